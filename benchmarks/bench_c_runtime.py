@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+################################################################################
+# \file bench_c_runtime
+#
+# Host benchmark of the generated C runtime: parser throughput for a few
+# receive buffer sizes and TX frame packing rate, built with gcc using the
+# CRC lookup table or the bitwise CRC, and a binary search or the generated
+# switch for message info lookups
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, Path(__file__).parent.parent.resolve().as_posix())
+
+from bench_model import make_dialect_xml  # noqa: E402
+from mavlib_gen.generator import GENERATOR_MAP  # noqa: E402
+from mavlib_gen.validator import MavlinkXmlValidator  # noqa: E402
+
+# argv: <number of frames> <repeat> <rx chunk size>...
+# prints one json object per measurement
+BENCH_SRC = r"""
+#define _POSIX_C_SOURCE 199309L
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+#include "mavlink_helpers.h"
+#include "synthetic/synthetic_msgs.h"
+
+static const mavlink_info_t MSG_INFO[] = MAVLINK_SYNTHETIC_MSG_INFO;
+#define MSG_INFO_COUNT MAVLINK_SYNTHETIC_MSG_INFO_COUNT
+
+static double now_s(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec * 1e-9;
+}
+
+int main(int argc, char **argv) {
+    size_t num_frames = (size_t)atol(argv[1]);
+    int repeat = atoi(argv[2]);
+    uint8_t *payloads = malloc(num_frames * MAVLINK_MAX_PAYLOAD_LEN);
+    uint8_t *stream = malloc(num_frames * MAVLINK_MAX_FRAME_LEN);
+    mavlink_channel_state_t chan;
+    mavlink_channel_init(&chan, NULL, MSG_INFO, MSG_INFO_COUNT);
+#ifdef BENCH_SWITCH_LOOKUP
+    chan.msg_info_fn = mavlink_synthetic_msg_info;
+#endif
+
+    uint32_t rand_state = 1;
+    for (size_t idx = 0; idx < num_frames * MAVLINK_MAX_PAYLOAD_LEN; ++idx) {
+        rand_state = rand_state * 1103515245u + 12345u;
+        payloads[idx] = (uint8_t)(rand_state >> 16);
+    }
+
+    // tx: pack every frame into the stream
+    size_t stream_len = 0;
+    double best_tx = 1e9;
+    for (int rep = 0; rep < repeat; ++rep) {
+        double start = now_s();
+        stream_len = 0;
+        for (size_t idx = 0; idx < num_frames; ++idx) {
+            const mavlink_info_t *info = &MSG_INFO[idx % MSG_INFO_COUNT];
+            stream_len += mavlink_pack_frame(&chan, stream + stream_len, MAVLINK_MAX_FRAME_LEN,
+                    payloads + idx * MAVLINK_MAX_PAYLOAD_LEN, info->msgid, info->crc_extra,
+                    info->len, 1, 1);
+        }
+        double elapsed = now_s() - start;
+        best_tx = elapsed < best_tx ? elapsed : best_tx;
+    }
+    printf("{\"op\": \"tx\", \"bytes\": %zu, \"frames\": %zu, \"seconds\": %.9f}\n",
+            stream_len, num_frames, best_tx);
+
+    // rx: parse the stream back, handing the parser chunk bytes at a time
+    mavlink_message_t msg;
+    for (int arg = 3; arg < argc; ++arg) {
+        size_t chunk = (size_t)atol(argv[arg]);
+        double best_rx = 1e9;
+        size_t parsed = 0;
+        for (int rep = 0; rep < repeat; ++rep) {
+            parsed = 0;
+            double start = now_s();
+            for (size_t offset = 0; offset < stream_len; offset += chunk) {
+                size_t len = stream_len - offset < chunk ? stream_len - offset : chunk;
+                size_t used = 0;
+                while (used < len) {
+                    size_t consumed;
+                    parsed += mavlink_parse_buf(&chan, stream + offset + used, len - used, &msg,
+                            &consumed);
+                    used += consumed;
+                }
+            }
+            double elapsed = now_s() - start;
+            best_rx = elapsed < best_rx ? elapsed : best_rx;
+        }
+        if (parsed != num_frames) {
+            fprintf(stderr, "parsed %zu of %zu frames\n", parsed, num_frames);
+            return 1;
+        }
+        printf("{\"op\": \"rx\", \"chunk\": %zu, \"bytes\": %zu, \"frames\": %zu, "
+                "\"seconds\": %.9f}\n", chunk, stream_len, parsed, best_rx);
+    }
+    return 0;
+}
+"""
+
+
+# (crc, message info lookup) combinations to measure
+VARIANTS = [("table", "bsearch"), ("bitwise", "bsearch"), ("table", "switch")]
+
+
+def build(gen_dir: Path, crc: str, lookup: str, cflags: list) -> Path:
+    """Compile the benchmark against the generated runtime. Returns the executable"""
+    exe = gen_dir / f"bench_c_runtime_{crc}_{lookup}"
+    defines = [f"-DMAVLINK_CRC_USE_TABLE={int(crc == 'table')}"]
+    if lookup == "switch":
+        defines.append("-DBENCH_SWITCH_LOOKUP")
+    subprocess.run(
+        ["gcc", "-std=c11", "-Wall"]
+        + defines
+        + cflags
+        + [f"-I{gen_dir}", "bench.c", "mavlink_helpers.c", "-o", exe.as_posix()],
+        cwd=gen_dir,
+        check=True,
+    )
+    return exe
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the generated C parser and TX path")
+    parser.add_argument("--messages", type=int, default=230)
+    parser.add_argument("--fields", type=int, default=12)
+    parser.add_argument("--frames", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[1, 16, 64, 4096])
+    parser.add_argument("--cflags", nargs="+", default=["-O2"])
+    parser.add_argument("--json", action="store_true", help="print raw results as json")
+    args = parser.parse_args()
+
+    if shutil.which("gcc") is None:
+        print("gcc is required to run this benchmark")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        gen_dir = Path(tmp_dir)
+        xml_path = gen_dir / "synthetic.xml"
+        xml_path.write_text(make_dialect_xml(args.messages, args.fields, 0, 0))
+        xmls = MavlinkXmlValidator().validate([xml_path])
+        assert xmls is not None
+        assert GENERATOR_MAP["c"]().generate(xmls, gen_dir)
+        (gen_dir / "bench.c").write_text(BENCH_SRC)
+
+        results = []
+        for crc, lookup in VARIANTS:
+            exe = build(gen_dir, crc, lookup, args.cflags)
+            run = subprocess.run(
+                [exe.as_posix(), str(args.frames), str(args.repeat)]
+                + [str(chunk) for chunk in args.chunks],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            for line in run.stdout.splitlines():
+                result = json.loads(line)
+                result["crc"] = crc
+                result["lookup"] = lookup
+                results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{args.frames} frames, {args.messages} message types, gcc {' '.join(args.cflags)}")
+    print(f"  {'crc':<8} {'lookup':<8} {'op':<12} {'MB/s':>9} {'frames/s':>12}")
+    for result in results:
+        op = "tx" if result["op"] == "tx" else f"rx {result['chunk']}B"
+        print(
+            f"  {result['crc']:<8} {result['lookup']:<8} {op:<12} "
+            + f"{result['bytes'] / result['seconds'] / 1e6:>9.1f} "
+            + f"{result['frames'] / result['seconds']:>12.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+################################################################################
+# \file bench_emb_cpp_compile
+#
+# Host compile times of translation units that include a large generated
+# emb_cpp dialect, for the header-per-message layout and the amalgamated
+# layout, each with and without the precompiled umbrella header
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, Path(__file__).parent.parent.resolve().as_posix())
+
+from bench_model import make_dialect_xml  # noqa: E402
+from mavlib_gen.lang_generators.generator_emb_cpp import EmbCppLangGenerator  # noqa: E402
+from mavlib_gen.validator import MavlinkXmlValidator  # noqa: E402
+
+# a translation unit that uses one message of the dialect. {idx} makes each one different
+TU_SRC = r"""
+#include "{header}"
+
+size_t serializeMessage{idx}(uint8_t* buf, size_t cap) {{
+    mavgen::synthetic::MessageSynthMessage{idx} msg;
+    return msg.serialize(buf, cap);
+}}
+"""
+
+# (amalgamate, precompiled umbrella) layouts to measure
+LAYOUTS = [(False, False), (False, True), (True, False), (True, True)]
+
+
+def compile_units(inc_dir: Path, units: list, cxxflags: list) -> dict:
+    """Compile each translation unit in turn. Returns total seconds and headers opened per unit"""
+    start = time.perf_counter()
+    headers_opened = 0
+    for unit in units:
+        # -H lists each header as it is opened (on stderr)
+        run = subprocess.run(
+            ["g++", "-std=c++17", "-H", f"-I{inc_dir}", f"-I{inc_dir / 'synthetic'}"]
+            + cxxflags
+            + ["-c", unit.as_posix(), "-o", unit.with_suffix(".o").as_posix()],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        headers_opened += sum(1 for line in run.stderr.splitlines() if line.startswith("."))
+    return {
+        "seconds": time.perf_counter() - start,
+        "headers_per_unit": headers_opened / len(units),
+    }
+
+
+def measure_layout(
+    xmls: dict, work_dir: Path, amalgamate: bool, pch: bool, num_units: int, cxxflags: list
+) -> dict:
+    generator = EmbCppLangGenerator(amalgamate=amalgamate, pch_umbrella=pch)
+    assert generator.generate(xmls, work_dir)
+    inc_dir = work_dir / "inc"
+
+    pch_seconds = 0.0
+    header = "SyntheticMsgs.hpp"
+    if pch:
+        # g++ uses inc/MavlinkPch.hpp.gch in place of the header when the flags match
+        header = "MavlinkPch.hpp"
+        start = time.perf_counter()
+        subprocess.run(
+            ["g++", "-std=c++17", "-x", "c++-header", f"-I{inc_dir}"]
+            + cxxflags
+            + [(inc_dir / header).as_posix(), "-o", (inc_dir / f"{header}.gch").as_posix()],
+            check=True,
+        )
+        pch_seconds = time.perf_counter() - start
+
+    units = []
+    for idx in range(num_units):
+        unit = work_dir / f"unit{idx}.cpp"
+        unit.write_text(TU_SRC.format(header=header, idx=idx))
+        units.append(unit)
+    result = compile_units(inc_dir, units, cxxflags)
+    result.update(
+        {
+            "layout": "amalgamated" if amalgamate else "per-message",
+            "pch": pch,
+            "pch_seconds": pch_seconds,
+            "units": num_units,
+            "files_generated": sum(1 for path in inc_dir.rglob("*.hpp")),
+        }
+    )
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark compile times of emb_cpp layouts")
+    parser.add_argument("--messages", type=int, default=230)
+    parser.add_argument("--fields", type=int, default=12)
+    parser.add_argument("--units", type=int, default=8, help="translation units to compile")
+    parser.add_argument("--cxxflags", nargs="+", default=["-O2"])
+    parser.add_argument("--json", action="store_true", help="print raw results as json")
+    args = parser.parse_args()
+
+    if shutil.which("g++") is None:
+        print("g++ is required to run this benchmark")
+        return 1
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        xml_path = Path(tmp_dir) / "synthetic.xml"
+        xml_path.write_text(make_dialect_xml(args.messages, args.fields, 0, 0))
+        xmls = MavlinkXmlValidator().validate([xml_path])
+        assert xmls is not None
+        for amalgamate, pch in LAYOUTS:
+            work_dir = Path(tmp_dir) / f"amalgamate{int(amalgamate)}_pch{int(pch)}"
+            results.append(
+                measure_layout(xmls, work_dir, amalgamate, pch, args.units, args.cxxflags)
+            )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(
+        f"{args.units} translation units, {args.messages} message types, "
+        + f"g++ {' '.join(args.cxxflags)}"
+    )
+    print(
+        f"  {'layout':<12} {'pch':<5} {'headers':>8} {'opened/unit':>12} {'s/unit':>8} "
+        + f"{'pch s':>7} {'total s':>8}"
+    )
+    for result in results:
+        print(
+            f"  {result['layout']:<12} {str(result['pch']):<5} {result['files_generated']:>8} "
+            + f"{result['headers_per_unit']:>12.0f} {result['seconds'] / result['units']:>8.3f} "
+            + f"{result['pch_seconds']:>7.2f} {result['seconds'] + result['pch_seconds']:>8.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
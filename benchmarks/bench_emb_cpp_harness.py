@@ -0,0 +1,359 @@
+#!/usr/bin/env python
+################################################################################
+# \file bench_emb_cpp_harness
+#
+# Host microbenchmark harness for generated emb_cpp code. Generates a dialect,
+# compiles a std::chrono harness against it with the local g++ and times
+# serialize, deserialize, MavlinkParser::parse and <Dialect>MsgTable::dispatch
+# over a corpus of frames of every message the dialect can receive. Also
+# reports the code size of each message's serialize/deserialize. Results are
+# written as json, and can be compared against a previous run's
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import argparse
+import json
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, Path(__file__).parent.parent.resolve().as_posix())
+
+from bench_model import make_dialect_xml  # noqa: E402
+from mavlib_gen.generator import GENERATOR_MAP  # noqa: E402
+from mavlib_gen.lang_generators.generator_emb_cpp import EmbCppLangGenerator  # noqa: E402
+from mavlib_gen.validator import MavlinkXmlValidator  # noqa: E402
+
+OPS = ["serialize", "deserialize", "parse", "dispatch"]
+
+# argv: <number of frames> <repeat> <parse chunk size>. {dialect_header}, {msg_table} and the
+# per message tables are filled in per dialect. Prints one json object per measurement
+HARNESS_SRC = r"""
+#include <stdio.h>
+#include <stdlib.h>
+#include <chrono>
+#include "{dialect_header}"
+
+using MsgTable = {msg_table};
+using SerializeFn = size_t (*)(uint8_t*, size_t);
+using DeserializeFn = size_t (*)(const uint8_t*, size_t);
+
+template <typename Msg>
+Msg instance;
+
+template <typename Msg>
+size_t serializeInstance(uint8_t* buf, size_t cap) {{
+    return instance<Msg>.serialize(buf, cap);
+}}
+
+template <typename Msg>
+size_t deserializeInstance(const uint8_t* buf, size_t len) {{
+    return instance<Msg>.deserialize(buf, len);
+}}
+
+// the messages in the corpus, and their serialize/deserialize functions
+static const uint32_t MSGIDS[] = {{ {msgids} }};
+static const SerializeFn SERIALIZE[] = {{ {serialize_fns} }};
+static const DeserializeFn DESERIALIZE[] = {{ {deserialize_fns} }};
+static constexpr size_t NUM_MSGS = sizeof(MSGIDS) / sizeof(MSGIDS[0]);
+
+/// Keep the compiler from optimizing away the computation of value
+template <typename T>
+static void doNotOptimize(const T& value) {{
+    asm volatile("" : : "r"(&value) : "memory");
+}}
+
+/// Fastest of repeat runs of fn, in seconds
+template <typename Fn>
+static double bestSeconds(int repeat, Fn&& fn) {{
+    double best = 1e9;
+    for (int rep = 0; rep < repeat; ++rep) {{
+        const auto start = std::chrono::steady_clock::now();
+        fn();
+        const std::chrono::duration<double> elapsed = std::chrono::steady_clock::now() - start;
+        best = elapsed.count() < best ? elapsed.count() : best;
+    }}
+    return best;
+}}
+
+static void printResult(const char* op, size_t bytes, size_t frames, double seconds) {{
+    printf("{{\"op\": \"%s\", \"bytes\": %zu, \"frames\": %zu, \"seconds\": %.9f}}\n", op, bytes,
+           frames, seconds);
+}}
+
+int main(int, char** argv) {{
+    const size_t numFrames = static_cast<size_t>(atol(argv[1]));
+    const int repeat = atoi(argv[2]);
+    const size_t chunk = static_cast<size_t>(atol(argv[3]));
+    uint8_t* stream = new uint8_t[numFrames * mavgen::MAV_MAX_FRAME_LEN];
+    uint8_t* out = new uint8_t[numFrames * mavgen::MAV_MAX_FRAME_LEN];
+    mavgen::MavlinkFrame* frames = new mavgen::MavlinkFrame[numFrames];
+
+    // the corpus: frames of each message in turn, with random payloads
+    uint32_t randState = 1;
+    uint8_t payload[mavgen::MAV_MAX_PAYLOAD_LEN];
+    mavgen::MavlinkHeader header{{}};
+    size_t streamLen = 0;
+    for (size_t idx = 0; idx < numFrames; ++idx) {{
+        const mavgen::MavlinkMsgInfo& info = *MsgTable::find(MSGIDS[idx % NUM_MSGS]);
+        for (size_t byte = 0; byte < info.maxLength; ++byte) {{
+            randState = randState * 1103515245u + 12345u;
+            payload[byte] = static_cast<uint8_t>(randState >> 16);
+        }}
+        header.seq = static_cast<uint8_t>(idx);
+        header.msgid = info.msgid;
+        streamLen += mavgen::serializeFrame(stream + streamLen, mavgen::MAV_MAX_FRAME_LEN, header,
+                                            info, payload);
+    }}
+
+    mavgen::MavlinkParser<MsgTable> parser;
+    size_t parsed = 0;
+    double seconds = bestSeconds(repeat, [&] {{
+        parser.reset();
+        parsed = 0;
+        for (size_t offset = 0; offset < streamLen; offset += chunk) {{
+            const size_t len = streamLen - offset < chunk ? streamLen - offset : chunk;
+            parsed += parser.parse(stream + offset, len, [](const mavgen::MavlinkFrame&) {{}});
+        }}
+    }});
+    if (parsed != numFrames) {{
+        fprintf(stderr, "parsed %zu of %zu frames\n", parsed, numFrames);
+        return 1;
+    }}
+    printResult("parse", streamLen, numFrames, seconds);
+
+    // the whole stream is one span, so every frame points into it
+    parser.reset();
+    size_t numParsed = 0;
+    parser.parse(stream, streamLen,
+                 [&](const mavgen::MavlinkFrame& frame) {{ frames[numParsed++] = frame; }});
+    seconds = bestSeconds(repeat, [&] {{
+        for (size_t idx = 0; idx < numFrames; ++idx) {{
+            MsgTable::dispatch(frames[idx], [](const auto& msg) {{ doNotOptimize(msg); }});
+        }}
+    }});
+    printResult("dispatch", streamLen, numFrames, seconds);
+
+    seconds = bestSeconds(repeat, [&] {{
+        size_t offset = 0;
+        for (size_t idx = 0; idx < numFrames; ++idx) {{
+            const size_t frameLen =
+                DESERIALIZE[idx % NUM_MSGS](stream + offset, streamLen - offset);
+            if (frameLen == 0) {{
+                fprintf(stderr, "frame %zu failed to deserialize\n", idx);
+                exit(1);
+            }}
+            offset += frameLen;
+        }}
+    }});
+    printResult("deserialize", streamLen, numFrames, seconds);
+
+    // serialize what the last deserialize left in each message instance
+    size_t outLen = 0;
+    seconds = bestSeconds(repeat, [&] {{
+        outLen = 0;
+        for (size_t idx = 0; idx < numFrames; ++idx) {{
+            outLen += SERIALIZE[idx % NUM_MSGS](out + outLen, mavgen::MAV_MAX_FRAME_LEN);
+        }}
+    }});
+    printResult("serialize", outLen, numFrames, seconds);
+
+    delete[] frames;
+    delete[] out;
+    delete[] stream;
+    return 0;
+}}
+"""
+
+
+def harness_source(dialect_header: str, msg_table: str, corpus_msgs: List[Tuple[int, str]]) -> str:
+    """Harness source for a dialect. corpus_msgs are the (msgid, qualified class name) of the
+    messages to put in the corpus"""
+    msg_classes = [class_name for _, class_name in corpus_msgs]
+    return HARNESS_SRC.format(
+        dialect_header=dialect_header,
+        msg_table=msg_table,
+        msgids=", ".join(str(msgid) for msgid, _ in corpus_msgs),
+        serialize_fns=", ".join(f"serializeInstance<{name}>" for name in msg_classes),
+        deserialize_fns=", ".join(f"deserializeInstance<{name}>" for name in msg_classes),
+    )
+
+
+def code_bytes(exe: Path, msg_classes: List[str]) -> Dict[str, any]:
+    """
+    Size of the code for each message in exe: every function with the message's class in its
+    name (its serialize/deserialize instantiations, and anything not inlined into them). The rest
+    of the mavgen code (EX: the parser and dispatch) is counted as shared
+    """
+    nm_out = subprocess.run(
+        ["nm", "--defined-only", "--print-size", "--demangle", exe.as_posix()],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    class_patterns = {name: re.compile(re.escape(name.lstrip(":")) + r"\b") for name in msg_classes}
+    per_message = {name.split("::")[-1]: 0 for name in msg_classes}
+    shared = 0
+    for line in nm_out.stdout.splitlines():
+        parts = line.split(maxsplit=3)
+        if len(parts) < 4 or parts[2] not in ("t", "T", "W"):
+            continue
+        size, symbol = int(parts[1], 16), parts[3]
+        owner = next((name for name, pat in class_patterns.items() if pat.search(symbol)), None)
+        if owner is not None:
+            per_message[owner.split("::")[-1]] += size
+        elif "mavgen::" in symbol:
+            shared += size
+    return {"per_message": per_message, "shared": shared}
+
+
+def run_harness(args: argparse.Namespace, out_dir: Path) -> Dict[str, any]:
+    """Generate, build and run the harness in out_dir. Returns the report"""
+    xml_path = args.xml
+    if xml_path is None:
+        xml_path = out_dir / "synthetic.xml"
+        xml_path.write_text(make_dialect_xml(args.messages, args.fields, 0, 0))
+    xmls = MavlinkXmlValidator().validate([xml_path])
+    assert xmls is not None
+    generator = GENERATOR_MAP["emb_cpp"](static_dispatch=args.static_dispatch)
+    assert generator.generate(xmls, out_dir)
+
+    # every message the dialect can receive, except those too long to fit in a frame
+    dialect = xmls[xml_path.name]
+    corpus_msgs = []
+    too_long = []
+    for name in (dialect.dependencies or []) + [xml_path.name]:
+        namespace = f"::mavgen::{xmls[name].name.lower()}"
+        for msg in xmls[name].xml.messages:
+            class_name = f"{namespace}::Message{msg.get_name('UpperCamel')}"
+            if msg.byte_length > EmbCppLangGenerator.MAX_PAYLOAD_LEN:
+                too_long.append(msg.name)
+            else:
+                corpus_msgs.append((msg.id, class_name))
+    corpus_msgs.sort()
+    msg_classes = [class_name for _, class_name in corpus_msgs]
+    dialect_dir = dialect.get_name("lower_snake")
+    (out_dir / "harness.cpp").write_text(
+        harness_source(
+            f"{dialect_dir}/{dialect.get_name('UpperCamel')}Msgs.hpp",
+            f"::mavgen::{dialect.name.lower()}::{dialect.get_name('UpperCamel')}MsgTable",
+            corpus_msgs,
+        )
+    )
+
+    exe = out_dir / "harness"
+    subprocess.run(
+        ["g++", "-std=c++17", "-Wall"]
+        + args.cxxflags
+        + [f"-I{out_dir / 'inc'}", "harness.cpp", "-o", exe.as_posix()],
+        cwd=out_dir,
+        check=True,
+    )
+    run = subprocess.run(
+        [exe.as_posix(), str(args.frames), str(args.repeat), str(args.chunk)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    results = {}
+    for line in run.stdout.splitlines():
+        result = json.loads(line)
+        result["ns_per_frame"] = result["seconds"] / result["frames"] * 1e9
+        results[result.pop("op")] = result
+
+    compiler = subprocess.run(["g++", "--version"], check=True, capture_output=True, text=True)
+    return {
+        "dialect": dialect.name,
+        "messages": len(msg_classes),
+        "too_long_messages": too_long,
+        "compiler": compiler.stdout.splitlines()[0],
+        "cxxflags": args.cxxflags,
+        "static_dispatch": args.static_dispatch,
+        "frames": args.frames,
+        "chunk": args.chunk,
+        "results": {op: results[op] for op in OPS},
+        "code_bytes": code_bytes(exe, msg_classes),
+    }
+
+
+def print_report(report: Dict[str, any], baseline: Dict[str, any] = None) -> None:
+    """Print report as a table. Changes from baseline are shown next to each value"""
+
+    def change(new: float, old: float) -> str:
+        return f" {(new - old) / old * 100:>+7.1f}%" if old else ""
+
+    print(
+        f"{report['dialect']}: {report['messages']} messages, {report['frames']} frames, "
+        + f"{report['compiler']} {' '.join(report['cxxflags'])}"
+        + (", static_dispatch" if report["static_dispatch"] else "")
+    )
+    print(f"  {'op':<12} {'ns/frame':>9} {'MB/s':>9} {'frames/s':>12}")
+    for op, result in report["results"].items():
+        old = baseline["results"][op]["ns_per_frame"] if baseline else 0
+        print(
+            f"  {op:<12} {result['ns_per_frame']:>9.1f} "
+            + f"{result['bytes'] / result['seconds'] / 1e6:>9.1f} "
+            + f"{result['frames'] / result['seconds']:>12.0f}{change(result['ns_per_frame'], old)}"
+        )
+
+    sizes = report["code_bytes"]
+    per_message = sizes["per_message"].values()
+    mean = sum(per_message) / len(per_message) if per_message else 0
+    old_mean = 0
+    if baseline:
+        old_sizes = baseline["code_bytes"]["per_message"].values()
+        old_mean = sum(old_sizes) / len(old_sizes) if old_sizes else 0
+    print(
+        f"  code bytes per message: {mean:.0f} mean, {max(per_message, default=0)} max"
+        + change(mean, old_mean)
+    )
+    old_shared = baseline["code_bytes"]["shared"] if baseline else 0
+    print(f"  shared code bytes: {sizes['shared']}{change(sizes['shared'], old_shared)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark generated emb_cpp code on the host")
+    parser.add_argument("--xml", type=Path, help="dialect to measure. Default: synthetic dialect")
+    parser.add_argument("--messages", type=int, default=230)
+    parser.add_argument("--fields", type=int, default=12)
+    parser.add_argument("--frames", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--chunk", type=int, default=4096, help="bytes per parse call")
+    parser.add_argument("--cxxflags", nargs="+", default=["-O2"])
+    parser.add_argument("--static-dispatch", action="store_true", help="generate static_dispatch")
+    parser.add_argument("--json", action="store_true", help="print the report as json")
+    parser.add_argument("--output", type=Path, help="also write the json report to this file")
+    parser.add_argument("--baseline", type=Path, help="json report of a previous run to compare")
+    parser.add_argument("--keep", type=Path, help="build in this dir instead of a temp dir")
+    args = parser.parse_args()
+
+    if shutil.which("g++") is None or shutil.which("nm") is None:
+        print("g++ and nm are required to run this benchmark")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        out_dir = (args.keep or Path(tmp_dir)).resolve()
+        out_dir.mkdir(parents=True, exist_ok=True)
+        report = run_harness(args, out_dir)
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    print_report(report, baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+################################################################################
+# \file bench_emb_cpp_parser
+#
+# Host benchmark of the generated emb_cpp MavlinkParser on a synthetic
+# dialect: receive throughput for a few span sizes (EX: DMA half-buffers),
+# built with g++ using the CRC lookup table or the bitwise CRC. Also measures
+# decoding every frame through the generated MsgTable::dispatch, for messages
+# generated with the virtual interface and with static_dispatch
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, Path(__file__).parent.parent.resolve().as_posix())
+
+from bench_model import make_dialect_xml  # noqa: E402
+from mavlib_gen.lang_generators.generator_emb_cpp import EmbCppLangGenerator  # noqa: E402
+from mavlib_gen.validator import MavlinkXmlValidator  # noqa: E402
+
+# argv: <number of frames> <repeat> <span size>...
+# prints one json object per measurement. op "parse" only counts frames, "dispatch" also decodes
+# each one into its message type
+BENCH_SRC = r"""
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+#include "MavlinkParser.hpp"
+#include "SyntheticMsgs.hpp"
+
+using MsgTable = mavgen::synthetic::SyntheticMsgTable;
+
+static double nowS() {
+    timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec * 1e-9;
+}
+
+int main(int argc, char** argv) {
+    const size_t numFrames = static_cast<size_t>(atol(argv[1]));
+    const int repeat = atoi(argv[2]);
+    uint8_t* stream = new uint8_t[numFrames * mavgen::MAV_MAX_FRAME_LEN];
+
+    // serialize random payloads of every message in the table
+    uint32_t randState = 1;
+    uint8_t payload[mavgen::MAV_MAX_PAYLOAD_LEN];
+    mavgen::MavlinkHeader header{};
+    size_t streamLen = 0;
+    for (size_t idx = 0; idx < numFrames; ++idx) {
+        const mavgen::MavlinkMsgInfo& info = MsgTable::INFO[idx % MsgTable::COUNT];
+        for (size_t byte = 0; byte < info.maxLength; ++byte) {
+            randState = randState * 1103515245u + 12345u;
+            payload[byte] = static_cast<uint8_t>(randState >> 16);
+        }
+        header.msgid = info.msgid;
+        header.seq = static_cast<uint8_t>(idx);
+        streamLen += mavgen::serializeFrame(stream + streamLen, mavgen::MAV_MAX_FRAME_LEN, header,
+                                            info, payload);
+    }
+
+    size_t checksum = 0;
+    auto visitor = [&checksum](const auto& msg) {
+        checksum += msg.getMsgInfo().maxLength + reinterpret_cast<const uint8_t*>(&msg.payload)[0];
+    };
+    for (int dispatch = 0; dispatch < 2; ++dispatch) {
+        for (int arg = 3; arg < argc; ++arg) {
+            const size_t span = static_cast<size_t>(atol(argv[arg]));
+            double best = 1e9;
+            size_t parsed = 0;
+            for (int rep = 0; rep < repeat; ++rep) {
+                mavgen::MavlinkParser<MsgTable> parser;
+                parsed = 0;
+                auto handler = [&](const mavgen::MavlinkFrame& frame) {
+                    if (dispatch) {
+                        MsgTable::dispatch(frame, visitor);
+                    } else {
+                        checksum += frame.payloadLen;
+                    }
+                };
+                const double start = nowS();
+                for (size_t offset = 0; offset < streamLen; offset += span) {
+                    const size_t len = streamLen - offset < span ? streamLen - offset : span;
+                    parsed += parser.parse(stream + offset, len, handler);
+                }
+                const double elapsed = nowS() - start;
+                best = elapsed < best ? elapsed : best;
+            }
+            if (parsed != numFrames) {
+                fprintf(stderr, "parsed %zu of %zu frames\n", parsed, numFrames);
+                return 1;
+            }
+            printf("{\"op\": \"%s\", \"span\": %zu, \"bytes\": %zu, \"frames\": %zu, "
+                   "\"seconds\": %.9f}\n", dispatch ? "dispatch" : "parse", span, streamLen,
+                   parsed, best);
+        }
+    }
+    fprintf(stderr, "checksum %zu\n", checksum);
+    delete[] stream;
+    return 0;
+}
+"""
+
+
+# (crc, message interface) combinations to measure
+VARIANTS = [("table", "virtual"), ("bitwise", "virtual"), ("table", "static")]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the emb_cpp MavlinkParser")
+    parser.add_argument("--messages", type=int, default=230)
+    parser.add_argument("--fields", type=int, default=12)
+    parser.add_argument("--frames", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--spans", type=int, nargs="+", default=[1, 16, 64, 512, 4096])
+    parser.add_argument("--cxxflags", nargs="+", default=["-O2"])
+    parser.add_argument("--json", action="store_true", help="print raw results as json")
+    args = parser.parse_args()
+
+    if shutil.which("g++") is None:
+        print("g++ is required to run this benchmark")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        gen_dir = Path(tmp_dir)
+        xml_path = gen_dir / "synthetic.xml"
+        xml_path.write_text(make_dialect_xml(args.messages, args.fields, 0, 0))
+        xmls = MavlinkXmlValidator().validate([xml_path])
+        assert xmls is not None
+        for interface in ["virtual", "static"]:
+            generator = EmbCppLangGenerator(static_dispatch=interface == "static")
+            assert generator.generate(xmls, gen_dir / interface)
+        (gen_dir / "bench.cpp").write_text(BENCH_SRC)
+
+        results = []
+        for crc, interface in VARIANTS:
+            inc_dir = gen_dir / interface / "inc"
+            exe = gen_dir / f"bench_{crc}_{interface}"
+            subprocess.run(
+                ["g++", "-std=c++17", "-Wall", "-fno-exceptions", "-fno-rtti"]
+                + [f"-DMAV_CRC_USE_TABLE={int(crc == 'table')}"]
+                + args.cxxflags
+                + [f"-I{inc_dir}", f"-I{inc_dir / 'synthetic'}", "bench.cpp", "-o", exe.as_posix()],
+                cwd=gen_dir,
+                check=True,
+            )
+            run = subprocess.run(
+                [exe.as_posix(), str(args.frames), str(args.repeat)]
+                + [str(span) for span in args.spans],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            for line in run.stdout.splitlines():
+                result = json.loads(line)
+                result["crc"] = crc
+                result["interface"] = interface
+                results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{args.frames} frames, {args.messages} message types, g++ {' '.join(args.cxxflags)}")
+    print(f"  {'crc':<8} {'messages':<9} {'op':<9} {'span B':>7} {'MB/s':>9} {'frames/s':>12}")
+    for result in results:
+        print(
+            f"  {result['crc']:<8} {result['interface']:<9} {result['op']:<9} {result['span']:>7} "
+            + f"{result['bytes'] / result['seconds'] / 1e6:>9.1f} "
+            + f"{result['frames'] / result['seconds']:>12.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
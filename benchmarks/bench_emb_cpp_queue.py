@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+################################################################################
+# \file bench_emb_cpp_queue
+#
+# Host benchmark of the generated emb_cpp MavlinkFrameQueue on a synthetic
+# dialect: frames/s through the queue with the producer and consumer on
+# separate threads, and the cost of a push + pop on one thread
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, Path(__file__).parent.parent.resolve().as_posix())
+
+from bench_model import make_dialect_xml  # noqa: E402
+from mavlib_gen.generator import GENERATOR_MAP  # noqa: E402
+from mavlib_gen.validator import MavlinkXmlValidator  # noqa: E402
+
+# argv: <number of frames> <repeat>. QUEUE_DEPTH is defined on the command line.
+# prints one json object per measurement
+BENCH_SRC = r"""
+#include <stdio.h>
+#include <stdlib.h>
+#include <thread>
+#include <time.h>
+#include "MavlinkFrameQueue.hpp"
+#include "SyntheticMsgs.hpp"
+
+using MsgTable = mavgen::synthetic::SyntheticMsgTable;
+using Queue = mavgen::MavlinkFrameQueue<MsgTable, QUEUE_DEPTH>;
+
+static double nowS() {
+    timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec * 1e-9;
+}
+
+static void printResult(const char* op, size_t bytes, size_t frames, double seconds) {
+    printf("{\"op\": \"%s\", \"depth\": %d, \"bytes\": %zu, \"frames\": %zu, "
+           "\"seconds\": %.9f}\n", op, QUEUE_DEPTH, bytes, frames, seconds);
+}
+
+int main(int, char** argv) {
+    const size_t numFrames = static_cast<size_t>(atol(argv[1]));
+    const int repeat = atoi(argv[2]);
+    uint8_t* stream = new uint8_t[numFrames * mavgen::MAV_MAX_FRAME_LEN];
+    size_t* offsets = new size_t[numFrames + 1];
+
+    uint32_t randState = 1;
+    uint8_t payload[mavgen::MAV_MAX_PAYLOAD_LEN];
+    mavgen::MavlinkHeader header{};
+    offsets[0] = 0;
+    for (size_t idx = 0; idx < numFrames; ++idx) {
+        const mavgen::MavlinkMsgInfo& info = MsgTable::INFO[idx % MsgTable::COUNT];
+        for (size_t byte = 0; byte < info.maxLength; ++byte) {
+            randState = randState * 1103515245u + 12345u;
+            payload[byte] = static_cast<uint8_t>(randState >> 16);
+        }
+        header.msgid = info.msgid;
+        offsets[idx + 1] = offsets[idx] + mavgen::serializeFrame(stream + offsets[idx],
+                                                                 mavgen::MAV_MAX_FRAME_LEN,
+                                                                 header, info, payload);
+    }
+    const size_t streamLen = offsets[numFrames];
+
+    size_t checksum = 0;
+    double best = 1e9;
+    for (int rep = 0; rep < repeat; ++rep) {
+        static Queue queue;
+        const double start = nowS();
+        std::thread producer([&] {
+            for (size_t idx = 0; idx < numFrames; ++idx) {
+                while (!queue.push(stream + offsets[idx], offsets[idx + 1] - offsets[idx])) {
+                    std::this_thread::yield();
+                }
+            }
+        });
+        mavgen::MavlinkFrame frame{};
+        for (size_t received = 0; received < numFrames;) {
+            if (!queue.front(frame)) {
+                std::this_thread::yield();
+                continue;
+            }
+            checksum += frame.payloadLen;
+            queue.pop();
+            ++received;
+        }
+        producer.join();
+        const double elapsed = nowS() - start;
+        best = elapsed < best ? elapsed : best;
+    }
+    printResult("threads", streamLen, numFrames, best);
+
+    // push then pop on one thread: the cost of the queue operations themselves
+    best = 1e9;
+    for (int rep = 0; rep < repeat; ++rep) {
+        static Queue queue;
+        mavgen::MavlinkFrame frame{};
+        const double start = nowS();
+        for (size_t idx = 0; idx < numFrames; ++idx) {
+            queue.push(stream + offsets[idx], offsets[idx + 1] - offsets[idx]);
+            queue.front(frame);
+            checksum += frame.payloadLen;
+            queue.pop();
+        }
+        const double elapsed = nowS() - start;
+        best = elapsed < best ? elapsed : best;
+    }
+    printResult("one_thread", streamLen, numFrames, best);
+    fprintf(stderr, "checksum %zu\n", checksum);
+    delete[] offsets;
+    delete[] stream;
+    return 0;
+}
+"""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the emb_cpp MavlinkFrameQueue")
+    parser.add_argument("--messages", type=int, default=230)
+    parser.add_argument("--fields", type=int, default=12)
+    parser.add_argument("--frames", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--depths", type=int, nargs="+", default=[4, 16, 64, 256])
+    parser.add_argument("--cxxflags", nargs="+", default=["-O2"])
+    parser.add_argument("--json", action="store_true", help="print raw results as json")
+    args = parser.parse_args()
+
+    if shutil.which("g++") is None:
+        print("g++ is required to run this benchmark")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        gen_dir = Path(tmp_dir)
+        xml_path = gen_dir / "synthetic.xml"
+        xml_path.write_text(make_dialect_xml(args.messages, args.fields, 0, 0))
+        xmls = MavlinkXmlValidator().validate([xml_path])
+        assert xmls is not None
+        assert GENERATOR_MAP["emb_cpp"]().generate(xmls, gen_dir)
+        (gen_dir / "bench.cpp").write_text(BENCH_SRC)
+
+        inc_dir = gen_dir / "inc"
+        results = []
+        for depth in args.depths:
+            exe = gen_dir / f"bench_{depth}"
+            subprocess.run(
+                ["g++", "-std=c++17", "-Wall", "-pthread", f"-DQUEUE_DEPTH={depth}"]
+                + ["-DMAV_QUEUE_INDEX_ALIGN=64"]
+                + args.cxxflags
+                + [f"-I{inc_dir}", f"-I{inc_dir / 'synthetic'}", "bench.cpp", "-o", exe.as_posix()],
+                cwd=gen_dir,
+                check=True,
+            )
+            run = subprocess.run(
+                [exe.as_posix(), str(args.frames), str(args.repeat)],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            results.extend(json.loads(line) for line in run.stdout.splitlines())
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{args.frames} frames, {args.messages} message types, g++ {' '.join(args.cxxflags)}")
+    print(f"  {'op':<11} {'depth':>6} {'MB/s':>9} {'frames/s':>12}")
+    for result in results:
+        print(
+            f"  {result['op']:<11} {result['depth']:>6} "
+            + f"{result['bytes'] / result['seconds'] / 1e6:>9.1f} "
+            + f"{result['frames'] / result['seconds']:>12.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
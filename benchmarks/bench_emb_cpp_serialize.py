@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+################################################################################
+# \file bench_emb_cpp_serialize
+#
+# Host benchmark of the generated emb_cpp Message<Name>::serialize and
+# deserialize methods on a synthetic dialect, built with g++. Also compares
+# reading one field of each received payload by decoding the whole payload
+# against reading it through the message's view
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, Path(__file__).parent.parent.resolve().as_posix())
+
+from bench_model import make_dialect_xml  # noqa: E402
+from mavlib_gen.generator import GENERATOR_MAP  # noqa: E402
+from mavlib_gen.validator import MavlinkXmlValidator  # noqa: E402
+
+# argv: <number of frames> <repeat>. {includes} and {msg_classes} are filled in per dialect.
+# prints one json object per measurement
+BENCH_SRC = r"""
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+{includes}
+
+using namespace mavgen::synthetic;
+
+using SerializeFn = size_t (*)(uint8_t*, size_t);
+using DeserializeFn = size_t (*)(const uint8_t*, size_t);
+using ReadFieldFn = uint64_t (*)(const uint8_t*, size_t);
+
+template <typename Msg>
+Msg instance;
+
+template <typename Msg>
+size_t serializeInstance(uint8_t* buf, size_t cap) {{
+    return instance<Msg>.serialize(buf, cap);
+}}
+
+template <typename Msg>
+size_t deserializeInstance(const uint8_t* buf, size_t len) {{
+    return instance<Msg>.deserialize(buf, len);
+}}
+
+template <typename Msg>
+void fillInstance(uint32_t& randState) {{
+    uint8_t* bytes = reinterpret_cast<uint8_t*>(&instance<Msg>.payload);
+    for (size_t idx = 0; idx < sizeof(instance<Msg>.payload); ++idx) {{
+        randState = randState * 1103515245u + 12345u;
+        bytes[idx] = static_cast<uint8_t>(randState >> 16);
+    }}
+}}
+
+static const SerializeFn SERIALIZE[] = {{ {serialize_fns} }};
+static const DeserializeFn DESERIALIZE[] = {{ {deserialize_fns} }};
+// read the first field (in wire order) of a payload, by decoding it or through a view
+static const ReadFieldFn DECODE_FIELD[] = {{ {decode_field_fns} }};
+static const ReadFieldFn VIEW_FIELD[] = {{ {view_field_fns} }};
+static constexpr size_t NUM_TYPES = sizeof(SERIALIZE) / sizeof(SERIALIZE[0]);
+
+static double nowS() {{
+    timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec * 1e-9;
+}}
+
+int main(int, char** argv) {{
+    const size_t numFrames = static_cast<size_t>(atol(argv[1]));
+    const int repeat = atoi(argv[2]);
+    uint32_t randState = 1;
+    {fill_calls}
+    uint8_t* stream = new uint8_t[numFrames * mavgen::MAV_MAX_FRAME_LEN];
+
+    size_t streamLen = 0;
+    double best = 1e9;
+    for (int rep = 0; rep < repeat; ++rep) {{
+        const double start = nowS();
+        streamLen = 0;
+        for (size_t idx = 0; idx < numFrames; ++idx) {{
+            streamLen += SERIALIZE[idx % NUM_TYPES](stream + streamLen, mavgen::MAV_MAX_FRAME_LEN);
+        }}
+        const double elapsed = nowS() - start;
+        best = elapsed < best ? elapsed : best;
+    }}
+    printf("{{\"op\": \"serialize\", \"bytes\": %zu, \"frames\": %zu, \"seconds\": %.9f}}\n",
+           streamLen, numFrames, best);
+
+    best = 1e9;
+    for (int rep = 0; rep < repeat; ++rep) {{
+        const double start = nowS();
+        size_t offset = 0;
+        for (size_t idx = 0; idx < numFrames; ++idx) {{
+            const size_t frameLen =
+                DESERIALIZE[idx % NUM_TYPES](stream + offset, streamLen - offset);
+            if (frameLen == 0) {{
+                fprintf(stderr, "frame %zu failed to deserialize\n", idx);
+                return 1;
+            }}
+            offset += frameLen;
+        }}
+        const double elapsed = nowS() - start;
+        best = elapsed < best ? elapsed : best;
+    }}
+    printf("{{\"op\": \"deserialize\", \"bytes\": %zu, \"frames\": %zu, \"seconds\": %.9f}}\n",
+           streamLen, numFrames, best);
+
+    const ReadFieldFn* readFns[] = {{DECODE_FIELD, VIEW_FIELD}};
+    const char* readOps[] = {{"decode_field", "view_field"}};
+    uint64_t checksum = 0;
+    for (int op = 0; op < 2; ++op) {{
+        best = 1e9;
+        for (int rep = 0; rep < repeat; ++rep) {{
+            const double start = nowS();
+            size_t offset = 0;
+            for (size_t idx = 0; idx < numFrames; ++idx) {{
+                const uint8_t* frame = stream + offset;
+                const uint8_t payloadLen = frame[1];
+                checksum += readFns[op][idx % NUM_TYPES](frame + mavgen::MAV_NUM_HEADER_BYTES,
+                                                         payloadLen);
+                offset += mavgen::MAV_NUM_HEADER_BYTES + payloadLen;
+                offset += mavgen::MAV_NUM_CHECKSUM_BYTES;
+            }}
+            const double elapsed = nowS() - start;
+            best = elapsed < best ? elapsed : best;
+        }}
+        printf("{{\"op\": \"%s\", \"bytes\": %zu, \"frames\": %zu, \"seconds\": %.9f}}\n",
+               readOps[op], streamLen, numFrames, best);
+    }}
+    fprintf(stderr, "checksum %llu\n", static_cast<unsigned long long>(checksum));
+    delete[] stream;
+    return 0;
+}}
+"""
+
+
+def bench_source(msg_classes: list, first_fields: list) -> str:
+    """
+    Benchmark source for a dialect with the given Message<Name> class names, and the first field
+    (in wire order) of each message as (name, is array)
+    """
+
+    def read_field(expression: str, is_array: bool) -> str:
+        return f"static_cast<uint64_t>({expression}{'[0]' if is_array else ''})"
+
+    return BENCH_SRC.format(
+        includes="\n".join(f'#include "{name}.hpp"' for name in msg_classes),
+        serialize_fns=", ".join(f"serializeInstance<{name}>" for name in msg_classes),
+        deserialize_fns=", ".join(f"deserializeInstance<{name}>" for name in msg_classes),
+        fill_calls="\n    ".join(f"fillInstance<{name}>(randState);" for name in msg_classes),
+        decode_field_fns=", ".join(
+            f"[](const uint8_t* w, size_t n) {{ {name} m; m.decodePayload(w, n); return "
+            + f"{read_field(f'm.payload.{field}', is_array)}; }}"
+            for name, (field, is_array) in zip(msg_classes, first_fields)
+        ),
+        view_field_fns=", ".join(
+            "[](const uint8_t* w, size_t n) { return "
+            + f"{read_field(f'{name}View(w, n).{field}()', is_array)}; }}"
+            for name, (field, is_array) in zip(msg_classes, first_fields)
+        ),
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark emb_cpp serialize/deserialize")
+    parser.add_argument("--messages", type=int, default=230)
+    parser.add_argument("--fields", type=int, default=12)
+    parser.add_argument("--frames", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cxxflags", nargs="+", default=["-O2"])
+    parser.add_argument("--json", action="store_true", help="print raw results as json")
+    args = parser.parse_args()
+
+    if shutil.which("g++") is None:
+        print("g++ is required to run this benchmark")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        gen_dir = Path(tmp_dir)
+        xml_path = gen_dir / "synthetic.xml"
+        xml_path.write_text(make_dialect_xml(args.messages, args.fields, 0, 0))
+        xmls = MavlinkXmlValidator().validate([xml_path])
+        assert xmls is not None
+        assert GENERATOR_MAP["emb_cpp"]().generate(xmls, gen_dir)
+        messages = next(iter(xmls.values())).xml.messages
+        msg_classes = [f"Message{msg.get_name('UpperCamel')}" for msg in messages]
+        first_fields = [
+            (msg.all_fields_sorted[0].name, msg.all_fields_sorted[0].is_array) for msg in messages
+        ]
+        (gen_dir / "bench.cpp").write_text(bench_source(msg_classes, first_fields))
+
+        inc_dir = gen_dir / "inc"
+        results = []
+        for crc in ["table", "bitwise"]:
+            exe = gen_dir / f"bench_{crc}"
+            subprocess.run(
+                ["g++", "-std=c++17", "-Wall", f"-DMAV_CRC_USE_TABLE={int(crc == 'table')}"]
+                + args.cxxflags
+                + [f"-I{inc_dir}", f"-I{inc_dir / 'synthetic'}", "bench.cpp", "-o", exe.as_posix()],
+                cwd=gen_dir,
+                check=True,
+            )
+            run = subprocess.run(
+                [exe.as_posix(), str(args.frames), str(args.repeat)],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            for line in run.stdout.splitlines():
+                result = json.loads(line)
+                result["crc"] = crc
+                results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{args.frames} frames, {args.messages} message types, g++ {' '.join(args.cxxflags)}")
+    print(f"  {'crc':<8} {'op':<12} {'MB/s':>9} {'frames/s':>12}")
+    for result in results:
+        print(
+            f"  {result['crc']:<8} {result['op']:<12} "
+            + f"{result['bytes'] / result['seconds'] / 1e6:>9.1f} "
+            + f"{result['frames'] / result['seconds']:>12.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+################################################################################
+# \file bench_include_graph
+#
+# Scaling benchmark for include tree expansion, cycle detection and
+# dependency list generation on synthetic include graphs
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import networkx as netx
+
+sys.path.insert(0, Path(__file__).parent.parent.resolve().as_posix())
+
+from mavlib_gen.model.mavlink_xml import MavlinkXmlFile  # noqa: E402
+from mavlib_gen.validator import MavlinkXmlValidator  # noqa: E402
+
+
+def make_include_graph(num_dialects: int, fanout: int, seed: int) -> Dict[str, List[str]]:
+    """
+    Build a random acyclic include graph. Dialect i always includes dialect i+1 (so everything is
+    reachable from dialect 0) plus up to fanout-1 random dialects with a larger index
+    """
+    rng = random.Random(seed)
+    graph = {}
+    for idx in range(num_dialects):
+        includes = set()
+        if idx + 1 < num_dialects:
+            includes.add(idx + 1)
+            for _ in range(fanout - 1):
+                includes.add(rng.randrange(idx + 1, num_dialects))
+        graph[f"d{idx}.xml"] = [f"d{inc}.xml" for inc in sorted(includes)]
+    return graph
+
+
+def legacy_expand_graph(graph: Dict[str, List[str]]) -> netx.DiGraph:
+    """Previous approach: check the whole graph is still acyclic after adding every edge"""
+    include_graph = netx.DiGraph()
+    for dialect, includes in graph.items():
+        include_graph.add_node(dialect)
+        for included in includes:
+            include_graph.add_edges_from([(dialect, included)])
+            assert netx.is_directed_acyclic_graph(include_graph)
+    return include_graph
+
+
+def legacy_dependency_lists(include_graph: netx.DiGraph) -> Dict[str, List[str]]:
+    """Previous approach: a separate depth-first search from every node"""
+    deps = {}
+    for node in include_graph.nodes:
+        deps[node] = [n for n in netx.dfs_postorder_nodes(include_graph, source=node) if n != node]
+    return deps
+
+
+def bench_graph_algorithms(graph: Dict[str, List[str]]) -> Dict[str, float]:
+    """Time the legacy and current cycle check + dependency closure on an in-memory graph"""
+    results = {}
+    start = time.perf_counter()
+    legacy_graph = legacy_expand_graph(graph)
+    legacy_deps = legacy_dependency_lists(legacy_graph)
+    results["legacy"] = time.perf_counter() - start
+
+    validator = MavlinkXmlValidator()
+    xmls = {name: MavlinkXmlFile(f"/synthetic/{name}", {}) for name in graph.keys()}
+    start = time.perf_counter()
+    include_graph = netx.DiGraph()
+    for dialect, includes in graph.items():
+        include_graph.add_node(dialect)
+        include_graph.add_edges_from((dialect, included) for included in includes)
+    try:
+        netx.find_cycle(include_graph)
+        raise RuntimeError("synthetic include graph has a cycle")
+    except netx.NetworkXNoCycle:
+        pass
+    validator.generate_dependency_list(xmls, include_graph)
+    results["current"] = time.perf_counter() - start
+
+    for name, xml in xmls.items():
+        assert sorted(xml.dependencies) == sorted(legacy_deps[name])
+    return results
+
+
+def bench_end_to_end(graph: Dict[str, List[str]]) -> float:
+    """Write the graph out as xml files and time a full MavlinkXmlValidator.validate of it"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for idx, (dialect, includes) in enumerate(graph.items()):
+            include_tags = "".join(f"<include>{inc}</include>" for inc in includes)
+            message = (
+                f'<messages><message id="{idx}" name="MSG_{idx}">'
+                + '<field name="value" type="uint32_t">value</field></message></messages>'
+            )
+            (Path(tmp_dir) / dialect).write_text(f"<mavlink>{include_tags}{message}</mavlink>")
+        validator = MavlinkXmlValidator(max_workers=1)
+        start = time.perf_counter()
+        result = validator.validate([Path(tmp_dir) / "d0.xml"])
+        elapsed = time.perf_counter() - start
+        assert result is not None and len(result) == len(graph)
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark include graph expansion on synthetic include trees"
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 200, 400], help="number of dialects"
+    )
+    parser.add_argument("--fanout", type=int, default=4, help="max includes per dialect")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--skip-end-to-end", action="store_true", help="only benchmark the graph algorithms"
+    )
+    args = parser.parse_args()
+
+    print(f"{'dialects':>9} {'edges':>7} {'legacy (s)':>11} {'current (s)':>12} {'e2e (s)':>8}")
+    for size in args.sizes:
+        graph = make_include_graph(size, args.fanout, args.seed)
+        num_edges = sum(len(includes) for includes in graph.values())
+        results = bench_graph_algorithms(graph)
+        e2e = "-" if args.skip_end_to_end else f"{bench_end_to_end(graph):.3f}"
+        print(
+            f"{size:>9} {num_edges:>7} {results['legacy']:>11.3f} {results['current']:>12.4f}"
+            + f" {e2e:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+################################################################################
+# \file bench_model
+#
+# Benchmark building and using the mavlink model objects for a synthetic
+# dialect roughly the size of common.xml
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import argparse
+import gc
+import importlib.util
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Tuple
+
+sys.path.insert(0, Path(__file__).parent.parent.resolve().as_posix())
+
+from mavlib_gen.validator import MavlinkXmlValidator  # noqa: E402
+from mavlib_gen.lang_generators.generator_python import PythonLangGenerator  # noqa: E402
+from mavlib_gen.lang_generators.generator_emb_cpp import EmbCppLangGenerator  # noqa: E402
+from mavlib_gen.lang_generators.generator_rst import RstLangGenerator  # noqa: E402
+from mavlib_gen import runtime_codec  # noqa: E402
+
+FIELD_TYPES = ["uint8_t", "int16_t", "uint32_t", "float", "uint64_t", "char[16]", "float[4]"]
+
+
+def make_dialect_xml(num_messages: int, num_fields: int, num_enums: int, num_entries: int) -> str:
+    """Make a synthetic dialect xml with common.xml-like descriptions and structure"""
+    description = (
+        "\n                Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod"
+        + "\n                tempor incididunt ut labore et dolore magna aliqua.\n            "
+    )
+    out = ["<mavlink>", "<enums>"]
+    for enum_idx in range(num_enums):
+        out.append(f'<enum name="SYNTH_ENUM_{enum_idx}"><description>{description}</description>')
+        for entry_idx in range(num_entries):
+            out.append(
+                f'<entry value="{entry_idx}" name="SYNTH_ENUM_{enum_idx}_ENTRY_{entry_idx}">'
+                + f"<description>{description}</description>"
+            )
+            if enum_idx % 8 == 0:
+                out.extend(f'<param index="{p}">Param {p}</param>' for p in range(1, 8))
+            out.append("</entry>")
+        out.append("</enum>")
+    out.append("</enums>")
+    out.append("<messages>")
+    for msg_idx in range(num_messages):
+        out.append(f'<message id="{msg_idx}" name="SYNTH_MESSAGE_{msg_idx}">')
+        out.append(f"<description>{description}</description>")
+        for field_idx in range(num_fields):
+            if field_idx == num_fields - 2:
+                out.append("<extensions/>")
+            field_type = FIELD_TYPES[(msg_idx + field_idx) % len(FIELD_TYPES)]
+            out.append(
+                f'<field type="{field_type}" name="field_{field_idx}" units="m">{description}'
+                + "</field>"
+            )
+        out.append("</message>")
+    out.append("</messages></mavlink>")
+    return "\n".join(out)
+
+
+def time_it(func: Callable[[], any], repeat: int) -> float:
+    """median wall time of func in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def template_like_access(xml_file: any) -> None:
+    """Access the model the way the jinja templates do (repeated property and name lookups)"""
+    for msg in xml_file.xml.messages:
+        for _ in range(4):
+            for field in msg.all_fields_sorted:
+                field.get_name("UpperCamel")
+                field.formatted_description(line_prefix=" * ")
+            for field in msg.all_fields:
+                field.name
+            msg.num_fields
+            msg.get_name("UpperCamel")
+            msg.get_name("UPPER_SNAKE")
+            msg.formatted_description(line_prefix=" * ")
+    for enum in xml_file.xml.enums:
+        for _ in range(4):
+            enum.has_params
+            enum.get_name("UpperCamel")
+            for entry in enum.entries:
+                entry.has_params
+                entry.get_name("UPPER_SNAKE")
+                entry.formatted_description(line_prefix="///")
+
+
+def time_generation(
+    validator: MavlinkXmlValidator, xml_path: Path, out_dir: Path, repeat: int
+) -> Tuple[float, float]:
+    """
+    median wall time of running the python, emb_cpp and rst generators back to back (like a
+    multi-generator config does). Returns (time against a freshly built model, time against a
+    model that has already been through a generation pass)
+    """
+    generators = [PythonLangGenerator(), EmbCppLangGenerator(), RstLangGenerator()]
+
+    def generate_all(xmls: dict) -> None:
+        for generator in generators:
+            assert generator.generate(xmls, out_dir / generator.lang_name())
+
+    fresh_times = []
+    reused_times = []
+    for _ in range(repeat):
+        xmls = validator.validate([xml_path])
+        start = time.perf_counter()
+        generate_all(xmls)
+        fresh_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        generate_all(xmls)
+        reused_times.append(time.perf_counter() - start)
+    return statistics.median(fresh_times), statistics.median(reused_times)
+
+
+def time_runtime_codec(
+    xml_file: any, xml_path: Path, out_dir: Path, repeat: int
+) -> Tuple[float, float, float]:
+    """
+    median wall time to get usable python message classes for a dialect. Returns (building them
+    in memory with an empty codec cache, getting them again from the cache, generating python
+    code and importing it)
+    """
+    xmls = {xml_path.as_posix(): xml_file}
+
+    def build_cold() -> None:
+        runtime_codec.clear_codec_cache()
+        runtime_codec.build_codecs(xmls)
+
+    cold_time = time_it(build_cold, repeat)
+    cached_time = time_it(lambda: runtime_codec.build_codecs(xmls), repeat)
+
+    sys.path.insert(0, out_dir.as_posix())
+    import_count = [0]
+
+    def generate_and_import() -> None:
+        assert PythonLangGenerator().generate(xmls, out_dir)
+        import_count[0] += 1
+        spec = importlib.util.spec_from_file_location(
+            f"synthetic_msgs_{import_count[0]}", out_dir / "synthetic_msgs.py"
+        )
+        spec.loader.exec_module(importlib.util.module_from_spec(spec))
+
+    generated_time = time_it(generate_and_import, repeat)
+    return cold_time, cached_time, generated_time
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark model object construction, memory and access"
+    )
+    parser.add_argument("--messages", type=int, default=230)
+    parser.add_argument("--fields", type=int, default=9)
+    parser.add_argument("--enums", type=int, default=160)
+    parser.add_argument("--entries", type=int, default=14)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument(
+        "--schema-path",
+        action="store_true",
+        help="load through the full xsd schema instead of the fast structural validator",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        xml_path = Path(tmp_dir) / "synthetic.xml"
+        xml_path.write_text(make_dialect_xml(args.messages, args.fields, args.enums, args.entries))
+        validator = MavlinkXmlValidator(use_fast_path=not args.schema_path)
+        xml_file = validator.validate_single_xml(xml_path)
+        assert xml_file is not None
+
+        load_time = time_it(lambda: validator.validate_single_xml(xml_path), args.repeat)
+
+        gc.collect()
+        tracemalloc.start()
+        baseline = tracemalloc.take_snapshot()
+        kept_model = validator.validate_single_xml(xml_path)
+        # parse trees can be left in reference cycles, only count what survives a collection
+        gc.collect()
+        retained = sum(
+            stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, "filename")
+        )
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert kept_model is not None
+
+        access_time = time_it(lambda: template_like_access(xml_file), args.repeat)
+        gen_fresh, gen_reused = time_generation(
+            validator, xml_path, Path(tmp_dir) / "out", args.repeat
+        )
+        codec_cold, codec_cached, codec_generated = time_runtime_codec(
+            xml_file, xml_path, Path(tmp_dir) / "out" / "python_import", args.repeat
+        )
+
+    num_fields = sum(msg.num_fields for msg in xml_file.xml.messages)
+    num_entries = sum(len(enum.entries) for enum in xml_file.xml.enums)
+    print(
+        f"synthetic dialect: {args.messages} messages, {num_fields} fields, "
+        + f"{args.enums} enums, {num_entries} entries"
+    )
+    print(f"  load (parse + validate + model build): {load_time * 1e3:8.2f} ms")
+    print(f"  model memory retained:                  {retained / 1024:8.1f} KiB")
+    print(f"  peak memory during load:                {peak / 1024:8.1f} KiB")
+    print(f"  template-like access:                   {access_time * 1e3:8.2f} ms")
+    print(f"  generate python+emb_cpp+rst:            {gen_fresh * 1e3:8.2f} ms")
+    print(f"  generate again with the same model:     {gen_reused * 1e3:8.2f} ms")
+    print(f"  runtime codec build:                    {codec_cold * 1e3:8.2f} ms")
+    print(f"  runtime codec cached:                   {codec_cached * 1e3:8.2f} ms")
+    print(f"  generate python + import:               {codec_generated * 1e3:8.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
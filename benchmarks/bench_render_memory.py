@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+################################################################################
+# \file bench_render_memory
+#
+# Measure peak memory while generating a large synthetic dialect. Each
+# generator runs in its own process so peak RSS numbers are independent
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, Path(__file__).parent.parent.resolve().as_posix())
+
+from bench_model import make_dialect_xml  # noqa: E402
+
+GENERATORS = ["python", "emb_cpp", "rst"]
+
+
+def peak_rss_kib() -> int:
+    """Peak resident set size of this process so far (ru_maxrss is KiB on linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure_generator(lang_name: str, xml_path: Path, out_dir: Path) -> dict:
+    """
+    Validate xml_path and run a single generator on it. Returns peak RSS before and after
+    generating, and the peak python heap allocated while generating
+    """
+    from mavlib_gen.generator import GENERATOR_MAP
+    from mavlib_gen.validator import MavlinkXmlValidator
+
+    xmls = MavlinkXmlValidator().validate([xml_path])
+    assert xmls is not None
+    generator = GENERATOR_MAP[lang_name]()
+    rss_before = peak_rss_kib()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    assert generator.generate(xmls, out_dir / lang_name)
+    elapsed = time.perf_counter() - start
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    output_size = sum(path.stat().st_size for path in (out_dir / lang_name).rglob("*"))
+    return {
+        "generator": lang_name,
+        "rss_before_kib": rss_before,
+        "rss_peak_kib": peak_rss_kib(),
+        "heap_peak_kib": heap_peak // 1024,
+        "output_kib": output_size // 1024,
+        "generate_ms": elapsed * 1e3,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark peak memory of code generation")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--fields", type=int, default=12)
+    parser.add_argument("--enums", type=int, default=160)
+    parser.add_argument("--entries", type=int, default=14)
+    parser.add_argument("--generators", nargs="+", default=GENERATORS)
+    # internal: run a single measurement and print it as json
+    parser.add_argument(
+        "--child", nargs=3, metavar=("LANG", "XML", "OUT_DIR"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+
+    if args.child:
+        lang_name, xml_path, out_dir = args.child
+        print(json.dumps(measure_generator(lang_name, Path(xml_path), Path(out_dir))))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        xml_path = Path(tmp_dir) / "synthetic.xml"
+        xml_path.write_text(make_dialect_xml(args.messages, args.fields, args.enums, args.entries))
+        print(f"synthetic dialect: {args.messages} messages, {args.fields} fields per message")
+        print(
+            f"  {'generator':<10} {'output KiB':>10} {'heap peak KiB':>14} {'RSS before KiB':>15} "
+            + f"{'RSS peak KiB':>13} {'generate ms':>12}"
+        )
+        for lang_name in args.generators:
+            child = subprocess.run(
+                [sys.executable, __file__, "--child", lang_name, xml_path.as_posix(), tmp_dir],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            result = json.loads(child.stdout.splitlines()[-1])
+            print(
+                f"  {lang_name:<10} {result['output_kib']:>10} {result['heap_peak_kib']:>14} "
+                + f"{result['rss_before_kib']:>15} {result['rss_peak_kib']:>13} "
+                + f"{result['generate_ms']:>12.1f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+################################################################################
+# \file size_report_emb_cpp
+#
+# Report the flash cost of the emb_cpp message info and MAV_INCLUDE_MSG_DETAILS
+# tables. Compiles an object that references every message's tables and
+# measures it with the host `size` tool. Optionally compares against emb_cpp
+# output produced by another version of the generator
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, Path(__file__).parent.parent.resolve().as_posix())
+
+from bench_model import make_dialect_xml  # noqa: E402
+from mavlib_gen.generator import GENERATOR_MAP  # noqa: E402
+from mavlib_gen.validator import MavlinkXmlValidator  # noqa: E402
+
+# references every message's tables so none of them can be discarded
+TABLES_SRC = """
+{includes}
+
+#ifdef MAV_INCLUDE_MSG_DETAILS
+extern const mavgen::MavlinkMsgDetails* const ALL_DETAILS[] = {{
+    {details}
+}};
+#endif
+extern const mavgen::MavlinkMsgInfo* const ALL_INFO[] = {{
+    {infos}
+}};
+"""
+
+
+def object_size(src_dir: Path, inc_dirs: List[Path], cxxflags: List[str]) -> Dict[str, int]:
+    """Compile tables.cpp in src_dir and return the `size` of the object (text, data, bss)"""
+    obj = src_dir / "tables.o"
+    subprocess.run(
+        ["g++", "-std=c++17", "-c", "-fno-pic"]
+        + cxxflags
+        + [f"-I{inc_dir}" for inc_dir in inc_dirs]
+        + ["tables.cpp", "-o", obj.as_posix()],
+        cwd=src_dir,
+        check=True,
+    )
+    # berkeley format: text data bss dec hex filename. rodata is counted in text
+    size_out = subprocess.run(["size", obj.as_posix()], check=True, capture_output=True, text=True)
+    text, data, bss = (int(value) for value in size_out.stdout.splitlines()[1].split()[:3])
+    return {"text": text, "data": data, "bss": bss}
+
+
+def report(label: str, out_dir: Path, dialect: str, msg_classes: List[str], cxxflags: list) -> None:
+    inc_dir = out_dir / "inc"
+    namespace = f"mavgen::{dialect}::"
+    (out_dir / "tables.cpp").write_text(
+        TABLES_SRC.format(
+            includes="\n".join(f'#include "{name}.hpp"' for name in msg_classes),
+            details=",\n    ".join(f"&{namespace}{name}::DETAILS" for name in msg_classes),
+            infos=",\n    ".join(f"&{namespace}{name}::INFO" for name in msg_classes),
+        )
+    )
+    inc_dirs = [inc_dir, inc_dir / dialect]
+    without_details = object_size(out_dir, inc_dirs, cxxflags)
+    with_details = object_size(out_dir, inc_dirs, cxxflags + ["-DMAV_INCLUDE_MSG_DETAILS"])
+    for name, sizes in [("info only", without_details), ("with details", with_details)]:
+        flash = sizes["text"] + sizes["data"]
+        print(
+            f"  {label:<10} {name:<13} {sizes['text']:>10} {sizes['data']:>8} {flash:>10} "
+            + f"{flash / len(msg_classes):>12.0f}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report flash used by emb_cpp message tables")
+    parser.add_argument("--xml", type=Path, help="dialect to measure. Default: synthetic dialect")
+    parser.add_argument("--messages", type=int, default=230)
+    parser.add_argument("--fields", type=int, default=12)
+    parser.add_argument("--cxxflags", nargs="+", default=["-Os"])
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="emb_cpp output dir for the same dialect from another mavlib_gen version to compare",
+    )
+    parser.add_argument("--keep", type=Path, help="generate into this dir instead of a temp dir")
+    args = parser.parse_args()
+
+    if shutil.which("g++") is None or shutil.which("size") is None:
+        print("g++ and size are required to run this report")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        out_dir = args.keep or Path(tmp_dir)
+        xml_path = args.xml
+        if xml_path is None:
+            xml_path = Path(tmp_dir) / "synthetic.xml"
+            xml_path.write_text(make_dialect_xml(args.messages, args.fields, 0, 0))
+        xmls = MavlinkXmlValidator().validate([xml_path])
+        assert xmls is not None
+        assert GENERATOR_MAP["emb_cpp"]().generate(xmls, out_dir)
+        dialect = xmls[xml_path.name]
+        msg_classes = [f"Message{msg.get_name('UpperCamel')}" for msg in dialect.xml.messages]
+
+        print(
+            f"{dialect.name}: {len(msg_classes)} messages, "
+            + f"{sum(msg.num_fields for msg in dialect.xml.messages)} fields, "
+            + f"g++ {' '.join(args.cxxflags)}"
+        )
+        print(
+            f"  {'version':<10} {'tables':<13} {'text':>10} {'data':>8} {'flash':>10} "
+            + f"{'flash/msg':>12}"
+        )
+        if args.baseline is not None:
+            report("baseline", args.baseline, dialect.name.lower(), msg_classes, args.cxxflags)
+        report("current", out_dir, dialect.name.lower(), msg_classes, args.cxxflags)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -147,6 +147,39 @@ class StyleChecker:
         return ret_code
 
 
+class EmbCppBenchmarkRunner:
+    """
+    Encapsulates running the host microbenchmark harness for generated emb_cpp code
+    """
+
+    harness_path = SCRIPT_ROOT / "benchmarks" / "bench_emb_cpp_harness.py"
+
+    @staticmethod
+    def add_arguments(subparser: argparse._SubParsersAction) -> None:
+        """
+        Add arguments to a new subparser
+        """
+        bench_subparser = subparser.add_parser(
+            "bench",
+            help="Time generated emb_cpp serialize/deserialize/parse/dispatch with the local g++",
+        )
+        bench_subparser.add_argument(
+            "harness_args",
+            nargs=argparse.REMAINDER,
+            help="Arguments for the harness, after a `--` (EX: bench -- --xml <dialect> --output "
+            + "results.json). See benchmarks/bench_emb_cpp_harness.py --help",
+        )
+        bench_subparser.set_defaults(func=EmbCppBenchmarkRunner.run)
+
+    @classmethod
+    def run(cls, args: argparse.Namespace) -> int:
+        """Build and run the harness"""
+        harness_args = args.harness_args
+        if harness_args[:1] == ["--"]:
+            harness_args = harness_args[1:]
+        return run_check_call([sys.executable, cls.harness_path.as_posix()] + harness_args)
+
+
 class UnitTestRunner:
     """
     Encapsulates running various levels of unit tests
@@ -203,6 +236,7 @@ if __name__ == "__main__":
     DocumentationBuilder.add_arguments(subparsers)
     StyleChecker.add_arguments(subparsers)
     UnitTestRunner.add_arguments(subparsers)
+    EmbCppBenchmarkRunner.add_arguments(subparsers)
 
     argcomplete.autocomplete(parser)
     args = parser.parse_args()
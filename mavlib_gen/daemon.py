@@ -0,0 +1,204 @@
+################################################################################
+# \file daemon
+#
+# Long-lived generation server on a local UNIX socket and the thin client used
+# to talk to it. Keeping one process around means validators, models and
+# template environments stay warm between generation requests
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import contextlib
+import json
+import logging
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+
+log = logging.getLogger(__name__)
+
+# bumped whenever the request/response format changes. Clients and servers with different
+# versions dont talk to each other (the client falls back to generating in-process)
+PROTOCOL_VERSION = 1
+
+# environment variable that overrides @ref default_socket_path
+SOCKET_PATH_ENV = "MAVLIBGEN_SOCKET"
+
+
+def default_socket_path() -> Path:
+    """Socket used when none is specified. One per user so daemons dont get shared"""
+    env_path = os.environ.get(SOCKET_PATH_ENV)
+    if env_path:
+        return Path(env_path)
+    return Path(tempfile.gettempdir()) / f"mavlibgen-{os.getuid()}.sock"
+
+
+class _RequestLogCapture(logging.Handler):
+    """
+    Collects the log records emitted by a single thread, so each request's logs can be sent back
+    to the client that made it
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.thread_id = threading.get_ident()
+        self.records: List[List[any]] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.thread == self.thread_id:
+            self.records.append([record.levelno, record.name, record.getMessage()])
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handles one request: a single line of JSON in, a single line of JSON out"""
+
+    def handle(self) -> None:
+        raw_request = self.rfile.readline()
+        if len(raw_request) == 0:
+            # connection closed without a request (EX: @ref is_daemon_running)
+            return
+        try:
+            request = json.loads(raw_request)
+        except ValueError as err:
+            self.__respond(
+                {
+                    "ok": False,
+                    "version": PROTOCOL_VERSION,
+                    "logs": [[logging.ERROR, __name__, f"Bad request: {err}"]],
+                }
+            )
+            return
+        if request.get("version") != PROTOCOL_VERSION:
+            self.__respond({"ok": False, "version": PROTOCOL_VERSION, "logs": []})
+            return
+
+        capture = _RequestLogCapture()
+        root_logger = logging.getLogger()
+        root_logger.addHandler(capture)
+        try:
+            ok = bool(self.server.handle_request_fn(request))
+        except Exception:
+            log.exception("Generation request failed")
+            ok = False
+        finally:
+            root_logger.removeHandler(capture)
+        self.__respond({"ok": ok, "version": PROTOCOL_VERSION, "logs": capture.records})
+
+    def __respond(self, response: Dict[str, any]) -> None:
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class GenerationDaemon(object):
+    """
+    Server side of the generation daemon. Each connection carries one JSON request that is passed
+    to handle_request_fn on its own thread, so requests run concurrently. Handlers use
+    @ref output_dir_lock to serialize requests that write to the same output directory
+    """
+
+    def __init__(self, socket_path: Path, handle_request_fn: Callable[[Dict[str, any]], bool]):
+        """
+        :param socket_path: UNIX socket to listen on
+        :param handle_request_fn: called with each decoded request. Returns True if generation
+            succeeded. Everything it logs is sent back to the client
+        """
+        self.socket_path = Path(socket_path)
+        self.handle_request_fn = handle_request_fn
+        self._server = None
+        self._dir_locks: Dict[Path, threading.Lock] = {}
+        self._dir_locks_lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def output_dir_lock(self, output_dir: Path) -> Iterator[None]:
+        """Hold the lock for an output directory. Requests for other directories arent blocked"""
+        output_dir = Path(output_dir).resolve()
+        with self._dir_locks_lock:
+            dir_lock = self._dir_locks.setdefault(output_dir, threading.Lock())
+        with dir_lock:
+            yield
+
+    def start(self) -> bool:
+        """
+        Bind the socket. Fails if another daemon is already listening on it. A socket file left
+        behind by a daemon that is no longer running is replaced
+        """
+        if self.socket_path.exists():
+            if is_daemon_running(self.socket_path):
+                log.error(f"A mavlibgen daemon is already listening on {self.socket_path}")
+                return False
+            self.socket_path.unlink()
+        self._server = _UnixServer(self.socket_path.as_posix(), _RequestHandler)
+        self._server.handle_request_fn = self.handle_request_fn
+        log.info(f"mavlibgen daemon listening on {self.socket_path}")
+        return True
+
+    def serve_forever(self) -> None:
+        """Handle requests until @ref shutdown is called (or interrupted)"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            with contextlib.suppress(OSError):
+                self.socket_path.unlink()
+
+    def shutdown(self) -> None:
+        """Stop @ref serve_forever. Must be called from a different thread"""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+def is_daemon_running(socket_path: Path) -> bool:
+    """True if something is accepting connections on socket_path"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(Path(socket_path).as_posix())
+        except OSError:
+            return False
+    return True
+
+
+def request_generation(request: Dict[str, any], socket_path: Path = None) -> Dict[str, any]:
+    """
+    Send a request to a running generation daemon and wait for it to finish. Log records the
+    daemon produced for the request are re-emitted in this process
+
+    :return: the daemon's response ({"ok": bool, ...}). None if no compatible daemon is running,
+        in which case the caller should generate in-process
+    """
+    socket_path = Path(socket_path) if socket_path is not None else default_socket_path()
+    request = dict(request, version=PROTOCOL_VERSION)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path.as_posix())
+        except OSError:
+            return None
+        with sock.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            raw_response = stream.readline()
+
+    try:
+        response = json.loads(raw_response)
+    except ValueError:
+        log.warning(f"Unreadable response from the mavlibgen daemon on {socket_path}")
+        return None
+    if response.get("version") != PROTOCOL_VERSION:
+        log.warning(
+            f"mavlibgen daemon on {socket_path} speaks protocol {response.get('version')}, "
+            + f"expected {PROTOCOL_VERSION}"
+        )
+        return None
+    for levelno, logger_name, message in response.get("logs", []):
+        logging.getLogger(logger_name).log(levelno, message)
+    return response
@@ -0,0 +1,453 @@
+################################################################################
+# \file fast_validator
+#
+# Fast, structural-only validation of mavlink message definition xmls.
+# Mirrors the constraints in schema/*.xsd so the (slow) XSD 1.1 validator
+# only needs to run when a definition is actually broken
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import logging
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+from xml.etree import ElementTree
+from .model.mavlink_xml import MavlinkXml, MavlinkXmlEnum, MavlinkXmlMessage
+
+log = logging.getLogger(__name__)
+
+# Names that may not be used for message, field, enum or entry names (case-insensitive).
+# Must be kept in sync with the 'name' attribute assertion in schema/types.xsd
+RESERVED_NAMES = frozenset(
+    [
+        "break", "case", "class", "catch", "const", "continue", "debugger", "default", "delete",
+        "do", "else", "export", "extends", "finally", "for", "function", "if", "import", "in",
+        "instanceof", "let", "new", "return", "super", "switch", "this", "throw", "try", "typeof",
+        "var", "void", "while", "with", "yield", "enum", "await", "implements", "package",
+        "protected", "static", "interface", "private", "public", "abstract", "boolean", "byte",
+        "char", "double", "final", "float", "goto", "int", "long", "native", "short",
+        "synchronized", "transient", "volatile",
+    ]
+)  # fmt: skip
+
+# schema/field.xsd 'type' attribute patterns
+FIELD_TYPE_PATTERN = re.compile(
+    r"(u)?int(8|16|32|64)_t(\[\d+\])?|float(\[\d+\])?|double(\[\d+\])?|char(\[\d+\])?"
+    r"|uint8_t_mavlink_version"
+)
+# schema/enums.xsd 'value' attribute patterns
+ENUM_VALUE_PATTERN = re.compile(r"\d{1,10}|0[xX][\da-fA-F]{1,8}|0[bB][0-1]{1,32}")
+# schema/types.xsd 'default' attribute patterns
+DEFAULT_VALUE_PATTERN = re.compile(r"\d{1,10}|0[xX][\da-fA-F]{1,8}|0[bB][0-1]{1,32}|NaN")
+# lexical spaces of the builtin xsd types used by the schema
+XSD_FLOAT_PATTERN = re.compile(r"[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?|[+-]?INF|NaN")
+XSD_UNSIGNED_BYTE_PATTERN = re.compile(r"\+?\d{1,3}")
+XSD_G_YEAR_MONTH_PATTERN = re.compile(r"-?\d{4,}-(0[1-9]|1[0-2])(Z|[+-]\d{2}:\d{2})?")
+XSD_BOOLEANS = {"true": True, "false": False, "1": True, "0": False}
+# whitespace as defined by the xml spec (str.strip would also remove unicode whitespace)
+XML_WHITESPACE = " \t\r\n"
+
+
+class StructuralViolation(Exception):
+    """
+    Raised internally by @ref MavlinkXmlFastValidator when an xml breaks one of the schema rules
+    """
+
+    pass
+
+
+def _xsd_boolean(value: str) -> bool:
+    if value not in XSD_BOOLEANS:
+        raise StructuralViolation(f"'{value}' is not a valid xs:boolean")
+    return XSD_BOOLEANS[value]
+
+
+def _xsd_unsigned_byte(value: str) -> int:
+    if XSD_UNSIGNED_BYTE_PATTERN.fullmatch(value) is None or int(value) > 255:
+        raise StructuralViolation(f"'{value}' is not a valid xs:unsignedByte")
+    return int(value)
+
+
+def _xsd_float(value: str) -> float:
+    if XSD_FLOAT_PATTERN.fullmatch(value) is None:
+        raise StructuralViolation(f"'{value}' is not a valid xs:float")
+    return float(value.replace("INF", "inf"))
+
+
+def _xsd_string(value: str) -> str:
+    return value
+
+
+def _pattern_checker(pattern: re.Pattern, type_desc: str) -> Callable[[str], str]:
+    """Make an attribute decoder that only accepts values that fully match pattern"""
+
+    def check(value: str) -> str:
+        if pattern.fullmatch(value) is None:
+            raise StructuralViolation(f"'{value}' is not a valid {type_desc}")
+        return value
+
+    return check
+
+
+def _mavlink_name(value: str) -> str:
+    """schema/types.xsd 'name' attribute: no spaces and not a reserved word"""
+    # non-ascii names are left to the schema, xpath and python disagree on some case conversions
+    if " " in value or not value.isascii() or value.lower() in RESERVED_NAMES:
+        raise StructuralViolation(f"'{value}' is not a valid mavlink name")
+    return value
+
+
+# Attribute specifications for each element. Maps attribute name ->
+# (decoder, required, default). Decoders validate the raw attribute string and convert it to the
+# same python type xmlschema would decode it to. Defaults are filled in like xmlschema does
+AttributeSpec = Dict[str, Tuple[Callable[[str], any], bool, any]]
+
+
+class MavlinkXmlFastValidator(object):
+    """
+    Validates a mavlink message definition xml with a single ElementTree.iterparse pass while
+    building its @ref MavlinkXml model object.
+
+    Every rule from the mavlink schema is re-implemented here in plain python (field type and name
+    patterns, unique msg id/name, unique enum entry name/value, unique includes, element placement
+    and ordering). The checks err on the side of strictness: when an xml does not comply,
+    @ref parse returns None and the caller is expected to fall back to full XSD validation, which
+    produces the exact error to report
+    """
+
+    def __init__(self, schema_dir: Path):
+        """
+        :param schema_dir: directory containing the mavlink schema. Only units.xsd is read, to get
+            the list of valid units
+        """
+        units = self.__load_units(Path(schema_dir) / "units.xsd")
+        units_checker = self.__units_checker(units)
+        mavlink_default = _pattern_checker(DEFAULT_VALUE_PATTERN, "default")
+
+        self.field_attributes: AttributeSpec = {
+            "type": (_pattern_checker(FIELD_TYPE_PATTERN, "field type"), True, None),
+            "name": (_mavlink_name, True, None),
+            "units": (units_checker, False, None),
+            "enum": (_xsd_string, False, None),
+            "default": (_xsd_string, False, None),
+            "instance": (_xsd_boolean, False, None),
+            "print_format": (_xsd_string, False, None),
+            "display": (_xsd_string, False, None),
+        }
+        self.message_attributes: AttributeSpec = {
+            "id": (_xsd_string, True, None),
+            "name": (_mavlink_name, True, None),
+        }
+        self.enum_attributes: AttributeSpec = {
+            "name": (_mavlink_name, True, None),
+            "bitmask": (_xsd_boolean, False, False),
+        }
+        self.entry_attributes: AttributeSpec = {
+            "value": (_pattern_checker(ENUM_VALUE_PATTERN, "enum value"), False, None),
+            "name": (_mavlink_name, True, None),
+            "hasLocation": (_xsd_boolean, False, True),
+            "isDestination": (_xsd_boolean, False, True),
+        }
+        self.param_attributes: AttributeSpec = {
+            "index": (_xsd_unsigned_byte, True, None),
+            "label": (_xsd_string, False, None),
+            "units": (units_checker, False, None),
+            "default": (mavlink_default, False, None),
+            "enum": (_xsd_string, False, None),
+            "instance": (_xsd_boolean, False, None),
+            "decimalPlaces": (_xsd_unsigned_byte, False, None),
+            "increment": (_xsd_float, False, None),
+            "minValue": (_xsd_float, False, None),
+            "maxValue": (_xsd_float, False, None),
+            "reserved": (_xsd_boolean, False, False),
+        }
+        self.deprecated_attributes: AttributeSpec = {
+            "since": (_pattern_checker(XSD_G_YEAR_MONTH_PATTERN, "xs:gYearMonth"), True, None),
+            "replaced_by": (_xsd_string, True, None),
+        }
+
+    @staticmethod
+    def __load_units(units_xsd: Path) -> frozenset:
+        """Read the enumeration of valid 'units' attribute values from the schema"""
+        xs_enum_tag = "{http://www.w3.org/2001/XMLSchema}enumeration"
+        return frozenset(
+            enum_elem.attrib["value"]
+            for enum_elem in ElementTree.parse(units_xsd).getroot().iter(xs_enum_tag)
+        )
+
+    @staticmethod
+    def __units_checker(units: frozenset) -> Callable[[str], str]:
+        def check(value: str) -> str:
+            if value not in units:
+                raise StructuralViolation(f"'{value}' is not a valid unit")
+            return value
+
+        return check
+
+    def parse(self, xml_filename: str) -> MavlinkXml:
+        """
+        Validate xml_filename and translate it into a @ref MavlinkXml model object.
+
+        :return: the model object, or None if the xml breaks a schema rule (the reason is logged at
+            debug level)
+        :raises ElementTree.ParseError: if xml_filename is not well-formed xml
+        """
+        try:
+            return self.__parse(xml_filename)
+        except StructuralViolation as violation:
+            log.debug(f"Fast validation of '{xml_filename}' failed: {violation}")
+            return None
+
+    def __parse(self, xml_filename: str) -> MavlinkXml:
+        xml_model = MavlinkXml()
+        message_ids = set()
+        message_names = set()
+        enum_names = set()
+        # tags of the elements currently open, root first
+        tag_stack = []
+
+        for event, elem in ElementTree.iterparse(str(xml_filename), events=("start", "end")):
+            if event == "start":
+                if len(tag_stack) == 0 and elem.tag != "mavlink":
+                    raise StructuralViolation(f"unexpected root element '{elem.tag}'")
+                tag_stack.append(elem.tag)
+                continue
+
+            tag_stack.pop()
+            depth = len(tag_stack)
+            if depth == 2 and tag_stack[1] == "messages" and elem.tag == "message":
+                self.__check_message(elem)
+                msg = MavlinkXmlMessage(elem)
+                if elem.attrib["id"] in message_ids:
+                    raise StructuralViolation(f"duplicate message id {elem.attrib['id']}")
+                if msg.name in message_names:
+                    raise StructuralViolation(f"duplicate message name {msg.name}")
+                message_ids.add(elem.attrib["id"])
+                message_names.add(msg.name)
+                xml_model.append_message(msg)
+                self.__release(elem)
+            elif depth == 2 and tag_stack[1] == "enums" and elem.tag == "enum":
+                self.__check_enum(elem)
+                enum = MavlinkXmlEnum(elem)
+                if enum.name in enum_names:
+                    raise StructuralViolation(f"duplicate enum name {enum.name}")
+                enum_names.add(enum.name)
+                xml_model.append_enum(enum)
+                self.__release(elem)
+            elif depth == 1 and elem.tag == "messages":
+                self.__check_no_attributes(elem)
+                self.__check_element_only(elem)
+                if len(elem) == 0:
+                    raise StructuralViolation("'messages' must contain at least one message")
+                self.__check_children_tags(elem, ("message",))
+            elif depth == 1 and elem.tag == "enums":
+                self.__check_no_attributes(elem)
+                self.__check_element_only(elem)
+                self.__check_children_tags(elem, ("enum",))
+            elif depth == 0:
+                self.__check_root(elem, xml_model)
+        return xml_model
+
+    @staticmethod
+    def __release(elem: ElementTree.Element) -> None:
+        """
+        Free an element subtree once the model holds everything needed from it. The tail is kept so
+        the parent can still check for stray text
+        """
+        tail = elem.tail
+        elem.clear()
+        elem.tail = tail
+
+    def __check_root(self, root: ElementTree.Element, xml_model: MavlinkXml) -> None:
+        """Check the top-level 'mavlink' element, its includes, version and dialect"""
+        self.__check_no_attributes(root)
+        self.__check_element_only(root)
+        children = list(root)
+        idx = 0
+        while idx < len(children) and children[idx].tag == "include":
+            include = children[idx]
+            self.__check_simple_content(include)
+            # xs:anyURI collapses whitespace
+            include_path = " ".join((include.text or "").split())
+            if len(include_path) == 0:
+                raise StructuralViolation("empty include tag")
+            if include_path in xml_model.includes:
+                raise StructuralViolation(f"duplicate include '{include_path}'")
+            xml_model.includes.append(include_path)
+            idx += 1
+        for optional_tag in ("version", "dialect"):
+            if idx < len(children) and children[idx].tag == optional_tag:
+                self.__check_simple_content(children[idx])
+                value = _xsd_unsigned_byte((children[idx].text or "").strip(XML_WHITESPACE))
+                setattr(xml_model, optional_tag, str(value))
+                idx += 1
+        # enums and messages were already checked and translated when their end tags were parsed
+        for optional_tag in ("enums", "messages"):
+            if idx < len(children) and children[idx].tag == optional_tag:
+                idx += 1
+        if idx != len(children):
+            raise StructuralViolation(f"unexpected element '{children[idx].tag}' in 'mavlink'")
+
+    def __check_message(self, message: ElementTree.Element) -> None:
+        """Check a 'message' element and all of its fields"""
+        self.__check_attributes(message, self.message_attributes)
+        self.__check_element_only(message)
+        try:
+            int(message.attrib["id"])
+        except ValueError:
+            raise StructuralViolation(f"non-integer message id '{message.attrib['id']}'")
+
+        children = list(message)
+        idx = self.__check_development_status(children)
+        # message descriptions are xs:anyType, anything goes
+        if idx < len(children) and children[idx].tag == "description":
+            self.__strip_mixed_text(children[idx])
+            idx += 1
+        field_names = set()
+        while idx < len(children) and children[idx].tag == "field":
+            self.__check_field(children[idx], field_names)
+            idx += 1
+        if idx < len(children) and children[idx].tag == "extensions":
+            idx += 1
+            if idx == len(children) or children[idx].tag != "field":
+                raise StructuralViolation("'extensions' must be followed by at least one field")
+            while idx < len(children) and children[idx].tag == "field":
+                self.__check_field(children[idx], field_names)
+                idx += 1
+        if idx != len(children):
+            raise StructuralViolation(f"unexpected element '{children[idx].tag}' in 'message'")
+
+    def __check_field(self, field: ElementTree.Element, field_names: set) -> None:
+        self.__check_attributes(field, self.field_attributes)
+        self.__strip_mixed_text(field)
+        # fields have mixed content with an optional description element
+        if len(field) > 1 or (len(field) == 1 and field[0].tag != "description"):
+            raise StructuralViolation("unexpected element in 'field'")
+        if len(field) == 1:
+            self.__check_simple_content(field[0])
+        if field.attrib["name"] in field_names:
+            raise StructuralViolation(f"duplicate field name {field.attrib['name']}")
+        field_names.add(field.attrib["name"])
+
+    def __check_enum(self, enum: ElementTree.Element) -> None:
+        """Check an 'enum' element along with all its entries and their params"""
+        self.__check_attributes(enum, self.enum_attributes)
+        self.__check_element_only(enum)
+        children = list(enum)
+        idx = 0
+        if idx < len(children) and children[idx].tag == "deprecated":
+            self.__check_deprecated(children[idx])
+            idx += 1
+        if idx < len(children) and children[idx].tag == "description":
+            self.__check_simple_content(children[idx])
+            idx += 1
+        entry_names = set()
+        entry_values = set()
+        if idx == len(children) or children[idx].tag != "entry":
+            raise StructuralViolation("'enum' must contain at least one entry")
+        while idx < len(children) and children[idx].tag == "entry":
+            entry = children[idx]
+            self.__check_entry(entry)
+            if entry.attrib["name"] in entry_names:
+                raise StructuralViolation(f"duplicate entry name {entry.attrib['name']}")
+            entry_names.add(entry.attrib["name"])
+            if "value" in entry.attrib:
+                if entry.attrib["value"] in entry_values:
+                    raise StructuralViolation(f"duplicate entry value {entry.attrib['value']}")
+                entry_values.add(entry.attrib["value"])
+            idx += 1
+        if idx != len(children):
+            raise StructuralViolation(f"unexpected element '{children[idx].tag}' in 'enum'")
+
+    def __check_entry(self, entry: ElementTree.Element) -> None:
+        self.__check_attributes(entry, self.entry_attributes)
+        self.__check_element_only(entry)
+        children = list(entry)
+        idx = self.__check_development_status(children)
+        if idx < len(children) and children[idx].tag == "description":
+            self.__check_simple_content(children[idx])
+            idx += 1
+        while idx < len(children) and children[idx].tag == "param":
+            param = children[idx]
+            self.__check_attributes(param, self.param_attributes)
+            self.__strip_mixed_text(param)
+            if len(param) > 0:
+                raise StructuralViolation("unexpected element in 'param'")
+            idx += 1
+        if idx != len(children):
+            raise StructuralViolation(f"unexpected element '{children[idx].tag}' in 'entry'")
+
+    def __check_development_status(self, children: List[ElementTree.Element]) -> int:
+        """
+        Check the optional 'deprecated' or 'wip' element that starts messages and enum entries.
+        :return: index of the first child after the development status element
+        """
+        if len(children) == 0:
+            return 0
+        status = children[0]
+        if status.tag == "deprecated":
+            self.__check_deprecated(status)
+            return 1
+        elif status.tag == "wip":
+            self.__check_no_attributes(status)
+            # a wip description is xs:anyType
+            if len(status) != 1 or status[0].tag != "description":
+                raise StructuralViolation("'wip' must contain exactly one description")
+            return 1
+        return 0
+
+    def __check_deprecated(self, deprecated: ElementTree.Element) -> None:
+        self.__check_attributes(deprecated, self.deprecated_attributes)
+        if len(deprecated) != 1 or deprecated[0].tag != "description":
+            raise StructuralViolation("'deprecated' must contain exactly one description")
+        self.__check_simple_content(deprecated[0])
+
+    def __check_attributes(self, elem: ElementTree.Element, spec: AttributeSpec) -> None:
+        """
+        Check elem's attributes comply with spec, replacing their raw string values with decoded
+        ones and filling in defaults
+        """
+        for attr_name, raw_value in elem.attrib.items():
+            if attr_name not in spec:
+                raise StructuralViolation(f"unexpected attribute '{attr_name}' on '{elem.tag}'")
+            elem.attrib[attr_name] = spec[attr_name][0](raw_value)
+        for attr_name, (_, required, default) in spec.items():
+            if attr_name not in elem.attrib:
+                if required:
+                    raise StructuralViolation(f"'{elem.tag}' is missing attribute '{attr_name}'")
+                if default is not None:
+                    elem.attrib[attr_name] = default
+
+    @staticmethod
+    def __strip_mixed_text(elem: ElementTree.Element) -> None:
+        """xmlschema strips the text of mixed and xs:anyType elements, mirror that for the model"""
+        if elem.text is not None:
+            elem.text = elem.text.strip() or None
+
+    def __check_no_attributes(self, elem: ElementTree.Element) -> None:
+        if len(elem.attrib) > 0:
+            raise StructuralViolation(f"unexpected attributes on '{elem.tag}'")
+
+    def __check_simple_content(self, elem: ElementTree.Element) -> None:
+        """Check an element that may only contain text (ie: xs:string)"""
+        self.__check_no_attributes(elem)
+        if len(elem) > 0:
+            raise StructuralViolation(f"unexpected element in '{elem.tag}'")
+
+    def __check_element_only(self, elem: ElementTree.Element) -> None:
+        """Check an element that may only contain other elements (no text other than whitespace)"""
+        if elem.text is not None and len(elem.text.strip(XML_WHITESPACE)) > 0:
+            raise StructuralViolation(f"unexpected text in '{elem.tag}'")
+        for child in elem:
+            if child.tail is not None and len(child.tail.strip(XML_WHITESPACE)) > 0:
+                raise StructuralViolation(f"unexpected text in '{elem.tag}'")
+
+    def __check_children_tags(self, elem: ElementTree.Element, allowed: Tuple[str]) -> None:
+        for child in elem:
+            if child.tag not in allowed:
+                raise StructuralViolation(f"unexpected element '{child.tag}' in '{elem.tag}'")
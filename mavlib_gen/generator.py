@@ -10,28 +10,122 @@
 # See the file 'LICENSE' in the root directory of the present
 # distribution, or http://opensource.org/licenses/MIT.
 ################################################################################
+import importlib
 import logging
+from collections.abc import Mapping
 from pathlib import Path
-from typing import List, Dict
-from .lang_generators.generator_base import AbstractLangGenerator
-from .lang_generators.generator_python import PythonLangGenerator
-from .lang_generators.generator_graphviz import GraphvizLangGenerator
-from .lang_generators.generator_emb_cpp import EmbCppLangGenerator
-from .lang_generators.generator_rst import RstLangGenerator
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Dict, Set, Union
 from .model.mavlink_xml import MavlinkXmlFile
+from .profiling import span
 from schema import Optional, Literal, Or
 from dataclasses import dataclass, field
 
+if TYPE_CHECKING:
+    from .lang_generators.generator_base import AbstractLangGenerator
+    from .output_sink import OutputSink
+
 log = logging.getLogger(__name__)
 
-GENERATOR_MAP = {
-    "python": PythonLangGenerator,
-    "graphviz": GraphvizLangGenerator,
-    "emb_cpp": EmbCppLangGenerator,
-    "rst": RstLangGenerator,
+# entry point group third-party generators register under. The entry point name is the key used
+# to configure the generator, and its value the AbstractLangGenerator subclass. EX: in the plugins
+# pyproject.toml
+#   [project.entry-points."mavlib_gen.generators"]
+#   rust = "mavlib_rust.generator:RustLangGenerator"
+GENERATOR_ENTRY_POINT_GROUP = "mavlib_gen.generators"
+
+# generators that ship with mavlib_gen: configuration key -> 'module:class'
+BUILTIN_GENERATORS = {
+    "python": "mavlib_gen.lang_generators.generator_python:PythonLangGenerator",
+    "graphviz": "mavlib_gen.lang_generators.generator_graphviz:GraphvizLangGenerator",
+    "emb_cpp": "mavlib_gen.lang_generators.generator_emb_cpp:EmbCppLangGenerator",
+    "rst": "mavlib_gen.lang_generators.generator_rst:RstLangGenerator",
+    "compiled": "mavlib_gen.lang_generators.generator_compiled:CompiledDialectGenerator",
+    "c": "mavlib_gen.lang_generators.generator_c:CLangGenerator",
 }
 
 
+class GeneratorRegistry(Mapping):
+    """
+    Read-only mapping of configuration key -> language generator class. A generator's module is
+    only imported the first time its class is looked up, so configuring one generator doesnt pay
+    for importing the others. Entry points are only read when a key isnt a built-in generator, or
+    when all generators are listed
+    """
+
+    def __init__(self, builtin_generators: Dict[str, str], entry_point_group: str = None):
+        """
+        :param builtin_generators: configuration key -> 'module:class' of the generator
+        :param entry_point_group: Optional. importlib.metadata entry point group to add
+            generators from. Built-in generators take priority over entry points with the same name
+        """
+        self._targets = dict(builtin_generators)
+        self._classes = {}
+        self._entry_point_group = entry_point_group
+        self._entry_points_loaded = entry_point_group is None
+
+    def register(self, name: str, generator: Union[str, type]) -> None:
+        """Add (or replace) a generator, either as its class or as a 'module:class' string"""
+        self._classes.pop(name, None)
+        if isinstance(generator, str):
+            self._targets[name] = generator
+        else:
+            self._targets[name] = f"{generator.__module__}:{generator.__qualname__}"
+            self._classes[name] = generator
+
+    def __load_entry_points(self) -> None:
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        try:
+            from importlib.metadata import entry_points
+        except ImportError:
+            # python 3.7 has no importlib.metadata, only built-in generators are available
+            return
+        all_entry_points = entry_points()
+        if hasattr(all_entry_points, "select"):
+            group = all_entry_points.select(group=self._entry_point_group)
+        else:
+            group = all_entry_points.get(self._entry_point_group, [])
+        for entry_point in group:
+            if entry_point.name in self._targets:
+                log.warning(
+                    f"Ignoring generator entry point '{entry_point.name} = {entry_point.value}', "
+                    + f"'{entry_point.name}' is already registered"
+                )
+                continue
+            self._targets[entry_point.name] = entry_point.value
+
+    def __getitem__(self, name: str) -> type:
+        generator_cls = self._classes.get(name)
+        if generator_cls is not None:
+            return generator_cls
+        if name not in self:
+            raise KeyError(name)
+        module_name, _, attr_path = self._targets[name].partition(":")
+        generator_cls = importlib.import_module(module_name)
+        for attr in attr_path.split("."):
+            generator_cls = getattr(generator_cls, attr)
+        self._classes[name] = generator_cls
+        return generator_cls
+
+    def __contains__(self, name: object) -> bool:
+        if name not in self._targets:
+            self.__load_entry_points()
+        return name in self._targets
+
+    def __iter__(self) -> Iterator[str]:
+        self.__load_entry_points()
+        return iter(list(self._targets))
+
+    def __len__(self) -> int:
+        self.__load_entry_points()
+        return len(self._targets)
+
+
+# every generator mavlib_gen can be configured with. Classes are imported on first lookup
+GENERATOR_MAP = GeneratorRegistry(BUILTIN_GENERATORS, GENERATOR_ENTRY_POINT_GROUP)
+
+
 @dataclass
 class MavlibGenerator:
     """
@@ -42,13 +136,20 @@ class MavlibGenerator:
 
     # Output directory for generated files
     outdir: str = ""
-    generators: List[AbstractLangGenerator] = field(default_factory=list)
+    generators: List["AbstractLangGenerator"] = field(default_factory=list)
+    # Where generated files are written (see mavlib_gen.output_sink). Paths are under outdir.
+    # Writes to the filesystem when not provided
+    sink: "OutputSink" = None
 
     @classmethod
-    def yaml_schema() -> Dict[any, any]:
+    def yaml_schema(cls, languages: Iterable[str] = None) -> Dict[any, any]:
         """
         Get YAML schema for the mavgen generation component. Includes schema for all language
         generators
+
+        :param languages: Optional. Only include schemas for these generators (EX: the ones
+            a configuration file uses) so the others dont need to be imported. Names that arent
+            generators are skipped, so the schema still rejects them
         """
         generate_options = {}
         generate_options[
@@ -59,10 +160,14 @@ class MavlibGenerator:
             )
         ] = str
         # append each possible generation language as an option
-        for lang_name, lang_cls in GENERATOR_MAP.items():
+        if languages is None:
+            languages = GENERATOR_MAP
+        for lang_name in languages:
+            if lang_name not in GENERATOR_MAP:
+                continue
             generate_options[
                 Optional(Literal(lang_name, description=f"generate Mavlink in {lang_name}"))
-            ] = Or(lang_cls.config_schema(), None)
+            ] = Or(GENERATOR_MAP[lang_name].config_schema(), None)
         return {
             Optional(
                 Literal("generate", description="Root element for configuring Mavlink generation")
@@ -71,10 +176,10 @@ class MavlibGenerator:
 
     @classmethod
     def from_config(cls, conf: Dict[any, any]) -> any:
-        print(conf)
+        log.debug(f"Generator configuration: {conf}")
         gen = MavlibGenerator()
         for k in conf.keys():
-            if k in GENERATOR_MAP.keys():
+            if k in GENERATOR_MAP:
                 value = conf.get(k, {})
                 value = {} if value is None else value
                 gen.generators.append(GENERATOR_MAP[k].from_config(value))
@@ -85,14 +190,26 @@ class MavlibGenerator:
     def __repr__(self) -> str:
         return f"MavlibGenerator(\n\toutdir: {self.outdir},\n\tgenerators: {self.generators}\n)"
 
-    def generate_all(self, mav_xmls: Dict[str, MavlinkXmlFile]) -> bool:
+    def generate_all(self, mav_xmls: Dict[str, MavlinkXmlFile], dialects: Set[str] = None) -> bool:
         """
         Generate all the validated mavlink XMLs in all the configured languages
+
+        :param dialects: Optional. Names of the xmls in mav_xmls whose output needs to be
+            regenerated, see @ref AbstractLangGenerator.generate_dialects. Everything is
+            generated when not provided
         """
         result = True
+        # only pass a sink when there is one, so generators written before sinks still work
+        sink_arg = {} if self.sink is None else {"sink": self.sink}
         for generator in self.generators:
             out_path = Path(self.outdir).resolve() / generator.lang_name()
-            result = result and generator.generate(mav_xmls, out_path)
+            with span(generator.lang_name(), "generator"):
+                if dialects is None:
+                    result = result and generator.generate(mav_xmls, out_path, **sink_arg)
+                else:
+                    result = result and generator.generate_dialects(
+                        mav_xmls, out_path, dialects, **sink_arg
+                    )
         return result
 
     def generate_one(self, mav_xmls: Dict[str, MavlinkXmlFile], output_language: str) -> bool:
@@ -101,4 +218,6 @@ class MavlibGenerator:
             log.fatal(f"Desired output language '{output_language}' not recognized")
             return False
         lang_generator = GENERATOR_MAP[output_language]()
-        return lang_generator.generate(mav_xmls, Path(self.outdir))
+        sink_arg = {} if self.sink is None else {"sink": self.sink}
+        with span(output_language, "generator"):
+            return lang_generator.generate(mav_xmls, Path(self.outdir), **sink_arg)
@@ -12,9 +12,72 @@
 ################################################################################
 from abc import ABC, abstractmethod
 from mavlib_gen.model.mavlink_xml import MavlinkXmlFile
-from typing import Dict
+from typing import Dict, Set
 from pathlib import Path
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from jinja2 import Environment, PackageLoader, Template, select_autoescape
+from mavlib_gen.output_sink import FileSystemSink, OutputSink
+from mavlib_gen.profiling import record_span, span
+import time
+
+
+@lru_cache(maxsize=None)
+def template_environment(template_dir: Path) -> Environment:
+    """
+    Get the jinja environment for a generators template directory. Environments are shared by all
+    generator instances in the process, so each template is only compiled the first time its used
+    """
+    return Environment(
+        loader=PackageLoader("mavlib_gen", package_path=template_dir),
+        autoescape=select_autoescape(),
+        # trim whitespace thats automatically inserted for jinja template blocks
+        trim_blocks=True,
+        # dont automatically tab-in jinja control blocks
+        lstrip_blocks=True,
+    )
+
+
+# number of rendered template chunks @ref render_to_file joins into a single write
+RENDER_CHUNKS_PER_WRITE = 512
+
+
+def render_to_file(sink: OutputSink, template: Template, out_path: Path, **context: any) -> None:
+    """
+    Render a template with the provided context variables and write the result to out_path in
+    sink. Output is streamed to the sink in batches as the template renders, so large dialects are
+    never held in memory as a single string. Rendering and writing are profiled as separate spans
+    """
+    start_ns = time.perf_counter_ns()
+    # time spent writing (including closing the file), between the batches being rendered
+    write_ns = 0
+    chunks = template.generate(**context)
+    with sink.open_text(out_path) as file_out:
+        while True:
+            batch = list(islice(chunks, RENDER_CHUNKS_PER_WRITE))
+            if len(batch) == 0:
+                break
+            write_start_ns = time.perf_counter_ns()
+            file_out.write("".join(batch))
+            write_ns += time.perf_counter_ns() - write_start_ns
+        close_start_ns = time.perf_counter_ns()
+    end_ns = time.perf_counter_ns()
+    write_ns += end_ns - close_start_ns
+    # the spans are recorded back to back, each holding its share of the time
+    record_span(template.name, "render", out_path, start_ns, end_ns - write_ns)
+    record_span("write", "file", out_path, end_ns - write_ns, end_ns)
+
+
+def copy_static_file(sink: OutputSink, src_path: Path, dest_path: Path) -> None:
+    """Copy a non-template library file into the generated output"""
+    with span("copy", "file", dest_path):
+        sink.copy_file(src_path, dest_path)
+
+
+def default_sink(sink: OutputSink = None) -> OutputSink:
+    """The sink a generator should write to: the one it was given, or the filesystem"""
+    return sink if sink is not None else FileSystemSink()
 
 
 class AbstractLangGenerator(ABC):
@@ -65,13 +128,36 @@ class AbstractLangGenerator(ABC):
         pass
 
     @abstractmethod
-    def generate(self, validated_xmls: Dict[str, MavlinkXmlFile], output_dir: Path) -> bool:
+    def generate(
+        self,
+        validated_xmls: Dict[str, MavlinkXmlFile],
+        output_dir: Path,
+        sink: OutputSink = None,
+    ) -> bool:
         """
         Top-level generate method. Generates mavlink messages in the
         implemented language from the provided dialect file
+
+        :param sink: Optional. Where to write generated files (see @ref default_sink). Files are
+            named by their path under output_dir
         """
         pass
 
+    def generate_dialects(
+        self,
+        validated_xmls: Dict[str, MavlinkXmlFile],
+        output_dir: Path,
+        dialects: Set[str],
+        sink: OutputSink = None,
+    ) -> bool:
+        """
+        Regenerate output for the dialects in validated_xmls that are named in dialects (EX: the
+        ones that changed since the last generation). By default everything is regenerated.
+        Generators whose output for a dialect only depends on that dialect should override this
+        to only regenerate the named ones
+        """
+        return self.generate(validated_xmls, output_dir, sink)
+
 
 @dataclass
 class OneShotGeneratorWrapper:
@@ -85,10 +171,18 @@ class OneShotGeneratorWrapper:
         generator_impl: A concrete AbstractLangGenerator implementation instantiation or anything
             that implements a similar generate method to AbstractLangGenerator.generate
         output_dir (str): Path to the output directory to place generated files
+        sink (OutputSink): Optional. Where to write generated files. Defaults to the filesystem
     """
 
     generator_impl: any
     output_dir: str = ""
+    sink: OutputSink = None
 
-    def generate_all(self, mav_xmls: Dict[str, MavlinkXmlFile]) -> bool:
-        return self.generator_impl.generate(mav_xmls, self.output_dir)
+    def generate_all(self, mav_xmls: Dict[str, MavlinkXmlFile], dialects: Set[str] = None) -> bool:
+        sink_arg = {} if self.sink is None else {"sink": self.sink}
+        with span(self.generator_impl.lang_name(), "generator"):
+            if dialects is not None:
+                return self.generator_impl.generate_dialects(
+                    mav_xmls, self.output_dir, dialects, **sink_arg
+                )
+            return self.generator_impl.generate(mav_xmls, self.output_dir, **sink_arg)
@@ -13,8 +13,10 @@
 from pathlib import Path
 import logging
 import re
-from .generator_base import AbstractLangGenerator
-from typing import Dict, List
+from .generator_base import AbstractLangGenerator, copy_static_file, default_sink
+from ..output_sink import OutputSink
+from typing import ClassVar, Dict, List
+from dataclasses import dataclass
 from ..model.mavlink_xml import (
     MavlinkXmlFile,
     MavlinkXmlMessage,
@@ -26,36 +28,70 @@ from ..model.mavlink_xml import (
 log = logging.getLogger(__name__)
 
 
+@dataclass
 class CLangGenerator(AbstractLangGenerator):
-    def __init__(self):
-        self.template_dir = Path(__file__).parent.resolve() / "templates" / "c"
-        self.msg_def_format = self.template_dir / "message_definition.h.in"
+    """MavlibGen C generator. Has no configuration options"""
 
-    DOC_COMMENT_PREPEND = " * "
+    template_dir: ClassVar[Path] = Path(__file__).parent.resolve() / "templates" / "c"
+    msg_def_format: ClassVar[Path] = template_dir / "message_definition.h.in"
+
+    DOC_COMMENT_PREPEND: ClassVar[str] = " * "
     # number of spaces that comprise a standard indent
-    STANDARD_INDENT_SIZE = 4
-    DOC_COMMENT_PREPEND2 = "/// "
-    MSG_DEF_FILENAME_FORMAT = "mavlink_msg_{}.h"
+    STANDARD_INDENT_SIZE: ClassVar[int] = 4
+    DOC_COMMENT_PREPEND2: ClassVar[str] = "/// "
+    MSG_DEF_FILENAME_FORMAT: ClassVar[str] = "mavlink_msg_{}.h"
+    # largest payload a mavlink 2 frame can carry
+    MAX_PAYLOAD_LEN: ClassVar[int] = 255
+    # dialect independent runtime copied to the root of the output directory
+    STATIC_FILES: ClassVar[List[str]] = [
+        "mavlink_types.h",
+        "mavlink_helpers.h",
+        "mavlink_helpers.c",
+    ]
 
     def lang_name(self) -> str:
         return "c"
 
-    def generate(self, validated_xmls: Dict[str, MavlinkXmlFile], output_dir: Path) -> bool:
-        output_dir = Path(output_dir)
+    @classmethod
+    def config_schema(cls) -> Dict[any, any]:
+        return {}
+
+    @classmethod
+    def from_config(cls, conf: Dict[any, any]) -> any:
+        return CLangGenerator()
+
+    def generate(
+        self,
+        validated_xmls: Dict[str, MavlinkXmlFile],
+        output_dir: Path,
+        sink: OutputSink = None,
+    ) -> bool:
         if validated_xmls is None or len(validated_xmls) == 0 or output_dir is None:
             return False
+        output_dir = Path(output_dir)
+        sink = default_sink(sink)
 
-        output_dir.mkdir(parents=True, exist_ok=True)
+        for static_file in self.STATIC_FILES:
+            copy_static_file(sink, self.template_dir / static_file, output_dir / static_file)
 
         for name, dialect_def in validated_xmls.items():
-            successfully_generated = self.generate_single_xml(dialect_def, output_dir)
+            dependencies = [validated_xmls[dep] for dep in dialect_def.dependencies or []]
+            successfully_generated = self.generate_single_xml(
+                dialect_def, output_dir, sink, dependencies
+            )
             if not successfully_generated:
                 log.error("C lang failed to generate for dialect {}".format(name))
                 return False
 
         return True
 
-    def generate_single_xml(self, dialect: MavlinkXmlFile, outdir: Path) -> bool:
+    def generate_single_xml(
+        self,
+        dialect: MavlinkXmlFile,
+        outdir: Path,
+        sink: OutputSink = None,
+        dependencies: List[MavlinkXmlFile] = None,
+    ) -> bool:
         # place generated files within a subdirectory of outdir. the subdirectory
         # is named based on the xml filename
         dialect_name = dialect.filename
@@ -66,8 +102,7 @@ class CLangGenerator(AbstractLangGenerator):
 
         gen_dir = outdir / dialect_name_lower
         print("{} generating in {}".format(dialect.filename, gen_dir))
-
-        gen_dir.mkdir(parents=True, exist_ok=True)
+        sink = default_sink(sink)
 
         xml = dialect.xml
         # first generate messages
@@ -75,7 +110,7 @@ class CLangGenerator(AbstractLangGenerator):
             with open(self.msg_def_format, "r") as mdef_format_file:
                 msg_def_format = mdef_format_file.read()
                 for msg_def in xml.messages:
-                    if not self.__generate_msg(msg_def, msg_def_format, gen_dir):
+                    if not self.__generate_msg(msg_def, msg_def_format, gen_dir, sink):
                         # generating this message header failed
                         log.error(
                             "Failed to generate C header for message: '{}'. Exiting".format(
@@ -84,17 +119,32 @@ class CLangGenerator(AbstractLangGenerator):
                         )
                         return False
 
-            self.__generate_xml_msg_include(dialect_name_lower, xml.messages, gen_dir)
-            self.__generate_enums(xml.enums, gen_dir, dialect_name_lower)
+            self.__generate_enums(xml.enums, gen_dir, dialect_name_lower, sink)
+
+        # messages this dialect can receive: its own, plus those from its dependencies. An
+        # include-only dialect still needs the msgs header for its info table
+        rx_msgs = list(xml.messages)
+        for dep in dependencies or []:
+            rx_msgs.extend(dep.xml.messages)
+        if len(rx_msgs) > 0:
+            self.__generate_xml_msg_include(
+                dialect_name_lower, xml.messages, rx_msgs, gen_dir, sink
+            )
 
         return True
 
     def __generate_xml_msg_include(
-        self, dialect_name_lower: str, msgs: List[MavlinkXmlMessage], outdir: Path
+        self,
+        dialect_name_lower: str,
+        msgs: List[MavlinkXmlMessage],
+        rx_msgs: List[MavlinkXmlMessage],
+        outdir: Path,
+        sink: OutputSink,
     ) -> None:
         """
-        Generates the dialects message include file. This header is simply
-        a collection of include statements for all messages in the dialect
+        Generates the dialects message include file. This header is a collection of include
+        statements for all messages in the dialect, plus the msgid sorted crc_extra/length table
+        the parser uses to validate rx_msgs
         """
         dialect_msg_include_format = self.template_dir / "dialect_msgs.h.in"
 
@@ -102,27 +152,48 @@ class CLangGenerator(AbstractLangGenerator):
         msg_c_includes = []
         for msg_def in msgs:
             msg_c_includes.append(
-                '#include "./{msg_filename}'.format(
+                '#include "./{msg_filename}"'.format(
                     msg_filename=self.MSG_DEF_FILENAME_FORMAT.format(msg_def.name.lower())
                 )
             )
 
         # generate the XMLs message include. This .h includes all messages in this dialect ONLY
         include_string_out = "\n".join([msg_inc for msg_inc in msg_c_includes])
+        # the parser looks messages up by msgid with a binary search, or the generated switch
+        msg_info = []
+        msg_info_cases = []
+        for msg_def in sorted(rx_msgs, key=lambda msg_def: msg_def.id):
+            if msg_def.byte_length > self.MAX_PAYLOAD_LEN:
+                log.warning(
+                    f"Message '{msg_def.name}' is {msg_def.byte_length} bytes, too long to fit "
+                    + "in a mavlink frame. Leaving it out of the C message info table"
+                )
+                continue
+            msg_info_cases.append(
+                "    case {}:\n        return &msg_info[{}];".format(msg_def.id, len(msg_info))
+            )
+            msg_info.append(
+                "    {{{}, {}, {}}}, \\".format(msg_def.id, msg_def.crc_extra, msg_def.byte_length)
+            )
         dialect_msgs_file_out = outdir / "{}_msgs.h".format(dialect_name_lower)
 
         with open(dialect_msg_include_format, "r") as dialect_msgs_format_file:
             formatter = dialect_msgs_format_file.read()
-            with open(dialect_msgs_file_out, "w") as dialect_msgs_out:
+            with sink.open_text(dialect_msgs_file_out) as dialect_msgs_out:
                 dialect_msgs_out.write(
                     formatter.format(
                         dialect_name_lower=dialect_name_lower,
                         dialect_name_upper=dialect_name_lower.upper(),
                         dialect_msg_includes=include_string_out,
+                        msg_info_count=len(msg_info),
+                        msg_info_entries="\n".join(msg_info),
+                        msg_info_cases="\n".join(msg_info_cases),
                     )
                 )
 
-    def __generate_msg(self, msg_def: MavlinkXmlMessage, formatter: str, outdir: Path) -> bool:
+    def __generate_msg(
+        self, msg_def: MavlinkXmlMessage, formatter: str, outdir: Path, sink: OutputSink
+    ) -> bool:
         """
         Generate a single message using 'formatter' as the format string and placing
         the resulting output in 'outdir'
@@ -142,23 +213,47 @@ class CLangGenerator(AbstractLangGenerator):
         mdef_file_out = outdir / self.MSG_DEF_FILENAME_FORMAT.format(msg_name_lower)
 
         # write out the definition file
-        with open(mdef_file_out, "w") as out_file:
+        with sink.open_text(mdef_file_out) as out_file:
             out_file.write(
                 formatter.format(
                     msg_name_upper=msg_name_upper,
                     msg_name_lower=msg_name_lower,
                     formatted_msg_desc=formatted_msg_desc,
                     msg_id=msg_id,
-                    struct_packed_def_start="",
-                    struct_packed_def_end="",
+                    # payloads are copied straight into the struct, so it must match the wire layout
+                    struct_packed_def_start="MAV_STRUCT_PACK(",
+                    struct_packed_def_end=")",
                     fields=self.__generate_msg_field_strings(msg_def),
                     crc_extra=msg_def.crc_extra,
                     msg_len=msg_def.byte_length,
+                    payload_buf_len=max(msg_def.byte_length, 1),
+                    fields_to_payload=self.__generate_field_swaps(msg_def, to_payload=True),
+                    payload_to_fields=self.__generate_field_swaps(msg_def, to_payload=False),
                 )
             )
 
         return True
 
+    def __generate_field_swaps(self, msg_def: MavlinkXmlMessage, to_payload: bool) -> str:
+        """
+        Generate the statements that copy every field between a message struct and its little-
+        endian payload buffer on big-endian targets
+        """
+        SWAP_FORMATTER = "    mavlink_copy_swapped({dst}, {src}, {size}, {count});"
+        swaps = []
+        for field in msg_def.all_fields_sorted:
+            struct_ptr = "(uint8_t *)&{}->{}".format(msg_def.name.lower(), field.name)
+            payload_ptr = "payload + {}".format(field.wire_offset)
+            swaps.append(
+                SWAP_FORMATTER.format(
+                    dst=payload_ptr if to_payload else struct_ptr,
+                    src=("(const " + struct_ptr[1:]) if to_payload else payload_ptr,
+                    size=field.base_type_len,
+                    count=max(field.array_len, 1),
+                )
+            )
+        return "\n".join(swaps)
+
     def __generate_msg_field_strings(self, msg_def: MavlinkXmlMessage) -> str:
         """generate the struct definition strings for all the fields in the message def"""
 
@@ -176,12 +271,13 @@ class CLangGenerator(AbstractLangGenerator):
 
     def __generate_single_field_string(self, field: MavlinkXmlMessageField) -> str:
         """generate the definition string for a single message field"""
-        MSG_FIELD_FORMATTER = "{field_desc}    {type} {name};"
+        MSG_FIELD_FORMATTER = "{field_desc}    {type} {name}{array};"
 
         field_str = MSG_FIELD_FORMATTER.format(
             field_desc=self.__doc_comment_formatter(field.description, 1),
-            type=field.type,
+            type=field.base_type,
             name=field.name,
+            array="[{}]".format(field.array_len) if field.is_array else "",
         )
         return field_str
 
@@ -215,12 +311,18 @@ class CLangGenerator(AbstractLangGenerator):
         return raw_desc
 
     def __generate_enums(
-        self, enums: List[MavlinkXmlEnum], outdir: Path, dialect_name_lower: str
+        self,
+        enums: List[MavlinkXmlEnum],
+        outdir: Path,
+        dialect_name_lower: str,
+        sink: OutputSink,
     ) -> bool:
         """
         Generate all enums for a single dialect into a header file
         """
-        ENUM_FORMATTER = "{doc_string}typedef enum {enum_name}_t {{\n{enum_entries}\n}};\n"
+        ENUM_FORMATTER = (
+            "{doc_string}typedef enum {enum_name}_t {{\n{enum_entries}\n}} {enum_name}_t;\n"
+        )
         dialect_enums_format = self.template_dir / "dialect_enums.h.in"
         dialect_enums_file_out = outdir / "{}_enums.h".format(dialect_name_lower)
 
@@ -239,7 +341,7 @@ class CLangGenerator(AbstractLangGenerator):
 
         with open(dialect_enums_format, "r") as dialect_enums_format_file:
             formatter = dialect_enums_format_file.read()
-            with open(dialect_enums_file_out, "w") as dialect_enums_out:
+            with sink.open_text(dialect_enums_file_out) as dialect_enums_out:
                 dialect_enums_out.write(
                     formatter.format(
                         dialect_name_lower=dialect_name_lower,
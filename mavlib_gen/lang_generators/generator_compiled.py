@@ -0,0 +1,99 @@
+################################################################################
+# \file generator_compiled
+#
+# Compiled dialect generator. Writes one compact, deterministic artifact per
+# include tree with everything runtime tools need to know about its messages
+# and enums, so they dont need to re-parse and re-validate the xmls
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+from mavlib_gen.lang_generators.generator_base import AbstractLangGenerator, default_sink
+from mavlib_gen.output_sink import OutputSink
+from mavlib_gen.model.mavlink_xml import MavlinkXmlFile
+from mavlib_gen.model.compiled_dialect import compile_dialects, dumps_binary, dumps_json
+from mavlib_gen.profiling import span
+from pathlib import Path
+from typing import Dict, ClassVar, List
+from dataclasses import dataclass
+from schema import Optional, Literal, Or
+
+
+@dataclass
+class CompiledDialectGenerator(AbstractLangGenerator):
+    """
+    Compiled dialect generator. For each top-level xml (one that no other xml includes), writes
+    an artifact containing it and all of its dependencies. Load it back with
+    MavlinkXmlValidator.load_compiled
+
+    Attributes:
+        format (str): 'json' for deterministic compact JSON (<dialect>.json) or 'binary' for the
+            packed binary form (<dialect>.mavc)
+    """
+
+    FILE_EXTENSIONS: ClassVar[Dict[str, str]] = {"json": ".json", "binary": ".mavc"}
+
+    format: str = "json"
+
+    def lang_name(self) -> str:
+        return "compiled"
+
+    @classmethod
+    def config_schema(cls) -> Dict[any, any]:
+        return {
+            Optional(
+                Literal(
+                    "format",
+                    description="Form of the compiled dialect artifact: 'json' (deterministic, "
+                    + "compact JSON) or 'binary' (packed, smaller and faster to load)",
+                )
+            ): Or(*cls.FILE_EXTENSIONS.keys()),
+        }
+
+    @classmethod
+    def from_config(cls, conf: Dict[any, any]) -> any:
+        return CompiledDialectGenerator(format=conf.get("format", cls.format))
+
+    def __repr__(self) -> str:
+        return f"CompiledDialectGenerator(format: {self.format})"
+
+    @staticmethod
+    def include_tree_roots(validated_xmls: Dict[str, MavlinkXmlFile]) -> List[MavlinkXmlFile]:
+        """xmls that are not a dependency of any other validated xml, sorted by filename"""
+        included = set()
+        for xml_file in validated_xmls.values():
+            included.update(xml_file.dependencies or [])
+        return sorted(
+            (xml_file for name, xml_file in validated_xmls.items() if name not in included),
+            key=lambda xml_file: xml_file.filename,
+        )
+
+    def generate(
+        self,
+        validated_xmls: Dict[str, MavlinkXmlFile],
+        output_dir: Path,
+        sink: OutputSink = None,
+    ) -> bool:
+        # TODO: move boilerplate checks up to ABC
+        if validated_xmls is None or len(validated_xmls) == 0 or output_dir is None:
+            return False
+        output_dir = Path(output_dir)
+        sink = default_sink(sink)
+
+        for root in self.include_tree_roots(validated_xmls):
+            tree = [root] + [validated_xmls[dep] for dep in root.dependencies or []]
+            out_path = output_dir / f"{root.name}{self.FILE_EXTENSIONS[self.format]}"
+            with span("compile_dialects", "render", out_path):
+                compiled = compile_dialects(tree)
+                if self.format == "binary":
+                    serialized = dumps_binary(compiled)
+                else:
+                    serialized = dumps_json(compiled).encode("utf-8")
+            with span("write", "file", out_path):
+                sink.write_bytes(out_path, serialized)
+
+        return True
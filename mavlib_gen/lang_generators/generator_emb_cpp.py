@@ -12,14 +12,37 @@
 # See the file 'LICENSE' in the root directory of the present
 # distribution, or http://opensource.org/licenses/MIT.
 ################################################################################
-from mavlib_gen.lang_generators.generator_base import AbstractLangGenerator
+from mavlib_gen.lang_generators.generator_base import (
+    AbstractLangGenerator,
+    copy_static_file,
+    default_sink,
+    render_to_file,
+    template_environment,
+)
+from mavlib_gen.output_sink import OutputSink
+from mavlib_gen.profiling import span
 from pathlib import Path
-from jinja2 import Environment, PackageLoader, select_autoescape
-from typing import Dict, ClassVar
+from typing import Dict, ClassVar, List, Set, Tuple
 from mavlib_gen.model.mavlink_xml import MavlinkXmlFile
-import shutil
 from dataclasses import dataclass
+from jinja2 import Template
 from schema import Optional, Literal
+import re
+
+# non-template files that are part of the library, in include order
+STATIC_SOURCES = ["MavlinkTypes.hpp", "MavlinkParser.hpp"]
+# static sources that are only used when included directly. Never amalgamated or precompiled
+OPTIONAL_STATIC_SOURCES = ["MavlinkFrameQueue.hpp"]
+PCH_UMBRELLA_FILENAME = "MavlinkPch.hpp"
+# includes of other generated/library headers. Removed when headers are amalgamated
+LOCAL_INCLUDE_RE = re.compile(r'^#include ".*"\n', re.MULTILINE)
+
+
+def amalgamation_section(header: str) -> str:
+    """header's contents to put in an amalgamated header: local includes removed and newline
+    terminated"""
+    header = LOCAL_INCLUDE_RE.sub("", header)
+    return header if header.endswith("\n") else header + "\n"
 
 
 @dataclass
@@ -30,10 +53,20 @@ class EmbCppLangGenerator(AbstractLangGenerator):
     Attributes:
         use_dialect_namespaces (bool): Put Message/Payload definitions within a namespace
             that has the same name as the mavlink XML file they are contained in
+        static_dispatch (bool): Messages get their info through static (CRTP) MavlinkMessage
+            traits instead of the virtual IMavlinkMessage interface, so they have no vtable
+        amalgamate (bool): Generate a single self-contained <Dialect>Msgs.hpp per dialect instead
+            of a header per message
+        pch_umbrella (bool): Also generate a MavlinkPch.hpp that includes every dialect, to use
+            as a precompiled header
     """
 
     TEMPLATE_DIR: ClassVar[Path] = Path(__file__).parent.resolve() / "templates" / "emb_cpp"
+    MAX_PAYLOAD_LEN: ClassVar[int] = 255
     use_dialect_namespaces: bool = True
+    static_dispatch: bool = False
+    amalgamate: bool = False
+    pch_umbrella: bool = False
 
     def lang_name(self) -> str:
         return "emb_cpp"
@@ -50,69 +83,241 @@ class EmbCppLangGenerator(AbstractLangGenerator):
                     ),
                 )
             ): bool,
+            Optional(
+                Literal(
+                    "static_dispatch",
+                    description=(
+                        "Use static (CRTP) message traits instead of the virtual IMavlinkMessage "
+                        + "interface. Messages have no vtable"
+                    ),
+                )
+            ): bool,
+            Optional(
+                Literal(
+                    "amalgamate",
+                    description=(
+                        "Generate one self-contained header per dialect instead of one header "
+                        + "per message"
+                    ),
+                )
+            ): bool,
+            Optional(
+                Literal(
+                    "pch_umbrella",
+                    description="Generate an umbrella header of all dialects to precompile",
+                )
+            ): bool,
         }
 
     @classmethod
     def from_config(cls, conf: Dict[any, any]) -> any:
         return EmbCppLangGenerator(
             use_dialect_namespaces=conf.get("use_dialect_namespaces", cls.use_dialect_namespaces),
+            static_dispatch=conf.get("static_dispatch", cls.static_dispatch),
+            amalgamate=conf.get("amalgamate", cls.amalgamate),
+            pch_umbrella=conf.get("pch_umbrella", cls.pch_umbrella),
         )
 
     def __repr__(self) -> str:
-        return f"EmbCppLangGenerator(use_dialect_namespaces: {self.use_dialect_namespaces})"
+        return (
+            f"EmbCppLangGenerator(use_dialect_namespaces: {self.use_dialect_namespaces}, "
+            + f"static_dispatch: {self.static_dispatch}, amalgamate: {self.amalgamate}, "
+            + f"pch_umbrella: {self.pch_umbrella})"
+        )
 
-    def generate(self, validated_xmls: Dict[str, MavlinkXmlFile], output_dir: Path) -> bool:
-        # TODO: move boilerplate checks up to ABC
-        if validated_xmls is None or len(validated_xmls) == 0 or output_dir is None:
-            return False
+    def __msg_class_name(self, dialect: MavlinkXmlFile, msg: any) -> str:
+        """Fully qualified C++ class name of a message from dialect"""
+        namespace = (
+            f"::mavgen::{dialect.name.lower()}" if self.use_dialect_namespaces else "::mavgen"
+        )
+        return f"{namespace}::Message{msg.get_name('UpperCamel')}"
 
-        output_dir.mkdir(parents=True, exist_ok=True)
+    def __dialect_files(
+        self,
+        dialect: MavlinkXmlFile,
+        all_xmls: Dict[str, MavlinkXmlFile],
+        templates: Dict[str, Template],
+    ) -> List[Tuple[Path, Template, Dict[str, any]]]:
+        """
+        Every file generated for dialect, as (path relative to the inc directory, template,
+        template context). Ordered so each file only depends on files before it
+        """
+        dialect_dir = Path(dialect.get_name("lower_snake"))
+        files = [
+            (
+                dialect_dir / f"{dialect.get_name('UpperCamel')}Enums.hpp",
+                templates["enum"],
+                {"dialect": dialect},
+            )
+        ]
+        for msg in dialect.xml.messages:
+            files.append(
+                (
+                    dialect_dir / f"Message{msg.get_name('UpperCamel')}.hpp",
+                    templates["msg"],
+                    {
+                        "msg": msg,
+                        "use_dialect_namespaces": self.use_dialect_namespaces,
+                        "static_dispatch": self.static_dispatch,
+                        "dialect_name_lower": dialect.name.lower(),
+                    },
+                )
+            )
 
-        jenv = Environment(
-            loader=PackageLoader("mavlib_gen", package_path=self.TEMPLATE_DIR),
-            autoescape=select_autoescape(),
-            # trim whitespace thats automatically inserted for jinja template blocks
-            trim_blocks=True,
-            # dont automatically tab-in jinja control blocks
-            lstrip_blocks=True,
+        # the dialect message list header. Its message table and dispatcher cover every message
+        # the dialect can receive: (msg, class name) for its own and its dependencies'
+        rx_msgs = [(msg, self.__msg_class_name(dialect, msg)) for msg in dialect.xml.messages]
+        dep_includes = []
+        for dep_name in dialect.dependencies or []:
+            dep = all_xmls[dep_name]
+            rx_msgs.extend((msg, self.__msg_class_name(dep, msg)) for msg in dep.xml.messages)
+            dep_includes.append(
+                f"../{dep.get_name('lower_snake')}/{dep.get_name('UpperCamel')}Msgs.hpp"
+            )
+        files.append(
+            (
+                dialect_dir / f"{dialect.get_name('UpperCamel')}Msgs.hpp",
+                templates["msg_list"],
+                {
+                    "dialect": dialect,
+                    "rx_msgs": sorted(rx_msgs, key=lambda rx_msg: rx_msg[0].id),
+                    # messages too long for a frame can't be received
+                    "max_payload_len": max(
+                        [min(msg.byte_length, self.MAX_PAYLOAD_LEN) for msg, _ in rx_msgs],
+                        default=0,
+                    ),
+                    "dep_includes": dep_includes,
+                    "use_dialect_namespaces": self.use_dialect_namespaces,
+                },
+            )
         )
-        msg_template = jenv.get_template("single_message.hpp.jinja")
-        enum_template = jenv.get_template("dialect_enums.hpp.jinja")
-        msg_list_template = jenv.get_template("dialect_msgs.hpp.jinja")
+        return files
+
+    def __generate_amalgamated(
+        self,
+        validated_xmls: Dict[str, MavlinkXmlFile],
+        all_xmls: Dict[str, MavlinkXmlFile],
+        templates: Dict[str, Template],
+        output_dir: Path,
+        sink: OutputSink,
+    ) -> None:
+        """
+        Generate one self-contained header per dialect, in place of its <Dialect>Msgs.hpp. It
+        holds the static sources, then the files of each of the dialect's dependencies (in
+        dependency order) and finally the dialect's own files, with local includes removed.
+        Every section keeps its include guard, so several amalgamated dialects can be included
+        together
+        """
+        # optional sources stand alone, with what they include coming from a dialect header
+        for src_filename in OPTIONAL_STATIC_SOURCES:
+            with sink.open_text(output_dir / "inc" / src_filename) as file_out:
+                file_out.write(amalgamation_section((self.TEMPLATE_DIR / src_filename).read_text()))
 
+        static_section = "".join(
+            amalgamation_section((self.TEMPLATE_DIR / src_filename).read_text())
+            for src_filename in STATIC_SOURCES
+        )
+        # xml name -> its rendered files joined together. Shared dependencies are rendered once
+        sections: Dict[str, str] = {}
         for name, dialect in validated_xmls.items():
-            dialect_inc_dir = output_dir / "inc" / dialect.get_name("lower_snake")
-            dialect_inc_dir.mkdir(parents=True, exist_ok=True)
-
-            # generate message headers
-            for msg in dialect.xml.messages:
-                msg_header_filename = dialect_inc_dir / f"Message{msg.get_name('UpperCamel')}.hpp"
-                with open(msg_header_filename, "w") as msg_hdr:
-                    msg_hdr.write(
-                        msg_template.render(
-                            msg=msg,
-                            use_dialect_namespaces=self.use_dialect_namespaces,
-                            dialect_name_lower=dialect.name.lower(),
+            for section_name in (dialect.dependencies or []) + [name]:
+                if section_name in sections:
+                    continue
+                with span("amalgamate", "dialect", section_name):
+                    sections[section_name] = "".join(
+                        amalgamation_section(template.render(**context))
+                        for _, template, context in self.__dialect_files(
+                            all_xmls[section_name], all_xmls, templates
                         )
                     )
 
-            # generate all enums
-            enums_filename = dialect_inc_dir / f"{dialect.get_name('UpperCamel')}Enums.hpp"
-            with open(enums_filename, "w") as enum_hdr:
-                enum_hdr.write(enum_template.render(dialect=dialect))
+            guard = f"__MAVLINK_{dialect.name.upper()}_AMALGAMATED_HPP__"
+            out_path = (
+                output_dir
+                / "inc"
+                / dialect.get_name("lower_snake")
+                / f"{dialect.get_name('UpperCamel')}Msgs.hpp"
+            )
+            with sink.open_text(out_path) as file_out:
+                file_out.write(
+                    f"/// Amalgamated MAVLink header for {dialect.name.lower()} and everything it "
+                    + "includes\n///\n/// AUTOGENERATED by mavlib_gen. DO NOT MODIFY DIRECTLY\n"
+                    + f"#ifndef {guard}\n#define {guard}\n"
+                )
+                file_out.write(static_section)
+                for section_name in (dialect.dependencies or []) + [name]:
+                    file_out.write(sections[section_name])
+                file_out.write(f"#endif /* {guard} */\n")
 
-            # generate dialect message list header
-            msg_list_filename = dialect_inc_dir / f"{dialect.get_name('UpperCamel')}Msgs.hpp"
-            with open(msg_list_filename, "w") as msg_list_hdr:
-                msg_list_hdr.write(msg_list_template.render(dialect=dialect))
+    def generate_dialects(
+        self,
+        validated_xmls: Dict[str, MavlinkXmlFile],
+        output_dir: Path,
+        dialects: Set[str],
+        sink: OutputSink = None,
+    ) -> bool:
+        # a dialect's output depends on that dialect, and its dependencies (for its message
+        # table, or their whole contents when amalgamated)
+        if len(dialects) == 0:
+            return True
+        affected = {
+            name
+            for name, xml_file in validated_xmls.items()
+            if name in dialects or not dialects.isdisjoint(xml_file.dependencies or [])
+        }
+        return self.generate(
+            {name: validated_xmls[name] for name in affected}, output_dir, sink, validated_xmls
+        )
+
+    def generate(
+        self,
+        validated_xmls: Dict[str, MavlinkXmlFile],
+        output_dir: Path,
+        sink: OutputSink = None,
+        all_xmls: Dict[str, MavlinkXmlFile] = None,
+    ) -> bool:
+        """
+        :param all_xmls: Optional. Every xml in the include tree, when validated_xmls only holds
+            the dialects to generate. Dependencies are looked up in it
+        """
+        # TODO: move boilerplate checks up to ABC
+        if validated_xmls is None or len(validated_xmls) == 0 or output_dir is None:
+            return False
+        output_dir = Path(output_dir)
+        sink = default_sink(sink)
+        all_xmls = all_xmls or validated_xmls
+
+        jenv = template_environment(self.TEMPLATE_DIR)
+        templates = {
+            "msg": jenv.get_template("single_message.hpp.jinja"),
+            "enum": jenv.get_template("dialect_enums.hpp.jinja"),
+            "msg_list": jenv.get_template("dialect_msgs.hpp.jinja"),
+        }
+
+        if self.amalgamate:
+            self.__generate_amalgamated(validated_xmls, all_xmls, templates, output_dir, sink)
+        else:
+            for dialect in validated_xmls.values():
+                for filename, template, context in self.__dialect_files(
+                    dialect, all_xmls, templates
+                ):
+                    render_to_file(sink, template, output_dir / "inc" / filename, **context)
 
             # copy over static source files (non-template files that are part of the library)
-            static_sources = [
-                "MavlinkTypes.hpp",
-            ]
-            for src_filename in static_sources:
+            for src_filename in STATIC_SOURCES + OPTIONAL_STATIC_SOURCES:
                 src_path = self.TEMPLATE_DIR / src_filename
                 dest_path = output_dir / "inc" / src_filename
-                shutil.copyfile(src_path, dest_path)
+                copy_static_file(sink, src_path, dest_path)
+
+        if self.pch_umbrella:
+            # the umbrella lists every dialect, not just the ones being (re)generated
+            render_to_file(
+                sink,
+                jenv.get_template("pch_umbrella.hpp.jinja"),
+                output_dir / "inc" / PCH_UMBRELLA_FILENAME,
+                dialects=all_xmls.values(),
+                static_sources=[] if self.amalgamate else STATIC_SOURCES,
+                amalgamated=self.amalgamate,
+            )
 
         return True
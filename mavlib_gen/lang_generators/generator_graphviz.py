@@ -10,9 +10,14 @@
 # See the file 'LICENSE' in the root directory of the present
 # distribution, or http://opensource.org/licenses/MIT.
 ################################################################################
-from mavlib_gen.lang_generators.generator_base import AbstractLangGenerator
+from mavlib_gen.lang_generators.generator_base import (
+    AbstractLangGenerator,
+    default_sink,
+    render_to_file,
+    template_environment,
+)
+from mavlib_gen.output_sink import OutputSink
 from pathlib import Path
-from jinja2 import Environment, PackageLoader, select_autoescape
 from typing import Dict, Tuple, ClassVar, List
 from mavlib_gen.model.mavlink_xml import MavlinkXmlFile, MavlinkXmlMessage, MavlinkXmlMessageField
 import re
@@ -199,30 +204,28 @@ class GraphvizLangGenerator(AbstractLangGenerator):
 
         return out
 
-    def generate(self, validated_xmls: Dict[str, MavlinkXmlFile], output_dir: Path) -> bool:
+    def generate(
+        self,
+        validated_xmls: Dict[str, MavlinkXmlFile],
+        output_dir: Path,
+        sink: OutputSink = None,
+    ) -> bool:
         # TODO: move boilerplate checks up to ABC
-        output_dir = Path(output_dir)
         if validated_xmls is None or len(validated_xmls) == 0 or output_dir is None:
             return False
+        output_dir = Path(output_dir)
+        sink = default_sink(sink)
 
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        jenv = Environment(
-            loader=PackageLoader("mavlib_gen", package_path=self.TEMPLATE_DIR),
-            autoescape=select_autoescape(),
-            # trim whitespace thats automatically inserted for jinja template blocks
-            trim_blocks=True,
-            # dont automatically tab-in jinja control blocks
-            lstrip_blocks=True,
-        )
+        jenv = template_environment(self.TEMPLATE_DIR)
         msg_diagram_template = jenv.get_template("single_message.dot.jinja")
 
         # first generate XML file include tree (if there are multiple xmls)
         if len(validated_xmls) > 1:
             include_tree_template = jenv.get_template("xml_include_tree.dot.jinja")
             include_tree_file = output_dir / "xml_include_tree.dot"
-            with open(include_tree_file, "w") as inc_tree_out:
-                inc_tree_out.write(include_tree_template.render(xmlfiles=validated_xmls.values()))
+            render_to_file(
+                sink, include_tree_template, include_tree_file, xmlfiles=validated_xmls.values()
+            )
 
         for name, dialect in validated_xmls.items():
             name = dialect.name
@@ -233,18 +236,16 @@ class GraphvizLangGenerator(AbstractLangGenerator):
 
             dialect_out_dir = output_dir / name.lower()
 
-            dialect_out_dir.mkdir(parents=True, exist_ok=True)
-
             for msg in dialect.xml.messages:
                 msg_filename = dialect_out_dir / f"{msg.name}.dot"
-                with open(msg_filename, "w") as msg_file_out:
-                    msg_file_out.write(
-                        msg_diagram_template.render(
-                            field_str=self.generate_table_rows(msg, 8),
-                            msg=msg,
-                            include_framing=self.include_framing,
-                            include_label=self.include_label,
-                        )
-                    )
+                render_to_file(
+                    sink,
+                    msg_diagram_template,
+                    msg_filename,
+                    field_str=self.generate_table_rows(msg, 8),
+                    msg=msg,
+                    include_framing=self.include_framing,
+                    include_label=self.include_label,
+                )
 
         return True
@@ -10,11 +10,16 @@
 # See the file 'LICENSE' in the root directory of the present
 # distribution, or http://opensource.org/licenses/MIT.
 ################################################################################
-from mavlib_gen.lang_generators.generator_base import AbstractLangGenerator
+from mavlib_gen.lang_generators.generator_base import (
+    AbstractLangGenerator,
+    copy_static_file,
+    default_sink,
+    render_to_file,
+    template_environment,
+)
+from mavlib_gen.output_sink import OutputSink
 from pathlib import Path
-import shutil
-from jinja2 import Environment, PackageLoader, select_autoescape
-from typing import Dict, ClassVar
+from typing import Dict, ClassVar, Set
 from ..model.mavlink_xml import MavlinkXmlFile, MavlinkXmlMessage, MavlinkXmlMessageField
 from schema import Optional, Literal
 from dataclasses import dataclass
@@ -97,22 +102,31 @@ class PythonLangGenerator(AbstractLangGenerator):
     def __repr__(self) -> str:
         return f"PythonLangGenerator(use_properties: {self.use_properties})"
 
-    def generate(self, validated_xmls: Dict[str, MavlinkXmlFile], output_dir: Path) -> bool:
+    def generate_dialects(
+        self,
+        validated_xmls: Dict[str, MavlinkXmlFile],
+        output_dir: Path,
+        dialects: Set[str],
+        sink: OutputSink = None,
+    ) -> bool:
+        # each dialect's output only depends on that dialect
+        if len(dialects) == 0:
+            return True
+        return self.generate({name: validated_xmls[name] for name in dialects}, output_dir, sink)
+
+    def generate(
+        self,
+        validated_xmls: Dict[str, MavlinkXmlFile],
+        output_dir: Path,
+        sink: OutputSink = None,
+    ) -> bool:
         # TODO: move boilerplate checks up to ABC
-        output_dir = Path(output_dir)
         if validated_xmls is None or len(validated_xmls) == 0 or output_dir is None:
             return False
+        output_dir = Path(output_dir)
+        sink = default_sink(sink)
 
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        jenv = Environment(
-            loader=PackageLoader("mavlib_gen", package_path=self.TEMPLATE_DIR),
-            autoescape=select_autoescape(),
-            # trim whitespace thats automatically inserted for jinja template blocks
-            trim_blocks=True,
-            # dont automatically tab-in jinja control blocks
-            lstrip_blocks=True,
-        )
+        jenv = template_environment(self.TEMPLATE_DIR)
         dialect_msgs_template = jenv.get_template("dialect_msgs.py.jinja")
 
         for name, dialect in validated_xmls.items():
@@ -124,21 +138,21 @@ class PythonLangGenerator(AbstractLangGenerator):
             dialect_name_upper = dialect_name.upper()
 
             file_path = output_dir / f"{dialect_name_lower}_msgs.py"
-            with open(file_path, "w") as msgs_file_out:
-                msgs_file_out.write(
-                    dialect_msgs_template.render(
-                        dialect_name_lower=dialect_name_lower,
-                        dialect_name_upper=dialect_name_upper,
-                        messages=dialect.xml.messages,
-                        use_properties=self.use_properties,
-                        generate_message_struct_pack_str=generate_message_struct_pack_str,
-                    )
-                )
+            render_to_file(
+                sink,
+                dialect_msgs_template,
+                file_path,
+                dialect_name_lower=dialect_name_lower,
+                dialect_name_upper=dialect_name_upper,
+                messages=dialect.xml.messages,
+                use_properties=self.use_properties,
+                generate_message_struct_pack_str=generate_message_struct_pack_str,
+            )
 
         # copy over types
         file_to_cp = "mavlink_types.py"
         mavlink_types_src = self.TEMPLATE_DIR / file_to_cp
         mavlink_types_dst = output_dir / file_to_cp
-        shutil.copyfile(mavlink_types_src, mavlink_types_dst)
+        copy_static_file(sink, mavlink_types_src, mavlink_types_dst)
 
         return True
@@ -10,13 +10,19 @@
 # See the file 'LICENSE' in the root directory of the present
 # distribution, or http://opensource.org/licenses/MIT.
 ################################################################################
-from mavlib_gen.lang_generators.generator_base import AbstractLangGenerator
+from mavlib_gen.lang_generators.generator_base import (
+    AbstractLangGenerator,
+    default_sink,
+    render_to_file,
+    template_environment,
+)
+from mavlib_gen.output_sink import OutputSink
 from mavlib_gen.lang_generators.generator_graphviz import GraphvizLangGenerator
 from pathlib import Path
 from dataclasses import dataclass
 from typing import Dict, ClassVar, List
 from mavlib_gen.model.mavlink_xml import MavlinkXmlFile
-from jinja2 import Environment, PackageLoader, select_autoescape
+from jinja2 import Environment
 from schema import Optional, Literal
 import logging
 
@@ -80,6 +86,7 @@ class RstLangGenerator(AbstractLangGenerator):
         xml_diagram_dir: str,
         output_dir: Path,
         xmlfiles: List[MavlinkXmlFile],
+        sink: OutputSink,
     ) -> bool:
         """
         Generate sphinx-specific components. Run when @ref generate_sphinx_root is true
@@ -87,39 +94,37 @@ class RstLangGenerator(AbstractLangGenerator):
         sphinx_conf_temp = jenv.get_template("conf.py.jinja")
         sphinx_homepage = jenv.get_template("index.rst.jinja")
 
-        with open(output_dir / "conf.py", "w") as conf_out:
-            conf_out.write(
-                sphinx_conf_temp.render(
-                    project_name=self.sphinx_project_name, xml_diagram_dir=xml_diagram_dir
-                )
-            )
+        render_to_file(
+            sink,
+            sphinx_conf_temp,
+            output_dir / "conf.py",
+            project_name=self.sphinx_project_name,
+            xml_diagram_dir=xml_diagram_dir,
+        )
 
-        with open(output_dir / "index.rst", "w") as index_out:
-            index_out.write(
-                sphinx_homepage.render(
-                    project_name=self.sphinx_project_name,
-                    xml_diagram_dir=xml_diagram_dir,
-                    xmlfiles=xmlfiles,
-                )
-            )
+        render_to_file(
+            sink,
+            sphinx_homepage,
+            output_dir / "index.rst",
+            project_name=self.sphinx_project_name,
+            xml_diagram_dir=xml_diagram_dir,
+            xmlfiles=xmlfiles,
+        )
         return True
 
-    def generate(self, validated_xmls: Dict[str, MavlinkXmlFile], output_dir: Path) -> bool:
+    def generate(
+        self,
+        validated_xmls: Dict[str, MavlinkXmlFile],
+        output_dir: Path,
+        sink: OutputSink = None,
+    ) -> bool:
         # TODO: move boilerplate checks up to ABC
-        output_dir = Path(output_dir)
         if validated_xmls is None or len(validated_xmls) == 0 or output_dir is None:
             return False
+        output_dir = Path(output_dir)
+        sink = default_sink(sink)
 
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        jenv = Environment(
-            loader=PackageLoader("mavlib_gen", package_path=self.TEMPLATE_DIR),
-            autoescape=select_autoescape(),
-            # trim whitespace thats automatically inserted for jinja template blocks
-            trim_blocks=True,
-            # dont automatically tab-in jinja control blocks
-            lstrip_blocks=True,
-        )
+        jenv = template_environment(self.TEMPLATE_DIR)
         dialect_enums_temp = jenv.get_template("dialect_enums.rst.jinja")
         dialect_msgs_temp = jenv.get_template("dialect_msgs.rst.jinja")
 
@@ -127,7 +132,7 @@ class RstLangGenerator(AbstractLangGenerator):
         if self.include_msg_diagrams:
             diagram_dir = output_dir / diagram_subdir
             graphviz_gen = GraphvizLangGenerator(include_label=True)
-            if not graphviz_gen.generate(validated_xmls, diagram_dir):
+            if not graphviz_gen.generate(validated_xmls, diagram_dir, sink):
                 logging.error("Failed to generate diagrams for RST docs")
                 return False
 
@@ -136,12 +141,10 @@ class RstLangGenerator(AbstractLangGenerator):
         # standalone resource as possible. If it could be distributed to a message consumer/customer
         # as an ICD that would be amazing
 
-        output_dir.mkdir(parents=True, exist_ok=True)
-
         if self.generate_sphinx_root:
             xml_diagram_dir = diagram_subdir if self.include_msg_diagrams else None
             if not self._generate_sphinx_specific(
-                jenv, xml_diagram_dir, output_dir, validated_xmls.values()
+                jenv, xml_diagram_dir, output_dir, validated_xmls.values(), sink
             ):
                 return False
 
@@ -159,20 +162,15 @@ class RstLangGenerator(AbstractLangGenerator):
             enums_out_filename = output_dir / f"{name}_enums.rst"
             msgs_out_filename = output_dir / f"{name}_msgs.rst"
 
-            with open(enums_out_filename, "w") as enums_out:
-                enums_out.write(
-                    dialect_enums_temp.render(
-                        xmlfile=dialect,
-                    )
-                )
+            render_to_file(sink, dialect_enums_temp, enums_out_filename, xmlfile=dialect)
 
-            with open(msgs_out_filename, "w") as msgs_out:
-                msgs_out.write(
-                    dialect_msgs_temp.render(
-                        xmlfile=dialect,
-                        include_msg_diagrams=self.include_msg_diagrams,
-                        xml_diagram_dir=xml_diagram_dir,
-                    )
-                )
+            render_to_file(
+                sink,
+                dialect_msgs_temp,
+                msgs_out_filename,
+                xmlfile=dialect,
+                include_msg_diagrams=self.include_msg_diagrams,
+                xml_diagram_dir=xml_diagram_dir,
+            )
 
         return True
@@ -0,0 +1,295 @@
+/// Implementation of the mavlink parser and TX helpers declared in mavlink_helpers.h
+#include <string.h>
+#include "mavlink_helpers.h"
+
+#if MAVLINK_CRC_USE_TABLE
+const uint16_t mavlink_crc_table[256] = {
+    0x0000, 0x1189, 0x2312, 0x329b, 0x4624, 0x57ad, 0x6536, 0x74bf,
+    0x8c48, 0x9dc1, 0xaf5a, 0xbed3, 0xca6c, 0xdbe5, 0xe97e, 0xf8f7,
+    0x1081, 0x0108, 0x3393, 0x221a, 0x56a5, 0x472c, 0x75b7, 0x643e,
+    0x9cc9, 0x8d40, 0xbfdb, 0xae52, 0xdaed, 0xcb64, 0xf9ff, 0xe876,
+    0x2102, 0x308b, 0x0210, 0x1399, 0x6726, 0x76af, 0x4434, 0x55bd,
+    0xad4a, 0xbcc3, 0x8e58, 0x9fd1, 0xeb6e, 0xfae7, 0xc87c, 0xd9f5,
+    0x3183, 0x200a, 0x1291, 0x0318, 0x77a7, 0x662e, 0x54b5, 0x453c,
+    0xbdcb, 0xac42, 0x9ed9, 0x8f50, 0xfbef, 0xea66, 0xd8fd, 0xc974,
+    0x4204, 0x538d, 0x6116, 0x709f, 0x0420, 0x15a9, 0x2732, 0x36bb,
+    0xce4c, 0xdfc5, 0xed5e, 0xfcd7, 0x8868, 0x99e1, 0xab7a, 0xbaf3,
+    0x5285, 0x430c, 0x7197, 0x601e, 0x14a1, 0x0528, 0x37b3, 0x263a,
+    0xdecd, 0xcf44, 0xfddf, 0xec56, 0x98e9, 0x8960, 0xbbfb, 0xaa72,
+    0x6306, 0x728f, 0x4014, 0x519d, 0x2522, 0x34ab, 0x0630, 0x17b9,
+    0xef4e, 0xfec7, 0xcc5c, 0xddd5, 0xa96a, 0xb8e3, 0x8a78, 0x9bf1,
+    0x7387, 0x620e, 0x5095, 0x411c, 0x35a3, 0x242a, 0x16b1, 0x0738,
+    0xffcf, 0xee46, 0xdcdd, 0xcd54, 0xb9eb, 0xa862, 0x9af9, 0x8b70,
+    0x8408, 0x9581, 0xa71a, 0xb693, 0xc22c, 0xd3a5, 0xe13e, 0xf0b7,
+    0x0840, 0x19c9, 0x2b52, 0x3adb, 0x4e64, 0x5fed, 0x6d76, 0x7cff,
+    0x9489, 0x8500, 0xb79b, 0xa612, 0xd2ad, 0xc324, 0xf1bf, 0xe036,
+    0x18c1, 0x0948, 0x3bd3, 0x2a5a, 0x5ee5, 0x4f6c, 0x7df7, 0x6c7e,
+    0xa50a, 0xb483, 0x8618, 0x9791, 0xe32e, 0xf2a7, 0xc03c, 0xd1b5,
+    0x2942, 0x38cb, 0x0a50, 0x1bd9, 0x6f66, 0x7eef, 0x4c74, 0x5dfd,
+    0xb58b, 0xa402, 0x9699, 0x8710, 0xf3af, 0xe226, 0xd0bd, 0xc134,
+    0x39c3, 0x284a, 0x1ad1, 0x0b58, 0x7fe7, 0x6e6e, 0x5cf5, 0x4d7c,
+    0xc60c, 0xd785, 0xe51e, 0xf497, 0x8028, 0x91a1, 0xa33a, 0xb2b3,
+    0x4a44, 0x5bcd, 0x6956, 0x78df, 0x0c60, 0x1de9, 0x2f72, 0x3efb,
+    0xd68d, 0xc704, 0xf59f, 0xe416, 0x90a9, 0x8120, 0xb3bb, 0xa232,
+    0x5ac5, 0x4b4c, 0x79d7, 0x685e, 0x1ce1, 0x0d68, 0x3ff3, 0x2e7a,
+    0xe70e, 0xf687, 0xc41c, 0xd595, 0xa12a, 0xb0a3, 0x8238, 0x93b1,
+    0x6b46, 0x7acf, 0x4854, 0x59dd, 0x2d62, 0x3ceb, 0x0e70, 0x1ff9,
+    0xf78f, 0xe606, 0xd49d, 0xc514, 0xb1ab, 0xa022, 0x92b9, 0x8330,
+    0x7bc7, 0x6a4e, 0x58d5, 0x495c, 0x3de3, 0x2c6a, 0x1ef1, 0x0f78
+};
+#endif
+
+const mavlink_info_t *mavlink_find_msg_info(const mavlink_info_t *table, size_t count,
+        uint32_t msgid) {
+    size_t low = 0;
+    size_t high = count;
+    while (low < high) {
+        size_t mid = low + (high - low) / 2;
+        if (table[mid].msgid < msgid) {
+            low = mid + 1;
+        } else {
+            high = mid;
+        }
+    }
+    if (low < count && table[low].msgid == msgid) {
+        return &table[low];
+    }
+    return NULL;
+}
+
+void mavlink_channel_init(mavlink_channel_state_t *chan_state, mavlink_send_bytes_fn_t default_cb,
+        const mavlink_info_t *msg_info, size_t msg_info_count) {
+    memset(chan_state, 0, sizeof(*chan_state));
+    chan_state->default_cb = default_cb;
+    chan_state->rx_parse_state = MAVLINK_PARSE_STATE_IDLE;
+    chan_state->msg_info = msg_info;
+    chan_state->msg_info_count = msg_info_count;
+}
+
+/// msgid of a header, assembled from its bytes so it doesnt depend on bitfield layout
+static inline uint32_t mavlink_header_msgid(const uint8_t *header_bytes) {
+    return (uint32_t)header_bytes[7] | ((uint32_t)header_bytes[8] << 8)
+            | ((uint32_t)header_bytes[9] << 16);
+}
+
+/// Drop the frame currently being received and go back to searching for a start byte
+static inline void mavlink_parse_drop(mavlink_channel_state_t *chan_state, uint16_t *counter) {
+    if (*counter < UINT16_MAX) {
+        ++(*counter);
+    }
+    chan_state->rx_parse_state = MAVLINK_PARSE_STATE_IDLE;
+}
+
+/// Header is complete: check the frame can be handled and start its checksum
+static void mavlink_parse_header_done(mavlink_channel_state_t *chan_state,
+        mavlink_message_t *msg) {
+    const uint8_t *header_bytes = msg->header.bytes;
+    if (header_bytes[2] & ~MAVLINK_IFLAG_SUPPORTED) {
+        mavlink_parse_drop(chan_state, &chan_state->rx_dropped);
+        return;
+    }
+    uint32_t msgid = mavlink_header_msgid(header_bytes);
+    const mavlink_info_t *info = chan_state->msg_info_fn != NULL
+            ? chan_state->msg_info_fn(msgid)
+            : mavlink_find_msg_info(chan_state->msg_info, chan_state->msg_info_count, msgid);
+    if (info == NULL) {
+        mavlink_parse_drop(chan_state, &chan_state->rx_dropped);
+        return;
+    }
+    chan_state->rx_crc_extra = info->crc_extra;
+    // zero-fill the trimmed tail of the payload so it can be read as the full struct
+    if (header_bytes[1] < info->len) {
+        memset(msg->payload + header_bytes[1], 0, info->len - header_bytes[1]);
+    }
+    // checksum covers the header (excluding the magic byte), payload, then crc_extra
+    chan_state->rx_crc = mavlink_crc_accumulate_buf(header_bytes + 1,
+            MAVLINK_NUM_HEADER_BYTES - 1, MAVLINK_CRC_INIT);
+    chan_state->rx_index = 0;
+    if (header_bytes[1] == 0) {
+        chan_state->rx_crc = mavlink_crc_accumulate(chan_state->rx_crc_extra, chan_state->rx_crc);
+        chan_state->rx_parse_state = MAVLINK_PARSE_STATE_GOT_PAYLOAD;
+    } else {
+        chan_state->rx_parse_state = MAVLINK_PARSE_STATE_GOT_MSGID3;
+    }
+}
+
+int mavlink_parse_buf(mavlink_channel_state_t *chan_state, const uint8_t *buf_in, size_t len,
+        mavlink_message_t *msg_out, size_t *consumed) {
+    size_t idx = 0;
+    int complete = 0;
+
+    while (idx < len && !complete) {
+        size_t remaining = len - idx;
+        switch (chan_state->rx_parse_state) {
+        case MAVLINK_PARSE_STATE_GOT_STX: {
+            // header, copied in one go once the bytes are available
+            size_t take = MAVLINK_NUM_HEADER_BYTES - chan_state->rx_index;
+            if (take > remaining) {
+                take = remaining;
+            }
+            memcpy(msg_out->header.bytes + chan_state->rx_index, buf_in + idx, take);
+            chan_state->rx_index += take;
+            idx += take;
+            if (chan_state->rx_index == MAVLINK_NUM_HEADER_BYTES) {
+                mavlink_parse_header_done(chan_state, msg_out);
+            }
+            break;
+        }
+        case MAVLINK_PARSE_STATE_GOT_MSGID3: {
+            // payload, as much of it as this buffer has. copied and checksummed in one pass,
+            // which measured faster than a memcpy followed by a checksum pass
+            size_t take = msg_out->header.len - chan_state->rx_index;
+            if (take > remaining) {
+                take = remaining;
+            }
+            const uint8_t *payload_in = buf_in + idx;
+            uint8_t *payload_out = msg_out->payload + chan_state->rx_index;
+            uint16_t crc = chan_state->rx_crc;
+            for (size_t pld_idx = 0; pld_idx < take; ++pld_idx) {
+                uint8_t byte = payload_in[pld_idx];
+                payload_out[pld_idx] = byte;
+                crc = mavlink_crc_accumulate(byte, crc);
+            }
+            chan_state->rx_crc = crc;
+            chan_state->rx_index += take;
+            idx += take;
+            if (chan_state->rx_index == msg_out->header.len) {
+                chan_state->rx_crc = mavlink_crc_accumulate(chan_state->rx_crc_extra,
+                        chan_state->rx_crc);
+                chan_state->rx_parse_state = MAVLINK_PARSE_STATE_GOT_PAYLOAD;
+            }
+            break;
+        }
+        case MAVLINK_PARSE_STATE_GOT_PAYLOAD:
+            msg_out->checksum.bytes[0] = buf_in[idx++];
+            if (msg_out->checksum.bytes[0] == (uint8_t)(chan_state->rx_crc & 0xff)) {
+                chan_state->rx_parse_state = MAVLINK_PARSE_STATE_GOT_CRC1;
+            } else {
+                chan_state->rx_parse_state = MAVLINK_PARSE_STATE_GOT_BAD_CRC1;
+            }
+            break;
+        case MAVLINK_PARSE_STATE_GOT_CRC1:
+        case MAVLINK_PARSE_STATE_GOT_BAD_CRC1:
+            msg_out->checksum.bytes[1] = buf_in[idx++];
+            if (chan_state->rx_parse_state == MAVLINK_PARSE_STATE_GOT_BAD_CRC1
+                    || msg_out->checksum.bytes[1] != (uint8_t)(chan_state->rx_crc >> 8)) {
+                mavlink_parse_drop(chan_state, &chan_state->rx_crc_errors);
+            } else if (msg_out->header.incompat_flags & MAVLINK_IFLAG_SIGNED) {
+                chan_state->rx_index = 0;
+                chan_state->rx_parse_state = MAVLINK_PARSE_STATE_SIGNATURE_WAIT;
+            } else {
+                chan_state->rx_parse_state = MAVLINK_PARSE_STATE_IDLE;
+                complete = 1;
+            }
+            break;
+        case MAVLINK_PARSE_STATE_SIGNATURE_WAIT: {
+            // signatures aren't verified, just skipped
+            size_t take = MAVLINK_SIGNATURE_BLOCK_LEN - chan_state->rx_index;
+            if (take > remaining) {
+                take = remaining;
+            }
+            chan_state->rx_index += take;
+            idx += take;
+            if (chan_state->rx_index == MAVLINK_SIGNATURE_BLOCK_LEN) {
+                chan_state->rx_parse_state = MAVLINK_PARSE_STATE_IDLE;
+                complete = 1;
+            }
+            break;
+        }
+        default: {
+            // idle: jump straight to the next start byte
+            const uint8_t *stx = (const uint8_t *)memchr(buf_in + idx, MAVLINK_STX, remaining);
+            if (stx == NULL) {
+                idx = len;
+                break;
+            }
+            idx = (size_t)(stx - buf_in) + 1;
+            msg_out->header.bytes[0] = MAVLINK_STX;
+            chan_state->rx_index = 1;
+            chan_state->rx_parse_state = MAVLINK_PARSE_STATE_GOT_STX;
+            break;
+        }
+        }
+    }
+
+    if (consumed != NULL) {
+        *consumed = idx;
+    }
+    return complete;
+}
+
+/// Length of a payload with its trailing zero bytes removed. Mavlink 2 always sends at least one
+/// payload byte
+static inline uint8_t mavlink_trimmed_len(const uint8_t *payload, uint8_t len) {
+    while (len > 1 && payload[len - 1] == 0) {
+        --len;
+    }
+    return len;
+}
+
+/// Fill in a frame header and return its checksum so far
+static inline uint16_t mavlink_fill_header(mavlink_channel_state_t *chan_state,
+        uint8_t *header_bytes, uint32_t msgid, uint8_t len, uint8_t sysid, uint8_t compid) {
+    header_bytes[0] = MAVLINK_STX;
+    header_bytes[1] = len;
+    header_bytes[2] = 0;
+    header_bytes[3] = 0;
+    header_bytes[4] = chan_state->tx_seq++;
+    header_bytes[5] = sysid;
+    header_bytes[6] = compid;
+    header_bytes[7] = (uint8_t)(msgid & 0xff);
+    header_bytes[8] = (uint8_t)((msgid >> 8) & 0xff);
+    header_bytes[9] = (uint8_t)((msgid >> 16) & 0xff);
+    return mavlink_crc_accumulate_buf(header_bytes + 1, MAVLINK_NUM_HEADER_BYTES - 1,
+            MAVLINK_CRC_INIT);
+}
+
+size_t mavlink_pack_frame(mavlink_channel_state_t *chan_state, uint8_t *buf, size_t cap,
+        const void *msg_payload, uint32_t msgid, uint8_t crc_extra, uint8_t len, uint8_t sysid,
+        uint8_t compid) {
+    const uint8_t *payload = (const uint8_t *)msg_payload;
+    uint8_t trimmed_len = mavlink_trimmed_len(payload, len);
+    size_t frame_len = MAVLINK_NUM_NON_PAYLOAD_BYTES + (size_t)trimmed_len;
+    if (cap < frame_len) {
+        return 0;
+    }
+
+    uint16_t crc = mavlink_fill_header(chan_state, buf, msgid, trimmed_len, sysid, compid);
+    // copy and checksum the payload in the same pass
+    uint8_t *payload_out = buf + MAVLINK_NUM_HEADER_BYTES;
+    for (uint8_t idx = 0; idx < trimmed_len; ++idx) {
+        uint8_t byte = payload[idx];
+        payload_out[idx] = byte;
+        crc = mavlink_crc_accumulate(byte, crc);
+    }
+    crc = mavlink_crc_accumulate(crc_extra, crc);
+    payload_out[trimmed_len] = (uint8_t)(crc & 0xff);
+    payload_out[trimmed_len + 1] = (uint8_t)(crc >> 8);
+    return frame_len;
+}
+
+int mavlink_tx_msg_cb(mavlink_channel_state_t *chan_state, const void* msg_payload, uint32_t msgid,
+        uint8_t crc_extra, uint8_t len, uint8_t sysid, uint8_t compid, mavlink_send_bytes_fn_t tx_func) {
+    if (tx_func == NULL) {
+        return -1;
+    }
+    const uint8_t *payload = (const uint8_t *)msg_payload;
+    uint8_t header_bytes[MAVLINK_NUM_HEADER_BYTES];
+    uint8_t trimmed_len = mavlink_trimmed_len(payload, len);
+    uint16_t crc = mavlink_fill_header(chan_state, header_bytes, msgid, trimmed_len, sysid,
+            compid);
+    crc = mavlink_crc_accumulate_buf(payload, trimmed_len, crc);
+    crc = mavlink_crc_accumulate(crc_extra, crc);
+    uint8_t checksum_bytes[MAVLINK_NUM_CHECKSUM_BYTES] = {
+        (uint8_t)(crc & 0xff), (uint8_t)(crc >> 8)
+    };
+
+    int err = tx_func(header_bytes, MAVLINK_NUM_HEADER_BYTES);
+    if (err == 0 && trimmed_len > 0) {
+        err = tx_func(payload, trimmed_len);
+    }
+    if (err == 0) {
+        err = tx_func(checksum_bytes, MAVLINK_NUM_CHECKSUM_BYTES);
+    }
+    return err;
+}
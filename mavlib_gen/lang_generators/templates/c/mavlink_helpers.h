@@ -3,11 +3,103 @@
 #define __MAVLINK_HELPERS_H__
 #include "mavlink_types.h"
 
+/// Set to 0 to calculate checksums bit by bit instead of with a 512 byte lookup table.
+/// The table is several times faster, the bitwise version saves flash
+#ifndef MAVLINK_CRC_USE_TABLE
+#define MAVLINK_CRC_USE_TABLE 1
+#endif
 
-/// Attempt to parse the provided buffer into a message. Returns on the first
-/// successfully parsed message
-int mavlink_parse_buf(const uint8_t *buf_in, mavlink_message_t *msg_out, uint8_t parse_buf);
+#define MAVLINK_CRC_INIT 0xFFFF
 
+#if MAVLINK_CRC_USE_TABLE
+/// CRC-16/MCRF4XX lookup table, defined in mavlink_helpers.c
+extern const uint16_t mavlink_crc_table[256];
+#endif
+
+/// Accumulate one byte into a CRC-16/MCRF4XX (X.25) checksum
+static inline uint16_t mavlink_crc_accumulate(uint8_t data, uint16_t crc) {
+#if MAVLINK_CRC_USE_TABLE
+    return (uint16_t)((crc >> 8) ^ mavlink_crc_table[(uint8_t)(crc ^ data)]);
+#else
+    uint8_t tmp = data ^ (uint8_t)(crc & 0xff);
+    tmp ^= (uint8_t)(tmp << 4);
+    return (uint16_t)((crc >> 8) ^ ((uint16_t)tmp << 8) ^ ((uint16_t)tmp << 3) ^ (tmp >> 4));
+#endif
+}
+
+/// Accumulate a buffer into a CRC-16/MCRF4XX (X.25) checksum
+static inline uint16_t mavlink_crc_accumulate_buf(const uint8_t *buf, size_t len, uint16_t crc) {
+    for (size_t idx = 0; idx < len; ++idx) {
+        crc = mavlink_crc_accumulate(buf[idx], crc);
+    }
+    return crc;
+}
+
+/// Find the crc_extra and max length of a message.
+///
+/// @param table
+///     Message info sorted by msgid (EX: the MAVLINK_<DIALECT>_MSG_INFO generated in each
+///     dialect's <dialect>_msgs.h)
+/// @param count
+///     Number of entries in table
+/// @return const mavlink_info_t*
+///     Info for msgid, or NULL if it isnt in the table
+const mavlink_info_t *mavlink_find_msg_info(const mavlink_info_t *table, size_t count,
+        uint32_t msgid);
+
+/// Initialize a channel before it is used to send or receive
+///
+/// @param chan_state
+///     Channel to initialize
+/// @param default_cb
+///     Function used to send bytes by TX helpers that aren't given one. May be NULL
+/// @param msg_info
+///     Messages this channel can receive, sorted by msgid. Frames with a msgid that isn't in
+///     this table are dropped since their checksum can't be verified. To look messages up with
+///     a generated switch instead of a binary search, set chan_state->msg_info_fn after init
+/// @param msg_info_count
+///     Number of entries in msg_info
+void mavlink_channel_init(mavlink_channel_state_t *chan_state, mavlink_send_bytes_fn_t default_cb,
+        const mavlink_info_t *msg_info, size_t msg_info_count);
+
+/// Parse received bytes, a buffer at a time. Returns as soon as a message is complete, so call
+/// it again with the rest of the buffer (buf_in + *consumed) until all of it has been consumed.
+///
+/// Skips straight to the next start byte, and copies header and payload bytes into msg_out in
+/// bulk. Frames are validated against the channel's msg_info table (checksum including
+/// crc_extra). Signatures are skipped, not verified.
+///
+/// @param chan_state
+///     Channel the bytes were received on
+/// @param buf_in
+///     Received bytes
+/// @param len
+///     Number of bytes in buf_in
+/// @param msg_out
+///     Where the message is assembled. Also holds a partially received frame between calls, so
+///     pass the same message for every call on a channel. Only valid when 1 is returned
+/// @param consumed
+///     Set to the number of bytes from buf_in that were used
+/// @return int
+///     1 if a complete and valid message is now in msg_out, otherwise 0
+int mavlink_parse_buf(mavlink_channel_state_t *chan_state, const uint8_t *buf_in, size_t len,
+        mavlink_message_t *msg_out, size_t *consumed);
+
+/// Serialize a message into a complete frame in buf: header, zero-trimmed payload and checksum.
+/// The payload is read once, while it is copied and checksummed. Uses and increments the
+/// channel's tx sequence id.
+///
+/// @param buf
+///     Where to write the frame. Must be DMA/transport ready memory if it will be sent directly
+/// @param cap
+///     Size of buf. MAVLINK_NUM_NON_PAYLOAD_BYTES + len is always enough
+/// @param msg_payload
+///     The message struct (EX: mavlink_heartbeat_t), len bytes long
+/// @return size_t
+///     Length of the frame written to buf, or 0 if it wouldn't fit in cap
+size_t mavlink_pack_frame(mavlink_channel_state_t *chan_state, uint8_t *buf, size_t cap,
+        const void *msg_payload, uint32_t msgid, uint8_t crc_extra, uint8_t len, uint8_t sysid,
+        uint8_t compid);
 
 /// Send a message over a transport using the provided send_bytes function
 ///
@@ -28,18 +120,23 @@ int mavlink_parse_buf(const uint8_t *buf_in, mavlink_message_t *msg_out, uint8_t
 /// @param compid
 ///     Source component id to use in this messages header
 /// @param tx_func
-///     Pointer to a function that can be used to send message bytes. This may be called
-///     multiple times to send a single message
+///     Pointer to a function that can be used to send message bytes. This is called 3 times for
+///     a message: the header, the payload (straight from msg_payload, no copy) and the checksum
+/// @return int
+///     0 on success, otherwise the error returned by tx_func
 int mavlink_tx_msg_cb(mavlink_channel_state_t *chan_state, const void* msg_payload, uint32_t msgid,
         uint8_t crc_extra, uint8_t len, uint8_t sysid, uint8_t compid, mavlink_send_bytes_fn_t tx_func);
 
-inline int mavlink_tx_msg_cb(mavlink_channel_state_t *chan_state, const void* msg_payload,
-        const mavlink_info_t *msg_info, uint8_t sysid, uint8_t compid, mavlink_send_bytes_fn_t tx_func) {
+/// @ref mavlink_tx_msg_cb using a message's info
+static inline int mavlink_tx_msg_info_cb(mavlink_channel_state_t *chan_state,
+        const void* msg_payload, const mavlink_info_t *msg_info, uint8_t sysid, uint8_t compid,
+        mavlink_send_bytes_fn_t tx_func) {
     return mavlink_tx_msg_cb(chan_state, msg_payload, msg_info->msgid, msg_info->crc_extra,
             msg_info->len, sysid, compid, tx_func);
 }
 
-inline int mavlink_tx_msg_cb(mavlink_channel_state_t *chan_state, const void* msg_payload,
+/// @ref mavlink_tx_msg_cb using a message's info and the channel's default send function
+static inline int mavlink_tx_msg_info(mavlink_channel_state_t *chan_state, const void* msg_payload,
         const mavlink_info_t *msg_info, uint8_t sysid, uint8_t compid) {
     return mavlink_tx_msg_cb(chan_state, msg_payload, msg_info->msgid, msg_info->crc_extra,
             msg_info->len, sysid, compid, chan_state->default_cb);
@@ -1,6 +1,7 @@
 /// Types used by the mavlink library
 #ifndef __MAVLINK_TYPES_H__
 #define __MAVLINK_TYPES_H__
+#include <stddef.h>
 #include <stdint.h>
 
 #ifndef MAV_STRUCT_PACK
@@ -11,10 +12,29 @@
 #endif
 #endif
 
+/// 1 if the target stores multi-byte values little-endian, like the mavlink wire format. Message
+/// structs are then copied to and from payloads with a single memcpy
+#ifndef MAVLINK_LITTLE_ENDIAN
+  #if defined(__BYTE_ORDER__) && defined(__ORDER_BIG_ENDIAN__) && __BYTE_ORDER__ == __ORDER_BIG_ENDIAN__
+    #define MAVLINK_LITTLE_ENDIAN 0
+  #else
+    #define MAVLINK_LITTLE_ENDIAN 1
+  #endif
+#endif
+
+#define MAVLINK_STX 0xFD
 #define MAVLINK_NUM_CHECKSUM_BYTES 2
 #define MAVLINK_NUM_HEADER_BYTES 10
 #define MAVLINK_NUM_NON_PAYLOAD_BYTES (MAVLINK_NUM_HEADER_BYTES+MAVLINK_NUM_CHECKSUM_BYTES)
 #define MAVLINK_MAX_PAYLOAD_LEN 255
+#define MAVLINK_SIGNATURE_BLOCK_LEN 13
+/// Largest possible frame on the wire (signed, full length payload)
+#define MAVLINK_MAX_FRAME_LEN (MAVLINK_NUM_NON_PAYLOAD_BYTES+MAVLINK_MAX_PAYLOAD_LEN+MAVLINK_SIGNATURE_BLOCK_LEN)
+
+/// incompat_flags bit set when a frame carries a signature block
+#define MAVLINK_IFLAG_SIGNED 0x01
+/// incompat_flags bits this library understands. Frames with any other bit set are dropped
+#define MAVLINK_IFLAG_SUPPORTED MAVLINK_IFLAG_SIGNED
 
 #ifndef MAVLINK_MAX_CHANNELS
   // Allow 4 channels by default
@@ -49,6 +69,9 @@ typedef struct __mavlink_message_t {
     } checksum;                                     ///< CRC-16/MCRF4XX for message (excluding magic byte)
 } mavlink_message_t;
 
+/// Pointer to the payload of a mavlink_message_t
+#define _MAV_PAYLOAD(msg) ((msg)->payload)
+
 /// Function pointer to a send_bytes method for mavlink TX helpers to use.
 /// Certain TX helpers can use this callback method to queue/send bytes as it
 /// gets them ready to transmit
@@ -65,7 +88,7 @@ typedef struct __mavlink_tx_info_t {
     uint16_t final_crc;   // final CRC produced for the messaged
     uint8_t  trimmed_len; // Trimmed length of the payload
     uint8_t  seq;         // Sequence id the message was transmitted with
-};
+} mavlink_tx_info_t;
 
 typedef struct __mavlink_info_t {
     uint32_t msgid;
@@ -73,6 +96,25 @@ typedef struct __mavlink_info_t {
     uint8_t len;
 } mavlink_info_t;
 
+/// Lookup of a message's info by msgid. Returns NULL for messages that can't be received.
+/// EX: the generated mavlink_<dialect>_msg_info
+typedef const mavlink_info_t *(*mavlink_msg_info_fn_t)(uint32_t msgid);
+
+#if !MAVLINK_LITTLE_ENDIAN
+/// Copy count values of elem_size bytes each from src to dst, reversing the byte order of every
+/// value. Converts fields between the little-endian wire format and a big-endian target
+static inline void mavlink_copy_swapped(uint8_t *dst, const uint8_t *src, size_t elem_size,
+        size_t count) {
+    for (size_t elem = 0; elem < count; ++elem) {
+        for (size_t byte = 0; byte < elem_size; ++byte) {
+            dst[byte] = src[elem_size - 1 - byte];
+        }
+        dst += elem_size;
+        src += elem_size;
+    }
+}
+#endif
+
 /// The state machine for the comm parser
 typedef enum {
     MAVLINK_PARSE_STATE_UNINIT=0,
@@ -101,6 +143,14 @@ typedef struct __mavlink_channel_state_t {
     uint8_t tx_seq; // current sequence id this channel is on to transmit
     mavlink_send_bytes_fn_t default_cb; // default function to use while sending bytes
     mavlink_parse_state_t rx_parse_state; // current state of this channels rx parsing machine
+    const mavlink_info_t *msg_info; // messages this channel can receive, sorted by msgid
+    size_t msg_info_count;          // number of entries in msg_info
+    mavlink_msg_info_fn_t msg_info_fn; // optional. used instead of searching msg_info when set
+    uint16_t rx_crc;        // running checksum of the frame being received
+    uint16_t rx_index;      // bytes received of the current header/payload/signature section
+    uint8_t rx_crc_extra;   // crc_extra of the frame being received
+    uint16_t rx_crc_errors; // frames dropped because of a bad checksum
+    uint16_t rx_dropped;    // frames dropped for an unknown msgid or unsupported incompat_flags
 } mavlink_channel_state_t;
 
 #endif /* __MAVLINK_TYPES_H__*/
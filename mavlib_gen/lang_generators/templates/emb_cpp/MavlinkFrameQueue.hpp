@@ -0,0 +1,128 @@
+/// Lock-free single-producer/single-consumer queue of received frames. When the library is
+/// generated with amalgamate, include a dialect header before this one
+///
+/// Included as part of message generation by mavlib_gen
+#ifndef __MAVLINKFRAMEQUEUE_H__
+#define __MAVLINKFRAMEQUEUE_H__
+#include <atomic>
+#include "MavlinkParser.hpp"
+
+/// Alignment of the queue's head and tail indices. Set to the cache line size (EX: 64) on
+/// multi-core targets so the producer and consumer don't contend for the same line
+#ifndef MAV_QUEUE_INDEX_ALIGN
+#define MAV_QUEUE_INDEX_ALIGN alignof(size_t)
+#endif
+
+namespace mavgen {
+
+/// Fixed capacity ring of validated frames, passed from one producer (EX: a UART ISR running a
+/// MavlinkParser) to one consumer (EX: an RTOS task). Every slot fits the longest frame in
+/// MsgTable. Push and pop never block, lock or allocate: the only shared state is a head index
+/// written by the producer and a tail index written by the consumer.
+///
+/// Only one context may push and only one may pop. Needs lock-free std::atomic<size_t> loads and
+/// stores, which single core MCUs have
+///
+/// @tparam MsgTable
+///     A generated <Dialect>MsgTable. Frames are checked against it by the parser before they're
+///     pushed, and looked up in it again by @ref front
+/// @tparam Depth
+///     Number of frames the queue holds. A power of two
+template <typename MsgTable, size_t Depth>
+class MavlinkFrameQueue {
+    static_assert(Depth > 0 && (Depth & (Depth - 1)) == 0,
+                  "MavlinkFrameQueue Depth must be a power of 2");
+
+   public:
+    /// Producer only. Copy a frame into the queue (EX: from a MavlinkParser handler)
+    /// @return bool
+    ///     false if the queue is full or the frame is longer than MsgTable::MAX_FRAME_LEN. The
+    ///     frame is dropped and counted in @ref dropped
+    bool push(const uint8_t* bytes, size_t length) {
+        const size_t head = head_.load(std::memory_order_relaxed);
+        if (head - tailCache_ == Depth) {
+            // acquire: the consumer is done reading a slot before it moves tail past it
+            tailCache_ = tail_.load(std::memory_order_acquire);
+        }
+        if (head - tailCache_ == Depth || length > MsgTable::MAX_FRAME_LEN) {
+            dropped_.store(dropped_.load(std::memory_order_relaxed) + 1, std::memory_order_relaxed);
+            return false;
+        }
+        Slot& slot = slots_[head & (Depth - 1)];
+        memcpy(slot.bytes, bytes, length);
+        slot.length = static_cast<uint16_t>(length);
+        // release: the slot is written before the consumer can see it
+        head_.store(head + 1, std::memory_order_release);
+        return true;
+    }
+
+    /// Producer only. @ref push a frame from a MavlinkParser
+    bool push(const MavlinkFrame& frame) { return push(frame.bytes, frame.length); }
+
+    /// Consumer only. The oldest frame, in place in the queue. Valid until @ref pop
+    /// @return bool
+    ///     false if the queue is empty
+    bool front(MavlinkFrame& frame) {
+        const size_t tail = tail_.load(std::memory_order_relaxed);
+        if (tail == headCache_) {
+            // acquire: see the slot contents the producer wrote before moving head
+            headCache_ = head_.load(std::memory_order_acquire);
+            if (tail == headCache_) {
+                return false;
+            }
+        }
+        const Slot& slot = slots_[tail & (Depth - 1)];
+        const uint8_t* bytes = slot.bytes;
+        frame.header.incompatFlags = bytes[2];
+        frame.header.compatFlags = bytes[3];
+        frame.header.seq = bytes[4];
+        frame.header.sysid = bytes[5];
+        frame.header.compid = bytes[6];
+        frame.header.msgid = static_cast<uint32_t>(bytes[7]) |
+                             (static_cast<uint32_t>(bytes[8]) << 8) |
+                             (static_cast<uint32_t>(bytes[9]) << 16);
+        frame.info = MsgTable::find(frame.header.msgid);
+        frame.payload = bytes + MAV_NUM_HEADER_BYTES;
+        frame.payloadLen = bytes[1];
+        frame.bytes = bytes;
+        frame.length = slot.length;
+        return true;
+    }
+
+    /// Consumer only. Release the frame returned by @ref front
+    void pop() {
+        // release: done reading the slot before the producer can reuse it
+        tail_.store(tail_.load(std::memory_order_relaxed) + 1, std::memory_order_release);
+    }
+
+    /// Number of frames in the queue. Never exact while the other side is running: from the
+    /// consumer it's a lower bound (the producer may push more), from the producer an upper bound
+    /// (the consumer may pop more). Only call it from the producer or the consumer
+    size_t size() const {
+        return head_.load(std::memory_order_acquire) - tail_.load(std::memory_order_acquire);
+    }
+
+    /// Number of frames push couldn't fit. Safe to read from either side
+    uint32_t dropped() const { return dropped_.load(std::memory_order_relaxed); }
+
+   private:
+    struct Slot {
+        uint16_t length;
+        uint8_t bytes[MsgTable::MAX_FRAME_LEN];
+    };
+
+    Slot slots_[Depth];
+    /// Free running index of the next slot to push. Written by the producer
+    alignas(MAV_QUEUE_INDEX_ALIGN) std::atomic<size_t> head_{0};
+    /// Producer's copy of tail_, refreshed only when the queue looks full
+    size_t tailCache_ = 0;
+    std::atomic<uint32_t> dropped_{0};
+    /// Free running index of the next slot to pop. Written by the consumer
+    alignas(MAV_QUEUE_INDEX_ALIGN) std::atomic<size_t> tail_{0};
+    /// Consumer's copy of head_, refreshed only when the queue looks empty
+    size_t headCache_ = 0;
+};
+
+}  // namespace mavgen
+
+#endif /* __MAVLINKFRAMEQUEUE_H__ */
@@ -0,0 +1,208 @@
+/// Receive side of the MAVLink library: splits a byte stream into validated frames
+///
+/// Included as part of message generation by mavlib_gen
+#ifndef __MAVLINKPARSER_H__
+#define __MAVLINKPARSER_H__
+#include "MavlinkTypes.hpp"
+
+namespace mavgen {
+
+/// A validated frame, as handed to a MavlinkParser handler. Pointers are only valid for the
+/// duration of the handler call
+struct MavlinkFrame {
+    MavlinkHeader header;
+    /// Table entry for header.msgid
+    const MavlinkMsgInfo* info;
+    /// Start of the (possibly trimmed) payload. Pass to a message's decodePayload
+    const uint8_t* payload;
+    uint8_t payloadLen;
+    /// The complete frame, including any signature
+    const uint8_t* bytes;
+    size_t length;
+};
+
+/// Parses received bytes, a span at a time (EX: each half of a circular DMA buffer), into
+/// frames. Frames are validated against MsgTable (checksum including crc_extra), then passed to
+/// a handler. Signatures are skipped, not verified. Uses no exceptions, RTTI or heap.
+///
+/// Frames that are fully inside a span are handed to the handler in place, without being
+/// copied. Only a frame split across two spans is copied, once, into the parser's buffer.
+///
+/// @tparam MsgTable
+///     Provides `static constexpr const MavlinkMsgInfo* find(uint32_t msgid)`, returning nullptr
+///     for messages that can't be received (EX: the <Dialect>MsgTable generated in each
+///     dialect's <Dialect>Msgs.hpp)
+/// @tparam Capacity
+///     Size of the buffer for frames split across spans. Longer frames are dropped. The default
+///     fits any frame
+template <typename MsgTable, size_t Capacity = MAV_MAX_FRAME_LEN>
+class MavlinkParser {
+    static_assert(Capacity >= MAV_NUM_HEADER_BYTES + MAV_NUM_CHECKSUM_BYTES,
+                  "MavlinkParser Capacity must fit at least an empty frame");
+
+   public:
+    /// Parse a span of received bytes. Bytes of an incomplete frame at the end of data are kept
+    /// until the next call
+    ///
+    /// @param handler
+    ///     Called as handler(const MavlinkFrame&) for each valid frame, in order
+    /// @return size_t
+    ///     Number of frames passed to handler
+    template <typename Handler>
+    size_t parse(const uint8_t* data, size_t len, Handler&& handler) {
+        size_t numFrames = 0;
+        MavlinkFrame frame;
+
+        // finish off a frame split across spans. Bytes are only taken from data as they're
+        // needed, and the frame is only checked again once they've all arrived
+        while (bufLen_ > 0) {
+            const Check result = bufLen_ < needed_ ? Check::NEED_MORE : check(buf_, bufLen_, frame);
+            if (result == Check::OK) {
+                handler(static_cast<const MavlinkFrame&>(frame));
+                ++numFrames;
+                discard(frame.length);
+            } else if (result == Check::INVALID) {
+                discard(1);
+            } else if (len == 0) {
+                return numFrames;
+            } else {
+                const size_t take = needed_ - bufLen_ < len ? needed_ - bufLen_ : len;
+                memcpy(buf_ + bufLen_, data, take);
+                bufLen_ += take;
+                data += take;
+                len -= take;
+            }
+        }
+
+        // everything else is parsed in place
+        while (len > 0) {
+            const uint8_t* stx = static_cast<const uint8_t*>(memchr(data, MAV_STX, len));
+            if (stx == nullptr) {
+                break;
+            }
+            len -= static_cast<size_t>(stx - data);
+            data = stx;
+            const Check result = check(data, len, frame);
+            if (result == Check::OK) {
+                handler(static_cast<const MavlinkFrame&>(frame));
+                ++numFrames;
+                data += frame.length;
+                len -= frame.length;
+            } else if (result == Check::INVALID) {
+                ++data;
+                --len;
+            } else {
+                // needed_ <= Capacity, so the rest of data fits
+                memcpy(buf_, data, len);
+                bufLen_ = len;
+                break;
+            }
+        }
+        return numFrames;
+    }
+
+    /// Forget any partially received frame (EX: after the link is re-established)
+    void reset() {
+        bufLen_ = 0;
+        needed_ = 0;
+    }
+
+    /// Number of frames dropped because their checksum didn't match
+    uint32_t crcErrors() const { return crcErrors_; }
+
+    /// Number of frames dropped because they can't be received: unknown msgid, unsupported
+    /// incompatibility flags or longer than Capacity
+    uint32_t dropped() const { return dropped_; }
+
+   private:
+    enum class Check : uint8_t { NEED_MORE, INVALID, OK };
+
+    /// Check whether buf (starting with STX) holds a valid frame. When it might, but is too short
+    /// to tell, sets needed_ to the number of bytes that are needed
+    Check check(const uint8_t* buf, size_t avail, MavlinkFrame& frame) {
+        if (avail < MAV_NUM_HEADER_BYTES) {
+            needed_ = MAV_NUM_HEADER_BYTES;
+            return Check::NEED_MORE;
+        }
+        const uint8_t payloadLen = buf[1];
+        const uint8_t incompatFlags = buf[2];
+        const uint32_t msgid = static_cast<uint32_t>(buf[7]) |
+                               (static_cast<uint32_t>(buf[8]) << 8) |
+                               (static_cast<uint32_t>(buf[9]) << 16);
+        const MavlinkMsgInfo* info = MsgTable::find(msgid);
+        size_t frameLen = MAV_NUM_HEADER_BYTES + payloadLen + MAV_NUM_CHECKSUM_BYTES;
+        if (incompatFlags & MAV_IFLAG_SIGNED) {
+            frameLen += MAV_SIGNATURE_BLOCK_LEN;
+        }
+        if ((incompatFlags & ~MAV_IFLAG_SIGNED) != 0 || info == nullptr || frameLen > Capacity) {
+            ++dropped_;
+            return Check::INVALID;
+        }
+        if (avail < frameLen) {
+            needed_ = frameLen;
+            return Check::NEED_MORE;
+        }
+
+        uint16_t checksum =
+            crc::accumulate(buf + 1, MAV_NUM_HEADER_BYTES - 1 + payloadLen, crc::CRC_INIT);
+        checksum = crc::accumulate(info->crcExtra, checksum);
+        const uint8_t* checksumIn = buf + MAV_NUM_HEADER_BYTES + payloadLen;
+        if (checksumIn[0] != (checksum & 0xff) || checksumIn[1] != (checksum >> 8)) {
+            ++crcErrors_;
+            return Check::INVALID;
+        }
+
+        frame.header.incompatFlags = incompatFlags;
+        frame.header.compatFlags = buf[3];
+        frame.header.seq = buf[4];
+        frame.header.sysid = buf[5];
+        frame.header.compid = buf[6];
+        frame.header.msgid = msgid;
+        frame.info = info;
+        frame.payload = buf + MAV_NUM_HEADER_BYTES;
+        frame.payloadLen = payloadLen;
+        frame.bytes = buf;
+        frame.length = frameLen;
+        return Check::OK;
+    }
+
+    /// Drop count bytes from the front of the buffer, then skip ahead to the next STX in it
+    void discard(size_t count) {
+        needed_ = 0;
+        const uint8_t* stx =
+            static_cast<const uint8_t*>(memchr(buf_ + count, MAV_STX, bufLen_ - count));
+        bufLen_ = stx == nullptr ? 0 : bufLen_ - static_cast<size_t>(stx - buf_);
+        if (bufLen_ > 0) {
+            memmove(buf_, stx, bufLen_);
+        }
+    }
+
+    uint8_t buf_[Capacity];
+    size_t bufLen_ = 0;
+    /// Length the buffered frame needs to be checked again
+    size_t needed_ = 0;
+    uint32_t crcErrors_ = 0;
+    uint32_t dropped_ = 0;
+};
+
+/// Decode frame into a Msg and pass it to visitor, if visitor accepts a const Msg&. Used by the
+/// generated <Dialect>MsgTable::dispatch
+/// @return bool
+///     true if visitor was called
+template <typename Msg, typename Visitor>
+bool visitFrame(const MavlinkFrame& frame, Visitor& visitor) {
+    if constexpr (detail::IsVisitable<Visitor&, Msg>::value) {
+        Msg msg;
+        msg.header = frame.header;
+        msg.decodePayload(frame.payload, frame.payloadLen);
+        visitor(static_cast<const Msg&>(msg));
+        return true;
+    } else {
+        static_cast<void>(frame);
+        return false;
+    }
+}
+
+}  // namespace mavgen
+
+#endif /* __MAVLINKPARSER_H__ */
@@ -5,6 +5,7 @@
 #define __MAVLINKTYPES_H__
 #include <stddef.h>
 #include <stdint.h>
+#include <string.h>
 
 #ifndef MAV_STRUCT_PACK
 #ifdef __GNUC__
@@ -14,14 +15,24 @@
 #endif
 #endif
 
-/// Defines the maximum number of fields that can be in a single message.
-#ifndef MAV_MAX_NUM_MSG_FIELDS
-#define MAV_MAX_NUM_MSG_FIELDS 64
+/// Set to 0 to calculate checksums bit by bit instead of with a 512 byte lookup table
+#ifndef MAV_CRC_USE_TABLE
+#define MAV_CRC_USE_TABLE 1
+#endif
+
+/// 1 if the target stores multi-byte values little-endian, like the mavlink wire format. Payloads
+/// are then copied to and from the wire with memcpy
+#ifndef MAV_LITTLE_ENDIAN
+#if defined(__BYTE_ORDER__) && defined(__ORDER_BIG_ENDIAN__) && __BYTE_ORDER__ == __ORDER_BIG_ENDIAN__
+#define MAV_LITTLE_ENDIAN 0
+#else
+#define MAV_LITTLE_ENDIAN 1
+#endif
 #endif
 
 namespace mavgen {
 
-enum MavlinkFieldType {
+enum MavlinkFieldType : uint8_t {
     CHAR = 0,
     UINT8_T = 1,
     INT8_T = 2,
@@ -35,31 +46,259 @@ enum MavlinkFieldType {
     DOUBLE = 10
 };
 
+constexpr uint8_t MAV_STX = 0xFD;
+constexpr size_t MAV_NUM_HEADER_BYTES = 10;
+constexpr size_t MAV_NUM_CHECKSUM_BYTES = 2;
+constexpr size_t MAV_MAX_PAYLOAD_LEN = 255;
+constexpr size_t MAV_SIGNATURE_BLOCK_LEN = 13;
+/// Largest possible frame on the wire (signed, full length payload)
+constexpr size_t MAV_MAX_FRAME_LEN =
+    MAV_NUM_HEADER_BYTES + MAV_MAX_PAYLOAD_LEN + MAV_NUM_CHECKSUM_BYTES + MAV_SIGNATURE_BLOCK_LEN;
+/// incompatFlags bit set when a frame carries a signature block
+constexpr uint8_t MAV_IFLAG_SIGNED = 0x01;
+
 /// Information about a properties common to all messages
 struct MavlinkMsgInfo {
     uint32_t msgid;
     uint8_t crcExtra;
-    uint8_t maxLength;
+    /// Length of the full (untrimmed) payload. Wider than a frame's length byte so definitions
+    /// that are too long to send still compile
+    uint16_t maxLength;
+};
+
+/// Frame header fields, other than the start byte and payload length
+struct MavlinkHeader {
+    uint8_t incompatFlags;
+    uint8_t compatFlags;
+    uint8_t seq;
+    uint8_t sysid;
+    uint8_t compid;
+    uint32_t msgid;
+};
+
+/// CRC-16/MCRF4XX (X.25), the mavlink frame checksum
+namespace crc {
+
+constexpr uint16_t CRC_INIT = 0xFFFF;
+
+constexpr uint16_t accumulateBitwise(uint8_t data, uint16_t crc) {
+    uint8_t tmp = data ^ static_cast<uint8_t>(crc & 0xff);
+    tmp ^= static_cast<uint8_t>(tmp << 4);
+    return static_cast<uint16_t>((crc >> 8) ^ (tmp << 8) ^ (tmp << 3) ^ (tmp >> 4));
+}
+
+#if MAV_CRC_USE_TABLE
+struct CrcTable {
+    uint16_t values[256];
+};
+
+constexpr CrcTable makeTable() {
+    CrcTable table{};
+    for (unsigned idx = 0; idx < 256; ++idx) {
+        table.values[idx] = accumulateBitwise(static_cast<uint8_t>(idx), 0);
+    }
+    return table;
+}
+
+/// Built at compile time, placed in flash
+inline constexpr CrcTable TABLE = makeTable();
+#endif
+
+constexpr uint16_t accumulate(uint8_t data, uint16_t crc) {
+#if MAV_CRC_USE_TABLE
+    return static_cast<uint16_t>((crc >> 8) ^ TABLE.values[static_cast<uint8_t>(crc ^ data)]);
+#else
+    return accumulateBitwise(data, crc);
+#endif
+}
+
+inline uint16_t accumulate(const uint8_t* buf, size_t len, uint16_t crc) {
+    for (size_t idx = 0; idx < len; ++idx) {
+        crc = accumulate(buf[idx], crc);
+    }
+    return crc;
+}
+
+}  // namespace crc
+
+#if !MAV_LITTLE_ENDIAN
+/// Copy count values of elemSize bytes each from src to dst, reversing the byte order of every
+/// value. Converts fields between the little-endian wire format and a big-endian target
+inline void copySwapped(uint8_t* dst, const uint8_t* src, size_t elemSize, size_t count) {
+    for (size_t elem = 0; elem < count; ++elem) {
+        for (size_t byte = 0; byte < elemSize; ++byte) {
+            dst[byte] = src[elemSize - 1 - byte];
+        }
+        dst += elemSize;
+        src += elemSize;
+    }
+}
+#endif
+
+/// Write a complete frame into buf: header, zero-trimmed payload and checksum. The payload is
+/// copied and checksummed in the same pass, straight into buf (EX: a DMA buffer)
+///
+/// @param payload
+///     Wire format payload, info.maxLength bytes
+/// @return size_t
+///     Length of the frame written to buf, or 0 if it doesn't fit in cap
+inline size_t serializeFrame(uint8_t* buf, size_t cap, const MavlinkHeader& header,
+                             const MavlinkMsgInfo& info, const uint8_t* payload) {
+    // mavlink 2 trims trailing zeros, but always sends the first payload byte
+    size_t len = info.maxLength;
+    while (len > 1 && payload[len - 1] == 0) {
+        --len;
+    }
+    const size_t frameLen = MAV_NUM_HEADER_BYTES + len + MAV_NUM_CHECKSUM_BYTES;
+    if (len > MAV_MAX_PAYLOAD_LEN || cap < frameLen) {
+        return 0;
+    }
+
+    buf[0] = MAV_STX;
+    buf[1] = static_cast<uint8_t>(len);
+    // no signature is appended
+    buf[2] = header.incompatFlags & ~MAV_IFLAG_SIGNED;
+    buf[3] = header.compatFlags;
+    buf[4] = header.seq;
+    buf[5] = header.sysid;
+    buf[6] = header.compid;
+    buf[7] = static_cast<uint8_t>(info.msgid & 0xff);
+    buf[8] = static_cast<uint8_t>((info.msgid >> 8) & 0xff);
+    buf[9] = static_cast<uint8_t>((info.msgid >> 16) & 0xff);
+    uint16_t checksum = crc::accumulate(buf + 1, MAV_NUM_HEADER_BYTES - 1, crc::CRC_INIT);
+
+    uint8_t* payloadOut = buf + MAV_NUM_HEADER_BYTES;
+    for (size_t idx = 0; idx < len; ++idx) {
+        const uint8_t byte = payload[idx];
+        payloadOut[idx] = byte;
+        checksum = crc::accumulate(byte, checksum);
+    }
+    checksum = crc::accumulate(info.crcExtra, checksum);
+    payloadOut[len] = static_cast<uint8_t>(checksum & 0xff);
+    payloadOut[len + 1] = static_cast<uint8_t>(checksum >> 8);
+    return frameLen;
+}
+
+/// Check that buf starts with a complete, valid frame of the message described by info
+///
+/// @param header
+///     Set to the frame's header
+/// @param payload
+///     Set to the start of the frame's payload within buf
+/// @param payloadLen
+///     Set to the frame's (possibly trimmed) payload length
+/// @return size_t
+///     Length of the frame including any signature, or 0 if buf doesn't start with a valid frame
+///     of this message
+inline size_t deserializeFrame(const uint8_t* buf, size_t len, const MavlinkMsgInfo& info,
+                               MavlinkHeader& header, const uint8_t*& payload, size_t& payloadLen) {
+    if (len < MAV_NUM_HEADER_BYTES + MAV_NUM_CHECKSUM_BYTES || buf[0] != MAV_STX) {
+        return 0;
+    }
+    const uint32_t msgid = static_cast<uint32_t>(buf[7]) | (static_cast<uint32_t>(buf[8]) << 8) |
+                           (static_cast<uint32_t>(buf[9]) << 16);
+    size_t frameLen = MAV_NUM_HEADER_BYTES + buf[1] + MAV_NUM_CHECKSUM_BYTES;
+    if (buf[2] & MAV_IFLAG_SIGNED) {
+        frameLen += MAV_SIGNATURE_BLOCK_LEN;
+    }
+    if (msgid != info.msgid || len < frameLen) {
+        return 0;
+    }
+    uint16_t checksum = crc::accumulate(buf + 1, MAV_NUM_HEADER_BYTES - 1 + buf[1], crc::CRC_INIT);
+    checksum = crc::accumulate(info.crcExtra, checksum);
+    const uint8_t* checksumIn = buf + MAV_NUM_HEADER_BYTES + buf[1];
+    if (checksumIn[0] != (checksum & 0xff) || checksumIn[1] != (checksum >> 8)) {
+        return 0;
+    }
+
+    header.incompatFlags = buf[2];
+    header.compatFlags = buf[3];
+    header.seq = buf[4];
+    header.sysid = buf[5];
+    header.compid = buf[6];
+    header.msgid = msgid;
+    payload = buf + MAV_NUM_HEADER_BYTES;
+    payloadLen = buf[1];
+    return frameLen;
+}
+
+/// Read a T from offset in a wireLen byte wire format payload, without any alignment
+/// requirements. Bytes past wireLen were trimmed from the payload, and read as zero
+template <typename T>
+inline T readWire(const uint8_t* wire, size_t wireLen, size_t offset) {
+    T value;
+#if MAV_LITTLE_ENDIAN
+    if (offset + sizeof(T) <= wireLen) {
+        memcpy(&value, wire + offset, sizeof(T));
+        return value;
+    }
+#endif
+    uint8_t bytes[sizeof(T)] = {};
+    if (offset < wireLen) {
+        memcpy(bytes, wire + offset, wireLen - offset < sizeof(T) ? wireLen - offset : sizeof(T));
+    }
+#if MAV_LITTLE_ENDIAN
+    memcpy(&value, bytes, sizeof(T));
+#else
+    copySwapped(reinterpret_cast<uint8_t*>(&value), bytes, sizeof(T), 1);
+#endif
+    return value;
+}
+
+/// Read-only view of an array field in a wire format payload, as returned by message views.
+/// Elements trimmed from the payload read as zero
+template <typename T>
+class MavlinkWireSpan {
+   public:
+    constexpr MavlinkWireSpan(const uint8_t* wire, size_t wireLen, size_t offset, size_t count)
+        : wire_(wire), wireLen_(wireLen), offset_(offset), count_(count) {}
+
+    /// Number of elements in the array field
+    constexpr size_t size() const { return count_; }
+
+    /// Element idx. Not bounds checked
+    T operator[](size_t idx) const {
+        return readWire<T>(wire_, wireLen_, offset_ + idx * sizeof(T));
+    }
+
+    /// Copy up to count elements into out
+    /// @return size_t
+    ///     Number of elements copied
+    size_t copyTo(T* out, size_t count) const {
+        count = count < count_ ? count : count_;
+        for (size_t idx = 0; idx < count; ++idx) {
+            out[idx] = (*this)[idx];
+        }
+        return count;
+    }
+
+   private:
+    const uint8_t* wire_;
+    size_t wireLen_;
+    size_t offset_;
+    size_t count_;
 };
 
+/// Sized for flash: one of these is generated for every field of every message
 struct MavlinkMsgFieldInfo {
     /// @brief Name of the field
     const char* name;
     MavlinkFieldType type;
     /// If this field is an array, the max number of elements, otherwise 0
-    size_t arrayLength;
+    uint8_t arrayLength;
     /// Total size of this field in bytes
-    size_t byteSize;
+    uint16_t byteSize;
     /// 0-based byte offset of where this field begins in a serialized payload
-    size_t wireOffset;
+    uint16_t wireOffset;
 };
 
 /// @brief Detailed information about a message that can be optionally included at compile time
 struct MavlinkMsgDetails {
-    /// @brief Information on each field in this message
-    MavlinkMsgFieldInfo fields[MAV_MAX_NUM_MSG_FIELDS];
+    /// @brief Information on each field in this message, in wire order. Each message has an
+    /// exactly sized array. nullptr if the message has no fields
+    const MavlinkMsgFieldInfo* fields;
     /// @brief Number of fields in @ref fields
-    size_t numFields;
+    uint8_t numFields;
     /// @brief String name of this message
     const char* name;
 };
@@ -76,6 +315,38 @@ class IMavlinkMessage {
 #endif
 };
 
+/// Static (CRTP) alternative to IMavlinkMessage, used by messages generated with static_dispatch.
+/// Provides the same accessors without a vtable pointer in every message or indirect calls
+template <typename Msg>
+class MavlinkMessage {
+   public:
+    /// @brief Get basic information about this message
+    static constexpr const MavlinkMsgInfo& getMsgInfo() { return Msg::INFO; }
+
+#ifdef MAV_INCLUDE_MSG_DETAILS
+    /// @brief Get detailed information on this message and its fields
+    static constexpr const MavlinkMsgDetails& getMsgDetails() { return Msg::DETAILS; }
+#endif
+};
+
+namespace detail {
+/// Declaration only, for use in unevaluated expressions (std::declval without the STL)
+template <typename T>
+T&& declval() noexcept;
+
+/// value is true if Visitor can be called with a const Msg&
+template <typename Visitor, typename Msg, typename = void>
+struct IsVisitable {
+    static constexpr bool value = false;
+};
+
+template <typename Visitor, typename Msg>
+struct IsVisitable<Visitor, Msg,
+                   decltype(static_cast<void>(declval<Visitor>()(declval<const Msg&>())))> {
+    static constexpr bool value = true;
+};
+}  // namespace detail
+
 }  // namespace mavgen
 
 #endif /* __MAVLINKTYPES_H__ */
@@ -250,9 +250,9 @@ class MavlinkMessage(ABC):
         """
         self.header.set_from_channel(channel)
 
-        # Mavlink 2 supports 0-trimming payloads
+        # Mavlink 2 supports 0-trimming payloads, but always sends the first payload byte
         if len(serialized_payload) > 0:
-            serialized_payload = serialized_payload.rstrip(0x00)
+            serialized_payload = serialized_payload[:1] + serialized_payload[1:].rstrip(b"\x00")
         self.header.payload_length = len(serialized_payload)
         packed_msg = self.header.pack() + serialized_payload
         msg_crc = x25crc(packed_msg[1:])
@@ -0,0 +1,392 @@
+################################################################################
+# \file compiled_dialect
+#
+# Serialize a validated mavlink include tree to a compact "compiled dialect"
+# artifact (deterministic JSON or packed binary) and rebuild the model objects
+# from one without parsing or schema-validating any xml
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import json
+import struct
+from pathlib import Path
+from typing import Dict, List
+from xml.etree import ElementTree
+from .mavlink_xml import (
+    MavlinkXml,
+    MavlinkXmlEnum,
+    MavlinkXmlEnumEntryParam,
+    MavlinkXmlFile,
+    MavlinkXmlMessage,
+    MavlinkXmlMessageField,
+)
+
+# bump whenever the layout of the compiled dictionary changes
+COMPILED_DIALECT_VERSION = 1
+# leading bytes of the packed binary form
+BINARY_MAGIC = b"MAVLCD"
+
+# value tags used by the packed binary form
+_TAG_NONE = 0
+_TAG_FALSE = 1
+_TAG_TRUE = 2
+_TAG_INT = 3
+_TAG_FLOAT = 4
+_TAG_STR = 5
+_TAG_LIST = 6
+_TAG_DICT = 7
+
+_FLOAT = struct.Struct("<d")
+
+
+class CompiledDialectError(ValueError):
+    """Raised when a compiled dialect artifact is malformed or doesnt match this version"""
+
+
+# Model -> dictionary
+
+
+def _message_to_dict(msg: MavlinkXmlMessage) -> dict:
+    fields = []
+    extension_fields = set(id(field) for field in msg.extension_fields)
+    for field in msg.all_fields:
+        field_dict = {
+            attr: getattr(field, attr)
+            for attr in MavlinkXmlMessageField.ATTRIBUTES
+            if getattr(field, attr) is not None
+        }
+        field_dict.update(
+            description=field.description,
+            base_type=field.base_type,
+            array_len=field.array_len,
+            field_len=field.field_len,
+            wire_offset=field.wire_offset,
+            extension=id(field) in extension_fields,
+        )
+        fields.append(field_dict)
+    return {
+        "id": msg.id,
+        "name": msg.name,
+        "description": msg.description,
+        "crc_extra": msg.crc_extra,
+        "min_length": sum(field.field_len for field in msg.fields),
+        "max_length": msg.byte_length,
+        "fields": fields,
+    }
+
+
+def _param_to_dict(param: MavlinkXmlEnumEntryParam) -> dict:
+    param_dict = param.attributes
+    param_dict["description"] = param.description
+    return param_dict
+
+
+def _enum_to_dict(enum: MavlinkXmlEnum) -> dict:
+    return {
+        "name": enum.name,
+        "description": enum.description,
+        "bitmask": enum.bitmask,
+        "entries": [
+            {
+                "name": entry.name,
+                # entries without a value are stored as the string 'None' by the model
+                "value": None if entry.value == "None" else entry.value,
+                "description": entry.description,
+                "hasLocation": entry.has_location,
+                "isDestination": entry.is_destination,
+                "params": [_param_to_dict(param) for param in entry.params],
+            }
+            for entry in enum.entries
+        ],
+    }
+
+
+def compile_dialects(xml_files: List[MavlinkXmlFile]) -> dict:
+    """
+    Translate validated xml files into the compiled dialect dictionary. Files are sorted by
+    filename so the result only depends on the xml contents
+    """
+    return {
+        "format_version": COMPILED_DIALECT_VERSION,
+        "dialects": [
+            {
+                "filename": xml_file.filename,
+                "version": xml_file.xml.version,
+                "dialect": xml_file.xml.dialect,
+                "includes": list(xml_file.xml.includes),
+                "dependencies": list(xml_file.dependencies or []),
+                "messages": [_message_to_dict(msg) for msg in xml_file.xml.messages],
+                "enums": [_enum_to_dict(enum) for enum in xml_file.xml.enums],
+            }
+            for xml_file in sorted(xml_files, key=lambda xml_file: xml_file.filename)
+        ],
+    }
+
+
+# Dictionary -> model
+
+
+def _text_element(tag: str, text: str) -> ElementTree.Element:
+    elem = ElementTree.Element(tag)
+    elem.text = text
+    return elem
+
+
+def _message_from_dict(msg_dict: dict) -> MavlinkXmlMessage:
+    # rebuild the element the model is normally constructed from. Attribute values keep the types
+    # the schema decoding produced, the same way the fast validator hands them over
+    msg_elem = ElementTree.Element("message", {"id": msg_dict["id"], "name": msg_dict["name"]})
+    if msg_dict["description"] is not None:
+        msg_elem.append(_text_element("description", msg_dict["description"]))
+    in_extensions = False
+    for field_dict in msg_dict["fields"]:
+        if field_dict["extension"] and not in_extensions:
+            msg_elem.append(ElementTree.Element("extensions"))
+            in_extensions = True
+        field_elem = _text_element("field", field_dict["description"])
+        for attr in MavlinkXmlMessageField.ATTRIBUTES:
+            if attr in field_dict:
+                field_elem.attrib[attr] = field_dict[attr]
+        msg_elem.append(field_elem)
+
+    msg = MavlinkXmlMessage(msg_elem)
+    if msg.crc_extra != msg_dict["crc_extra"]:
+        raise CompiledDialectError(
+            f"crc_extra of message {msg.name} does not match its compiled value "
+            + f"({msg.crc_extra} vs {msg_dict['crc_extra']})"
+        )
+    return msg
+
+
+def _enum_from_dict(enum_dict: dict) -> MavlinkXmlEnum:
+    enum_elem = ElementTree.Element(
+        "enum", {"name": enum_dict["name"], "bitmask": enum_dict["bitmask"]}
+    )
+    if enum_dict["description"] is not None:
+        enum_elem.append(_text_element("description", enum_dict["description"]))
+    for entry_dict in enum_dict["entries"]:
+        entry_elem = ElementTree.SubElement(
+            enum_elem,
+            "entry",
+            {
+                "name": entry_dict["name"],
+                "hasLocation": entry_dict["hasLocation"],
+                "isDestination": entry_dict["isDestination"],
+            },
+        )
+        if entry_dict["value"] is not None:
+            entry_elem.attrib["value"] = entry_dict["value"]
+        if entry_dict["description"] is not None:
+            entry_elem.append(_text_element("description", entry_dict["description"]))
+        for param_dict in entry_dict["params"]:
+            param_elem = _text_element("param", param_dict["description"])
+            for attr in MavlinkXmlEnumEntryParam.ATTRIBUTES:
+                if attr in param_dict:
+                    param_elem.attrib[attr] = param_dict[attr]
+            entry_elem.append(param_elem)
+    return MavlinkXmlEnum(enum_elem)
+
+
+def load_compiled_dict(compiled: dict, base_dir: Path) -> Dict[str, MavlinkXmlFile]:
+    """
+    Rebuild the model objects from a compiled dialect dictionary
+
+    :param base_dir: directory used for the 'absolute_path' of each rebuilt MavlinkXmlFile. The
+        artifact does not record where the original xmls lived
+    :return: Dictionary of XML filename -> MavlinkXmlFile, same as MavlinkXmlValidator.validate
+    """
+    if not isinstance(compiled, dict) or compiled.get("format_version") != (
+        COMPILED_DIALECT_VERSION
+    ):
+        raise CompiledDialectError(
+            f"unsupported compiled dialect format version (expected {COMPILED_DIALECT_VERSION})"
+        )
+    try:
+        xml_files = {}
+        for dialect_dict in compiled["dialects"]:
+            xml_model = MavlinkXml()
+            xml_model.includes.extend(dialect_dict["includes"])
+            xml_model.version = dialect_dict["version"]
+            xml_model.dialect = dialect_dict["dialect"]
+            for msg_dict in dialect_dict["messages"]:
+                xml_model.append_message(_message_from_dict(msg_dict))
+            for enum_dict in dialect_dict["enums"]:
+                xml_model.append_enum(_enum_from_dict(enum_dict))
+
+            xml_file = MavlinkXmlFile(Path(base_dir) / dialect_dict["filename"], xml_model)
+            xml_file.set_dependencies(list(dialect_dict["dependencies"]))
+            xml_files[xml_file.filename] = xml_file
+    except CompiledDialectError:
+        raise
+    except (KeyError, TypeError, ValueError) as err:
+        raise CompiledDialectError(f"malformed compiled dialect: {err!r}") from err
+    return xml_files
+
+
+# Serialized forms
+
+
+def dumps_json(compiled: dict) -> str:
+    """Deterministic (sorted keys, fixed separators) compact JSON form of a compiled dialect"""
+    return json.dumps(compiled, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _write_uvarint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_uvarint(data: bytes, pos: int) -> tuple:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def dumps_binary(compiled: dict) -> bytes:
+    """
+    Packed binary form of a compiled dialect. Layout (little endian, varints are LEB128):
+        magic 'MAVLCD', u8 format version,
+        string table: varint count, then (varint byte length, utf-8 bytes) per string,
+        root value
+    Each value is a u8 tag followed by its payload: nothing for None/False/True, a zigzag varint
+    for ints, a f64 for floats, a string table index for strings, a varint count and the items for
+    lists, and a varint count and (key string index, value) pairs for dicts. Dict keys are sorted
+    and strings are numbered in order of first use, so the output is deterministic
+    """
+    strings = {}
+    body = bytearray()
+
+    def string_index(value: str) -> int:
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    def pack(value: any) -> None:
+        if value is None:
+            body.append(_TAG_NONE)
+        elif value is True:
+            body.append(_TAG_TRUE)
+        elif value is False:
+            body.append(_TAG_FALSE)
+        elif isinstance(value, int):
+            body.append(_TAG_INT)
+            _write_uvarint(body, (value << 1) if value >= 0 else ((-value << 1) - 1))
+        elif isinstance(value, float):
+            body.append(_TAG_FLOAT)
+            body.extend(_FLOAT.pack(value))
+        elif isinstance(value, str):
+            body.append(_TAG_STR)
+            _write_uvarint(body, string_index(value))
+        elif isinstance(value, (list, tuple)):
+            body.append(_TAG_LIST)
+            _write_uvarint(body, len(value))
+            for item in value:
+                pack(item)
+        elif isinstance(value, dict):
+            body.append(_TAG_DICT)
+            _write_uvarint(body, len(value))
+            for key in sorted(value):
+                _write_uvarint(body, string_index(key))
+                pack(value[key])
+        else:
+            raise TypeError(f"cannot pack value of type {type(value).__name__}")
+
+    pack(compiled)
+
+    out = bytearray(BINARY_MAGIC)
+    out.append(COMPILED_DIALECT_VERSION)
+    _write_uvarint(out, len(strings))
+    for string in strings:
+        encoded = string.encode()
+        _write_uvarint(out, len(encoded))
+        out.extend(encoded)
+    out.extend(body)
+    return bytes(out)
+
+
+def loads_binary(data: bytes) -> dict:
+    """Unpack the binary form produced by @ref dumps_binary"""
+    if not data.startswith(BINARY_MAGIC):
+        raise CompiledDialectError("not a packed compiled dialect (bad magic)")
+    pos = len(BINARY_MAGIC)
+    if len(data) <= pos or data[pos] != COMPILED_DIALECT_VERSION:
+        raise CompiledDialectError("unsupported packed compiled dialect version")
+    pos += 1
+
+    strings = []
+
+    def unpack(pos: int) -> tuple:
+        tag = data[pos]
+        pos += 1
+        if tag == _TAG_NONE:
+            return None, pos
+        elif tag == _TAG_FALSE:
+            return False, pos
+        elif tag == _TAG_TRUE:
+            return True, pos
+        elif tag == _TAG_INT:
+            zigzag, pos = _read_uvarint(data, pos)
+            return (zigzag >> 1) if not zigzag & 1 else -((zigzag + 1) >> 1), pos
+        elif tag == _TAG_FLOAT:
+            return _FLOAT.unpack_from(data, pos)[0], pos + _FLOAT.size
+        elif tag == _TAG_STR:
+            idx, pos = _read_uvarint(data, pos)
+            return strings[idx], pos
+        elif tag == _TAG_LIST:
+            count, pos = _read_uvarint(data, pos)
+            items = []
+            for _ in range(count):
+                item, pos = unpack(pos)
+                items.append(item)
+            return items, pos
+        elif tag == _TAG_DICT:
+            count, pos = _read_uvarint(data, pos)
+            items = {}
+            for _ in range(count):
+                key_idx, pos = _read_uvarint(data, pos)
+                items[strings[key_idx]], pos = unpack(pos)
+            return items, pos
+        raise CompiledDialectError(f"unknown value tag {tag} at offset {pos - 1}")
+
+    try:
+        num_strings, pos = _read_uvarint(data, pos)
+        for _ in range(num_strings):
+            length, pos = _read_uvarint(data, pos)
+            strings.append(data[pos : pos + length].decode())
+            pos += length
+        compiled, pos = unpack(pos)
+    except (IndexError, UnicodeDecodeError, struct.error) as err:
+        raise CompiledDialectError(f"truncated or corrupt packed compiled dialect: {err}") from err
+    if pos != len(data):
+        raise CompiledDialectError("trailing bytes after packed compiled dialect")
+    return compiled
+
+
+def load_compiled_dialect(compiled_path: Path) -> Dict[str, MavlinkXmlFile]:
+    """
+    Load a compiled dialect artifact (either form, detected from its contents) and rebuild its
+    model objects. Raises @ref CompiledDialectError or OSError on failure
+    """
+    compiled_path = Path(compiled_path)
+    data = compiled_path.read_bytes()
+    if data.startswith(BINARY_MAGIC):
+        compiled = loads_binary(data)
+    else:
+        try:
+            compiled = json.loads(data)
+        except ValueError as err:
+            raise CompiledDialectError(f"invalid compiled dialect JSON: {err}") from err
+    return load_compiled_dict(compiled, compiled_path.parent.resolve())
@@ -0,0 +1,83 @@
+################################################################################
+# \file converter
+#
+# xmlschema converter that translates a mavlink xml straight into model objects
+# while it is being schema-validated
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+from typing import Dict, Iterator, List
+from xmlschema.converters import ElementData
+from xmlschema.dataobjects import DataElementConverter
+from xmlschema.helpers import raw_xml_encode
+from xmlschema.validators import XsdElement, XsdType
+from .mavlink_xml import MavlinkXml, MavlinkXmlEnum, MavlinkXmlMessage
+
+
+class ConvertedElement(object):
+    """
+    Minimal stand-in for xmlschema.DataElement used while converting. Holds just what the model
+    object constructors read (tag, text, attrib and children) and is dropped as soon as the model
+    object owning it has been built
+    """
+
+    __slots__ = ("tag", "value", "attrib", "tail", "_children")
+
+    def __init__(self, tag: str, value: any = None, **kwargs: any):
+        self.tag = tag
+        self.value = value
+        self.attrib: Dict[str, any] = {}
+        self.tail = None
+        self._children: List[any] = []
+
+    @property
+    def text(self) -> str:
+        """The string value of the element, same as DataElement.text"""
+        return raw_xml_encode(self.value)
+
+    def append(self, child: any) -> None:
+        self._children.append(child)
+
+    def __getitem__(self, idx: int) -> any:
+        return self._children[idx]
+
+    def __iter__(self) -> Iterator[any]:
+        return iter(self._children)
+
+    def __len__(self) -> int:
+        return len(self._children)
+
+
+class MavlinkXmlConverter(DataElementConverter):
+    """
+    Converter for xmlschema's decode that builds @ref MavlinkXml model objects in the same pass as
+    schema validation. Each message and enum is turned into its model object as soon as its
+    element is decoded, so no intermediate DataElement tree for the whole file is ever held.
+
+    Usage: schema.decode(xml_filename, converter=MavlinkXmlConverter)
+    """
+
+    # model object to build for each element tag, as soon as the element is fully decoded
+    MODEL_FACTORIES = {
+        "message": MavlinkXmlMessage,
+        "enum": MavlinkXmlEnum,
+        "mavlink": MavlinkXml,
+    }
+
+    def __init__(self, namespaces: Dict[str, str] = None, **kwargs: any):
+        kwargs["data_element_class"] = ConvertedElement
+        super().__init__(namespaces, **kwargs)
+
+    def element_decode(
+        self, data: ElementData, xsd_element: XsdElement, xsd_type: XsdType = None, level: int = 0
+    ) -> any:
+        element = super().element_decode(data, xsd_element, xsd_type, level)
+        factory = self.MODEL_FACTORIES.get(element.tag)
+        if factory is not None:
+            return factory(element)
+        return element
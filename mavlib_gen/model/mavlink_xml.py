@@ -10,16 +10,26 @@
 # See the file 'LICENSE' in the root directory of the present
 # distribution, or http://opensource.org/licenses/MIT.
 ################################################################################
+from __future__ import annotations
 import logging
 import operator
-from typing import List
-from xmlschema.dataobjects import DataElement
+from typing import TYPE_CHECKING, Dict, List, Tuple
 import crcmod
+import crcmod.predefined
 import re
 from pathlib import Path
 
+if TYPE_CHECKING:
+    # only needed for annotations. Not importing xmlschema at runtime keeps loading models from a
+    # compiled dialect (see model.compiled_dialect) cheap
+    from xmlschema.dataobjects import DataElement
+
 log = logging.getLogger(__name__)
 
+# CRC-16/MCRF4XX (aka X.25) as used by MAVLink. The crc function is built once and shared, creating
+# a crcmod.Crc object per message is surprisingly expensive
+mavlink_crc16 = crcmod.predefined.mkPredefinedCrcFun("crc-16-mcrf4xx")
+
 
 # Helper methods (shared by multiple model objects)
 def name_str_format_converter(str_in: str, format: str) -> str:
@@ -87,9 +97,33 @@ def raw_str_formatter(str_in: str, line_prefix: str = None, leading_newline: boo
     return processed_str
 
 
-class MavlinkElementWithDescription(object):
+class MavlinkElementWithFormatCache(object):
+    """
+    Base class for Mavlink model objects that memoize their formatted name/description strings.
+    Templates ask for the same formatted strings many times per object, and model objects dont
+    change after construction, so each result only needs computing once. Concrete classes must
+    declare a '_format_cache' slot
+    """
+
+    # model objects are created in bulk (one per message/field/enum entry in every dialect), so
+    # all of them use __slots__ to keep their per-instance footprint small
+    __slots__ = ()
+
+    def _get_format_cache(self) -> Dict[any, str]:
+        """Get this objects cache of formatted strings, keyed by method name and arguments"""
+        try:
+            return self._format_cache
+        except AttributeError:
+            # created on first use so objects that are never formatted dont pay for it
+            self._format_cache = {}
+            return self._format_cache
+
+
+class MavlinkElementWithDescription(MavlinkElementWithFormatCache):
     """Base class for Mavlink model objects that have a description field"""
 
+    __slots__ = ()
+
     def formatted_description(self, line_prefix: str = None, leading_newline: bool = False) -> str:
         """
         Get a formatted version of this elements description. This mainly helps fix up multi-line
@@ -103,12 +137,19 @@ class MavlinkElementWithDescription(object):
             of starting whitespace all lines have in common. those would be removed
         - line_prefix replacement (explained in param doc)
 
+        The result is memoized per (line_prefix, leading_newline) combination
+
         :param line_prefix: Replace all newlines with a newline+this string
             ie: if line_prefix="* " then all "\n" in the string will be replaced with "\n* "
         """
-        return raw_str_formatter(
-            self.description, line_prefix=line_prefix, leading_newline=leading_newline
-        )
+        cache = self._get_format_cache()
+        key = ("description", line_prefix, leading_newline)
+        formatted = cache.get(key)
+        if formatted is None:
+            formatted = cache[key] = raw_str_formatter(
+                self.description, line_prefix=line_prefix, leading_newline=leading_newline
+            )
+        return formatted
 
     def single_line_description(self) -> str:
         """
@@ -117,12 +158,18 @@ class MavlinkElementWithDescription(object):
         In general, try and preserve user formatting as much as possible. Use this in situations
         where the generated content must be on a single line for compliance
         """
-        return self.description.replace("\n", " ")
+        cache = self._get_format_cache()
+        formatted = cache.get("single_line_description")
+        if formatted is None:
+            formatted = cache["single_line_description"] = self.description.replace("\n", " ")
+        return formatted
 
 
-class MavlinkElementWithName:
+class MavlinkElementWithName(MavlinkElementWithFormatCache):
     """Base class for Mavlink model objects that have a name field"""
 
+    __slots__ = ()
+
     def get_name(self, format: str) -> str:
         """
         :param format: specify the desired format to return the message name string in.
@@ -132,22 +179,39 @@ class MavlinkElementWithName:
             'UpperCamel'  = upper camel case name (ie: "MessageName")
             If none of these options are correctly provided, the raw name string is returned
         """
-        return name_str_format_converter(self.name, format)
+        cache = self._get_format_cache()
+        key = ("name", format)
+        formatted = cache.get(key)
+        if formatted is None:
+            formatted = cache[key] = name_str_format_converter(self.name, format)
+        return formatted
 
 
 class MavlinkXmlEnumEntryParam(MavlinkElementWithDescription):
     """Represents a 'param' child within a mavlink XML enum entry"""
 
+    # every attribute a param element may declare (see schema/enums.xsd)
+    ATTRIBUTES = (
+        "index",
+        "label",
+        "units",
+        "default",
+        "enum",
+        "instance",
+        "decimalPlaces",
+        "increment",
+        "minValue",
+        "maxValue",
+        "reserved",
+    )
+    __slots__ = ("_description", "_format_cache") + tuple("_" + attr for attr in ATTRIBUTES)
+
     def __init__(self, param_data_elem: DataElement):
-        self._index = None
         self._description = ""
-        self._label = None
-        self._minValue = None
-        self._maxValue = None
+        for attr in self.ATTRIBUTES:
+            setattr(self, "_" + attr, None)
         # per schema, if not declared reserved is implicitly False
         self._reserved = False
-        self._default = None
-        self._units = None
 
         if param_data_elem.text is not None and len(str(param_data_elem.text)) > 0:
             self._description = str(param_data_elem.text)
@@ -171,30 +235,47 @@ class MavlinkXmlEnumEntryParam(MavlinkElementWithDescription):
         indented_doc_str = self.description.replace("\n", "\n" + " " * continuation_indent)
         return "param {}: {}".format(self.index, indented_doc_str)
 
+    @property
+    def attributes(self) -> Dict[str, any]:
+        """All attributes declared on the param element (index, label, units, etc), by name"""
+        return {
+            attr: getattr(self, "_" + attr)
+            for attr in self.ATTRIBUTES
+            if getattr(self, "_" + attr) is not None
+        }
+
     # TODO: add other param values here as needed
 
 
 class MavlinkXmlEnumEntry(MavlinkElementWithDescription, MavlinkElementWithName):
     """Represents an Enum entry/value within a mavlink XML enum"""
 
+    __slots__ = (
+        "_params",
+        "_name",
+        "_value",
+        "_description",
+        "_hasLocation",
+        "_isDestination",
+        "_has_params",
+        "_format_cache",
+    )
+
     def __init__(self, entry_data_elem: DataElement):
         self._params = []
         self._name = None
         self._value = None
         self._description = None
-
-        TAG_MAP = {
-            "description": (
-                lambda entry, data_elem: setattr(entry, "_description", str(data_elem.text))
-            ),
-            "param": (lambda entry, data_elem: entry.__append_param(data_elem)),
-        }
+        # per schema, if not declared these are implicitly True
+        self._hasLocation = True
+        self._isDestination = True
 
         for child in entry_data_elem:
-            if child.tag not in TAG_MAP:
+            handler = self.CHILD_HANDLERS.get(child.tag)
+            if handler is None:
                 log.error("Unknown element in MavlinkXmlEnumEntry: {}".format(child.tag))
             else:
-                TAG_MAP[child.tag](self, child)
+                handler(self, child)
 
         for k, v in entry_data_elem.attrib.items():
             setattr(self, "_" + k, v)
@@ -203,6 +284,8 @@ class MavlinkXmlEnumEntry(MavlinkElementWithDescription, MavlinkElementWithName)
         # store value as a string so its generated to look the same as the definition (useful
         # for hex numbers) the schema validates its a good value
         self._value = str(self._value)
+        self._params = tuple(self._params)
+        self._has_params = len(self._params) > 0
 
     @property
     def name(self) -> str:
@@ -223,48 +306,67 @@ class MavlinkXmlEnumEntry(MavlinkElementWithDescription, MavlinkElementWithName)
         return self._description
 
     @property
-    def params(self) -> List[MavlinkXmlEnumEntryParam]:
+    def params(self) -> Tuple[MavlinkXmlEnumEntryParam, ...]:
         """
-        List of params attached to this entry in the order theyre defined, if any.
-        Defaults to empty list
+        Params attached to this entry in the order theyre defined, if any.
+        Defaults to empty
         """
         return self._params
 
+    @property
+    def has_location(self) -> bool:
+        """the entry's hasLocation attribute. Defaults to True"""
+        return self._hasLocation
+
+    @property
+    def is_destination(self) -> bool:
+        """the entry's isDestination attribute. Defaults to True"""
+        return self._isDestination
+
     @property
     def has_params(self) -> bool:
         """Return true if the entry has param fields, otherwise false"""
-        return len(self.params) > 0
+        return self._has_params
+
+    def __set_description(self, description_data_elem: DataElement) -> None:
+        self._description = str(description_data_elem.text)
 
     def __append_param(self, param_data_elem: DataElement) -> None:
         """Append a new param to this enum entry's list of params"""
         self._params.append(MavlinkXmlEnumEntryParam(param_data_elem))
 
+    # construction handler for each child element tag
+    CHILD_HANDLERS = {
+        "description": __set_description,
+        "param": __append_param,
+    }
+
 
 class MavlinkXmlEnum(MavlinkElementWithDescription, MavlinkElementWithName):
     """Represents a single enum as defined in a mavlink XML"""
 
+    __slots__ = ("_entries", "_name", "_description", "_bitmask", "_has_params", "_format_cache")
+
     def __init__(self, enum_data_elem: DataElement):
         self._entries = []
         self._name = None
         self._description = None
-
-        TAG_MAP = {
-            "description": (
-                lambda enum, data_elem: setattr(enum, "_description", str(data_elem.text))
-            ),
-            "entry": (lambda enum, data_elem: enum.__append_entry(data_elem)),
-        }
+        # per schema, if not declared bitmask is implicitly False
+        self._bitmask = False
 
         for child in enum_data_elem:
-            if child.tag not in TAG_MAP:
+            handler = self.CHILD_HANDLERS.get(child.tag)
+            if handler is None:
                 log.error("Unknown element in MavlinkXmlEnum: {}".format(child.tag))
             else:
-                TAG_MAP[child.tag](self, child)
+                handler(self, child)
 
         for k, v in enum_data_elem.attrib.items():
             setattr(self, "_" + k, v)
 
         self._name = str(self._name)
+        self._entries = tuple(self._entries)
+        self._has_params = any(entry.has_params for entry in self._entries)
 
     @property
     def name(self) -> str:
@@ -277,21 +379,56 @@ class MavlinkXmlEnum(MavlinkElementWithDescription, MavlinkElementWithName):
         return self._description
 
     @property
-    def entries(self) -> List[MavlinkXmlEnumEntry]:
-        """List of enum entries in the mavlink enum in the order they're defined"""
+    def entries(self) -> Tuple[MavlinkXmlEnumEntry, ...]:
+        """Enum entries in the mavlink enum in the order they're defined"""
         return self._entries
 
+    @property
+    def bitmask(self) -> bool:
+        """True if the enum values are bit flags. Defaults to False"""
+        return self._bitmask
+
     @property
     def has_params(self) -> bool:
         """Return true if this enum contains any entries that have param fields, otherwise false"""
-        return any([entry.has_params for entry in self.entries])
+        return self._has_params
+
+    def __set_description(self, description_data_elem: DataElement) -> None:
+        self._description = str(description_data_elem.text)
 
     def __append_entry(self, entry_data_elem: DataElement) -> None:
         """Append a new entry to this enums list of entries"""
         self._entries.append(MavlinkXmlEnumEntry(entry_data_elem))
 
+    # construction handler for each child element tag
+    CHILD_HANDLERS = {
+        "description": __set_description,
+        "entry": __append_entry,
+    }
+
 
 class MavlinkXmlMessageField(MavlinkElementWithDescription, MavlinkElementWithName):
+    # every attribute a field element may declare (see schema/field.xsd)
+    ATTRIBUTES = (
+        "name",
+        "type",
+        "units",
+        "enum",
+        "default",
+        "instance",
+        "print_format",
+        "display",
+    )
+    __slots__ = ATTRIBUTES + (
+        "description",
+        "wire_offset",
+        "base_type",
+        "base_type_len",
+        "field_len",
+        "array_len",
+        "_format_cache",
+    )
+
     def __init__(
         self,
         field_elem: DataElement = None,
@@ -299,6 +436,10 @@ class MavlinkXmlMessageField(MavlinkElementWithDescription, MavlinkElementWithNa
         typename: str = None,
         description: str = None,
     ):
+        for attr in self.ATTRIBUTES:
+            setattr(self, attr, None)
+        self.description = None
+
         if field_elem is not None:
             self.description = field_elem.text
             if self.description is not None:
@@ -361,7 +502,7 @@ class MavlinkXmlMessageField(MavlinkElementWithDescription, MavlinkElementWithNa
     @property
     def is_enum(self) -> bool:
         """Returns true if the field references an enum, otherwise false"""
-        return hasattr(self, "enum")
+        return self.enum is not None
 
     def get_type(self, lang: str) -> str:
         """
@@ -394,14 +535,30 @@ class MavlinkXmlMessageField(MavlinkElementWithDescription, MavlinkElementWithNa
             "name",
             "type",
         ]  # 'description']
-        for k, v in self.__dict__.items():
-            if k not in no_append_attrs:
+        for k in self.__slots__:
+            v = getattr(self, k, None)
+            if k not in no_append_attrs and not k.startswith("_") and v is not None:
                 rep += ", {}={}".format(k, v)
         rep += ")"
         return rep
 
 
 class MavlinkXmlMessage(MavlinkElementWithDescription, MavlinkElementWithName):
+    __slots__ = (
+        "_fields",
+        "_sorted_fields",
+        "_extension_fields",
+        "_all_fields",
+        "_all_fields_sorted",
+        "has_extensions",
+        "_id",
+        "_name",
+        "_description",
+        "_crc_extra",
+        "_length",
+        "_format_cache",
+    )
+
     def __init__(self, message_data_elem: DataElement):
         # use properties of the same name (minus the leading '_') to get
         self._fields = []
@@ -416,20 +573,12 @@ class MavlinkXmlMessage(MavlinkElementWithDescription, MavlinkElementWithName):
         self._crc_extra = 0
         self._length = 0
 
-        TAG_MAP = {
-            "description": (
-                lambda msg, data_elem: setattr(msg, "_description", str(data_elem.text))
-            ),
-            "extensions": (lambda msg, data_elem: setattr(msg, "has_extensions", True)),
-            "field": (lambda msg, data_elem: msg.__append_field(data_elem)),
-            # TODO: deprecated and wip elements
-        }
-
         for child in message_data_elem:
-            if child.tag not in TAG_MAP:
+            handler = self.CHILD_HANDLERS.get(child.tag)
+            if handler is None:
                 log.error("Unknown element in MavlinkXmlMessage: {}".format(child.tag))
             else:
-                TAG_MAP[child.tag](self, child)
+                handler(self, child)
 
         # set any element attributes as object attributes (should set 'id' and 'name' attributes
         # for a message)
@@ -444,9 +593,17 @@ class MavlinkXmlMessage(MavlinkElementWithDescription, MavlinkElementWithName):
 
         self.__reorder_fields()
 
+        # field containers are fixed from here on. Build the combined views once since generators
+        # walk them repeatedly
+        self._fields = tuple(self._fields)
+        self._sorted_fields = tuple(self._sorted_fields)
+        self._extension_fields = tuple(self._extension_fields)
+        self._all_fields = self._fields + self._extension_fields
+        self._all_fields_sorted = self._sorted_fields + self._extension_fields
+
         # calculate field wire offset
         current_wire_offset = 0
-        for field in self.all_fields_sorted:
+        for field in self._all_fields_sorted:
             field.wire_offset = current_wire_offset
             current_wire_offset += field.field_len
 
@@ -470,18 +627,18 @@ class MavlinkXmlMessage(MavlinkElementWithDescription, MavlinkElementWithName):
         return self._description
 
     @property
-    def fields(self) -> List[MavlinkXmlMessageField]:
+    def fields(self) -> Tuple[MavlinkXmlMessageField, ...]:
         """the messages non-extension fields sorted in xml definition order"""
         return self._fields
 
     @property
     def num_fields(self) -> int:
         """number of fields (including extension fields) in this message"""
-        return len(self.fields) + len(self.extension_fields)
+        return len(self._all_fields)
 
     # TODO: name change to fields_sorted?
     @property
-    def sorted_fields(self) -> List[MavlinkXmlMessageField]:
+    def sorted_fields(self) -> Tuple[MavlinkXmlMessageField, ...]:
         """
         the messages non-extension fields sorted in mavlink-order. The contents
         is the same as @ref fields, just in the byte/serialization order that will be used
@@ -490,21 +647,19 @@ class MavlinkXmlMessage(MavlinkElementWithDescription, MavlinkElementWithName):
         return self._sorted_fields
 
     @property
-    def extension_fields(self) -> List[MavlinkXmlMessageField]:
+    def extension_fields(self) -> Tuple[MavlinkXmlMessageField, ...]:
         """the messages extension fields in xml definition order, if any"""
         return self._extension_fields
 
     @property
-    def all_fields(self) -> List[MavlinkXmlMessageField]:
+    def all_fields(self) -> Tuple[MavlinkXmlMessageField, ...]:
         """Return all fields in a message, including its extension fields"""
-        all_fields = self._fields + self._extension_fields
-        return all_fields
+        return self._all_fields
 
     @property
-    def all_fields_sorted(self) -> List[MavlinkXmlMessageField]:
+    def all_fields_sorted(self) -> Tuple[MavlinkXmlMessageField, ...]:
         """All of the messages fields (including extension fields if any) in mavlink-order"""
-        all_sorted = self._sorted_fields + self._extension_fields
-        return all_sorted
+        return self._all_fields_sorted
 
     @property
     def crc_extra(self) -> int:
@@ -531,21 +686,21 @@ class MavlinkXmlMessage(MavlinkElementWithDescription, MavlinkElementWithName):
 
     def __calculate_crc_extra(self) -> None:
         """Calculate and set the CRC_EXTRA for this message"""
-        mav_crc_generator = crcmod.predefined.Crc("crc-16-mcrf4xx")
-        msg_name_str = self.name + " "
-
-        mav_crc_generator.update(msg_name_str.encode())
+        crc_input = bytearray((self.name + " ").encode())
         for field in self._sorted_fields:
-            field_type = field.base_type + " "
-            field_name = field.name + " "
-            mav_crc_generator.update(field_type.encode())
-            mav_crc_generator.update(field_name.encode())
+            crc_input += (field.base_type + " " + field.name + " ").encode()
             if field.is_array:
-                mav_crc_generator.update(bytes([field.array_len]))
+                crc_input.append(field.array_len)
 
-        digest = int(mav_crc_generator.hexdigest(), 16)
+        digest = mavlink_crc16(crc_input)
         self._crc_extra = (digest & 0xFF) ^ (digest >> 8)
 
+    def __set_description(self, description_data_elem: DataElement) -> None:
+        self._description = str(description_data_elem.text)
+
+    def __start_extensions(self, extensions_data_elem: DataElement) -> None:
+        self.has_extensions = True
+
     def __append_field(self, field_data_elem: DataElement) -> None:
         """append a new field to the correct list (fields or extension_fields"""
         # on construction, has_extensions is marked True once an 'extensions' element is
@@ -556,6 +711,14 @@ class MavlinkXmlMessage(MavlinkElementWithDescription, MavlinkElementWithName):
         else:
             self._fields.append(MavlinkXmlMessageField(field_data_elem))
 
+    # construction handler for each child element tag
+    CHILD_HANDLERS = {
+        "description": __set_description,
+        "extensions": __start_extensions,
+        "field": __append_field,
+        # TODO: deprecated and wip elements
+    }
+
     def __repr__(self):
         rep = "Msg({}, id={} fields:\n".format(self.name, self.id)
         for field in self._fields:
@@ -569,30 +732,29 @@ class MavlinkXmlMessage(MavlinkElementWithDescription, MavlinkElementWithName):
 
 
 class MavlinkXml(object):
-    def __init__(self, mavlink_data_elem: DataElement):
+    __slots__ = ("includes", "_messages", "_enums", "version", "dialect")
+
+    def __init__(self, mavlink_data_elem: DataElement = None):
+        """
+        :param mavlink_data_elem: the decoded root 'mavlink' element to translate. When None, an
+            empty model is created that can be filled in with @ref append_message and
+            @ref append_enum
+        """
         self.includes = []
         self._messages = []
         self._enums = []
         self.version = None
         self.dialect = None
 
-        TAG_MAP = {
-            "messages": (lambda mav_xml, data_elem: mav_xml.__enumerate_messages(data_elem)),
-            "enums": (lambda mav_xml, data_elem: mav_xml.__enumerate_enums(data_elem)),
-            "include": (lambda mav_xml, data_elem: mav_xml.includes.append(str(data_elem.text))),
-            "version": (
-                lambda mav_xml, data_elem: setattr(mav_xml, "version", str(data_elem.text))
-            ),
-            "dialect": (
-                lambda mav_xml, data_elem: setattr(mav_xml, "dialect", str(data_elem.text))
-            ),
-        }
+        if mavlink_data_elem is None:
+            return
 
         for child in mavlink_data_elem:
-            if child.tag not in TAG_MAP:
+            handler = self.CHILD_HANDLERS.get(child.tag)
+            if handler is None:
                 log.error("Unknown element in MavlinkXml : {}".format(child.tag))
             else:
-                TAG_MAP[child.tag](self, child)
+                handler(self, child)
 
     @property
     def messages(self) -> List[MavlinkXmlMessage]:
@@ -612,15 +774,46 @@ class MavlinkXml(object):
         """
         return [Path(fname).name for fname in self.includes]
 
+    def append_message(self, message: MavlinkXmlMessage) -> None:
+        """Add an already-constructed message to this dialect"""
+        self._messages.append(message)
+
+    def append_enum(self, enum: MavlinkXmlEnum) -> None:
+        """Add an already-constructed enum to this dialect"""
+        self._enums.append(enum)
+
     def __enumerate_messages(self, messages_data_elem: DataElement) -> None:
         """Used during construction to import message definitions into the object"""
         for child in messages_data_elem:
-            self._messages.append(MavlinkXmlMessage(child))
+            # single-pass converters (see model.converter) hand over already-built messages
+            if not isinstance(child, MavlinkXmlMessage):
+                child = MavlinkXmlMessage(child)
+            self.append_message(child)
 
     def __enumerate_enums(self, enums_data_elem: DataElement) -> None:
         """Used during construction to import enum definitions into the object"""
         for child in enums_data_elem:
-            self._enums.append(MavlinkXmlEnum(child))
+            if not isinstance(child, MavlinkXmlEnum):
+                child = MavlinkXmlEnum(child)
+            self.append_enum(child)
+
+    def __append_include(self, include_data_elem: DataElement) -> None:
+        self.includes.append(str(include_data_elem.text))
+
+    def __set_version(self, version_data_elem: DataElement) -> None:
+        self.version = str(version_data_elem.text)
+
+    def __set_dialect(self, dialect_data_elem: DataElement) -> None:
+        self.dialect = str(dialect_data_elem.text)
+
+    # construction handler for each child element tag
+    CHILD_HANDLERS = {
+        "messages": __enumerate_messages,
+        "enums": __enumerate_enums,
+        "include": __append_include,
+        "version": __set_version,
+        "dialect": __set_dialect,
+    }
 
     def __repr__(self):
         rep = "messages:\n"
@@ -635,6 +828,8 @@ class MavlinkXmlFile(MavlinkElementWithName, object):
     file including its parsed/validated @ref MavlinkXml object
     """
 
+    __slots__ = ("absolute_path", "filename", "_name", "_xml", "dependencies", "_format_cache")
+
     def __init__(self, absolute_path: str, xml: MavlinkXml):
         """
         Construct a Message Definition xml object. These objects must contain
@@ -643,6 +838,7 @@ class MavlinkXmlFile(MavlinkElementWithName, object):
         """
         self.absolute_path = absolute_path
         self.filename = Path(absolute_path).name
+        self._name = str(Path(self.filename).stem)
         self._xml = xml
         self.dependencies = None
 
@@ -659,7 +855,7 @@ class MavlinkXmlFile(MavlinkElementWithName, object):
         """
         XML file basename (no path or extension)
         """
-        return str(Path(self.filename).stem)
+        return self._name
 
     def set_dependencies(self, deps: List[str]) -> None:
         """
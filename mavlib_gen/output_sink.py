@@ -0,0 +1,214 @@
+################################################################################
+# \file output_sink
+#
+# Destinations for generated files. Generators write through an OutputSink
+# instead of opening files themselves, so the same generation can land on the
+# filesystem, in memory, or in a single zip/tar archive
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import contextlib
+import io
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterator, Set, TextIO
+
+# archive suffix -> (archive kind, tarfile stream mode)
+ARCHIVE_FORMATS = {
+    ".zip": ("zip", None),
+    ".tar": ("tar", "w|"),
+    ".tar.gz": ("tar", "w|gz"),
+    ".tgz": ("tar", "w|gz"),
+    ".tar.bz2": ("tar", "w|bz2"),
+    ".tar.xz": ("tar", "w|xz"),
+}
+
+
+class OutputSink(ABC):
+    """
+    Where generators put the files they generate. Generators name files with the same paths they
+    would use on disk (output_dir / ...). Sinks that dont write to the filesystem store files
+    relative to their root directory
+
+    Sinks are context managers. Close a sink once generation is done to finish any pending output
+    (EX: the end of an archive)
+    """
+
+    def __init__(self, root: Path = None):
+        """
+        :param root: Optional. Directory generated paths are relative to. Relative paths are
+            resolved against it. Typically the generation outdir
+        """
+        self.root = Path(root).resolve() if root is not None else None
+
+    def relative_path(self, path: Path) -> PurePosixPath:
+        """path relative to this sink's root. Raises ValueError if path is outside of root"""
+        path = Path(path)
+        if self.root is not None and path.is_absolute():
+            path = path.relative_to(self.root)
+        elif path.is_absolute():
+            raise ValueError(f"{path} is absolute, but the output sink has no root directory")
+        return PurePosixPath(path.as_posix())
+
+    @abstractmethod
+    def open_text(self, path: Path) -> contextlib.AbstractContextManager:
+        """Context manager giving a text file object to write path's contents to"""
+        pass
+
+    @abstractmethod
+    def write_bytes(self, path: Path, data: bytes) -> None:
+        """Write path's entire contents"""
+        pass
+
+    def copy_file(self, src_path: Path, path: Path) -> None:
+        """Copy an existing file (EX: a static library source) to path"""
+        self.write_bytes(path, Path(src_path).read_bytes())
+
+    def close(self) -> None:
+        """Finish writing. Nothing can be written after a sink is closed"""
+        pass
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, *exc_info: any) -> None:
+        self.close()
+
+
+class FileSystemSink(OutputSink):
+    """Writes generated files to the filesystem. The default for all generators"""
+
+    def __init__(self, root: Path = None):
+        super().__init__(root)
+        # directories this sink has already made, so each one is only created once
+        self._made_dirs: Set[Path] = set()
+
+    def __file_path(self, path: Path) -> Path:
+        path = Path(path)
+        if self.root is not None:
+            path = self.root / path
+        parent = path.parent
+        if parent not in self._made_dirs:
+            parent.mkdir(parents=True, exist_ok=True)
+            self._made_dirs.add(parent)
+        return path
+
+    def open_text(self, path: Path) -> contextlib.AbstractContextManager:
+        return open(self.__file_path(path), "w")
+
+    def write_bytes(self, path: Path, data: bytes) -> None:
+        self.__file_path(path).write_bytes(data)
+
+
+class MemorySink(OutputSink):
+    """
+    Keeps generated files in a dict instead of writing them anywhere. Useful for tests and tools
+    that consume generated code directly
+
+    Attributes:
+        files (Dict[str, bytes]): posix path relative to root -> file contents
+    """
+
+    def __init__(self, root: Path = None):
+        super().__init__(root)
+        self.files: Dict[str, bytes] = {}
+
+    @contextlib.contextmanager
+    def open_text(self, path: Path) -> Iterator[TextIO]:
+        key = str(self.relative_path(path))
+        text_out = io.StringIO()
+        yield text_out
+        self.files[key] = text_out.getvalue().encode("utf-8")
+
+    def write_bytes(self, path: Path, data: bytes) -> None:
+        self.files[str(self.relative_path(path))] = bytes(data)
+
+    def read_text(self, path: Path) -> str:
+        """Contents of a generated file, decoded. path can be relative to root or absolute"""
+        return self.files[str(self.relative_path(path))].decode("utf-8")
+
+
+class ArchiveSink(OutputSink):
+    """
+    Writes all generated files into a single zip or tar archive in one streaming pass. The format
+    is picked from the archive's suffix, see @ref ARCHIVE_FORMATS. Paths in the archive are
+    relative to root. Writing the same path twice keeps the first copy
+    """
+
+    def __init__(self, archive_path: Path, root: Path = None):
+        """
+        :param archive_path: archive to create (replaced if it already exists)
+        :param root: Optional. Directory generated paths are relative to
+        """
+        super().__init__(root)
+        self.archive_path = Path(archive_path)
+        suffix = "".join(self.archive_path.suffixes[-2:]).lower()
+        if suffix not in ARCHIVE_FORMATS:
+            suffix = self.archive_path.suffix.lower()
+        if suffix not in ARCHIVE_FORMATS:
+            raise ValueError(
+                f"Unsupported archive type '{self.archive_path.name}'. Use one of: "
+                + ", ".join(ARCHIVE_FORMATS)
+            )
+        self.kind, tar_mode = ARCHIVE_FORMATS[suffix]
+        self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+        # archive modules are only imported when an archive is actually written
+        if self.kind == "zip":
+            import zipfile
+
+            self._archive = zipfile.ZipFile(self.archive_path, "w", zipfile.ZIP_DEFLATED)
+        else:
+            import tarfile
+
+            self._archive = tarfile.open(self.archive_path.as_posix(), tar_mode)
+        self._written: Set[str] = set()
+
+    def __claim(self, path: Path) -> str:
+        """archive member name for path. None if it has already been written"""
+        name = str(self.relative_path(path))
+        if name in self._written:
+            return None
+        self._written.add(name)
+        return name
+
+    @contextlib.contextmanager
+    def open_text(self, path: Path) -> Iterator[TextIO]:
+        name = self.__claim(path)
+        if name is None:
+            yield io.StringIO()
+        elif self.kind == "zip":
+            with io.TextIOWrapper(self._archive.open(name, "w"), encoding="utf-8") as text_out:
+                yield text_out
+        else:
+            buffer = io.BytesIO()
+            text_out = io.TextIOWrapper(buffer, encoding="utf-8")
+            yield text_out
+            text_out.flush()
+            text_out.detach()
+            self.__add_tar_member(name, buffer)
+
+    def write_bytes(self, path: Path, data: bytes) -> None:
+        name = self.__claim(path)
+        if name is None:
+            return
+        if self.kind == "zip":
+            self._archive.writestr(name, data)
+        else:
+            self.__add_tar_member(name, io.BytesIO(data))
+
+    def __add_tar_member(self, name: str, buffer: io.BytesIO) -> None:
+        info = self._archive.tarinfo(name)
+        info.size = len(buffer.getbuffer())
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        buffer.seek(0)
+        self._archive.addfile(info, buffer)
+
+    def close(self) -> None:
+        self._archive.close()
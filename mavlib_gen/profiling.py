@@ -0,0 +1,182 @@
+################################################################################
+# \file profiling
+#
+# Lightweight spans for profiling generation runs. Spans are recorded into the
+# active @ref Profiler, which can write them as Chrome trace-event JSON
+# (chrome://tracing, ui.perfetto.dev) and summarize them as a table. With no
+# active profiler a span is a shared no-op object
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# profiler spans are recorded into. None when profiling is disabled
+_active_profiler = None
+# id of the current thread for trace events. get_native_id is only available from python 3.8
+_thread_id = getattr(threading, "get_native_id", threading.get_ident)
+
+
+class Profiler(object):
+    """
+    Collects completed spans. Use @ref enable_profiling to make one active, and @ref span to
+    record into it
+    """
+
+    def __init__(self):
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = None
+        # (name, category, detail, thread id, start ns, end ns)
+        self.events: List[Tuple[str, str, any, int, int, int]] = []
+
+    def stop(self) -> None:
+        """Mark the end of the profiled run (used for the summary's percentages)"""
+        if self.end_ns is None:
+            self.end_ns = time.perf_counter_ns()
+
+    @property
+    def elapsed_ns(self) -> int:
+        return (self.end_ns or time.perf_counter_ns()) - self.start_ns
+
+    def chrome_trace(self) -> Dict[str, any]:
+        """Recorded spans as a Chrome trace-event 'complete' (ph: X) event list"""
+        pid = os.getpid()
+        events = []
+        for name, category, detail, tid, start_ns, end_ns in self.events:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start_ns - self.start_ns) / 1e3,
+                "dur": (end_ns - start_ns) / 1e3,
+                "pid": pid,
+                "tid": tid,
+            }
+            if detail is not None:
+                event["args"] = {"detail": str(detail)}
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def summary(self) -> List[Tuple[str, str, int, float, float]]:
+        """(category, name, count, total ms, max ms) for each kind of span, largest total first"""
+        totals = {}
+        for name, category, _, _, start_ns, end_ns in self.events:
+            duration_ms = (end_ns - start_ns) / 1e6
+            count, total, longest = totals.get((category, name), (0, 0.0, 0.0))
+            totals[(category, name)] = (count + 1, total + duration_ms, max(longest, duration_ms))
+        rows = [(cat, name, *stats) for (cat, name), stats in totals.items()]
+        return sorted(rows, key=lambda row: row[3], reverse=True)
+
+    def summary_table(self) -> str:
+        """@ref summary formatted as a text table"""
+        elapsed_ms = self.elapsed_ns / 1e6
+        lines = [
+            f"{'category':<10} {'span':<32} {'count':>7} {'total ms':>10} {'mean ms':>9} "
+            + f"{'max ms':>9} {'% run':>6}"
+        ]
+        for category, name, count, total, longest in self.summary():
+            lines.append(
+                f"{category:<10} {name:<32} {count:>7} {total:>10.2f} {total / count:>9.3f} "
+                + f"{longest:>9.3f} {100 * total / elapsed_ms if elapsed_ms else 0:>6.1f}"
+            )
+        lines.append(f"profiled run: {elapsed_ms:.2f} ms (nested spans are counted in both)")
+        return "\n".join(lines)
+
+    def write_chrome_trace(self, out_path: Path) -> None:
+        with open(out_path, "w") as trace_out:
+            json.dump(self.chrome_trace(), trace_out)
+
+
+class _Span(object):
+    """Records its duration into a profiler when the with-block exits"""
+
+    __slots__ = ("profiler", "name", "category", "detail", "start_ns")
+
+    def __init__(self, profiler: Profiler, name: str, category: str, detail: any):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.detail = detail
+
+    def __enter__(self) -> "_Span":
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info: any) -> None:
+        self.profiler.events.append(
+            (
+                self.name,
+                self.category,
+                self.detail,
+                _thread_id(),
+                self.start_ns,
+                time.perf_counter_ns(),
+            )
+        )
+
+
+class _NullSpan(object):
+    """Span used while profiling is disabled. Does nothing"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info: any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, category: str = "", detail: any = None) -> any:
+    """
+    Context manager timing a block of code into the active profiler. When profiling is disabled
+    it returns a shared no-op object, so the cost is a function call and an empty with-block.
+    Callers should pass anything that needs formatting as detail (formatted only when the trace
+    is written) instead of building strings up front
+
+    EX:
+        with span("render", "template", template.name):
+            ...
+    """
+    if _active_profiler is None:
+        return _NULL_SPAN
+    return _Span(_active_profiler, name, category, detail)
+
+
+def record_span(name: str, category: str, detail: any, start_ns: int, end_ns: int) -> None:
+    """
+    Record a span the caller timed itself (with time.perf_counter_ns) into the active profiler.
+    For work that is interleaved with other work, so it can't be wrapped in a single @ref span
+    (EX: the writes made while a template renders). Does nothing when profiling is disabled
+    """
+    if _active_profiler is not None:
+        _active_profiler.events.append((name, category, detail, _thread_id(), start_ns, end_ns))
+
+
+def enable_profiling() -> Profiler:
+    """Start recording spans into a new profiler, and return it"""
+    global _active_profiler
+    _active_profiler = Profiler()
+    return _active_profiler
+
+
+def disable_profiling() -> Profiler:
+    """Stop recording spans. Returns the profiler that was active (or None)"""
+    global _active_profiler
+    profiler = _active_profiler
+    _active_profiler = None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
@@ -0,0 +1,325 @@
+################################################################################
+# \file runtime_codec
+#
+# Build python message classes for a validated dialect in memory, without
+# generating and importing code. The classes behave like the ones written by
+# PythonLangGenerator
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import hashlib
+import importlib.util
+import inspect
+import struct
+import sys
+from operator import attrgetter
+from typing import Callable, Dict, List, Tuple
+from .lang_generators.generator_python import PythonLangGenerator, generate_message_struct_pack_str
+from .model.mavlink_xml import MavlinkXmlFile, MavlinkXmlMessage
+
+
+def _load_mavlink_types() -> any:
+    """
+    Load the mavlink_types.py that PythonLangGenerator copies next to generated code, so runtime
+    classes share the exact same MavlinkMessage/MavlinkChannel implementation
+    """
+    module_name = f"{__name__}_types"
+    module = sys.modules.get(module_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(
+            module_name, PythonLangGenerator.TEMPLATE_DIR / "mavlink_types.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+mavlink_types = _load_mavlink_types()
+MavlinkChannel = mavlink_types.MavlinkChannel
+MavlinkMessage = mavlink_types.MavlinkMessage
+
+# codecs that have already been built, keyed by @ref dialect_fingerprint
+_codec_cache: Dict[str, "DialectCodec"] = {}
+
+_MISSING = object()
+
+# python type hint strings from MavlinkXmlMessageField.get_type -> the type they evaluate to in
+# generated code
+PYTHON_TYPE_HINTS = {
+    "int": int,
+    "float": float,
+    "str": str,
+    "List[int]": List[int],
+    "List[float]": List[float],
+}
+
+
+class DialectCodec(object):
+    """
+    In-memory equivalent of a <dialect>_msgs.py module written by PythonLangGenerator. Message
+    classes are available as attributes, same as from the generated module
+    (EX: codec.MessageHeartbeat)
+
+    Attributes:
+        name (str): lowercase dialect name, same as the generated module name without '_msgs'
+        fingerprint (str): hash of everything the message classes were built from
+        messages (Dict[str, type]): class name -> message class
+        msg_id_map (Dict[int, type]): message id -> message class. Same as the generated
+            MAVLINK_<DIALECT>_MSG_ID_MAP
+        crc_extra_map (Dict[int, int]): message id -> crc extra byte
+    """
+
+    __slots__ = ("name", "fingerprint", "messages", "msg_id_map", "crc_extra_map")
+
+    def __init__(self, name: str, fingerprint: str, message_classes: List[type]):
+        self.name = name
+        self.fingerprint = fingerprint
+        self.messages = {msg_cls.__name__: msg_cls for msg_cls in message_classes}
+        self.msg_id_map = {msg_cls.MSG_ID: msg_cls for msg_cls in message_classes}
+        self.crc_extra_map = {msg_cls.MSG_ID: msg_cls.CRC_EXTRA for msg_cls in message_classes}
+
+    def __getattr__(self, name: str) -> type:
+        try:
+            return self.messages[name]
+        except KeyError:
+            raise AttributeError(f"dialect '{self.name}' has no message class '{name}'") from None
+
+    def __repr__(self) -> str:
+        return f"DialectCodec({self.name}, messages: {len(self.messages)})"
+
+
+def _dialect_name(xml_file: MavlinkXmlFile) -> str:
+    """lowercase dialect name, same as PythonLangGenerator uses for the module name"""
+    dialect_name = xml_file.filename
+    if dialect_name.endswith(".xml"):
+        dialect_name = dialect_name[:-4]
+    return dialect_name.lower()
+
+
+def dialect_fingerprint(xml_file: MavlinkXmlFile, use_properties: bool = False) -> str:
+    """
+    Hash of everything the message classes for a dialect are built from. Two xmls with the same
+    fingerprint produce interchangeable codecs. Model objects dont change once built, so the hash
+    is kept with the other derived strings in the xml file's format cache
+    """
+    cache = xml_file._get_format_cache()
+    key = ("runtime_codec_fingerprint", use_properties)
+    fingerprint = cache.get(key)
+    if fingerprint is None:
+        digest = hashlib.sha1(f"{_dialect_name(xml_file)}|{use_properties}".encode())
+        for msg in xml_file.xml.messages:
+            digest.update(
+                repr(
+                    (
+                        msg.name,
+                        msg.id,
+                        msg.crc_extra,
+                        msg.description,
+                        tuple(
+                            (field.name, field.type, field.wire_offset, field.description)
+                            for field in msg.all_fields
+                        ),
+                    )
+                ).encode()
+            )
+        fingerprint = cache[key] = digest.hexdigest()
+    return fingerprint
+
+
+def _bind_field_args(
+    cls_name: str, field_names: Tuple[str, ...], args: tuple, kwargs: Dict[str, any]
+) -> List[any]:
+    """
+    Match constructor arguments to fields the same way python would for the generated
+    __init__(self, field0, field1, ...), including its TypeErrors
+    """
+    num_fields = len(field_names)
+    if len(args) > num_fields:
+        raise TypeError(
+            f"{cls_name}.__init__() takes {num_fields + 1} positional arguments but "
+            + f"{len(args) + 1} were given"
+        )
+    values = list(args) + [_MISSING] * (num_fields - len(args))
+    for key, value in kwargs.items():
+        try:
+            idx = field_names.index(key)
+        except ValueError:
+            raise TypeError(
+                f"{cls_name}.__init__() got an unexpected keyword argument '{key}'"
+            ) from None
+        if values[idx] is not _MISSING:
+            raise TypeError(f"{cls_name}.__init__() got multiple values for argument '{key}'")
+        values[idx] = value
+    missing = [name for name, value in zip(field_names, values) if value is _MISSING]
+    if missing:
+        raise TypeError(
+            f"{cls_name}.__init__() missing {len(missing)} required positional argument(s): "
+            + ", ".join(f"'{name}'" for name in missing)
+        )
+    return values
+
+
+def _make_init(
+    cls_name: str, msg_id: int, field_names: Tuple[str, ...], attr_names: Tuple[str, ...]
+) -> Callable:
+    num_fields = len(field_names)
+    base_init = MavlinkMessage.__init__
+
+    def __init__(self: MavlinkMessage, *args: any, **kwargs: any) -> None:
+        base_init(self, msg_id)
+        if kwargs or len(args) != num_fields:
+            args = _bind_field_args(cls_name, field_names, args, kwargs)
+        for attr_name, value in zip(attr_names, args):
+            setattr(self, attr_name, value)
+
+    return __init__
+
+
+def _make_pack(msg: MavlinkXmlMessage) -> Callable:
+    crc_extra = msg.crc_extra
+    array_checks = tuple(
+        (attrgetter(field.name), field.array_len) for field in msg.all_fields if field.is_array
+    )
+
+    if msg.num_fields == 0:
+
+        def pack(self: MavlinkMessage, channel: MavlinkChannel) -> bytearray:
+            return self._pack(channel, bytearray(), crc_extra)
+
+        return pack
+
+    pack_payload = struct.Struct(generate_message_struct_pack_str(msg)).pack
+    if not array_checks:
+        # no arrays: field values go straight to the precompiled struct in wire order
+        getter = attrgetter(*(field.name for field in msg.all_fields_sorted))
+        if msg.num_fields == 1:
+
+            def pack(self: MavlinkMessage, channel: MavlinkChannel) -> bytearray:
+                return self._pack(channel, pack_payload(getter(self)), crc_extra)
+
+        else:
+
+            def pack(self: MavlinkMessage, channel: MavlinkChannel) -> bytearray:
+                return self._pack(channel, pack_payload(*getter(self)), crc_extra)
+
+        return pack
+
+    wire_fields = tuple(
+        (attrgetter(field.name), field.array_len if field.is_array else None)
+        for field in msg.all_fields_sorted
+    )
+
+    def pack(self: MavlinkMessage, channel: MavlinkChannel) -> bytearray:
+        for getter, array_len in array_checks:
+            assert len(getter(self)) >= array_len
+        values = []
+        for getter, array_len in wire_fields:
+            if array_len is None:
+                values.append(getter(self))
+            else:
+                values.extend(getter(self)[:array_len])
+        return self._pack(channel, pack_payload(*values), crc_extra)
+
+    return pack
+
+
+def _make_property(attr_name: str, doc: str) -> property:
+    def setter(self: MavlinkMessage, value: any) -> None:
+        setattr(self, attr_name, value)
+
+    return property(attrgetter(attr_name), setter, doc=doc)
+
+
+def build_message_class(
+    msg: MavlinkXmlMessage, module_name: str, use_properties: bool = False
+) -> type:
+    """
+    Build the class for a single message, equivalent to the one PythonLangGenerator writes from
+    single_message.py.jinja
+    """
+    cls_name = f"Message{msg.get_name('UpperCamel')}"
+    field_names = tuple(field.name for field in msg.all_fields)
+    attr_names = tuple(f"_{name}" for name in field_names) if use_properties else field_names
+
+    namespace = {
+        "__doc__": msg.formatted_description("    ", False),
+        "__module__": module_name,
+        "__qualname__": cls_name,
+        "CRC_EXTRA": msg.crc_extra,
+        "MSG_ID": msg.id,
+        "NAME": msg.name,
+        "FORMAT": generate_message_struct_pack_str(msg),
+        "__init__": _make_init(cls_name, msg.id, field_names, attr_names),
+        "pack": _make_pack(msg),
+    }
+    namespace["__init__"].__signature__ = inspect.Signature(
+        [inspect.Parameter("self", inspect.Parameter.POSITIONAL_OR_KEYWORD)]
+        + [
+            inspect.Parameter(
+                field.name,
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                annotation=PYTHON_TYPE_HINTS[field.get_type("python")],
+            )
+            for field in msg.all_fields
+        ]
+    )
+    namespace["pack"].__doc__ = f"Packs {msg.name} into a serialized bytearray"
+    if use_properties:
+        for field in msg.all_fields:
+            namespace[field.name] = _make_property(
+                f"_{field.name}", field.formatted_description("        ", False)
+            )
+    return type(cls_name, (MavlinkMessage,), namespace)
+
+
+def build_dialect_codec(xml_file: MavlinkXmlFile, use_properties: bool = False) -> DialectCodec:
+    """
+    Get the codec for the messages defined directly in a single validated xml (not its
+    dependencies, same as PythonLangGenerator's per-xml modules). Codecs are cached by
+    @ref dialect_fingerprint, so asking again for an unchanged dialect returns the same classes
+    """
+    fingerprint = dialect_fingerprint(xml_file, use_properties)
+    codec = _codec_cache.get(fingerprint)
+    if codec is None:
+        name = _dialect_name(xml_file)
+        module_name = f"{__name__}.{name}_msgs"
+        codec = DialectCodec(
+            name,
+            fingerprint,
+            [
+                build_message_class(msg, module_name, use_properties)
+                for msg in xml_file.xml.messages
+            ],
+        )
+        _codec_cache[fingerprint] = codec
+    return codec
+
+
+def build_codecs(
+    validated_xmls: Dict[str, MavlinkXmlFile], use_properties: bool = False
+) -> Dict[str, DialectCodec]:
+    """
+    Build a codec for every xml output by @ref MavlinkXmlValidator.validate
+
+    :param validated_xmls: validated xmls, as returned by MavlinkXmlValidator.validate
+    :param use_properties: same as the PythonLangGenerator option. Fields are exposed as
+        properties backed by '_<field name>' attributes instead of plain instance attributes
+    :return: lowercase dialect name -> @ref DialectCodec. None if validated_xmls is empty
+    """
+    if validated_xmls is None or len(validated_xmls) == 0:
+        return None
+    return {
+        _dialect_name(xml_file): build_dialect_codec(xml_file, use_properties)
+        for xml_file in validated_xmls.values()
+    }
+
+
+def clear_codec_cache() -> None:
+    """Drop all cached codecs. Message classes that are still referenced stay valid"""
+    _codec_cache.clear()
@@ -13,20 +13,51 @@
 #################################################################################
 from pathlib import Path
 import logging
-import xmlschema
+import os
+from concurrent.futures import ProcessPoolExecutor
 from xml.etree import ElementTree
-import networkx as netx
-from .model.mavlink_xml import MavlinkXmlFile, MavlinkXml
-from typing import List, Dict, Tuple
+from .model.mavlink_xml import MavlinkXmlFile
+from .model.compiled_dialect import CompiledDialectError, load_compiled_dialect
+from .fast_validator import MavlinkXmlFastValidator
+from .profiling import span
+from typing import TYPE_CHECKING, List, Dict, Tuple
 from abc import ABC, abstractmethod
 
+if TYPE_CHECKING:
+    # xmlschema and networkx are imported by the methods that use them. Importing them up front
+    # would double the cold-start cost of @ref MavlinkXmlValidator.load_compiled
+    import networkx as netx
+    import xmlschema
+
 # return codes from MavlinkXmlValidator.is_msg_def_unique
 MSG_DEF_UNIQUE = 1
 MSG_DEF_DUPLICATE = 0
 MSG_DEF_DUPLICATE_ERR = -1
 
+# minimum number of newly discovered includes in one level of the include tree before they are
+# validated in a process pool. Below this, pool startup costs more than it saves
+MIN_PARALLEL_VALIDATIONS = 8
+
 log = logging.getLogger(__name__)
 
+# validator instance used by process pool workers, see @ref _init_pool_worker
+_pool_worker_validator = None
+
+
+def _init_pool_worker(use_fast_path: bool) -> None:
+    """
+    Initializer for process pool workers. Errors are not logged from workers, the parent process
+    re-validates any failed xml itself so errors are reported no matter how the worker was started
+    """
+    global _pool_worker_validator
+    logging.disable(logging.CRITICAL)
+    _pool_worker_validator = MavlinkXmlValidator(use_fast_path=use_fast_path, max_workers=1)
+
+
+def _pool_worker_validate(xml_filename: Path) -> MavlinkXmlFile:
+    """Validate a single xml from within a process pool worker"""
+    return _pool_worker_validator.validate_single_xml(xml_filename)
+
 
 class AbstractXmlValidator(ABC):
     """
@@ -35,7 +66,7 @@ class AbstractXmlValidator(ABC):
     """
 
     @abstractmethod
-    def validate(self, xmls: Dict[str, MavlinkXmlFile], include_graph: netx.DiGraph) -> bool:
+    def validate(self, xmls: Dict[str, MavlinkXmlFile], include_graph: "netx.DiGraph") -> bool:
         """
         Run the custom validator, return True if the xmls pass your validation
         rules, otherwise False
@@ -51,59 +82,62 @@ class UniqueMsgIdNameAcrossDependencies(AbstractXmlValidator):
     Verify all message ids and names are unique across an XML + its dependencies
     Note: unique message ids are verified on a per-xml basis by the schema
     @ref MavlinkXmlValidator adds and runs this validator automatically
+
+    A single index of msgid -> defining xmls and name -> defining xmls is built from all the
+    messages. Only ids/names defined by more than one xml can possibly conflict, so those are the
+    only ones checked against each xmls dependency list. Every conflict found is reported
     """
 
-    def validate(self, msg_defs: Dict[str, MavlinkXmlFile], include_graph: netx.DiGraph) -> bool:
-        # for each xml
+    def validate(self, msg_defs: Dict[str, MavlinkXmlFile], include_graph: "netx.DiGraph") -> bool:
+        # msgid -> [(xml filename, message name), ...] and name -> [(xml filename, msgid), ...]
+        id_index = {}
+        name_index = {}
         for fname, mdef in msg_defs.items():
-            processed = []  # keep a list of the dialect names processed for better error reporting
-            if mdef.dependencies is None:
-                # no dependencies for this xml to check against
-                continue
-            if len(mdef.xml.messages) > 0:
-                base_msgid_set = {msg.id for msg in mdef.xml.messages}
-                base_msgname_set = {msg.name for msg in mdef.xml.messages}
-            else:
-                base_msgid_set = set()
-                base_msgname_set = set()
-            processed.append(fname)
-            for dep in mdef.dependencies:
-                dependency_xml_file = msg_defs[dep]
-                if len(dependency_xml_file.xml.messages) > 0:
-                    dep_msgid_set = {msg.id for msg in dependency_xml_file.xml.messages}
-                    dep_msgname_set = {msg.name for msg in dependency_xml_file.xml.messages}
-                else:
-                    # this dependency has no messages/msg_ids, good to continue
-                    continue
-                # check for id or name intersections
-                conflicting_ids = base_msgid_set.intersection(dep_msgid_set)
-                if len(conflicting_ids) > 0:
-                    log.error(
-                        f"One of '{fname}'s dependencies has a conflicting message id with one "
-                        + f"of its other dependencies (or with '{fname}' itself)"
-                    )
-                    log.error(
-                        f"Conflicting id(s): {conflicting_ids}. This conflict can be found in "
-                        + f"{dependency_xml_file.filename} and one of the following: {processed}"
-                    )
-                    return False
-                conflicting_names = base_msgname_set.intersection(dep_msgname_set)
-                if len(conflicting_names) > 0:
-                    log.error(
-                        f"One of '{fname}'s dependencies has a conflicting message name with one "
-                        + f"of its other dependencies (or with '{fname}' itself)"
-                    )
-                    log.error(
-                        f"Conflicting name(s): {conflicting_names}. This conflict can be found in "
-                        + f"{dependency_xml_file.filename} and one of the following: {processed}"
-                    )
-                    return False
-                # otherwise, no conflicts
-                base_msgid_set.update(dep_msgid_set)
-                base_msgname_set.update(dep_msgname_set)
+            for msg in mdef.xml.messages:
+                id_index.setdefault(msg.id, []).append((fname, msg.name))
+                name_index.setdefault(msg.name, []).append((fname, msg.id))
+
+        # for each xml the set of xmls it consists of (itself + its dependencies). Xmls with no
+        # dependency list have nothing to be checked against
+        closures = {
+            fname: set(mdef.dependencies).union([fname])
+            for fname, mdef in msg_defs.items()
+            if mdef.dependencies is not None
+        }
+
+        id_conflicts_ok = self.__check_index(id_index, closures, "id")
+        name_conflicts_ok = self.__check_index(name_index, closures, "name")
+        return id_conflicts_ok and name_conflicts_ok
+
+    def __check_index(
+        self, index: Dict[any, List[Tuple[str, any]]], closures: Dict[str, set], kind: str
+    ) -> bool:
+        """
+        Check every index entry defined by multiple xmls against each xmls closure. Logs each
+        conflict once along with all the xmls it affects
 
-                processed.append(dependency_xml_file.filename)
-        return True
+        :param kind: 'id' or 'name', used for error reporting
+        """
+        success = True
+        for key, definitions in index.items():
+            if len(definitions) < 2:
+                continue
+            # conflicting pair of definitions -> xmls that include both
+            conflicts = {}
+            for fname, closure in closures.items():
+                in_closure = [definition for definition in definitions if definition[0] in closure]
+                for idx, first in enumerate(in_closure):
+                    for second in in_closure[idx + 1 :]:
+                        conflicts.setdefault((first, second), []).append(fname)
+
+            for (first, second), affected_xmls in conflicts.items():
+                success = False
+                log.error(
+                    f"Conflicting message {kind} {key}: defined in both '{first[0]}' ({first[1]})"
+                    + f" and '{second[0]}' ({second[1]})"
+                )
+                log.error(f"  This conflict affects: {sorted(affected_xmls)}")
+        return success
 
 
 class MavlinkXmlValidator(object):
@@ -112,17 +146,50 @@ class MavlinkXmlValidator(object):
     expand their includes
     """
 
-    def __init__(self):
-        base_url = Path(__file__).parent.resolve() / "schema"
-        self.schema = xmlschema.XMLSchema11(
-            base_url / "mavlink_schema.xsd",
-            base_url=base_url,
-            converter=xmlschema.DataElementConverter,
-        )
+    SCHEMA_DIR = Path(__file__).parent.resolve() / "schema"
+
+    def __init__(self, use_fast_path: bool = True, max_workers: int = None):
+        """
+        :param use_fast_path: First validate xmls with @ref MavlinkXmlFastValidator and only use
+            the full XSD 1.1 schema when it detects a violation (to report the exact error). When
+            False, every xml is validated against the XSD schema
+        :param max_workers: Maximum number of processes used to validate includes concurrently
+            in @ref expand_includes. Defaults to the number of CPUs. Use 1 to always validate
+            serially
+        """
+        self.use_fast_path = use_fast_path
+        self.cache_models = False
+        """
+        When True, each validated xml's model is kept along with the file's modification time and
+        size. Asking to validate an unchanged file returns the kept model instead of re-parsing it.
+        Used by long running modes (EX: MavlibgenRunner.watch) where most files dont change
+        between runs
+        """
+        self._model_cache = {}
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self._schema = None
+        self.fast_validator = MavlinkXmlFastValidator(self.SCHEMA_DIR) if use_fast_path else None
         self.custom_validators = []
         self.msgid_name_validator = UniqueMsgIdNameAcrossDependencies()
         self.custom_validators.append(self.msgid_name_validator)
 
+    @property
+    def schema(self) -> "xmlschema.XMLSchema11":
+        """
+        The mavlink XSD 1.1 schema. Compiling it is expensive, so its only done the first time its
+        needed
+        """
+        if self._schema is None:
+            import xmlschema
+
+            with span("schema_compile", "validate"):
+                self._schema = xmlschema.XMLSchema11(
+                    self.SCHEMA_DIR / "mavlink_schema.xsd",
+                    base_url=self.SCHEMA_DIR,
+                    converter=xmlschema.DataElementConverter,
+                )
+        return self._schema
+
     def add_validator(self, custom_validator: AbstractXmlValidator) -> None:
         """
         Add a custom validator to the list of validators to be run when @ref validate is called
@@ -139,27 +206,99 @@ class MavlinkXmlValidator(object):
             log.error("Unable to locate '{}'".format(xml_filename))
             return None
 
-        # attempt to read the xml directly into a dictionary
+        cached_model = self.__get_cached_model(xml_filepath)
+        if cached_model is not None:
+            return cached_model
+
+        with span("validate_single_xml", "validate", xml_filepath.name):
+            try:
+                xml_model = None
+                if self.fast_validator is not None:
+                    with span("fast_validate", "validate", xml_filepath.name):
+                        xml_model = self.fast_validator.parse(xml_filename)
+                if xml_model is None:
+                    # either the fast path is disabled or it found a problem. Use the full schema
+                    # so any error reported is exact
+                    xml_model = self.__schema_decode(xml_filename)
+                    if xml_model is None:
+                        return None
+            except ElementTree.ParseError as parseErr:
+                log.error(
+                    "Failed to parse '{}': {}".format(
+                        xml_filepath.relative_to(Path.cwd()), parseErr
+                    )
+                )
+                return None
+        log.debug("{} passed validation".format(xml_filename))
+        return self.__cache_model(MavlinkXmlFile(xml_filepath.absolute(), xml_model))
+
+    def __schema_decode(self, xml_filename: str) -> any:
+        """
+        Decode an xml into its model with the full schema. Reports any schema validation error
+
+        :return: the xml's model, or None if it failed validation
+        """
+        import xmlschema
+        from .model.converter import MavlinkXmlConverter
+
+        schema = self.schema
         try:
-            xml_elem = self.schema.decode(xml_filename)
-            # translate into our model objects
-            # TODO: take care of this at the converter level so we dont need intermediate xml_elem
-            xml_model = MavlinkXml(xml_elem)
-        except ElementTree.ParseError as parseErr:
-            log.error(
-                "Failed to parse '{}': {}".format(xml_filepath.relative_to(Path.cwd()), parseErr)
-            )
-            return None
+            # the converter builds our model objects while the schema decodes, so no
+            # intermediate DataElement tree is created
+            with span("schema_decode", "validate", Path(xml_filename).name):
+                return schema.decode(xml_filename, converter=MavlinkXmlConverter)
         except xmlschema.validators.exceptions.XMLSchemaValidationError as xsve:
             self.__report_schama_validation_error(xsve, xml_filename)
             return None
-        log.debug("{} passed validation".format(xml_filename))
-        return MavlinkXmlFile(xml_filepath.absolute(), xml_model)
+
+    @staticmethod
+    def __file_stamp(xml_filepath: Path) -> Tuple[int, int]:
+        """(modification time, size) of a file. Used to tell if a cached model is out of date"""
+        stat = xml_filepath.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def __get_cached_model(self, xml_filepath: Path) -> MavlinkXmlFile:
+        """Model kept for xml_filepath by @ref cache_models, or None if it is missing or stale"""
+        if not self.cache_models:
+            return None
+        cached = self._model_cache.get(xml_filepath.absolute())
+        if cached is None or cached[0] != self.__file_stamp(xml_filepath):
+            return None
+        return cached[1]
+
+    def __cache_model(self, xml_file: MavlinkXmlFile) -> MavlinkXmlFile:
+        """Keep a freshly validated model when @ref cache_models is enabled"""
+        if self.cache_models:
+            xml_filepath = Path(xml_file.absolute_path)
+            self._model_cache[xml_filepath] = (self.__file_stamp(xml_filepath), xml_file)
+        return xml_file
+
+    def load_compiled(self, compiled_path: str) -> Dict[str, MavlinkXmlFile]:
+        """
+        Load the model objects for a whole include tree from a compiled dialect artifact (see
+        CompiledDialectGenerator) instead of parsing and validating its xmls. The artifact was
+        made from an already validated tree, so neither the schema nor the custom validators are
+        run
+
+        :return: Dictionary of XML filename -> MavlinkXmlFile object, same as @ref validate.
+            None if the artifact could not be loaded
+        """
+        try:
+            return load_compiled_dialect(compiled_path)
+        except OSError as os_err:
+            log.error("Unable to read compiled dialect '{}': {}".format(compiled_path, os_err))
+        except CompiledDialectError as compiled_err:
+            log.error(
+                "Failed to load compiled dialect '{}': {}".format(compiled_path, compiled_err)
+            )
+        return None
 
     def __report_schama_validation_error(
-        self, xsve: xmlschema.validators.exceptions.XMLSchemaValidationError, xml_filename: str
+        self, xsve: "xmlschema.validators.exceptions.XMLSchemaValidationError", xml_filename: str
     ) -> None:
         """Helper method to report validation errors in a useful way that I like"""
+        import xmlschema
+
         log.error("Validation of message definition file '{}' failed!".format(xml_filename))
         reason = ""
         if xsve.reason is not None:
@@ -192,7 +331,7 @@ class MavlinkXmlValidator(object):
 
     def expand_includes(
         self, validated_xmls: Dict[str, MavlinkXmlFile]
-    ) -> Tuple[Dict[str, MavlinkXmlFile], netx.DiGraph]:
+    ) -> Tuple[Dict[str, MavlinkXmlFile], "netx.DiGraph"]:
         """
         Expand the includes of each message definition xml in validated_xmls.
         This method has a number of responsibilities:
@@ -202,86 +341,178 @@ class MavlinkXmlValidator(object):
         - Ensure valid include tree (no circular dependencies)
         Note: The schema has a constraint which ensures include tag contents are unique within a
         definition file
+
+        The include tree is walked breadth-first. All xmls newly discovered in one level of the tree
+        are independent of each other, so they are validated concurrently (see @ref
+        validate_many_xmls) before being merged into validated_xmls and the include graph
         """
+        import networkx as netx
+
         # Use a Directed Acyclic Graph (DAG) to ensure valid include tree
         # with definitions <include> tags (no circular dependencies)
         include_graph = netx.DiGraph()
 
         xmls_to_expand = list(validated_xmls.keys())
-        # ensure we only iterate and expand on the xmls provided in the initial parameter
-        while len(xmls_to_expand) > 0:
-            current_xmls_to_expand = xmls_to_expand
-            xmls_to_expand = []
-            for cur_dialect in current_xmls_to_expand:
-                log.debug("Expanding includes in dialect {}".format(cur_dialect))
-                if len(validated_xmls[cur_dialect].xml.includes) == 0:
-                    # add the xml to the graph (becomes important later when analyzing dependencies
-                    # for generation)
-                    include_graph.add_node(validated_xmls[cur_dialect].filename)
+        with _LazyProcessPool(self) as pool:
+            # ensure we only iterate and expand on the xmls provided in the initial parameter
+            while len(xmls_to_expand) > 0:
+                current_xmls_to_expand = xmls_to_expand
+                xmls_to_expand = []
+
+                # first resolve every include in this level and decide which ones are new
+                level = self.__resolve_include_level(current_xmls_to_expand, validated_xmls)
+                if level is None:
+                    return None
+                level_edges, new_include_paths = level
+
+                # then validate all the new ones at once and merge them in discovery order
+                newly_validated = self.validate_many_xmls(new_include_paths, pool)
+                if newly_validated is None:
+                    return None
+                for validated_xml in newly_validated:
+                    validated_xmls[validated_xml.filename] = validated_xml
+                    xmls_to_expand.append(validated_xml.filename)
+
+                for cur_dialect, included_filename in level_edges:
+                    if included_filename is None:
+                        # add the xml to the graph (becomes important later when analyzing
+                        # dependencies for generation)
+                        include_graph.add_node(cur_dialect)
+                        continue
+                    log.debug("Create edge {} - {}".format(cur_dialect, included_filename))
+                    include_graph.add_edge(cur_dialect, included_filename)
+
+        # confirm the graph is acyclic (no circular dependencies). Already expanded xmls are never
+        # expanded again, so a cycle cant stop the walk above from finishing. Checking once here
+        # keeps the whole expansion linear in the size of the include graph
+        try:
+            cycle = netx.find_cycle(include_graph)
+        except netx.NetworkXNoCycle:
+            return validated_xmls, include_graph
+        cycle_path = [edge[0] for edge in cycle] + [cycle[-1][1]]
+        log.error(
+            "Circular dependency detected involving '{}' and its included dialect '{}'".format(
+                cycle[-1][0], cycle[-1][1]
+            )
+        )
+        log.error("  Include cycle: {}".format(" -> ".join(cycle_path)))
+        return None
+
+    def __resolve_include_level(
+        self, dialects: List[str], validated_xmls: Dict[str, MavlinkXmlFile]
+    ) -> Tuple[List[Tuple[str, str]], List[Path]]:
+        """
+        Resolve the include tags of every dialect in one level of the include tree to files.
+
+        :return: None if an include could not be resolved or conflicts with an already known xml.
+            Otherwise a tuple of:
+            - the include graph edges for this level as (dialect, included filename) pairs in
+              definition order. included filename is None for dialects with no includes
+            - the absolute paths of includes not yet in validated_xmls, in discovery order
+        """
+        edges = []
+        new_include_paths = []
+        # barebones MavlinkXmlFile for each include discovered in this level that hasnt been
+        # validated yet, so duplicates within the level are also detected
+        discovered_xmls = {}
+        for cur_dialect in dialects:
+            log.debug("Expanding includes in dialect {}".format(cur_dialect))
+            if len(validated_xmls[cur_dialect].xml.includes) == 0:
+                edges.append((validated_xmls[cur_dialect].filename, None))
+                continue
+
+            for include_path in validated_xmls[cur_dialect].xml.includes:
+                # per the mavlink schema definition, include tags are relative to the
+                # dialect file they are contained in
+                # NOTE: include_path is split on unix or windows path separator to ensure
+                #       the abs_include_path generated works for the current os
+                # TODO: verify windows path split still works
+                abs_include_path = (
+                    Path(validated_xmls[cur_dialect].absolute_path).parent / include_path
+                ).absolute()
+                if not abs_include_path.is_file():
+                    log.error(
+                        "Failed to resolve include '{}' in definition "
+                        "'{}' to a file".format(include_path, cur_dialect)
+                    )
+                    log.debug(
+                        "  Expected absolute path that doesnt exist: '{}'".format(abs_include_path)
+                    )
+                    return None
+
+                # make a barebones MavlinkXmlFile to run a duplicate check with the current
+                # list
+                dup_check_def = MavlinkXmlFile(abs_include_path, {})
+                known_xmls = validated_xmls
+                if dup_check_def.filename in discovered_xmls:
+                    known_xmls = discovered_xmls
+                uniqueness_result = self.is_msg_def_unique(dup_check_def, known_xmls)
+                if uniqueness_result == MSG_DEF_DUPLICATE_ERR:
+                    log.error(
+                        "Second non-identical include path originated from '{}' include"
+                        " tag in '{}'".format(include_path, cur_dialect)
+                    )
+                    return None
+                elif uniqueness_result == MSG_DEF_DUPLICATE:
+                    # This file has already been validated (or will be with the rest of this
+                    # level). All thats left to do is add the edge/relationship to the DAG
+                    pass
+                elif uniqueness_result == MSG_DEF_UNIQUE:
+                    discovered_xmls[dup_check_def.filename] = dup_check_def
+                    new_include_paths.append(abs_include_path)
                 else:
-                    for include_path in validated_xmls[cur_dialect].xml.includes:
-                        # per the mavlink schema definition, include tags are relative to the
-                        # dialect file they are contained in
-                        # NOTE: include_path is split on unix or windows path separator to ensure
-                        #       the abs_include_path generated works for the current os
-                        # TODO: verify windows path split still works
-                        abs_include_path = (
-                            Path(validated_xmls[cur_dialect].absolute_path).parent / include_path
-                        ).absolute()
-                        if not abs_include_path.is_file():
-                            log.error(
-                                "Failed to resolve include '{}' in definition "
-                                "'{}' to a file".format(include_path, cur_dialect)
-                            )
-                            log.debug(
-                                "  Expected absolute path that doesnt exist: '{}'".format(
-                                    abs_include_path
-                                )
-                            )
-                            return None
-
-                        # make a barebones MavlinkXmlFile to run a duplicate check with the current
-                        # list
-                        dup_check_def = MavlinkXmlFile(abs_include_path, {})
-                        uniqueness_result = self.is_msg_def_unique(dup_check_def, validated_xmls)
-                        if uniqueness_result == MSG_DEF_DUPLICATE_ERR:
-                            log.error(
-                                "Second non-identical include path originated from '{}' include"
-                                " tag in '{}'".format(include_path, cur_dialect)
-                            )
-                            return None
-                        elif uniqueness_result == MSG_DEF_DUPLICATE:
-                            # This file has already been validated and added to the validated_xmls
-                            # list. All thats left to do is add the edge/relationship to the DAG
-                            pass
-                        elif uniqueness_result == MSG_DEF_UNIQUE:
-                            validated_xml = self.validate_single_xml(abs_include_path)
-                            if validated_xml is None:
-                                return None
-                            validated_xmls[validated_xml.filename] = validated_xml
-                            xmls_to_expand.append(validated_xml.filename)
-                        else:
-                            raise ValueError(
-                                "Unknown result {} from validator.is_msg_def_unique".format(
-                                    uniqueness_result
-                                )
-                            )
-
-                        log.debug("Create edge {} - {}".format(cur_dialect, dup_check_def.filename))
-                        include_graph.add_edges_from([(cur_dialect, dup_check_def.filename)])
-
-                        # confirm the DAG is still directed and acyclic (to circular dependencies)
-                        # before proceeding
-                        if not netx.is_directed_acyclic_graph(include_graph):
-                            log.error(
-                                "Circular dependency detected involving '{}' and its included"
-                                " dialect '{}'".format(cur_dialect, dup_check_def.filename)
-                            )
-                            return None
-        return validated_xmls, include_graph
+                    raise ValueError(
+                        "Unknown result {} from validator.is_msg_def_unique".format(
+                            uniqueness_result
+                        )
+                    )
+                edges.append((cur_dialect, dup_check_def.filename))
+        return edges, new_include_paths
+
+    def validate_many_xmls(
+        self, xml_filenames: List[Path], pool: "_LazyProcessPool" = None
+    ) -> List[MavlinkXmlFile]:
+        """
+        Validate multiple independent xmls using @ref validate_single_xml. When there are enough of
+        them and a pool is provided, they are validated concurrently in worker processes
+
+        :return: validated xmls in the same order as xml_filenames, or None if any failed
+        """
+        if pool is None or len(xml_filenames) < MIN_PARALLEL_VALIDATIONS or self.max_workers < 2:
+            results = []
+            for xml_filename in xml_filenames:
+                validated_xml = self.validate_single_xml(xml_filename)
+                if validated_xml is None:
+                    return None
+                results.append(validated_xml)
+            return results
+
+        # only send xmls that actually need validating to the workers
+        results = [self.__get_cached_model(Path(xml_filename)) for xml_filename in xml_filenames]
+        uncached = [
+            xml_filename
+            for xml_filename, cached_model in zip(xml_filenames, results)
+            if cached_model is None
+        ]
+        if len(uncached) > 0:
+            log.debug(f"Validating {len(uncached)} xmls in a process pool")
+            # (spans from inside the worker processes arent recorded)
+            with span("validate_in_pool", "validate", len(uncached)):
+                validated = iter(list(pool.get().map(_pool_worker_validate, uncached)))
+            results = [
+                next(validated) if cached_model is None else cached_model
+                for cached_model in results
+            ]
+        for xml_filename, validated_xml in zip(xml_filenames, results):
+            if validated_xml is None:
+                # workers dont log, re-validate here so the error is reported
+                self.validate_single_xml(xml_filename)
+                return None
+            self.__cache_model(validated_xml)
+        return results
 
     def generate_dependency_list(
-        self, validated_xmls: Dict[str, MavlinkXmlFile], include_graph: netx.DiGraph
+        self, validated_xmls: Dict[str, MavlinkXmlFile], include_graph: "netx.DiGraph"
     ) -> None:
         """
         For each dialect xml, use the include graph to generate its list of dependencies.
@@ -289,14 +520,25 @@ class MavlinkXmlValidator(object):
         included by the dialect. Each xmls list is set in its MavlinkXmlFile object
         """
 
-        all_nodes = list(validated_xmls.keys())
-        for node in all_nodes:
-            includes = []
-            # a 'reachable_node' comes from a depth-first-search (dfs) of the graph and indicates
-            # all includes that are directly or indirectly included by the root 'node'
-            for reachable_node in netx.dfs_postorder_nodes(include_graph, source=node):
-                if reachable_node != node:  # we know we're reachable from ourself
-                    includes.append(reachable_node)
+        import networkx as netx
+
+        # visit the graph in reverse topological order so every include has its set of
+        # reachable xmls calculated before any xml that includes it. Each xmls set is then just
+        # the union of its direct includes and their (memoized) sets
+        topo_order = list(netx.topological_sort(include_graph))
+        # position of each xml in the reverse topological order. Sorting dependency lists by
+        # this puts every xml after all of its own dependencies
+        reverse_topo_index = {node: idx for idx, node in enumerate(reversed(topo_order))}
+        reachable = {}
+        for node in reversed(topo_order):
+            node_reachable = set()
+            for included in include_graph.successors(node):
+                node_reachable.add(included)
+                node_reachable.update(reachable[included])
+            reachable[node] = node_reachable
+
+        for node in validated_xmls.keys():
+            includes = sorted(reachable[node], key=reverse_topo_index.__getitem__)
             log.debug("{} uses the following includes: {}".format(node, includes))
             validated_xmls[node].set_dependencies(includes)
 
@@ -334,7 +576,8 @@ class MavlinkXmlValidator(object):
                 )
 
         # now expand the includes of all the current validated xmls and verify the include tree
-        result = self.expand_includes(validated_xmls)
+        with span("expand_includes", "validate"):
+            result = self.expand_includes(validated_xmls)
         if result is None:
             # something went wrong while expanding includes
             return None
@@ -342,13 +585,44 @@ class MavlinkXmlValidator(object):
         include_dag = result[1]
 
         # generate list of all dependencies for each xml
-        self.generate_dependency_list(validated_xmls, include_dag)
+        with span("generate_dependency_list", "validate"):
+            self.generate_dependency_list(validated_xmls, include_dag)
 
         # run through all the attached custom validators
         for custom_validator in self.custom_validators:
-            if not custom_validator.validate(validated_xmls, include_dag):
+            with span(type(custom_validator).__name__, "xml_validator"):
+                custom_validator_passed = custom_validator.validate(validated_xmls, include_dag)
+            if not custom_validator_passed:
                 log.error("{} failed validation".format(type(custom_validator).__name__))
                 return None
 
         # successfully read, expanded and validated!
         return validated_xmls
+
+
+class _LazyProcessPool(object):
+    """
+    Context manager for a process pool used by @ref MavlinkXmlValidator.expand_includes. The pool
+    is only started if it is actually needed, and is shut down on exit
+    """
+
+    def __init__(self, validator: MavlinkXmlValidator):
+        self.validator = validator
+        self.executor = None
+
+    def get(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.validator.max_workers,
+                initializer=_init_pool_worker,
+                initargs=(self.validator.use_fast_path,),
+            )
+        return self.executor
+
+    def __enter__(self) -> "_LazyProcessPool":
+        return self
+
+    def __exit__(self, *exc_info: any) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
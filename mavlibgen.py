@@ -13,15 +13,20 @@
 # distribution, or http://opensource.org/licenses/MIT.
 ################################################################################
 import argparse
+import os
 import sys
 import logging
+import threading
+import time
 from pathlib import Path
-from typing import List, Union
+from typing import Dict, List, Set, Tuple, Union
 
-from mavlib_gen.validator import MavlinkXmlValidator
-from mavlib_gen.generator import MavlibGenerator
-from schema import Schema, SchemaError
-from ruamel.yaml import YAML
+from mavlib_gen.daemon import GenerationDaemon, default_socket_path, request_generation
+from mavlib_gen.profiling import disable_profiling, enable_profiling
+
+# NOTE: the validator, generators, schema and yaml modules are imported where they are used.
+# They take most of the startup time, and a --daemon client that finds a running daemon never
+# needs them
 
 
 class MavlibgenRunner:
@@ -47,6 +52,8 @@ class MavlibgenRunner:
             mavlink_xmls = [mavlink_xmls]
         self.mavlink_xmls = [Path(xml_file).resolve() for xml_file in mavlink_xmls]
         self.generator = generator
+        from mavlib_gen.validator import MavlinkXmlValidator
+
         self.validator = MavlinkXmlValidator()
 
     def load_configuration(self) -> bool:
@@ -58,10 +65,17 @@ class MavlibgenRunner:
         elif not self.config_file.is_file():
             logging.error(f"Unable to locate the configuration file {self.config_file}")
             return False
-        yaml = YAML(type="safe")
-        config_schema = Schema(MavlibGenerator.yaml_schema())
+        from mavlib_gen.generator import MavlibGenerator
+        from schema import Schema, SchemaError
+        from ruamel.yaml import YAML
+
+        yaml = YAML(typ="safe")
         with open(self.config_file, "r") as conf_raw:
             user_config = yaml.load(conf_raw)
+            # only the configured generators need to be imported to check their options
+            generate_conf = user_config.get("generate") if isinstance(user_config, dict) else None
+            languages = generate_conf.keys() if isinstance(generate_conf, dict) else ()
+            config_schema = Schema(MavlibGenerator.yaml_schema(languages))
             try:
                 config_schema.validate(user_config)
                 logging.debug("User config file is compliant to the mavlib schema")
@@ -71,6 +85,7 @@ class MavlibgenRunner:
                 )
                 raise se
             self.generator = MavlibGenerator.from_config(user_config.get("generate", {}))
+        return True
 
     def run(self) -> bool:
         # load settings from configuration file
@@ -85,9 +100,262 @@ class MavlibgenRunner:
             return self.generator.generate_all(validated_xmls)
         return True
 
+    def run_with_daemon(self, socket_path: str = None) -> bool:
+        """
+        Same as @ref run, but done by a running generation daemon (see @ref serve) when there is
+        one. Falls back to generating in this process when no daemon is running
+
+        :param socket_path: Optional. The daemon's socket, defaults to
+            mavlib_gen.daemon.default_socket_path
+        """
+        if self.generator is not None:
+            # manually provided generators cant be sent to the daemon
+            return self.run()
+        result = self.generate_with_daemon(self.mavlink_xmls, self.config_file, socket_path)
+        if result is None:
+            logging.info("No mavlibgen daemon running, generating in-process")
+            return self.run()
+        return result
+
+    @staticmethod
+    def generate_with_daemon(
+        mavlink_xmls: Union[str, List[str]], config_file: str, socket_path: str = None
+    ) -> bool:
+        """
+        Send a generation request to a running daemon without loading any of the generation
+        machinery in this process
+
+        :return: True/False for the daemon's result, None if no daemon is running
+        """
+        if not isinstance(mavlink_xmls, list):
+            mavlink_xmls = [mavlink_xmls]
+        response = request_generation(
+            {
+                "config_file": (
+                    None if config_file is None else Path(config_file).resolve().as_posix()
+                ),
+                "xmls": [Path(xml_file).resolve().as_posix() for xml_file in mavlink_xmls],
+                "cwd": Path.cwd().as_posix(),
+            },
+            socket_path,
+        )
+        return None if response is None else response["ok"]
+
+    @classmethod
+    def create_daemon(cls, socket_path: str = None) -> GenerationDaemon:
+        """
+        Create (but dont start) a generation daemon. Clients (@ref run_with_daemon) send it a
+        config file and xmls and it runs them like @ref run, except the validator (and its
+        compiled schema), the models of unchanged xmls and template environments stay warm
+        between requests. Requests that write to the same output directory are run one at a time,
+        requests for different output directories run concurrently
+
+        :param socket_path: Optional. Socket to listen on, defaults to
+            mavlib_gen.daemon.default_socket_path
+        """
+        from mavlib_gen.validator import MavlinkXmlValidator
+
+        # requests are handled on threads, dont fork validation worker processes from them
+        validator = MavlinkXmlValidator(max_workers=1)
+        validator.cache_models = True
+        # config loading and validation share the warm validator and its model cache
+        validator_lock = threading.Lock()
+
+        def handle_request(request: Dict[str, any]) -> bool:
+            runner = cls(request["xmls"], request.get("config_file"))
+            runner.validator = validator
+            with validator_lock:
+                if not runner.load_configuration():
+                    return False
+                validated_xmls = validator.validate(runner.mavlink_xmls)
+            if validated_xmls is None:
+                return False
+            if runner.generator is None:
+                return True
+            # relative output directories are relative to where the client was run
+            outdir = Path(request.get("cwd", os.getcwd())) / runner.generator.outdir
+            runner.generator.outdir = outdir.as_posix()
+            with daemon.output_dir_lock(outdir):
+                return runner.generator.generate_all(validated_xmls)
+
+        socket_path = Path(socket_path) if socket_path is not None else default_socket_path()
+        daemon = GenerationDaemon(socket_path, handle_request)
+        return daemon
+
+    @classmethod
+    def serve(cls, socket_path: str = None) -> bool:
+        """
+        Run a generation daemon (see @ref create_daemon) until interrupted
+
+        :return: False if the daemon could not be started
+        """
+        daemon = cls.create_daemon(socket_path)
+        if not daemon.start():
+            return False
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            logging.info("mavlibgen daemon stopped")
+        return True
+
+    def watch(self, poll_interval: float = 0.5, max_cycles: int = None) -> bool:
+        """
+        Generate, then keep regenerating whenever the configuration file or one of the xmls in the
+        resolved include graph changes. Runs until interrupted (Ctrl+C).
+
+        Everything expensive stays loaded between cycles: the validator (and its schema once
+        compiled), the models of xmls that havent changed and the generators' template
+        environments. Each cycle only re-parses the changed xmls and regenerates the dialects
+        they affect (the changed xmls and every xml that includes them). A change to the
+        configuration file regenerates everything. Timing for each cycle is printed
+
+        :param poll_interval: seconds between checks of the watched files
+        :param max_cycles: Optional. Return after this many generation cycles (including the
+            initial one)
+        :return: True if the last generation cycle succeeded
+        """
+        self.validator.cache_models = True
+        cycle = 0
+        # validated xmls from the last successful cycle. None forces a full regeneration
+        last_validated = None
+        watched_files = self.__watched_files(None)
+        # every file being watched -> its (modification time, size) when last checked
+        stamps = self.__file_stamps(watched_files)
+        changed_files = set(stamps.keys())
+        try:
+            while True:
+                cycle += 1
+                config_changed = self.config_file is not None and self.config_file in changed_files
+                if cycle == 1 or config_changed:
+                    last_validated = None
+                result, validated = self.__watch_cycle(cycle, changed_files, last_validated)
+                last_validated = validated if result else None
+
+                if max_cycles is not None and cycle >= max_cycles:
+                    return result
+
+                # wait for something to change. Xmls newly found in the include graph start out
+                # with their current stamp. When validation failed the include graph is unknown,
+                # so keep watching the last known one: fixing an included xml starts a new cycle
+                if validated is None:
+                    watched_files = watched_files.union(self.__watched_files(None))
+                else:
+                    watched_files = self.__watched_files(validated)
+                stamps.update(self.__file_stamps(watched_files.difference(stamps.keys())))
+                changed_files = set()
+                while len(changed_files) == 0:
+                    time.sleep(poll_interval)
+                    new_stamps = self.__file_stamps(watched_files)
+                    changed_files = {
+                        path for path, stamp in new_stamps.items() if stamps.get(path) != stamp
+                    }
+                stamps = new_stamps
+        except KeyboardInterrupt:
+            print("[watch] stopped", flush=True)
+            return last_validated is not None
+
+    def __watch_cycle(
+        self,
+        cycle: int,
+        changed_files: Set[Path],
+        last_validated: Dict[str, any],
+    ) -> Tuple[bool, Dict[str, any]]:
+        """
+        Run one validate + generate cycle of @ref watch. Regenerates everything when last_validated
+        is None, otherwise only the dialects affected by changed_files
+
+        :return: (True if the cycle succeeded, the validated xmls or None if validation failed)
+        """
+        start = time.perf_counter()
+        if last_validated is None:
+            from ruamel.yaml import YAMLError
+            from schema import SchemaError
+
+            # an invalid configuration fails the cycle instead of ending the watch, so it can be
+            # fixed like any other watched file
+            try:
+                config_loaded = self.load_configuration()
+            except (SchemaError, YAMLError) as config_err:
+                logging.error(f"Invalid configuration file {self.config_file}: {config_err}")
+                config_loaded = False
+            if not config_loaded:
+                print(
+                    f"[watch] cycle {cycle}: failed to load {self.config_file}. Waiting for changes",
+                    flush=True,
+                )
+                return False, None
+
+        validated = self.validator.validate(self.mavlink_xmls)
+        validated_time = time.perf_counter()
+        if validated is None:
+            print(
+                f"[watch] cycle {cycle}: validation failed "
+                + f"({(validated_time - start) * 1e3:.1f} ms). Waiting for changes",
+                flush=True,
+            )
+            return False, None
+
+        dialects = None
+        if last_validated is not None:
+            changed = {
+                name
+                for name, xml_file in validated.items()
+                if name not in last_validated or Path(xml_file.absolute_path) in changed_files
+            }
+            dialects = changed.union(
+                name
+                for name, xml_file in validated.items()
+                if not changed.isdisjoint(xml_file.dependencies)
+            )
+
+        result = True
+        if self.generator is not None and (dialects is None or len(dialects) > 0):
+            if dialects is None:
+                result = self.generator.generate_all(validated)
+            else:
+                result = self.generator.generate_all(validated, dialects=dialects)
+        end = time.perf_counter()
+
+        regenerated = "all" if dialects is None else ", ".join(sorted(dialects)) or "nothing"
+        print(
+            f"[watch] cycle {cycle}: {'ok' if result else 'generation failed'} - "
+            + f"validate {(validated_time - start) * 1e3:.1f} ms, "
+            + f"generate {(end - validated_time) * 1e3:.1f} ms, "
+            + f"total {(end - start) * 1e3:.1f} ms (regenerated: {regenerated})",
+            flush=True,
+        )
+        return result, validated
+
+    def __watched_files(self, validated_xmls: Dict[str, any]) -> Set[Path]:
+        """
+        The config file, input xmls and (when known) every xml in their resolved include graph
+        """
+        watched = set(self.mavlink_xmls)
+        if self.config_file is not None:
+            watched.add(self.config_file)
+        if validated_xmls is not None:
+            watched.update(Path(xml_file.absolute_path) for xml_file in validated_xmls.values())
+        return watched
+
+    @staticmethod
+    def __file_stamps(paths: Set[Path]) -> Dict[Path, Tuple[int, int]]:
+        """(modification time, size) of each path. None for paths that dont exist"""
+        stamps = {}
+        for path in paths:
+            try:
+                stat = path.stat()
+                stamps[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamps[path] = None
+        return stamps
+
     @classmethod
     def generate_once(
-        cls, xmls: Union[str, List[str]], output_lang: str, output_location: str
+        cls,
+        xmls: Union[str, List[str]],
+        output_lang: str,
+        output_location: str,
+        sink: any = None,
     ) -> bool:
         """
         Do a single language generation using default configuration. No YAML required
@@ -96,6 +364,8 @@ class MavlibgenRunner:
             xmls: One or more paths to MAVLink xml files to validate and generate
             output_lang: the language to generate
             output_location: base directory to place resulting files
+            sink: Optional. mavlib_gen.output_sink.OutputSink to write the files to instead of
+                the filesystem (paths are under output_location)
         """
         # input validation
         if xmls is None:
@@ -105,13 +375,16 @@ class MavlibgenRunner:
         if not isinstance(xmls, list):
             xmls = [xmls]
 
+        from mavlib_gen.validator import MavlinkXmlValidator
+        from mavlib_gen.generator import MavlibGenerator
+
         validator = MavlinkXmlValidator()
 
         validated_xmls = validator.validate(xmls)
         if validated_xmls is None:
             return False  # failed to validate
 
-        generator = MavlibGenerator(outdir=output_location)
+        generator = MavlibGenerator(outdir=output_location, sink=sink)
         return generator.generate_one(validated_xmls, output_lang)
 
     @classmethod
@@ -121,15 +394,59 @@ class MavlibgenRunner:
         """
         parser.add_argument(
             "config_file",
+            nargs="?",
             help="yaml configuration file for this run of mavlibgen. See docs for config file schema",
         )
 
         parser.add_argument(
             "xmls",
-            nargs="+",
+            nargs="*",
             help="One or more XMLs to work with. Validation will expand any includes so you do not need to add all of those XMLs as arguments",
         )
 
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="Keep running and regenerate whenever the config file or an xml in the include "
+            + "graph changes",
+        )
+
+        parser.add_argument(
+            "--watch-interval",
+            type=float,
+            default=0.5,
+            help="Seconds between checks for changed files in --watch mode (default: %(default)s)",
+        )
+
+        parser.add_argument(
+            "--serve",
+            action="store_true",
+            help="Run a generation daemon that keeps caches warm between requests. No config file "
+            + "or xmls needed",
+        )
+
+        parser.add_argument(
+            "--daemon",
+            action="store_true",
+            help="Have a running generation daemon (see --serve) do the generation. Falls back to "
+            + "generating in-process if none is running",
+        )
+
+        parser.add_argument(
+            "--profile",
+            metavar="OUT_JSON",
+            default=None,
+            help="Profile the run: write Chrome trace-event JSON (chrome://tracing or "
+            + "ui.perfetto.dev) to OUT_JSON and print a summary table",
+        )
+
+        parser.add_argument(
+            "--socket",
+            default=None,
+            help="UNIX socket of the generation daemon for --serve and --daemon. Defaults to "
+            + "$MAVLIBGEN_SOCKET, or a per-user socket in the temp directory",
+        )
+
 
 def main() -> int:
     logging.basicConfig(level=logging.DEBUG)
@@ -137,10 +454,31 @@ def main() -> int:
     parser = argparse.ArgumentParser()
     MavlibgenRunner.add_args(parser)
     args = parser.parse_args()
-    runner = MavlibgenRunner(mavlink_xmls=args.xmls, config_file=args.config_file)
-    if runner.run():
-        return 0
-    return 1
+    if args.serve:
+        return 0 if MavlibgenRunner.serve(args.socket) else 1
+    if args.config_file is None or len(args.xmls) == 0:
+        parser.error("a config file and at least one xml are required")
+    if args.daemon and not args.watch and args.profile is None:
+        result = MavlibgenRunner.generate_with_daemon(args.xmls, args.config_file, args.socket)
+        if result is not None:
+            return 0 if result else 1
+        logging.info("No mavlibgen daemon running, generating in-process")
+
+    if args.profile is not None:
+        enable_profiling()
+    try:
+        runner = MavlibgenRunner(mavlink_xmls=args.xmls, config_file=args.config_file)
+        if args.watch:
+            result = runner.watch(poll_interval=args.watch_interval)
+        else:
+            result = runner.run()
+    finally:
+        if args.profile is not None:
+            profiler = disable_profiling()
+            profiler.write_chrome_trace(args.profile)
+            print(profiler.summary_table())
+            print(f"Chrome trace written to {args.profile}")
+    return 0 if result else 1
 
 
 if __name__ == "__main__":
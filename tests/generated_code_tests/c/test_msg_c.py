@@ -0,0 +1,257 @@
+################################################################################
+# \file test_msg_c
+#
+# Generate code using the "c" language, build it with gcc and verify the C
+# parser and TX helpers against frames packed by the python runtime
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import sys, time, shutil, subprocess
+import pytest
+from pathlib import Path
+
+script_dir = Path(__file__).parent.resolve()
+repo_root_dir = script_dir.parent.parent.parent.absolute()
+sys.path.insert(0, repo_root_dir)
+
+from mavlibgen import MavlibgenRunner
+from mavlib_gen.validator import MavlinkXmlValidator
+from mavlib_gen import runtime_codec
+
+TESTGEN_OUTPUT_BASE_DIR = (
+    script_dir.parent.parent / "test_artifacts" / f"c_msg_tests{str(int(time.time_ns() / 1000))}"
+)
+
+DIALECT_NAME = "message_type_tests"
+
+TEST_MSG_DEF = script_dir.parent / "test_cases" / f"{DIALECT_NAME}.xml"
+
+pytestmark = pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc is not available")
+
+# rx <chunk size> <bsearch|switch>: parse stdin a chunk at a time (0 = varying chunk sizes) and
+#   print each message
+# tx: write EXTENSION_FIELDS(-2, 1, 3, 0, 0) to stdout, once with each TX helper
+# roundtrip: pack, parse and decode ALL_FIELD_TYPES. exits non-zero if anything changed
+HARNESS_SRC = r"""
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include "mavlink_helpers.h"
+#include "message_type_tests/message_type_tests_msgs.h"
+#include "message_type_tests/message_type_tests_enums.h"
+
+static const mavlink_info_t MSG_INFO[] = MAVLINK_MESSAGE_TYPE_TESTS_MSG_INFO;
+
+static int write_stdout(const uint8_t *tx_bytes, uint32_t tx_len) {
+    return fwrite(tx_bytes, 1, tx_len, stdout) == tx_len ? 0 : 1;
+}
+
+int main(int argc, char **argv) {
+    mavlink_channel_state_t chan;
+    mavlink_channel_init(&chan, write_stdout, MSG_INFO, MAVLINK_MESSAGE_TYPE_TESTS_MSG_INFO_COUNT);
+    if (strcmp(argv[1], "tx") == 0) {
+        mavlink_extension_fields_t ext = {3, -2, 1, 0, 0};
+        uint8_t frame[MAVLINK_MAX_FRAME_LEN];
+        size_t frame_len = mavlink_msg_extension_fields_pack(&chan, 1, 2, &ext, frame,
+                sizeof(frame));
+        if (frame_len == 0 || mavlink_msg_extension_fields_pack(&chan, 1, 2, &ext, frame, 5) != 0) {
+            return 1;
+        }
+        fwrite(frame, 1, frame_len, stdout);
+        const mavlink_info_t *info = mavlink_find_msg_info(MSG_INFO,
+                MAVLINK_MESSAGE_TYPE_TESTS_MSG_INFO_COUNT, MAVLINK_MSG_ID_EXTENSION_FIELDS);
+        --chan.tx_seq;
+        return mavlink_tx_msg_info(&chan, &ext, info, 1, 2);
+    }
+
+    if (strcmp(argv[1], "roundtrip") == 0) {
+        // pack then parse and decode a message using every field type
+        mavlink_all_field_types_t sent;
+        mavlink_all_field_types_t received;
+        uint8_t *sent_bytes = (uint8_t *)&sent;
+        for (size_t idx = 0; idx < sizeof(sent); ++idx) {
+            sent_bytes[idx] = (uint8_t)(idx * 37 + 11);
+        }
+        uint8_t frame[MAVLINK_MAX_FRAME_LEN];
+        size_t frame_len = mavlink_msg_all_field_types_pack(&chan, 1, 2, &sent, frame,
+                sizeof(frame));
+        mavlink_message_t msg;
+        size_t consumed = 0;
+        if (!mavlink_parse_buf(&chan, frame, frame_len, &msg, &consumed)
+                || consumed != frame_len) {
+            return 1;
+        }
+        memset(&received, 0xFF, sizeof(received));
+        mavlink_msg_all_field_types_decode(&msg, &received);
+        return memcmp(&sent, &received, sizeof(sent)) != 0;
+    }
+
+    static uint8_t stream[1 << 16];
+    size_t stream_len = fread(stream, 1, sizeof(stream), stdin);
+    size_t chunk = (size_t)atoi(argv[2]);
+    if (strcmp(argv[3], "switch") == 0) {
+        chan.msg_info_fn = mavlink_message_type_tests_msg_info;
+    }
+    mavlink_message_t msg;
+    size_t offset = 0;
+    unsigned step = 0;
+    while (offset < stream_len) {
+        size_t len = chunk ? chunk : (step++ * 7) % 23 + 1;
+        if (len > stream_len - offset) {
+            len = stream_len - offset;
+        }
+        size_t used = 0;
+        while (used < len) {
+            size_t consumed = 0;
+            if (mavlink_parse_buf(&chan, stream + offset + used, len - used, &msg, &consumed)) {
+                printf("%u %u %u %u %u ", (unsigned)(msg.header.bytes[7]), msg.header.len,
+                        msg.header.seq, msg.header.sysid, msg.header.compid);
+                for (unsigned idx = 0; idx < msg.header.len; ++idx) {
+                    printf("%02x", msg.payload[idx]);
+                }
+                if (msg.header.msgid == MAVLINK_MSG_ID_EXTENSION_FIELDS) {
+                    mavlink_extension_fields_t ext;
+                    mavlink_msg_extension_fields_decode(&msg, &ext);
+                    printf(" %d %d %u %d %u", ext.testfield2, ext.testfield0, ext.testfield1,
+                            ext.ext_field0, ext.ext_field1);
+                }
+                printf("\n");
+            }
+            used += consumed;
+        }
+        offset += len;
+    }
+    printf("crc_errors %u dropped %u\n", chan.rx_crc_errors, chan.rx_dropped);
+    return 0;
+}
+"""
+
+
+@pytest.fixture(scope="module")
+def codec():
+    validated_xmls = MavlinkXmlValidator().validate([TEST_MSG_DEF])
+    return runtime_codec.build_codecs(validated_xmls)[DIALECT_NAME]
+
+
+def build_harness(out_dir: Path, defines: list) -> Path:
+    """Generate C code for the test dialect into out_dir and build the harness against it"""
+    assert MavlibgenRunner.generate_once(TEST_MSG_DEF, "c", out_dir)
+    for static_file in ["mavlink_types.h", "mavlink_helpers.h", "mavlink_helpers.c"]:
+        assert (out_dir / static_file).is_file()
+    (out_dir / "harness.c").write_text(HARNESS_SRC)
+    exe = out_dir / "harness"
+    subprocess.run(
+        ["gcc", "-std=c11", "-Wall", "-Werror"]
+        + defines
+        + [f"-I{out_dir}", "harness.c", "mavlink_helpers.c", "-o", exe.as_posix()],
+        cwd=out_dir,
+        check=True,
+    )
+    return exe
+
+
+@pytest.fixture(scope="module", params=[1, 0], ids=["crc_table", "crc_bitwise"])
+def harness(request):
+    return build_harness(
+        TESTGEN_OUTPUT_BASE_DIR / f"crc_table{request.param}",
+        [f"-DMAVLINK_CRC_USE_TABLE={request.param}"],
+    )
+
+
+def run_harness(exe: Path, args: list, stdin: bytes = b"") -> bytes:
+    return subprocess.run(
+        [exe.as_posix()] + args, input=stdin, capture_output=True, check=True
+    ).stdout
+
+
+def test_c_tx_matches_python(harness, codec):
+    channel = runtime_codec.MavlinkChannel(1, 2, 3)
+    expected = b"".join(codec.MessageExtensionFields(-2, 1, 3, 0, 0).pack(channel) for _ in "ab")
+    assert run_harness(harness, ["tx"]) == expected
+
+
+@pytest.mark.parametrize("lookup", ["bsearch", "switch"])
+@pytest.mark.parametrize("chunk", ["0", "1", "7", "4096"])
+def test_c_parse_python_frames(harness, codec, chunk, lookup):
+    channel = runtime_codec.MavlinkChannel(1, 2, 3)
+    ext_frame = codec.MessageExtensionFields(-2, 1, 3, 0, 5).pack(channel)
+    ext_trimmed = codec.MessageExtensionFields(-2, 1, 3, 0, 0).pack(channel)
+    bad_crc = bytearray(codec.MessageExtensionFields(1, 1, 1, 1, 1).pack(channel))
+    bad_crc[-1] ^= 0xFF
+    # not in the table: the 465 byte message can't be sent in a frame
+    unknown = bytearray(ext_frame)
+    unknown[7] = 3
+    unsupported_flags = bytearray(ext_frame)
+    unsupported_flags[2] = 0x02
+    # the signature block that follows a signed frame is skipped, even if it contains STX
+    channel.incompatibility_flags = 0x01
+    signed_frame = codec.MessageExtensionFields(-2, 1, 3, 0, 5).pack(channel) + b"\xfd" * 13
+    assert signed_frame[2] == 0x01
+    stream = (
+        b"\x00\x01garbage"
+        + ext_frame
+        + bytes(bad_crc)
+        + bytes(unknown)
+        + bytes(unsupported_flags)
+        + ext_trimmed
+        + signed_frame
+        + ext_frame
+    )
+
+    lines = run_harness(harness, ["rx", chunk, lookup], stream).decode().splitlines()
+    assert lines == [
+        "4 6 0 1 2 0300fe010005 3 -2 1 0 5",
+        "4 4 0 1 2 0300fe01 3 -2 1 0 0",
+        "4 6 0 1 2 0300fe010005 3 -2 1 0 5",
+        "4 6 0 1 2 0300fe010005 3 -2 1 0 5",
+        "crc_errors 1 dropped 2",
+    ]
+
+
+def test_c_pack_decode_roundtrip(harness):
+    run_harness(harness, ["roundtrip"])
+
+
+def test_c_big_endian_roundtrip():
+    """Force the big-endian field copies on this host. decode must still undo pack"""
+    exe = build_harness(TESTGEN_OUTPUT_BASE_DIR / "big_endian", ["-DMAVLINK_LITTLE_ENDIAN=0"])
+    run_harness(exe, ["roundtrip"])
+
+
+def test_c_include_only_dialect_msg_info():
+    """A dialect with no messages of its own still gets the info table of its dependencies"""
+    tree_dir = script_dir.parent.parent / "xml_validator_tests" / "test_cases" / "pass"
+    tree_dir = tree_dir / "complex_include_graph"
+    out_dir = TESTGEN_OUTPUT_BASE_DIR / "include_only"
+    assert MavlibgenRunner.generate_once(tree_dir / "top_level.xml", "c", out_dir)
+    assert (out_dir / "top_level" / "top_level_msgs.h").is_file()
+    (out_dir / "include_only.c").write_text(
+        r"""
+#include "top_level/top_level_msgs.h"
+
+static const mavlink_info_t MSG_INFO[] = MAVLINK_TOP_LEVEL_MSG_INFO;
+
+int main(void) {
+    if (MAVLINK_TOP_LEVEL_MSG_INFO_COUNT != 2 || sizeof(MSG_INFO) != 2 * sizeof(MSG_INFO[0])) {
+        return 1;
+    }
+    if (mavlink_top_level_msg_info(1) == NULL || mavlink_top_level_msg_info(2) == NULL) {
+        return 2;
+    }
+    return mavlink_top_level_msg_info(3) == NULL ? 0 : 3;
+}
+"""
+    )
+    exe = out_dir / "include_only"
+    subprocess.run(
+        ["gcc", "-std=c11", "-Wall", "-Werror", f"-I{out_dir}", "include_only.c"]
+        + ["-o", exe.as_posix()],
+        cwd=out_dir,
+        check=True,
+    )
+    run_harness(exe, [])
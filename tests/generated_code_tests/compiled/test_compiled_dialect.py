@@ -0,0 +1,150 @@
+################################################################################
+# \file test_compiled_dialect
+#
+# Generate compiled dialect artifacts and verify the model objects loaded back
+# from them match the ones built from the original xmls
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import sys, time, json, subprocess, textwrap
+import pytest
+from pathlib import Path
+
+script_dir = Path(__file__).parent.resolve()
+repo_root_dir = script_dir.parent.parent.parent.absolute()
+sys.path.insert(0, repo_root_dir)
+
+from mavlib_gen.validator import MavlinkXmlValidator
+from mavlib_gen.lang_generators.generator_compiled import CompiledDialectGenerator
+
+TESTGEN_OUTPUT_BASE_DIR = (
+    script_dir.parent.parent / "test_artifacts" / f"compiled_tests{str(int(time.time_ns() / 1000))}"
+)
+
+TEST_MSG_DEF = script_dir.parent / "test_cases" / "message_type_tests.xml"
+COMPLEX_TREE_DIR = (
+    repo_root_dir
+    / "tests"
+    / "xml_validator_tests"
+    / "test_cases"
+    / "pass"
+    / "complex_include_graph"
+)
+COMPLEX_TREE_XMLS = [COMPLEX_TREE_DIR / "top_level.xml", COMPLEX_TREE_DIR / "top_level2.xml"]
+ENUM_PARAM_XML = (
+    repo_root_dir / "tests" / "xml_schema_tests" / "test_cases" / "pass" / "enum_with_params.xml"
+)
+
+
+def assert_models_equal(loaded, original, path="xml"):
+    """Recursively compare model objects, ignoring where the files were loaded from"""
+    if isinstance(original, (list, tuple)):
+        assert len(loaded) == len(original), path
+        for idx, (loaded_item, original_item) in enumerate(zip(loaded, original)):
+            assert_models_equal(loaded_item, original_item, f"{path}[{idx}]")
+        return
+    slots = [slot for cls in type(original).__mro__ for slot in getattr(cls, "__slots__", ())]
+    if not slots:
+        assert loaded == original, path
+        return
+    assert type(loaded) is type(original), path
+    for slot in slots:
+        if slot in ("absolute_path", "_format_cache"):
+            continue
+        assert_models_equal(getattr(loaded, slot), getattr(original, slot), f"{path}.{slot}")
+
+
+@pytest.mark.parametrize("output_format", ["json", "binary"])
+@pytest.mark.parametrize(
+    "xmls", [[TEST_MSG_DEF], COMPLEX_TREE_XMLS, [ENUM_PARAM_XML]], ids=["msgs", "tree", "params"]
+)
+def test_compiled_round_trip(output_format, xmls):
+    """Models loaded from every generated artifact match the models built from the xmls"""
+    validator = MavlinkXmlValidator()
+    validated_xmls = validator.validate(xmls)
+    assert validated_xmls is not None
+
+    out_dir = TESTGEN_OUTPUT_BASE_DIR / output_format / xmls[0].stem
+    generator = CompiledDialectGenerator(format=output_format)
+    assert generator.generate(validated_xmls, out_dir)
+
+    roots = generator.include_tree_roots(validated_xmls)
+    assert len(roots) == len(xmls)
+    for root in roots:
+        artifact = out_dir / f"{root.name}{generator.FILE_EXTENSIONS[output_format]}"
+        loaded = MavlinkXmlValidator(use_fast_path=False).load_compiled(artifact)
+        assert loaded is not None
+        tree_names = [root.filename] + root.dependencies
+        assert sorted(loaded.keys()) == sorted(tree_names)
+        for name in tree_names:
+            assert_models_equal(loaded[name], validated_xmls[name], name)
+
+
+def test_compiled_output_is_deterministic():
+    """Generating the same tree twice gives byte-identical artifacts in both forms"""
+    for output_format in ["json", "binary"]:
+        outputs = []
+        for run in range(2):
+            validated_xmls = MavlinkXmlValidator().validate(COMPLEX_TREE_XMLS)
+            out_dir = TESTGEN_OUTPUT_BASE_DIR / "determinism" / f"{output_format}{run}"
+            assert CompiledDialectGenerator(format=output_format).generate(validated_xmls, out_dir)
+            outputs.append({path.name: path.read_bytes() for path in out_dir.iterdir()})
+        assert outputs[0] == outputs[1]
+
+
+def test_compiled_json_contents():
+    """The JSON artifact carries the message metadata runtime tools need"""
+    validated_xmls = MavlinkXmlValidator().validate([TEST_MSG_DEF])
+    out_dir = TESTGEN_OUTPUT_BASE_DIR / "contents"
+    assert CompiledDialectGenerator().generate(validated_xmls, out_dir)
+    compiled = json.loads((out_dir / "message_type_tests.json").read_text())
+
+    model = validated_xmls["message_type_tests.xml"].xml
+    (dialect,) = compiled["dialects"]
+    assert len(dialect["messages"]) == len(model.messages)
+    for msg_dict, msg in zip(dialect["messages"], model.messages):
+        assert msg_dict["id"] == msg.id
+        assert msg_dict["crc_extra"] == msg.crc_extra
+        assert msg_dict["max_length"] == msg.byte_length
+        assert msg_dict["min_length"] == sum(field.field_len for field in msg.fields)
+        wire_offsets = {field.name: field.wire_offset for field in msg.all_fields}
+        for field_dict in msg_dict["fields"]:
+            assert field_dict["wire_offset"] == wire_offsets[field_dict["name"]]
+
+
+def test_load_compiled_rejects_bad_artifacts(tmp_path):
+    validator = MavlinkXmlValidator()
+    assert validator.load_compiled(tmp_path / "missing.json") is None
+
+    bad_version = tmp_path / "bad_version.json"
+    bad_version.write_text(json.dumps({"format_version": 0, "dialects": []}))
+    assert validator.load_compiled(bad_version) is None
+
+    validated_xmls = validator.validate([TEST_MSG_DEF])
+    assert CompiledDialectGenerator(format="binary").generate(validated_xmls, tmp_path)
+    packed = (tmp_path / "message_type_tests.mavc").read_bytes()
+    truncated = tmp_path / "truncated.mavc"
+    truncated.write_bytes(packed[: len(packed) // 2])
+    assert validator.load_compiled(truncated) is None
+
+
+def test_load_compiled_skips_schema_imports(tmp_path):
+    """Loading a compiled dialect through the validator doesnt import xmlschema or networkx"""
+    validated_xmls = MavlinkXmlValidator().validate([TEST_MSG_DEF])
+    assert CompiledDialectGenerator().generate(validated_xmls, tmp_path)
+    check = textwrap.dedent(
+        f"""
+        import sys
+        from mavlib_gen.validator import MavlinkXmlValidator
+        loaded = MavlinkXmlValidator().load_compiled({str(tmp_path / "message_type_tests.json")!r})
+        assert loaded is not None
+        heavy = [m for m in ("xmlschema", "networkx") if m in sys.modules]
+        assert heavy == [], heavy
+        """
+    )
+    subprocess.run([sys.executable, "-c", check], cwd=repo_root_dir.as_posix(), check=True)
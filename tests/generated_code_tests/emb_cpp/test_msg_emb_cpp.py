@@ -10,7 +10,8 @@
 # See the file 'LICENSE' in the root directory of the present
 # distribution, or http://opensource.org/licenses/MIT.
 ################################################################################
-import sys, time
+import sys, time, shutil, subprocess
+import pytest
 from pathlib import Path
 
 script_dir = Path(__file__).parent.resolve()
@@ -18,6 +19,10 @@ repo_root_dir = script_dir.parent.parent.parent.absolute()
 sys.path.insert(0, repo_root_dir)
 
 from mavlibgen import MavlibgenRunner
+from mavlib_gen.validator import MavlinkXmlValidator
+from mavlib_gen.lang_generators.generator_emb_cpp import EmbCppLangGenerator
+from mavlib_gen.output_sink import MemorySink
+from mavlib_gen import runtime_codec
 
 # when True, generated files will not be deleted on module teardown
 DEBUG_MODE = True
@@ -30,6 +35,16 @@ TESTGEN_OUTPUT_BASE_DIR = (
 DIALECT_NAME = "message_type_tests"
 
 TEST_MSG_DEF = script_dir.parent / "test_cases" / f"{DIALECT_NAME}.xml"
+COMPLEX_TREE_DIR = (
+    repo_root_dir
+    / "tests"
+    / "xml_validator_tests"
+    / "test_cases"
+    / "pass"
+    / "complex_include_graph"
+)
+
+requires_gpp = pytest.mark.skipif(shutil.which("g++") is None, reason="g++ is not available")
 
 
 def test_emb_cpp_generation():
@@ -42,3 +57,547 @@ def test_emb_cpp_generation():
 #     complex_tree_folder = repo_root_dir / "tests" / "xml_validator_tests" / "test_cases"
 #     abs_files = [complex_tree_folder / "pass" / "complex_include_graph" / fname for fname in files]
 #     assert generate(abs_files, "emb_cpp", TESTGEN_OUTPUT_BASE_DIR)
+
+
+# tx: serialize EXTENSION_FIELDS(-2, 1, 3, 0, 0), then the all-zero EXTENSION_FIELDS to stdout
+# rx: deserialize every EXTENSION_FIELDS frame found in stdin and print its fields
+# roundtrip: serialize then deserialize ALL_FIELD_TYPES. exits non-zero if anything changed
+# details: print the MAV_INCLUDE_MSG_DETAILS of every message, one field per line
+# parse <chunk>: feed stdin to a MavlinkParser chunk bytes at a time. prints each frame, then the
+#   parser's error counters
+# dispatch: parse stdin and dispatch each frame to a visitor that handles EMPTY_MSG and
+#   EXTENSION_FIELDS. prints what each frame was dispatched to
+# view: read ALL_FIELD_TYPES and ALL_ARRAY_TYPES payloads, full and trimmed, through their views.
+#   exits non-zero if any field differs from decodePayload
+HARNESS_SRC = r"""
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <type_traits>
+#include "MessageTypeTestsMsgs.hpp"
+
+using namespace mavgen::message_type_tests;
+
+#ifdef HARNESS_STATIC_DISPATCH
+static_assert(!std::is_polymorphic<MessageEmptyMsg>::value, "static messages have no vtable");
+static_assert(MessageExtensionFields::getMsgInfo().msgid == 4, "traits are constexpr");
+#else
+static_assert(std::is_base_of<mavgen::IMavlinkMessage, MessageEmptyMsg>::value,
+              "messages implement the virtual interface by default");
+#endif
+
+template <typename T>
+bool same(T lhs, T rhs) {
+    return memcmp(&lhs, &rhs, sizeof(T)) == 0;
+}
+
+template <typename T, size_t N>
+bool same(mavgen::MavlinkWireSpan<T> lhs, const T (&rhs)[N]) {
+    T copied[N + 1];
+    bool equal = lhs.size() == N && lhs.copyTo(copied, N + 1) == N;
+    for (size_t idx = 0; idx < N; ++idx) {
+        equal = equal && same(lhs[idx], rhs[idx]) && same(copied[idx], rhs[idx]);
+    }
+    return equal;
+}
+
+// every field of a view matches the decoded payload, for each length the wire could be trimmed to
+bool checkViews() {
+    uint8_t wire[sizeof(PayloadAllArrayTypes)];
+    for (size_t idx = 0; idx < sizeof(wire); ++idx) {
+        wire[idx] = static_cast<uint8_t>(idx * 37 + 11);
+    }
+    for (size_t wireLen = 0; wireLen <= sizeof(wire); ++wireLen) {
+        MessageAllFieldTypes fields;
+        fields.decodePayload(wire, wireLen);
+        const MessageAllFieldTypesView fieldsView(wire, wireLen);
+        const PayloadAllFieldTypes& fp = fields.payload;
+        if (!same(fieldsView.testfield0(), fp.testfield0) ||
+            !same(fieldsView.testfield1(), fp.testfield1) ||
+            !same(fieldsView.testfield2(), fp.testfield2) ||
+            !same(fieldsView.testfield3(), fp.testfield3) ||
+            !same(fieldsView.testfield4(), fp.testfield4) ||
+            !same(fieldsView.testfield5(), fp.testfield5) ||
+            !same(fieldsView.testfield6(), fp.testfield6) ||
+            !same(fieldsView.testfield7(), fp.testfield7) ||
+            !same(fieldsView.testfield8(), fp.testfield8) ||
+            !same(fieldsView.testfield9(), fp.testfield9) ||
+            !same(fieldsView.testfield10(), fp.testfield10) ||
+            !same(fieldsView.testfield11(), fp.testfield11) ||
+            !same(fieldsView.enumField1(), fp.enumField1)) {
+            printf("ALL_FIELD_TYPES view differs with %zu wire bytes\n", wireLen);
+            return false;
+        }
+
+        MessageAllArrayTypes arrays;
+        arrays.decodePayload(wire, wireLen);
+        const MessageAllArrayTypesView arraysView(wire, wireLen);
+        const PayloadAllArrayTypes& ap = arrays.payload;
+        if (!same(arraysView.testfield0(), ap.testfield0) ||
+            !same(arraysView.testfield1(), ap.testfield1) ||
+            !same(arraysView.testfield2(), ap.testfield2) ||
+            !same(arraysView.testfield3(), ap.testfield3) ||
+            !same(arraysView.testfield4(), ap.testfield4) ||
+            !same(arraysView.testfield5(), ap.testfield5) ||
+            !same(arraysView.testfield6(), ap.testfield6) ||
+            !same(arraysView.testfield7(), ap.testfield7) ||
+            !same(arraysView.testfield8(), ap.testfield8) ||
+            !same(arraysView.testfield9(), ap.testfield9) ||
+            !same(arraysView.testfield10(), ap.testfield10)) {
+            printf("ALL_ARRAY_TYPES view differs with %zu wire bytes\n", wireLen);
+            return false;
+        }
+    }
+    // views are constructible for messages without fields too
+    const MessageEmptyMsgView emptyView(wire, 0);
+    static_cast<void>(emptyView);
+    return true;
+}
+
+struct Visitor {
+    void operator()(const MessageEmptyMsg& msg) { printf("empty %u\n", msg.getMsgInfo().msgid); }
+    void operator()(const MessageExtensionFields& msg) {
+        printf("extension %u %d %d\n", msg.header.sysid, msg.payload.testfield2,
+               msg.payload.ext_field1);
+    }
+};
+
+int main(int, char** argv) {
+    uint8_t frame[mavgen::MAV_MAX_FRAME_LEN];
+    if (strcmp(argv[1], "tx") == 0) {
+        MessageExtensionFields msg;
+        msg.header.sysid = 1;
+        msg.header.compid = 2;
+        msg.payload = {3, -2, 1, 0, 0};
+        const size_t frameLen = msg.serialize(frame, sizeof(frame));
+        if (frameLen == 0 || msg.serialize(frame, frameLen - 1) != 0) {
+            return 1;
+        }
+        fwrite(frame, 1, frameLen, stdout);
+        // trimming always keeps the first payload byte
+        msg.payload = {0, 0, 0, 0, 0};
+        fwrite(frame, 1, msg.serialize(frame, sizeof(frame)), stdout);
+        return 0;
+    }
+    if (strcmp(argv[1], "view") == 0) {
+        return checkViews() ? 0 : 1;
+    }
+    if (strcmp(argv[1], "roundtrip") == 0) {
+        MessageAllFieldTypes sent;
+        MessageAllFieldTypes received;
+        uint8_t* sentBytes = reinterpret_cast<uint8_t*>(&sent.payload);
+        for (size_t idx = 0; idx < sizeof(sent.payload); ++idx) {
+            sentBytes[idx] = static_cast<uint8_t>(idx * 37 + 11);
+        }
+        sent.header.seq = 7;
+        const size_t frameLen = sent.serialize(frame, sizeof(frame));
+        memset(&received.payload, 0xFF, sizeof(received.payload));
+        if (frameLen == 0 || received.deserialize(frame, frameLen) != frameLen) {
+            return 1;
+        }
+        return memcmp(&sent.payload, &received.payload, sizeof(sent.payload)) != 0 ||
+               received.header.seq != 7;
+    }
+
+#ifdef MAV_INCLUDE_MSG_DETAILS
+    if (strcmp(argv[1], "details") == 0) {
+        const mavgen::MavlinkMsgDetails* allDetails[] = {
+            &MessageEmptyMsg::DETAILS,
+            &MessageAllFieldTypes::DETAILS,
+            &MessageAllArrayTypes::DETAILS,
+            &MessageExtensionFields::DETAILS,
+        };
+        for (const mavgen::MavlinkMsgDetails* details : allDetails) {
+            printf("%s %u\n", details->name, details->numFields);
+            for (uint8_t idx = 0; idx < details->numFields; ++idx) {
+                const mavgen::MavlinkMsgFieldInfo& field = details->fields[idx];
+                printf("  %s %u %u %u %u\n", field.name, field.type, field.arrayLength,
+                       field.byteSize, field.wireOffset);
+            }
+        }
+        return 0;
+    }
+#endif
+
+    static uint8_t stream[1 << 16];
+    const size_t streamLen = fread(stream, 1, sizeof(stream), stdin);
+    if (strcmp(argv[1], "parse") == 0) {
+        const size_t chunk = static_cast<size_t>(atol(argv[2]));
+        mavgen::MavlinkParser<MessageTypeTestsMsgTable> parser;
+        auto handler = [](const mavgen::MavlinkFrame& frame) {
+            printf("%u %u %u %u", frame.header.msgid, frame.header.seq, frame.header.sysid,
+                   frame.payloadLen);
+            if (frame.header.msgid == MessageExtensionFields::INFO.msgid) {
+                MessageExtensionFields msg;
+                msg.decodePayload(frame.payload, frame.payloadLen);
+                printf(" %d %d %u %d %u", msg.payload.testfield2, msg.payload.testfield0,
+                       msg.payload.testfield1, msg.payload.ext_field0, msg.payload.ext_field1);
+            }
+            printf("\n");
+        };
+        for (size_t offset = 0; offset < streamLen; offset += chunk) {
+            const size_t len = streamLen - offset < chunk ? streamLen - offset : chunk;
+            parser.parse(stream + offset, len, handler);
+        }
+        printf("crc %u dropped %u\n", parser.crcErrors(), parser.dropped());
+        return 0;
+    }
+
+    if (strcmp(argv[1], "dispatch") == 0) {
+        mavgen::MavlinkParser<MessageTypeTestsMsgTable> parser;
+        Visitor visitor;
+        parser.parse(stream, streamLen, [&visitor](const mavgen::MavlinkFrame& frame) {
+            if (!MessageTypeTestsMsgTable::dispatch(frame, visitor)) {
+                printf("skipped %u\n", frame.header.msgid);
+            }
+        });
+        return 0;
+    }
+
+    size_t offset = 0;
+    while (offset < streamLen) {
+        MessageExtensionFields msg;
+        const size_t frameLen = msg.deserialize(stream + offset, streamLen - offset);
+        if (frameLen == 0) {
+            ++offset;
+            continue;
+        }
+        printf("%u %u %d %d %u %d %u\n", msg.header.seq, msg.header.sysid, msg.payload.testfield2,
+               msg.payload.testfield0, msg.payload.testfield1, msg.payload.ext_field0,
+               msg.payload.ext_field1);
+        offset += frameLen;
+    }
+    return 0;
+}
+"""
+
+
+# argv: <number of frames>. A producer thread serializes EXTENSION_FIELDS frames numbered 0..n-1
+# into byte spans, parses them and pushes each frame to a small MavlinkFrameQueue. The main thread
+# pops and checks every frame arrives once, in order and intact. Prints the number received, the
+# number of pushes that found the queue full (and were retried) and the frames left in the queue
+QUEUE_STRESS_SRC = r"""
+#include <stdio.h>
+#include <stdlib.h>
+#include <thread>
+#include "MavlinkFrameQueue.hpp"
+#include "MessageTypeTestsMsgs.hpp"
+
+using namespace mavgen::message_type_tests;
+
+static mavgen::MavlinkFrameQueue<MessageTypeTestsMsgTable, 8> queue;
+
+static void produce(size_t numFrames) {
+    mavgen::MavlinkParser<MessageTypeTestsMsgTable, MessageTypeTestsMsgTable::MAX_FRAME_LEN> parser;
+    uint8_t span[64];
+    size_t spanLen = 0;
+    auto pushFrame = [](const mavgen::MavlinkFrame& frame) {
+        while (!queue.push(frame)) {
+            std::this_thread::yield();
+        }
+    };
+    for (size_t idx = 0; idx < numFrames; ++idx) {
+        MessageExtensionFields msg;
+        msg.header.seq = static_cast<uint8_t>(idx);
+        msg.payload.testfield2 = static_cast<int16_t>(idx);
+        msg.payload.ext_field1 = static_cast<uint8_t>(idx >> 16);
+        uint8_t frame[mavgen::MAV_MAX_FRAME_LEN];
+        const size_t frameLen = msg.serialize(frame, sizeof(frame));
+        // hand the parser fixed size spans, like a DMA half-buffer, so frames straddle spans
+        for (size_t byte = 0; byte < frameLen; ++byte) {
+            span[spanLen++] = frame[byte];
+            if (spanLen == sizeof(span)) {
+                parser.parse(span, spanLen, pushFrame);
+                spanLen = 0;
+            }
+        }
+    }
+    parser.parse(span, spanLen, pushFrame);
+}
+
+int main(int, char** argv) {
+    const size_t numFrames = static_cast<size_t>(atol(argv[1]));
+    std::thread producer(produce, numFrames);
+    size_t received = 0;
+    mavgen::MavlinkFrame frame;
+    while (received < numFrames) {
+        if (!queue.front(frame)) {
+            std::this_thread::yield();
+            continue;
+        }
+        const MessageExtensionFieldsView view(frame.payload, frame.payloadLen);
+        const size_t idx = static_cast<uint16_t>(view.testfield2()) |
+                           (static_cast<size_t>(view.ext_field1()) << 16);
+        if (frame.info != &MessageTypeTestsMsgTable::INFO[3] ||
+            frame.header.seq != static_cast<uint8_t>(received) || idx != received) {
+            printf("frame %zu arrived as %zu\n", received, idx);
+            return 1;
+        }
+        queue.pop();
+        ++received;
+    }
+    producer.join();
+    printf("%zu %u %zu\n", received, queue.dropped(), queue.size());
+    return 0;
+}
+"""
+
+
+def build_harness(out_dir: Path, defines: list, generator: EmbCppLangGenerator = None) -> Path:
+    """
+    Generate emb_cpp code for the test dialect into out_dir and build the harness against it.
+    Uses the default generator configuration unless a generator is given
+    """
+    if generator is None:
+        assert MavlibgenRunner.generate_once(TEST_MSG_DEF, "emb_cpp", out_dir)
+    else:
+        assert generator.generate(MavlinkXmlValidator().validate([TEST_MSG_DEF]), out_dir)
+    inc_dir = out_dir / "inc"
+    (out_dir / "harness.cpp").write_text(HARNESS_SRC)
+    exe = out_dir / "harness"
+    subprocess.run(
+        # the generated code must build for targets without exceptions or RTTI
+        ["g++", "-std=c++17", "-Wall", "-Wextra", "-Werror", "-fno-exceptions", "-fno-rtti"]
+        + defines
+        + [f"-I{inc_dir}", f"-I{inc_dir / DIALECT_NAME}", "harness.cpp", "-o", exe.as_posix()],
+        cwd=out_dir,
+        check=True,
+    )
+    return exe
+
+
+def run_harness(exe: Path, args: list, stdin: bytes = b"") -> bytes:
+    return subprocess.run(
+        [exe.as_posix()] + args, input=stdin, capture_output=True, check=True
+    ).stdout
+
+
+@pytest.fixture(scope="module")
+def codec():
+    validated_xmls = MavlinkXmlValidator().validate([TEST_MSG_DEF])
+    return runtime_codec.build_codecs(validated_xmls)[DIALECT_NAME]
+
+
+@pytest.fixture(
+    scope="module",
+    params=[[], ["-DMAV_CRC_USE_TABLE=0"], ["-DMAV_INCLUDE_MSG_DETAILS"]],
+    ids=["crc_table", "crc_bitwise", "msg_details"],
+)
+def harness(request):
+    return build_harness(TESTGEN_OUTPUT_BASE_DIR / f"harness{request.param_index}", request.param)
+
+
+# MavlinkFieldType values
+FIELD_TYPE_IDS = {
+    name: idx
+    for idx, name in enumerate(
+        [
+            "char",
+            "uint8_t",
+            "int8_t",
+            "uint16_t",
+            "int16_t",
+            "uint32_t",
+            "int32_t",
+            "uint64_t",
+            "int64_t",
+            "float",
+            "double",
+        ]
+    )
+}
+
+
+@requires_gpp
+def test_emb_cpp_serialize_matches_python(harness, codec):
+    channel = runtime_codec.MavlinkChannel(1, 2, 3)
+    expected = codec.MessageExtensionFields(-2, 1, 3, 0, 0).pack(channel)
+    all_zero = codec.MessageExtensionFields(0, 0, 0, 0, 0).pack(channel)
+    # the payload is trimmed to its first byte, never to nothing
+    assert all_zero[1] == 1
+    assert run_harness(harness, ["tx"]) == expected + all_zero
+
+
+@requires_gpp
+def test_emb_cpp_deserialize_python_frames(harness, codec):
+    channel = runtime_codec.MavlinkChannel(1, 2, 3)
+    full = codec.MessageExtensionFields(-2, 1, 3, 0, 5).pack(channel)
+    trimmed = codec.MessageExtensionFields(-2, 1, 3, 0, 0).pack(channel)
+    bad_crc = bytearray(full)
+    bad_crc[-1] ^= 0xFF
+    channel.incompatibility_flags = 0x01
+    signed = codec.MessageExtensionFields(4, 5, 6, 7, 8).pack(channel) + bytes(13)
+    other_msg = codec.MessageEmptyMsg().pack(channel)
+    stream = b"garbage" + full + bytes(bad_crc) + other_msg + trimmed + signed + full[:-1]
+
+    assert run_harness(harness, ["rx"], stream).decode().splitlines() == [
+        "0 1 3 -2 1 0 5",
+        "0 1 3 -2 1 0 0",
+        "0 1 6 4 5 7 8",
+    ]
+
+
+@requires_gpp
+def test_emb_cpp_roundtrip(harness):
+    run_harness(harness, ["roundtrip"])
+
+
+@requires_gpp
+def test_emb_cpp_big_endian_roundtrip():
+    """Force the big-endian field copies on this host. deserialize must still undo serialize"""
+    exe = build_harness(TESTGEN_OUTPUT_BASE_DIR / "big_endian", ["-DMAV_LITTLE_ENDIAN=0"])
+    run_harness(exe, ["roundtrip"])
+    run_harness(exe, ["view"])
+
+
+@requires_gpp
+def test_emb_cpp_view(harness):
+    """Message views read the same field values as decodePayload, however the wire is trimmed"""
+    run_harness(harness, ["view"])
+
+
+@requires_gpp
+def test_emb_cpp_msg_details():
+    """Each message's exactly sized field table matches the model"""
+    exe = build_harness(TESTGEN_OUTPUT_BASE_DIR / "details", ["-DMAV_INCLUDE_MSG_DETAILS"])
+    dialect = MavlinkXmlValidator().validate([TEST_MSG_DEF])[f"{DIALECT_NAME}.xml"]
+    expected = []
+    for msg in dialect.xml.messages:
+        expected.append(f"{msg.name} {msg.num_fields}")
+        for field in msg.all_fields_sorted:
+            expected.append(
+                f"  {field.name} {FIELD_TYPE_IDS[field.base_type]} {field.array_len} "
+                + f"{field.field_len} {field.wire_offset}"
+            )
+    assert run_harness(exe, ["details"]).decode().splitlines() == expected
+
+
+@requires_gpp
+@pytest.mark.parametrize("chunk", [1, 7, 64, 4096])
+def test_emb_cpp_parser(harness, codec, chunk):
+    """MavlinkParser resyncs past garbage and bad frames, however the stream is split up"""
+    channel = runtime_codec.MavlinkChannel(1, 2, 3)
+    full = codec.MessageExtensionFields(-2, 1, 3, 0, 5).pack(channel)
+    trimmed = codec.MessageExtensionFields(-2, 1, 3, 0, 0).pack(channel)
+    empty = codec.MessageEmptyMsg().pack(channel)
+    bad_crc = bytearray(full)
+    bad_crc[-1] ^= 0xFF
+    # a start byte whose 'frame' swallows the valid frame after it. the parser has to go back
+    fake_stx = b"\xfd\x20\x00\x00\x00\x00\x00\x04\x00\x00"
+    unknown_msg = b"\xfd\x00\x00\x00\x00\x00\x00\x63\x00\x00\x00\x00"
+    channel.incompatibility_flags = 0x01
+    signed = codec.MessageExtensionFields(4, 5, 6, 7, 8).pack(channel) + bytes(13)
+    stream = (
+        b"garbage"
+        + full
+        + bytes(bad_crc)
+        + fake_stx
+        + empty
+        + trimmed
+        + unknown_msg
+        + signed
+        + full[:-1]
+    )
+
+    assert run_harness(harness, ["parse", str(chunk)], stream).decode().splitlines() == [
+        "4 0 1 6 3 -2 1 0 5",
+        "1 0 1 0",
+        f"4 0 1 {len(trimmed) - 12} 3 -2 1 0 0",
+        "4 0 1 6 6 4 5 7 8",
+        "crc 2 dropped 1",
+    ]
+
+
+@requires_gpp
+@pytest.mark.parametrize(
+    "generator",
+    [
+        EmbCppLangGenerator(),
+        EmbCppLangGenerator(static_dispatch=True),
+        EmbCppLangGenerator(amalgamate=True),
+    ],
+    ids=["virtual", "static", "amalgamated"],
+)
+def test_emb_cpp_dispatch(codec, generator, request):
+    """MsgTable::dispatch calls the visitor overload for each frame's message type"""
+    defines = []
+    if generator.static_dispatch:
+        defines = ["-DHARNESS_STATIC_DISPATCH", "-DMAV_INCLUDE_MSG_DETAILS"]
+    exe = build_harness(
+        TESTGEN_OUTPUT_BASE_DIR / f"dispatch_{request.node.callspec.id}", defines, generator
+    )
+    channel = runtime_codec.MavlinkChannel(1, 2, 3)
+    stream = (
+        codec.MessageEmptyMsg().pack(channel)
+        + codec.MessageExtensionFields(-2, 1, 3, 0, 5).pack(channel)
+        + codec.MessageAllFieldTypes(*range(10), b"x", 11, 12).pack(channel)
+        + codec.MessageExtensionFields(4, 5, 6, 7, 8).pack(channel)
+    )
+    assert run_harness(exe, ["dispatch"], stream).decode().splitlines() == [
+        "empty 1",
+        "extension 1 3 5",
+        "skipped 2",
+        "extension 1 6 8",
+    ]
+
+
+@requires_gpp
+def test_emb_cpp_amalgamated_layout():
+    """
+    Amalgamated output is one self-contained header per dialect. Any of them can be included
+    together, directly or through the precompilable umbrella
+    """
+    validated_xmls = MavlinkXmlValidator().validate([COMPLEX_TREE_DIR / "top_level.xml"])
+    out_dir = TESTGEN_OUTPUT_BASE_DIR / "amalgamated"
+    sink = MemorySink(root=out_dir)
+    generator = EmbCppLangGenerator(amalgamate=True, pch_umbrella=True)
+    assert generator.generate(validated_xmls, out_dir, sink)
+
+    dialect_headers = {
+        f"inc/{xml.get_name('lower_snake')}/{xml.get_name('UpperCamel')}Msgs.hpp"
+        for xml in validated_xmls.values()
+    }
+    assert set(sink.files) == dialect_headers | {"inc/MavlinkPch.hpp", "inc/MavlinkFrameQueue.hpp"}
+    for header in dialect_headers:
+        assert '#include "' not in sink.read_text(out_dir / header)
+
+    for name, contents in sink.files.items():
+        (out_dir / name).parent.mkdir(parents=True, exist_ok=True)
+        (out_dir / name).write_bytes(contents)
+    (out_dir / "tu.cpp").write_text(
+        '#include "MavlinkPch.hpp"\n#include "m1/M1Msgs.hpp"\n#include "r2/R2Msgs.hpp"\n'
+        + '#include "MavlinkFrameQueue.hpp"\n'
+        + "mavgen::MavlinkFrameQueue<mavgen::top_level::TopLevelMsgTable, 4> queue;\n"
+        + "int main() { return mavgen::top_level::TopLevelMsgTable::COUNT == 0; }\n"
+    )
+    subprocess.run(
+        ["g++", "-std=c++17", "-Wall", "-Wextra", "-Werror", f"-I{out_dir / 'inc'}", "tu.cpp"]
+        + ["-o", (out_dir / "tu").as_posix()],
+        cwd=out_dir,
+        check=True,
+    )
+    run_harness(out_dir / "tu", [])
+
+
+@requires_gpp
+def test_emb_cpp_frame_queue_stress():
+    """
+    Frames pushed to a MavlinkFrameQueue from one thread all arrive at another, in order.
+    Built with ThreadSanitizer so missing memory ordering is reported as a failure
+    """
+    out_dir = TESTGEN_OUTPUT_BASE_DIR / "queue_stress"
+    assert MavlibgenRunner.generate_once(TEST_MSG_DEF, "emb_cpp", out_dir)
+    inc_dir = out_dir / "inc"
+    (out_dir / "stress.cpp").write_text(QUEUE_STRESS_SRC)
+    exe = out_dir / "stress"
+    subprocess.run(
+        ["g++", "-std=c++17", "-O1", "-Wall", "-Wextra", "-Werror", "-pthread"]
+        + ["-fsanitize=thread", f"-I{inc_dir}", f"-I{inc_dir / DIALECT_NAME}", "stress.cpp"]
+        + ["-o", exe.as_posix()],
+        cwd=out_dir,
+        check=True,
+    )
+    # the queue only holds 8 frames, so both sides wait on each other throughout
+    num_frames = 200000
+    received, _, left_in_queue = run_harness(exe, [str(num_frames)]).decode().split()
+    assert (int(received), int(left_in_queue)) == (num_frames, 0)
@@ -0,0 +1,162 @@
+################################################################################
+# \file test_runtime_codec
+#
+# Verify message classes built in memory by runtime_codec behave the same as
+# the ones written to disk by the python generator
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import sys, time, importlib.util, inspect
+from typing import List
+import pytest
+from pathlib import Path
+
+script_dir = Path(__file__).parent.resolve()
+sys.path.insert(0, script_dir.parent.parent.parent.absolute())
+
+from mavlib_gen.lang_generators.generator_python import PythonLangGenerator
+from mavlib_gen.validator import MavlinkXmlValidator
+from mavlib_gen import runtime_codec
+
+TESTGEN_OUTPUT_BASE_DIR = (
+    script_dir.parent.parent
+    / "test_artifacts"
+    / f"pyruntime_codec_tests{str(int(time.time_ns() / 1000))}"
+)
+
+DIALECT_NAME = "message_type_tests"
+
+TEST_MSG_DEF = script_dir.parent / "test_cases" / f"{DIALECT_NAME}.xml"
+
+
+def load_generated_module(output_dir: Path, use_properties: bool):
+    """Generate python code for the test dialect, with or without properties, and import it under
+    a unique name"""
+    generator = PythonLangGenerator(use_properties=use_properties)
+    assert generator.generate(MavlinkXmlValidator().validate([TEST_MSG_DEF]), output_dir)
+    sys.path.insert(0, output_dir.as_posix())
+    spec = importlib.util.spec_from_file_location(
+        f"{DIALECT_NAME}_msgs_props{use_properties}", output_dir / f"{DIALECT_NAME}_msgs.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def field_values(msg_cls):
+    """One valid value per constructor argument of a message class"""
+    values = []
+    for idx, param in enumerate(list(inspect.signature(msg_cls.__init__).parameters.values())[1:]):
+        annotation = param.annotation
+        if annotation == List[int]:
+            values.append([(idx + count) % 100 for count in range(255)])
+        elif annotation == List[float]:
+            values.append([idx + count / 4 for count in range(255)])
+        elif annotation is float:
+            values.append(idx + 0.5)
+        elif annotation is str:
+            values.append(b"x")
+        else:
+            values.append(idx + 1)
+    return values
+
+
+def pack_result(msg):
+    """Packed bytes, or the exception type if packing failed"""
+    try:
+        return msg.pack(runtime_codec.MavlinkChannel(1, 2, 3))
+    except Exception as err:
+        return type(err)
+
+
+@pytest.fixture(scope="module")
+def validated_xmls():
+    return MavlinkXmlValidator().validate([TEST_MSG_DEF])
+
+
+@pytest.mark.parametrize("use_properties", [False, True])
+def test_runtime_classes_match_generated(validated_xmls, use_properties):
+    generated = load_generated_module(
+        TESTGEN_OUTPUT_BASE_DIR / f"props_{use_properties}", use_properties
+    )
+    codec = runtime_codec.build_codecs(validated_xmls, use_properties=use_properties)[DIALECT_NAME]
+
+    generated_map = getattr(generated, f"MAVLINK_{DIALECT_NAME.upper()}_MSG_ID_MAP")
+    assert sorted(codec.msg_id_map) == sorted(generated_map)
+    num_packed = 0
+    for msg_id, generated_cls in generated_map.items():
+        runtime_cls = codec.msg_id_map[msg_id]
+        assert runtime_cls is getattr(codec, generated_cls.__name__)
+        assert runtime_cls.__name__ == generated_cls.__name__
+        for attr in ("CRC_EXTRA", "MSG_ID", "NAME", "FORMAT"):
+            assert getattr(runtime_cls, attr) == getattr(generated_cls, attr)
+        assert codec.crc_extra_map[msg_id] == generated_cls.CRC_EXTRA
+        assert inspect.signature(runtime_cls.__init__) == inspect.signature(
+            generated_cls.__init__
+        )
+
+        values = field_values(generated_cls)
+        runtime_msg = runtime_cls(*values)
+        generated_msg = generated_cls(*values)
+        for name in list(inspect.signature(generated_cls.__init__).parameters)[1:]:
+            assert getattr(runtime_msg, name) == getattr(generated_msg, name)
+            # both sides were built with the same use_properties
+            assert isinstance(getattr(generated_cls, name, None), property) == use_properties
+            assert isinstance(getattr(runtime_cls, name, None), property) == use_properties
+        assert pack_result(runtime_msg) == pack_result(generated_msg)
+        num_packed += isinstance(pack_result(generated_msg), (bytes, bytearray))
+
+        # keyword construction fills the same fields
+        names = list(inspect.signature(generated_cls.__init__).parameters)[1:]
+        keyword_msg = runtime_cls(**dict(zip(names, values)))
+        assert pack_result(keyword_msg) == pack_result(generated_msg)
+    # everything but the char array message is expected to pack
+    assert num_packed == len(generated_map) - 1
+
+
+def test_runtime_pack_serializes_fields(validated_xmls):
+    codec = runtime_codec.build_codecs(validated_xmls)[DIALECT_NAME]
+    msg = codec.MessageExtensionFields(-2, 1, 3, 0, 0)
+    packed = msg.pack(runtime_codec.MavlinkChannel(1, 2, 3))
+    # header, then wire-ordered fields with the trailing zero extension fields trimmed
+    assert packed[1] == 4
+    assert packed[10:14] == bytes([3, 0, 0xFE, 1])
+    assert len(packed) == 10 + 4 + 2
+
+
+def test_runtime_constructor_errors(validated_xmls):
+    codec = runtime_codec.build_codecs(validated_xmls)[DIALECT_NAME]
+    with pytest.raises(TypeError):
+        codec.MessageExtensionFields(1, 2, 3)
+    with pytest.raises(TypeError):
+        codec.MessageExtensionFields(1, 2, 3, 4, 5, 6)
+    with pytest.raises(TypeError):
+        codec.MessageExtensionFields(1, 2, 3, 4, 5, testfield0=1)
+    with pytest.raises(TypeError):
+        codec.MessageExtensionFields(1, 2, 3, 4, not_a_field=5)
+    with pytest.raises(AttributeError):
+        codec.MessageNotInDialect
+
+
+def test_codecs_are_cached_by_fingerprint(validated_xmls):
+    runtime_codec.clear_codec_cache()
+    codec = runtime_codec.build_codecs(validated_xmls)[DIALECT_NAME]
+    assert runtime_codec.build_codecs(validated_xmls)[DIALECT_NAME] is codec
+
+    # a freshly validated copy of the same xml maps to the same codec
+    revalidated = MavlinkXmlValidator().validate([TEST_MSG_DEF])
+    assert runtime_codec.build_codecs(revalidated)[DIALECT_NAME] is codec
+
+    with_properties = runtime_codec.build_codecs(validated_xmls, use_properties=True)
+    assert with_properties[DIALECT_NAME].fingerprint != codec.fingerprint
+
+    runtime_codec.clear_codec_cache()
+    rebuilt = runtime_codec.build_codecs(validated_xmls)[DIALECT_NAME]
+    assert rebuilt is not codec
+    assert rebuilt.fingerprint == codec.fingerprint
+    assert runtime_codec.build_codecs({}) is None
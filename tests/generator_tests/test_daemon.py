@@ -0,0 +1,121 @@
+################################################################################
+# \file test_daemon
+#
+# Tests for the generation daemon and the client that falls back to
+# generating in-process
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import sys, shutil, time, tempfile, threading, logging
+import pytest
+from pathlib import Path
+
+script_dir = Path(__file__).parent.resolve()
+sys.path.insert(0, script_dir.parent.parent)
+
+from mavlibgen import MavlibgenRunner
+from mavlib_gen.daemon import is_daemon_running
+
+TEST_OUT_DIR = script_dir.parent / "test_artifacts" / f"daemon{str(int(time.time_ns() / 1000))}"
+VALID_XML = script_dir / "test_cases" / "valid_mavlink.xml"
+INVALID_XML = script_dir / "test_cases" / "invalid_mavlink.xml"
+
+
+def teardown_module(module):
+    """pytest module teardown. remove any generated mavlink files"""
+    if TEST_OUT_DIR.is_dir():
+        shutil.rmtree(TEST_OUT_DIR)
+
+
+def write_config(name: str) -> Path:
+    """config file generating python into its own output directory"""
+    out_dir = TEST_OUT_DIR / name
+    out_dir.mkdir(parents=True, exist_ok=True)
+    config_file = out_dir / "mavlibgen.yaml"
+    config_file.write_text(f"generate:\n  outdir: {out_dir.as_posix()}\n  python:\n")
+    return config_file
+
+
+@pytest.fixture
+def socket_path():
+    # socket paths have a short length limit, keep them out of the (long) artifacts path
+    socket_dir = Path(tempfile.mkdtemp())
+    yield socket_dir / "mavlibgen.sock"
+    shutil.rmtree(socket_dir)
+
+
+@pytest.fixture
+def running_daemon(socket_path):
+    daemon = MavlibgenRunner.create_daemon(socket_path)
+    assert daemon.start()
+    server_thread = threading.Thread(target=daemon.serve_forever)
+    server_thread.start()
+    yield daemon
+    daemon.shutdown()
+    server_thread.join()
+    assert not socket_path.exists()
+
+
+def test_client_falls_back_without_daemon(socket_path):
+    """with no daemon running the client generates in-process"""
+    assert not is_daemon_running(socket_path)
+    config_file = write_config("fallback")
+    assert MavlibgenRunner(VALID_XML, config_file).run_with_daemon(socket_path)
+    assert (config_file.parent / "python" / "valid_mavlink_msgs.py").is_file()
+
+
+def test_daemon_generates_concurrent_requests(running_daemon, socket_path):
+    """concurrent requests, some sharing an output directory, all succeed"""
+    config_files = [write_config("daemon_a"), write_config("daemon_b")]
+    results = []
+
+    def client(config_file: Path):
+        results.append(MavlibgenRunner(VALID_XML, config_file).run_with_daemon(socket_path))
+
+    clients = [threading.Thread(target=client, args=(conf,)) for conf in config_files * 3]
+    for client_thread in clients:
+        client_thread.start()
+    for client_thread in clients:
+        client_thread.join()
+
+    assert results == [True] * len(clients)
+    for config_file in config_files:
+        assert (config_file.parent / "python" / "valid_mavlink_msgs.py").is_file()
+
+
+def test_daemon_reports_failures(running_daemon, socket_path, caplog):
+    """validation failures are returned to the client along with the daemons error logs"""
+    config_file = write_config("daemon_invalid")
+    caplog.clear()
+    with caplog.at_level(logging.ERROR):
+        assert not MavlibgenRunner(INVALID_XML, config_file).run_with_daemon(socket_path)
+    assert any("invalid_mavlink.xml" in record.getMessage() for record in caplog.records)
+    assert not (config_file.parent / "python").exists()
+
+
+def test_second_daemon_refuses_socket(running_daemon, socket_path):
+    assert not MavlibgenRunner.create_daemon(socket_path).start()
+    assert is_daemon_running(socket_path)
+
+
+def test_output_dir_lock_is_per_directory(socket_path):
+    daemon = MavlibgenRunner.create_daemon(socket_path)
+    with daemon.output_dir_lock(TEST_OUT_DIR / "a"):
+        # a different directory isnt blocked
+        with daemon.output_dir_lock(TEST_OUT_DIR / "b"):
+            pass
+        # the same directory is
+        acquired = []
+        other = threading.Thread(
+            target=lambda: acquired.append(
+                daemon._dir_locks[(TEST_OUT_DIR / "a").resolve()].acquire(timeout=0.1)
+            )
+        )
+        other.start()
+        other.join()
+        assert acquired == [False]
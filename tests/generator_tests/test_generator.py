@@ -11,14 +11,24 @@
 # See the file 'LICENSE' in the root directory of the present
 # distribution, or http://opensource.org/licenses/MIT.
 ################################################################################
-import sys, shutil, time
+import sys, shutil, time, threading, subprocess, textwrap
+import pytest
 from pathlib import Path
+from schema import SchemaError
 
 script_dir = Path(__file__).parent.resolve()
 sys.path.insert(0, script_dir.parent.parent)
+COMPLEX_TREE_DIR = (
+    script_dir.parent / "xml_validator_tests" / "test_cases" / "pass" / "complex_include_graph"
+)
 
 from mavlibgen import MavlibgenRunner
-from mavlib_gen.generator import GENERATOR_MAP
+from mavlib_gen.generator import (
+    BUILTIN_GENERATORS,
+    GENERATOR_ENTRY_POINT_GROUP,
+    GENERATOR_MAP,
+    GeneratorRegistry,
+)
 
 TEST_OUT_DIR = script_dir.parent / "test_artifacts" / str(int(time.time_ns() / 1000))
 
@@ -51,3 +61,187 @@ def test_gen_with_valid_file():
     """verify if the file is valid, generate returns true"""
     valid_file = script_dir / "test_cases" / "valid_mavlink.xml"
     assert MavlibgenRunner.generate_once(valid_file, VALID_OUTPUT_LANG, TEST_OUT_DIR)
+
+
+def test_run_with_config_file():
+    """verify a yaml config file is loaded and its generators are run"""
+    out_dir = TEST_OUT_DIR / "config_run"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    config_file = out_dir / "mavlibgen.yaml"
+    config_file.write_text(f"generate:\n  outdir: {out_dir.as_posix()}\n  python:\n")
+    runner = MavlibgenRunner(script_dir / "test_cases" / "valid_mavlink.xml", config_file)
+    assert runner.run()
+    assert (out_dir / "python" / "valid_mavlink_msgs.py").is_file()
+
+
+def test_run_rejects_unknown_generator():
+    out_dir = TEST_OUT_DIR / "unknown_generator"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    config_file = out_dir / "mavlibgen.yaml"
+    config_file.write_text(f"generate:\n  outdir: {out_dir.as_posix()}\n  not_a_language:\n")
+    with pytest.raises(SchemaError):
+        MavlibgenRunner(script_dir / "test_cases" / "valid_mavlink.xml", config_file).run()
+
+
+def test_generators_imported_lazily():
+    """only generators that are looked up get imported"""
+    check = textwrap.dedent(
+        """
+        import sys
+        from mavlib_gen.generator import GENERATOR_MAP
+        def loaded():
+            return sorted(m for m in sys.modules if m.startswith("mavlib_gen.lang_generators."))
+        assert loaded() == [], loaded()
+        GENERATOR_MAP["graphviz"]
+        assert loaded() == [
+            "mavlib_gen.lang_generators.generator_base",
+            "mavlib_gen.lang_generators.generator_graphviz",
+        ], loaded()
+        """
+    )
+    subprocess.run(
+        [sys.executable, "-c", check], cwd=script_dir.parent.parent.as_posix(), check=True
+    )
+
+
+def test_c_generator_registered():
+    valid_file = script_dir / "test_cases" / "valid_mavlink.xml"
+    assert "c" in GENERATOR_MAP
+    assert MavlibgenRunner.generate_once(valid_file, "c", TEST_OUT_DIR / "c")
+    assert (TEST_OUT_DIR / "c" / "valid_mavlink" / "valid_mavlink_msgs.h").is_file()
+
+
+def test_entry_point_generators():
+    """third-party generators are found through their installed entry points"""
+    plugin_dir = TEST_OUT_DIR / "plugin"
+    dist_info = plugin_dir / "mavlib_gen_fake_plugin-0.1.dist-info"
+    dist_info.mkdir(parents=True)
+    (dist_info / "METADATA").write_text("Metadata-Version: 2.1\nName: mavlib_gen_fake_plugin\n")
+    (dist_info / "entry_points.txt").write_text(
+        f"[{GENERATOR_ENTRY_POINT_GROUP}]\n"
+        + "fake = mavlib_gen_fake_plugin:FakeLangGenerator\n"
+        + "python = mavlib_gen_fake_plugin:FakeLangGenerator\n"
+    )
+    (plugin_dir / "mavlib_gen_fake_plugin.py").write_text(
+        textwrap.dedent(
+            """
+            class FakeLangGenerator:
+                pass
+            """
+        )
+    )
+    sys.path.insert(0, plugin_dir.as_posix())
+    try:
+        registry = GeneratorRegistry(BUILTIN_GENERATORS, GENERATOR_ENTRY_POINT_GROUP)
+        assert "fake" in registry
+        assert registry["fake"].__name__ == "FakeLangGenerator"
+        # built-in generators cant be replaced by an entry point
+        assert registry["python"] is GENERATOR_MAP["python"]
+        assert sorted(registry) == sorted(list(BUILTIN_GENERATORS) + ["fake"])
+    finally:
+        sys.path.remove(plugin_dir.as_posix())
+    with pytest.raises(KeyError):
+        GeneratorRegistry(BUILTIN_GENERATORS)["fake"]
+
+
+class RecordingGenerator:
+    """Stand-in for MavlibGenerator that records what it was asked to generate"""
+
+    def __init__(self):
+        self.calls = []
+
+    def generate_all(self, mav_xmls, dialects=None):
+        self.calls.append((sorted(mav_xmls.keys()), dialects))
+        return True
+
+
+def test_watch_regenerates_affected_dialects():
+    """verify watch mode regenerates an edited xml and only the xmls that include it"""
+    tree_dir = TEST_OUT_DIR / "watch_tree"
+    shutil.copytree(COMPLEX_TREE_DIR, tree_dir)
+    generator = RecordingGenerator()
+    runner = MavlibgenRunner(tree_dir / "top_level.xml", generator=generator)
+
+    def edit_xml():
+        time.sleep(0.3)
+        edited_xml = tree_dir / "mid_includes" / "m4.xml"
+        edited_xml.write_text(edited_xml.read_text() + "<!-- edited -->\n")
+
+    editor = threading.Thread(target=edit_xml)
+    editor.start()
+    assert runner.watch(poll_interval=0.05, max_cycles=2)
+    editor.join()
+
+    assert len(generator.calls) == 2
+    all_xmls, first_dialects = generator.calls[0]
+    assert first_dialects is None
+    assert len(all_xmls) == 8
+    assert generator.calls[1] == (all_xmls, {"m4.xml", "m1.xml", "m2.xml", "m5.xml", "top_level.xml"})
+
+
+def test_watch_recovers_from_invalid_include():
+    """verify watch mode keeps watching included xmls after validation fails, so fixing a broken
+    included xml starts a new cycle"""
+    tree_dir = TEST_OUT_DIR / "watch_invalid_tree"
+    shutil.copytree(COMPLEX_TREE_DIR, tree_dir)
+    generator = RecordingGenerator()
+    runner = MavlibgenRunner(tree_dir / "top_level.xml", generator=generator)
+    included_xml = tree_dir / "mid_includes" / "m4.xml"
+    original = included_xml.read_text()
+    watch_done = threading.Event()
+
+    def edit_xml():
+        time.sleep(0.3)
+        included_xml.write_text("<mavlink><not_a_mavlink_tag/></mavlink>\n")
+        time.sleep(0.5)
+        included_xml.write_text(original)
+        # if the fix goes unnoticed, touch the top-level xml so the test can't hang
+        if not watch_done.wait(5.0):
+            top_level = tree_dir / "top_level.xml"
+            top_level.write_text(top_level.read_text() + "<!-- rescue -->\n")
+
+    editor = threading.Thread(target=edit_xml)
+    editor.start()
+    start = time.perf_counter()
+    result = runner.watch(poll_interval=0.05, max_cycles=3)
+    elapsed = time.perf_counter() - start
+    watch_done.set()
+    editor.join()
+
+    assert result
+    assert elapsed < 5.0
+    # the failed cycle doesnt generate, the one after it regenerates everything
+    assert len(generator.calls) == 2
+    assert generator.calls[1][1] is None
+
+
+def test_watch_recovers_from_invalid_config(capsys):
+    """verify an invalid configuration file fails a watch cycle instead of ending the watch, and
+    fixing it regenerates"""
+    out_dir = TEST_OUT_DIR / "watch_config"
+    out_dir.mkdir(parents=True)
+    config_file = out_dir / "mavlibgen.yaml"
+    valid_config = f"generate:\n  outdir: {out_dir.as_posix()}\n  python:\n"
+    config_file.write_text(valid_config)
+    runner = MavlibgenRunner(script_dir / "test_cases" / "valid_mavlink.xml", config_file)
+
+    def edit_config():
+        for config in [
+            # fails the schema
+            valid_config + "    not_an_option: true\n",
+            # isnt yaml
+            "generate: [\n",
+            valid_config,
+        ]:
+            time.sleep(0.6)
+            config_file.write_text(config)
+
+    editor = threading.Thread(target=edit_config)
+    editor.start()
+    assert runner.watch(poll_interval=0.05, max_cycles=4)
+    editor.join()
+
+    output = capsys.readouterr().out
+    assert "cycle 2: failed to load" in output
+    assert "cycle 3: failed to load" in output
+    assert (out_dir / "python" / "valid_mavlink_msgs.py").is_file()
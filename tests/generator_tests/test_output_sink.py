@@ -0,0 +1,114 @@
+################################################################################
+# \file test_output_sink
+#
+# Tests for the output sinks generators write through
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import sys, shutil, time, tarfile, zipfile
+import pytest
+from pathlib import Path
+
+script_dir = Path(__file__).parent.resolve()
+sys.path.insert(0, script_dir.parent.parent)
+
+from mavlib_gen.generator import BUILTIN_GENERATORS, GENERATOR_MAP, MavlibGenerator
+from mavlib_gen.output_sink import ArchiveSink, FileSystemSink, MemorySink
+from mavlib_gen.validator import MavlinkXmlValidator
+
+TEST_OUT_DIR = script_dir.parent / "test_artifacts" / f"output_sink{str(int(time.time_ns() / 1000))}"
+COMPLEX_TREE_DIR = (
+    script_dir.parent / "xml_validator_tests" / "test_cases" / "pass" / "complex_include_graph"
+)
+
+
+def teardown_module(module):
+    """pytest module teardown. remove any generated mavlink files"""
+    if TEST_OUT_DIR.is_dir():
+        shutil.rmtree(TEST_OUT_DIR)
+
+
+@pytest.fixture(scope="module")
+def validated_xmls():
+    return MavlinkXmlValidator().validate([COMPLEX_TREE_DIR / "top_level.xml"])
+
+
+def generate(validated_xmls, out_dir: Path, sink=None) -> bool:
+    generators = [GENERATOR_MAP[lang]() for lang in BUILTIN_GENERATORS]
+    return MavlibGenerator(outdir=out_dir, generators=generators, sink=sink).generate_all(
+        validated_xmls
+    )
+
+
+def files_on_disk(out_dir: Path):
+    return {
+        path.relative_to(out_dir).as_posix(): path.read_bytes()
+        for path in out_dir.rglob("*")
+        if path.is_file()
+    }
+
+
+def test_memory_sink_matches_filesystem(validated_xmls):
+    """every generator writes the same files to memory as it does to disk"""
+    disk_dir = TEST_OUT_DIR / "disk"
+    assert generate(validated_xmls, disk_dir)
+    expected = files_on_disk(disk_dir)
+    for lang_name in BUILTIN_GENERATORS:
+        assert any(name.startswith(f"{lang_name}/") for name in expected), lang_name
+    assert "python/mavlink_types.py" in expected
+    assert "emb_cpp/inc/MavlinkTypes.hpp" in expected
+
+    memory_dir = TEST_OUT_DIR / "memory"
+    sink = MemorySink(root=memory_dir)
+    assert generate(validated_xmls, memory_dir, sink)
+    assert sink.files == expected
+    assert not memory_dir.exists()
+    assert sink.read_text(memory_dir / "python" / "mavlink_types.py") == (
+        disk_dir / "python" / "mavlink_types.py"
+    ).read_text()
+
+
+@pytest.mark.parametrize("archive_name", ["generated.zip", "generated.tar.gz", "generated.tar"])
+def test_archive_sink(validated_xmls, archive_name):
+    out_dir = TEST_OUT_DIR / "archive_out"
+    memory_sink = MemorySink(root=out_dir)
+    assert generate(validated_xmls, out_dir, memory_sink)
+
+    archive_path = TEST_OUT_DIR / archive_name
+    with ArchiveSink(archive_path, root=out_dir) as sink:
+        assert generate(validated_xmls, out_dir, sink)
+    assert not out_dir.exists()
+
+    if archive_name.endswith(".zip"):
+        with zipfile.ZipFile(archive_path) as archive:
+            archived = {name: archive.read(name) for name in archive.namelist()}
+            assert len(archive.namelist()) == len(archived)
+    else:
+        with tarfile.open(archive_path) as archive:
+            members = archive.getmembers()
+            archived = {member.name: archive.extractfile(member).read() for member in members}
+            assert len(members) == len(archived)
+    assert archived == memory_sink.files
+
+
+def test_filesystem_sink_root(tmp_path):
+    sink = FileSystemSink(root=tmp_path)
+    with sink.open_text(Path("a") / "b" / "c.txt") as text_out:
+        text_out.write("relative")
+    sink.write_bytes(tmp_path / "d" / "e.bin", b"\x00\x01")
+    assert (tmp_path / "a" / "b" / "c.txt").read_text() == "relative"
+    assert (tmp_path / "d" / "e.bin").read_bytes() == b"\x00\x01"
+
+
+def test_sink_path_errors(tmp_path):
+    with pytest.raises(ValueError):
+        MemorySink(root=tmp_path / "root").write_bytes(tmp_path / "outside.txt", b"")
+    with pytest.raises(ValueError):
+        MemorySink().write_bytes(tmp_path / "no_root.txt", b"")
+    with pytest.raises(ValueError):
+        ArchiveSink(tmp_path / "generated.rar")
@@ -0,0 +1,96 @@
+################################################################################
+# \file test_profiling
+#
+# Tests for the profiling spans recorded during generation runs
+#
+# Copyright (c) 2026 len0rd
+#
+# All rights reserved.
+# This file is distributed under the terms of the MIT License.
+# See the file 'LICENSE' in the root directory of the present
+# distribution, or http://opensource.org/licenses/MIT.
+################################################################################
+import sys, shutil, time, json
+import pytest
+from pathlib import Path
+
+script_dir = Path(__file__).parent.resolve()
+sys.path.insert(0, script_dir.parent.parent)
+
+from mavlibgen import MavlibgenRunner
+from mavlib_gen import profiling
+
+TEST_OUT_DIR = script_dir.parent / "test_artifacts" / f"profiling{str(int(time.time_ns() / 1000))}"
+VALID_XML = script_dir / "test_cases" / "valid_mavlink.xml"
+
+
+def teardown_module(module):
+    """pytest module teardown. remove any generated mavlink files"""
+    if TEST_OUT_DIR.is_dir():
+        shutil.rmtree(TEST_OUT_DIR)
+
+
+@pytest.fixture
+def profiler():
+    profiler = profiling.enable_profiling()
+    yield profiler
+    profiling.disable_profiling()
+
+
+def test_span_disabled_is_noop():
+    assert profiling.disable_profiling() is None
+    with profiling.span("nothing", "test") as first:
+        pass
+    # the same shared object is handed out every time, nothing gets recorded
+    assert profiling.span("other") is first
+
+
+def test_span_records_into_active_profiler(profiler):
+    with profiling.span("outer", "test", "detail"):
+        with profiling.span("inner", "test"):
+            pass
+    assert [event[0] for event in profiler.events] == ["inner", "outer"]
+    assert profiling.disable_profiling() is profiler
+    with profiling.span("after_disable"):
+        pass
+    assert len(profiler.events) == 2
+
+
+def test_generation_spans(profiler):
+    assert MavlibgenRunner.generate_once(VALID_XML, "python", TEST_OUT_DIR / "python")
+    profiling.disable_profiling()
+
+    recorded = {(category, name) for category, name, *_ in profiler.summary()}
+    for expected in [
+        ("validate", "validate_single_xml"),
+        ("validate", "expand_includes"),
+        ("validate", "generate_dependency_list"),
+        ("generator", "python"),
+        ("render", "dialect_msgs.py.jinja"),
+        ("file", "write"),
+    ]:
+        assert expected in recorded
+    assert any(category == "xml_validator" for category, _ in recorded)
+
+    table = profiler.summary_table()
+    assert "validate_single_xml" in table
+    assert table.splitlines()[-1].startswith("profiled run:")
+
+
+def test_chrome_trace_output(profiler):
+    assert MavlibgenRunner.generate_once(VALID_XML, "python", TEST_OUT_DIR / "trace")
+    profiling.disable_profiling()
+    trace_file = TEST_OUT_DIR / "trace.json"
+    profiler.write_chrome_trace(trace_file)
+
+    trace = json.loads(trace_file.read_text())
+    events = trace["traceEvents"]
+    assert len(events) == len(profiler.events)
+    for event in events:
+        assert event["ph"] == "X"
+        assert event["ts"] >= 0
+        assert event["dur"] >= 0
+        assert {"name", "cat", "pid", "tid"} <= set(event)
+    render_events = [event for event in events if event["cat"] == "render"]
+    assert render_events
+    assert all("detail" in event["args"] for event in render_events)
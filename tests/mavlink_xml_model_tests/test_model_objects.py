@@ -18,6 +18,7 @@ sys.path.insert(0, script_dir.parent.parent)
 
 from mavlib_gen.validator import *
 import xmlschema
+import pytest
 
 TEST_CASE_DIR = script_dir / "test_cases"
 mav_schema_dir = script_dir.parent.parent / "mavlib_gen" / "schema"
@@ -70,3 +71,48 @@ def test_enum_import():
                             break
                     assert truthParam is not None
                     assert truthParam["$"] == param.description
+
+
+def test_model_objects_are_frozen():
+    """Model containers are immutable after construction and objects reject unknown attributes"""
+    validator = MavlinkXmlValidator()
+    message_xml = (
+        script_dir.parent / "generated_code_tests" / "test_cases" / "message_type_tests.xml"
+    )
+    model = validator.validate_single_xml(message_xml)
+    assert model is not None
+
+    for msg in model.xml.messages:
+        assert isinstance(msg.all_fields, tuple)
+        assert msg.all_fields == msg.fields + msg.extension_fields
+        assert msg.all_fields_sorted == msg.sorted_fields + msg.extension_fields
+        assert msg.num_fields == len(msg.all_fields)
+        with pytest.raises(AttributeError):
+            msg.some_new_attribute = True
+
+    enum_xml = validator.validate_single_xml(TEST_CASE_DIR / "simple_enum.xml").xml
+    enum = enum_xml.enums[0]
+    assert isinstance(enum.entries, tuple)
+    assert enum.has_params
+    assert [entry.has_params for entry in enum.entries] == [True, False]
+    with pytest.raises(AttributeError):
+        enum.entries[0].params[0].some_new_attribute = True
+
+
+def test_formatted_strings_are_memoized():
+    """Repeated name/description formatting returns the cached string for the same arguments"""
+    validator = MavlinkXmlValidator()
+    enum = validator.validate_single_xml(TEST_CASE_DIR / "simple_enum.xml").xml.enums[0]
+
+    camel = enum.get_name("UpperCamel")
+    assert camel == "TestEnumName"
+    assert enum.get_name("UpperCamel") is camel
+    assert enum.get_name("lower_snake") == "test_enum_name"
+
+    entry = enum.entries[0]
+    plain = entry.formatted_description()
+    assert entry.formatted_description() is plain
+    assert entry.formatted_description(line_prefix="* ", leading_newline=True) == (
+        "\n* Test enum entry description"
+    )
+    assert entry.formatted_description() is plain
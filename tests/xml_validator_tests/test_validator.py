@@ -4,6 +4,9 @@ from pathlib import Path
 script_dir = Path(__file__).parent.resolve()
 sys.path.insert(0, script_dir.parent.parent)
 from mavlib_gen.validator import *
+import mavlib_gen.validator
+from mavlib_gen.model.converter import MavlinkXmlConverter
+from mavlib_gen.model.mavlink_xml import MavlinkXml
 import networkx as netx
 
 TEST_CASE_DIR = script_dir / "test_cases"
@@ -115,6 +118,18 @@ def test_complex_include_tree(validator):
         assert sorted(expected_successors[node]) == sorted(list(include_graph.successors(node)))
 
 
+def test_circular_include(validator, caplog):
+    """an include cycle should fail and report the xmls involved"""
+    top_xml = validator.validate_single_xml(TEST_CASE_DIR / "fail" / "circular_include" / "top.xml")
+    assert top_xml is not None
+    assert validator.expand_includes({top_xml.filename: top_xml}) is None
+    assert any(
+        "mid.xml -> bottom.xml -> mid.xml" in record.getMessage()
+        or "bottom.xml -> mid.xml -> bottom.xml" in record.getMessage()
+        for record in caplog.records
+    )
+
+
 def test_generate_dependency_list_complex_tree(validator):
     """verify generate_dependency_list produces accurate results for a complex tree"""
     expected_dep_lists = {
@@ -139,6 +154,46 @@ def test_generate_dependency_list_complex_tree(validator):
     for fname, xml in expanded_xmls.items():
         assert fname in expected_dep_lists
         assert sorted(expected_dep_lists[fname]) == sorted(xml.dependencies)
+        # dependencies are ordered so each xml comes after everything it includes
+        for idx, dep in enumerate(xml.dependencies):
+            assert set(expanded_xmls[dep].dependencies).issubset(xml.dependencies[:idx])
+
+
+def test_parallel_include_expansion_matches_serial(monkeypatch):
+    """validating each level of includes in a process pool should give the same result as serially"""
+    serial_validator = MavlinkXmlValidator(max_workers=1)
+    serial_xmls, serial_graph = serial_validator.expand_includes(
+        setup_complex_tree_top_xmls(serial_validator)
+    )
+
+    # force the pool to be used for every level with more than one new include
+    monkeypatch.setattr(mavlib_gen.validator, "MIN_PARALLEL_VALIDATIONS", 2)
+    parallel_validator = MavlinkXmlValidator(max_workers=2)
+    result = parallel_validator.expand_includes(setup_complex_tree_top_xmls(parallel_validator))
+    assert result is not None
+    parallel_xmls, parallel_graph = result
+
+    assert list(serial_xmls.keys()) == list(parallel_xmls.keys())
+    for fname, xml in serial_xmls.items():
+        assert xml.absolute_path == parallel_xmls[fname].absolute_path
+        assert xml.xml.includes == parallel_xmls[fname].xml.includes
+    assert sorted(serial_graph.edges) == sorted(parallel_graph.edges)
+
+
+def test_parallel_include_expansion_invalid_include(monkeypatch, tmp_path):
+    """an invalid include validated in a worker process should fail expansion"""
+    monkeypatch.setattr(mavlib_gen.validator, "MIN_PARALLEL_VALIDATIONS", 2)
+    (tmp_path / "top.xml").write_text(
+        "<mavlink><include>good.xml</include><include>bad.xml</include></mavlink>"
+    )
+    (tmp_path / "good.xml").write_text("<mavlink></mavlink>")
+    (tmp_path / "bad.xml").write_text(
+        '<mavlink><messages><message id="1" name="BAD NAME"/></messages></mavlink>'
+    )
+    validator = MavlinkXmlValidator(max_workers=2)
+    top_xml = validator.validate_single_xml(tmp_path / "top.xml")
+    assert top_xml is not None
+    assert validator.expand_includes({top_xml.filename: top_xml}) is None
 
 
 ###################################
@@ -205,3 +260,108 @@ def test_conflicting_names(validator, msg_id_name_validator):
     assert result is not None
     validator.generate_dependency_list(result[0], result[1])
     assert not msg_id_name_validator.validate(result[0], result[1])
+
+
+###################################
+# Fast Validation Path
+###################################
+
+SCHEMA_TEST_CASE_DIR = script_dir.parent / "xml_schema_tests" / "test_cases"
+fast_path_failure_files = sorted((SCHEMA_TEST_CASE_DIR / "fail").glob("*.xml"))
+fast_path_success_files = sorted((SCHEMA_TEST_CASE_DIR / "pass").glob("*.xml")) + sorted(
+    (script_dir.parent / "generated_code_tests" / "test_cases").glob("*.xml")
+)
+
+
+@pytest.fixture
+def fast_validator():
+    return MavlinkXmlFastValidator(MavlinkXmlValidator.SCHEMA_DIR)
+
+
+def model_slots(obj) -> list:
+    """All __slots__ attribute names of a model object, across its class hierarchy"""
+    return [
+        slot
+        for cls in type(obj).__mro__
+        for slot in getattr(cls, "__slots__", ())
+        if slot != "_format_cache"
+    ]
+
+
+def assert_models_equal(fast_obj, schema_obj, path="xml"):
+    """Recursively compare two model objects built by the fast path and the schema path"""
+    if isinstance(schema_obj, (list, tuple)):
+        assert len(fast_obj) == len(schema_obj), path
+        for idx, (fast_item, schema_item) in enumerate(zip(fast_obj, schema_obj)):
+            assert_models_equal(fast_item, schema_item, f"{path}[{idx}]")
+    elif model_slots(schema_obj):
+        assert type(fast_obj) == type(schema_obj), path
+        for attr in model_slots(schema_obj):
+            assert_models_equal(
+                getattr(fast_obj, attr), getattr(schema_obj, attr), f"{path}.{attr}"
+            )
+    else:
+        assert fast_obj == schema_obj, path
+
+
+@pytest.mark.parametrize("filename", fast_path_failure_files, ids=lambda f: f.name)
+def test_fast_path_failure_cases(validator, fast_validator, filename):
+    """xmls the schema rejects must be rejected by the fast path too"""
+    assert fast_validator.parse(filename) is None
+    assert validator.validate_single_xml(filename) is None
+
+
+@pytest.mark.parametrize("filename", fast_path_success_files, ids=lambda f: f.name)
+def test_fast_path_success_cases(fast_validator, filename):
+    """xmls the schema accepts must be accepted by the fast path with an identical model"""
+    fast_model = fast_validator.parse(filename)
+    assert fast_model is not None
+    schema_validator = MavlinkXmlValidator(use_fast_path=False)
+    schema_model = schema_validator.validate_single_xml(filename)
+    assert schema_model is not None
+    assert_models_equal(fast_model, schema_model.xml)
+
+
+@pytest.mark.parametrize("filename", fast_path_success_files, ids=lambda f: f.name)
+def test_converter_matches_data_element_model(validator, filename):
+    """The single-pass schema converter must build the same model as decoding to DataElements"""
+    converted_model = validator.schema.decode(filename, converter=MavlinkXmlConverter)
+    assert isinstance(converted_model, MavlinkXml)
+    data_element_model = MavlinkXml(validator.schema.decode(filename))
+    assert_models_equal(converted_model, data_element_model)
+
+
+def test_fast_path_skips_schema_compile(validator):
+    """The XSD schema should only be compiled when the fast path finds a problem"""
+    assert validator.validate_single_xml(TEST_CASE_DIR / "pass" / "no_includes.xml") is not None
+    assert validator._schema is None
+    bad_name_xml = SCHEMA_TEST_CASE_DIR / "fail" / "bad_name_1.xml"
+    assert validator.validate_single_xml(bad_name_xml) is None
+    assert validator._schema is not None
+
+
+def test_all_conflicts_reported(validator, msg_id_name_validator, caplog):
+    """verify every id and name conflict is reported in a single run"""
+    top_xml = validator.validate_single_xml(
+        TEST_CASE_DIR / "fail" / "include_with_multiple_conflicts" / "top.xml"
+    )
+    assert top_xml is not None
+    result = validator.expand_includes({top_xml.filename: top_xml})
+    assert result is not None
+    validator.generate_dependency_list(result[0], result[1])
+    assert not msg_id_name_validator.validate(result[0], result[1])
+    errors = [record.getMessage() for record in caplog.records if record.levelname == "ERROR"]
+    assert any("Conflicting message id 1" in error for error in errors)
+    assert any("Conflicting message name TEST2" in error for error in errors)
+
+
+def test_unrelated_xmls_may_share_ids(validator, msg_id_name_validator):
+    """xmls that never end up in the same dependency tree can reuse message ids and names"""
+    conflict_dir = TEST_CASE_DIR / "fail" / "include_with_multiple_conflicts"
+    xmls = [
+        validator.validate_single_xml(conflict_dir / fname) for fname in ["root.xml", "other.xml"]
+    ]
+    result = validator.expand_includes({xml.filename: xml for xml in xmls})
+    assert result is not None
+    validator.generate_dependency_list(result[0], result[1])
+    assert msg_id_name_validator.validate(result[0], result[1])